@@ -0,0 +1,31 @@
+"""
+Compact raw wellness samples older than the retention window into per-day blocks
+
+Usage:
+    python -m app.compact_metrics            # all users
+    python -m app.compact_metrics --user 42  # a single user
+"""
+import argparse
+from app.database import each_user_database, init_database, session_for_user
+from app.services.metrics import MetricService, RAW_RETENTION_DAYS
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact LifeOS metric samples")
+    parser.add_argument("--user", type=int, default=None, help="Only compact this user id")
+    args = parser.parse_args()
+
+    init_database()
+    db = session_for_user(args.user)
+    try:
+        if args.user is not None:
+            compacted = MetricService.compact(db, user_id=args.user)
+        else:
+            compacted = sum(MetricService.compact(user_db) for user_db in each_user_database(db))
+        print(f"Compacted {compacted} samples older than {RAW_RETENTION_DAYS} days")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+"""
+Response compression middleware: zstd, brotli or gzip, whichever the client accepts
+
+Small bodies (auth tokens, single rows) go out untouched; large ones are
+compressed with the best encoding both sides support. Whole bodies are
+compressed in one go at the normal level and sent as is if that does not
+make them smaller. Streaming responses (exports) are compressed chunk by
+chunk at the fast level, flushed often enough that the client is never
+far behind. Compressing a large
+body or chunk runs in a worker thread so the event loop keeps serving
+other requests meanwhile.
+
+brotli and zstandard are optional: an encoding whose library is not
+installed is simply never offered. gzip is always available.
+"""
+import os
+import zlib
+from typing import Callable, Dict, Optional, Tuple
+from anyio import to_thread
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+
+
+# Bodies smaller than this are not worth the encoding header and the CPU
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+# Bodies and stream chunks at least this large are compressed in a worker thread
+COMPRESSION_THREAD_BYTES = int(os.getenv("COMPRESSION_THREAD_BYTES", str(64 * 1024)))
+# Levels for whole bodies and for streams (and whole bodies over COMPRESSION_LARGE_BYTES);
+# see benchmarks/bench_compression.py for what each level costs and saves
+COMPRESSION_LEVELS = {
+    "zstd": (int(os.getenv("COMPRESSION_ZSTD_LEVEL", "6")), int(os.getenv("COMPRESSION_ZSTD_FAST_LEVEL", "3"))),
+    "br": (int(os.getenv("COMPRESSION_BROTLI_LEVEL", "5")), int(os.getenv("COMPRESSION_BROTLI_FAST_LEVEL", "3"))),
+    "gzip": (int(os.getenv("COMPRESSION_GZIP_LEVEL", "6")), int(os.getenv("COMPRESSION_GZIP_FAST_LEVEL", "1"))),
+}
+COMPRESSION_LARGE_BYTES = int(os.getenv("COMPRESSION_LARGE_BYTES", str(4 * 1024 * 1024)))
+# A stream's compressor is flushed once this much input has gone in without output coming out,
+# so a slow stream is never held back by more than this
+COMPRESSION_STREAM_FLUSH_BYTES = int(os.getenv("COMPRESSION_STREAM_FLUSH_BYTES", str(32 * 1024)))
+
+# Content types that are compressed already or are streamed for latency, not volume
+SKIP_TYPE_PREFIXES = ("image/", "video/", "audio/", "font/woff", "text/event-stream")
+SKIP_TYPES = {
+    "application/gzip", "application/x-gzip", "application/zip", "application/zstd", "application/x-bzip2",
+    "application/x-7z-compressed", "application/octet-stream", "application/pdf",
+}
+
+
+class _Gzip:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _Brotli:
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _Zstd:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+# Server preference when the client accepts several encodings equally
+ENCODERS: Dict[str, Callable] = {}
+if zstandard is not None:
+    ENCODERS["zstd"] = _Zstd
+if brotli is not None:
+    ENCODERS["br"] = _Brotli
+ENCODERS["gzip"] = _Gzip
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Pick the encoding for a response from the request's Accept-Encoding
+
+    The client's quality values decide; among equally acceptable encodings
+    the server prefers zstd, then brotli, then gzip. ``*`` stands for any
+    encoding not listed.
+
+    Returns:
+        The encoding name, or None to send the body uncompressed
+    """
+    if not accept_encoding:
+        return None
+    qualities: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        q = 1.0
+        name, _, value = params.partition("=")
+        if name.strip() == "q":
+            try:
+                q = float(value)
+            except ValueError:
+                q = 0.0
+        if coding:
+            qualities[coding] = q
+    wildcard = qualities.get("*", 0.0)
+    best, best_q = None, 0.0
+    for coding in ENCODERS:
+        q = qualities.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(encoding: str, data: bytes, level: int) -> bytes:
+    """Compress a whole body with the named encoding"""
+    encoder = ENCODERS[encoding](level)
+    return encoder.compress(data) + encoder.finish()
+
+
+def _compressible(headers: Headers) -> bool:
+    if "content-encoding" in headers:
+        return False
+    content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+    return content_type not in SKIP_TYPES and not content_type.startswith(SKIP_TYPE_PREFIXES)
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing HTTP responses"""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MIN_BYTES,
+                 thread_size: int = COMPRESSION_THREAD_BYTES, large_size: int = COMPRESSION_LARGE_BYTES,
+                 stream_flush_size: int = COMPRESSION_STREAM_FLUSH_BYTES,
+                 levels: Optional[Dict[str, Tuple[int, int]]] = None):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.thread_size = thread_size
+        self.large_size = large_size
+        self.stream_flush_size = stream_flush_size
+        self.levels = levels or COMPRESSION_LEVELS
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _Responder(self, encoding, send).send)
+
+
+class _Responder:
+    """Per-response state: holds the start message until the first body chunk shows what to do"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.start: Optional[Message] = None
+        self.mode: Optional[str] = None  # "identity" or "stream" once decided
+        self.encoder = None
+        self.unflushed = 0
+
+    async def _run(self, size: int, func, *args):
+        # Big inputs are compressed off the event loop
+        if size >= self.middleware.thread_size:
+            return await to_thread.run_sync(func, *args)
+        return func(*args)
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+        if self.mode == "identity":
+            await self._send(message)
+            return
+        if self.mode == "stream":
+            await self._stream(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        headers = MutableHeaders(raw=self.start["headers"])
+        if not _compressible(headers) or (not more_body and len(body) < self.middleware.minimum_size):
+            await self._identity(message)
+            return
+
+        normal_level, fast_level = self.middleware.levels[self.encoding]
+        if not more_body:
+            level = fast_level if len(body) >= self.middleware.large_size else normal_level
+            compressed = await self._run(len(body), compress, self.encoding, body, level)
+            if len(compressed) >= len(body):
+                await self._identity(message)
+                return
+            headers["Content-Encoding"] = self.encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            self._weaken_etag(headers)
+            await self._send(self.start)
+            await self._send({"type": "http.response.body", "body": compressed, "more_body": False})
+            return
+
+        # A stream: its length is unknown, so it is compressed as it goes at the fast level
+        self.mode = "stream"
+        self.encoder = ENCODERS[self.encoding](fast_level)
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if "content-length" in headers:
+            del headers["Content-Length"]
+        self._weaken_etag(headers)
+        await self._send(self.start)
+        await self._stream(message)
+
+    async def _identity(self, message: Message) -> None:
+        self.mode = "identity"
+        await self._send(self.start)
+        await self._send(message)
+
+    @staticmethod
+    def _weaken_etag(headers: MutableHeaders) -> None:
+        # The compressed bytes differ from the entity the strong validator was computed over
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+
+    async def _stream(self, message: Message) -> None:
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        out = await self._run(len(body), self.encoder.compress, body) if body else b""
+        self.unflushed = 0 if out else self.unflushed + len(body)
+        if not more_body:
+            out += self.encoder.finish()
+        elif self.unflushed >= self.middleware.stream_flush_size:
+            out += self.encoder.flush()
+            self.unflushed = 0
+        # In between, the compressor holds small chunks back until it has a block worth sending
+        if out or not more_body:
+            await self._send({"type": "http.response.body", "body": out, "more_body": more_body})
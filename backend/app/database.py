@@ -2,22 +2,63 @@
 Database configuration and connection setup for LifeOS
 """
 import os
-from sqlalchemy import create_engine, MetaData
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Tuple
+from fastapi import Request
+from sqlalchemy import create_engine, event, MetaData
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import StaticPool
 
 # Database configuration
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./lifeos.db")
 
+# Optional sharding of user data: "" keeps everything in DATABASE_URL, "user"
+# gives every user their own SQLite file and "hash" spreads users over
+# SHARD_COUNT files. The tables in CENTRAL_TABLES always stay in DATABASE_URL.
+SHARD_MODE = os.getenv("SHARD_MODE", "")
+SHARD_COUNT = int(os.getenv("SHARD_COUNT", "8"))
+SHARD_DIR = os.getenv("SHARD_DIR", "./shards")
+# Shard engines kept open at once; the least recently used one is closed beyond this
+SHARD_CACHE_SIZE = int(os.getenv("SHARD_CACHE_SIZE", "64"))
+# Accounts and their refresh tokens, the shared food catalog, the job queue
+# and trigger table that the background workers and scheduler scan across
+# all users, and the idempotency keys, which are checked before the
+# request's user is known
+CENTRAL_TABLES = ("users", "refresh_tokens", "foods", "jobs", "triggers", "idempotency_keys")
+
+
+def create_sqlite_engine(url: str) -> Engine:
+    """
+    Create an engine for a SQLite URL
+
+    In-memory SQLite needs StaticPool so every session sees the same database;
+    file databases use a regular pool so concurrent sessions get their own
+    connection, and run in WAL mode: readers no longer block the single writer,
+    and synchronous=NORMAL makes each commit an append to the log without fsync.
+    """
+    engine_options = {"poolclass": StaticPool} if ":memory:" in url else {}
+    new_engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False},  # SQLite specific
+        echo=False,  # Set to True for SQL query logging during development
+        **engine_options
+    )
+    if url.startswith("sqlite") and ":memory:" not in url:
+        @event.listens_for(new_engine, "connect")
+        def _set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.close()
+    return new_engine
+
+
 # Create SQLAlchemy engine
-# For SQLite, we use StaticPool to ensure connection persistence
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False},  # SQLite specific
-    poolclass=StaticPool,
-    echo=False  # Set to True for SQL query logging during development
-)
+engine = create_sqlite_engine(DATABASE_URL)
 
 # Create SessionLocal class for database sessions
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -28,12 +69,165 @@ Base = declarative_base()
 # Metadata for database operations
 metadata = MetaData()
 
-def get_database():
+
+class ShardRouter:
+    """
+    Routes each user's data to a shard database file
+
+    Sessions from a shard are bound to the shard file, with the central
+    tables bound to the central engine, so services use them exactly like a
+    plain session: a query on ``users`` or ``jobs`` goes to the central
+    database and everything else to the user's shard. Shard files and their
+    tables are created on first use. At most ``capacity`` shard engines stay
+    open; opening another one disposes the least recently used.
+    """
+
+    def __init__(self, mode: str, central_engine: Engine, count: int = SHARD_COUNT, directory: str = SHARD_DIR,
+                 capacity: int = SHARD_CACHE_SIZE):
+        if mode not in ("user", "hash"):
+            raise ValueError(f"Unknown shard mode '{mode}', expected 'user' or 'hash'")
+        self.mode = mode
+        self.central_engine = central_engine
+        self.count = count
+        self.directory = directory
+        self.capacity = capacity
+        self._factories: "OrderedDict[str, sessionmaker]" = OrderedDict()
+        self._created = set()
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.evicted = 0
+
+    def shard_key(self, user_id: int) -> str:
+        """Name of the shard holding a user's data"""
+        if self.mode == "user":
+            return f"user_{user_id}"
+        # crc32 rather than hash() so the placement is the same in every process
+        return f"shard_{zlib.crc32(str(user_id).encode()) % self.count:03d}"
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.db")
+
+    def _factory(self, key: str) -> sessionmaker:
+        with self._lock:
+            factory = self._factories.get(key)
+            if factory is not None:
+                self._factories.move_to_end(key)
+                return factory
+            os.makedirs(self.directory, exist_ok=True)
+            shard_engine = create_sqlite_engine(f"sqlite:///{self.path(key)}")
+            central = [table for table in Base.metadata.sorted_tables if table.name in CENTRAL_TABLES]
+            if key not in self._created:
+                Base.metadata.create_all(
+                    bind=shard_engine,
+                    tables=[table for table in Base.metadata.sorted_tables if table.name not in CENTRAL_TABLES]
+                )
+                self._created.add(key)
+            factory = sessionmaker(
+                autocommit=False, autoflush=False, bind=shard_engine,
+                binds={table: self.central_engine for table in central}
+            )
+            self._factories[key] = factory
+            self.opened += 1
+            if len(self._factories) > self.capacity:
+                # Sessions still using the evicted engine keep their connection until they close
+                _, evicted = self._factories.popitem(last=False)
+                evicted.kw["bind"].dispose()
+                self.evicted += 1
+            return factory
+
+    def session(self, user_id: int) -> Session:
+        """Open a session on a user's shard"""
+        return self._factory(self.shard_key(user_id))()
+
+    def existing_keys(self) -> List[str]:
+        """Names of the shards that have a database file, sorted"""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name[:-3] for name in os.listdir(self.directory) if name.endswith(".db"))
+
+    def session_for_key(self, key: str) -> Session:
+        """Open a session on a shard by name"""
+        return self._factory(key)()
+
+    def partition(self, rows: List[dict]) -> List[Tuple[sessionmaker, List[dict]]]:
+        """Group rows carrying a ``user_id`` by shard, with the session factory of each shard"""
+        groups: Dict[str, List[dict]] = {}
+        for row in rows:
+            groups.setdefault(self.shard_key(row["user_id"]), []).append(row)
+        return [(self._factory(key), group) for key, group in groups.items()]
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "mode": self.mode,
+            "open_shards": len(self._factories),
+            "capacity": self.capacity,
+            "opened": self.opened,
+            "evicted": self.evicted
+        }
+
+    def dispose(self) -> None:
+        """Close every cached shard engine"""
+        with self._lock:
+            for factory in self._factories.values():
+                factory.kw["bind"].dispose()
+            self._factories.clear()
+
+
+shard_router: Optional[ShardRouter] = ShardRouter(SHARD_MODE, engine) if SHARD_MODE else None
+
+
+def session_for_user(user_id: Optional[int]) -> Session:
+    """
+    Open a session on the database holding a user's data
+
+    That is the central database unless sharding is enabled, and for
+    requests or jobs that belong to no user.
+    """
+    if shard_router is None or user_id is None:
+        return SessionLocal()
+    return shard_router.session(user_id)
+
+
+def each_user_database(db: Session) -> Iterator[Session]:
+    """
+    Yield sessions that together cover every user's data, for maintenance jobs
+
+    That is ``db`` itself unless sharding is enabled; otherwise a session on
+    each existing shard in turn, closed when the caller moves on to the next.
+    """
+    if shard_router is None:
+        yield db
+        return
+    for key in shard_router.existing_keys():
+        shard_db = shard_router.session_for_key(key)
+        try:
+            yield shard_db
+        finally:
+            shard_db.close()
+
+
+def _request_user_id(request: Request) -> Optional[int]:
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    from app.services.auth import AuthService  # the auth service imports the models, which import this module
+    token_data = AuthService.verify_token(token)
+    return token_data.user_id if token_data else None
+
+
+def get_database(request: Request):
     """
     Dependency function to get database session
     Yields a database session and ensures it's closed after use
+
+    With sharding enabled the session is opened on the shard of the user
+    named by the Bearer token; unauthenticated requests get the central
+    database, which is all that login and registration need.
     """
-    db = SessionLocal()
+    if shard_router is None:
+        db = SessionLocal()
+    else:
+        db = session_for_user(_request_user_id(request))
     try:
         yield db
     finally:
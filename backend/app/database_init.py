@@ -5,6 +5,21 @@ import os
 import sqlite3
 from app.database import engine, init_database, test_connection
 from app.models.user import User  # Import to register the model
+from app.models.refresh_token import RefreshToken
+from app.models.sync import SyncCounter
+from app.models.task import Task
+from app.models.habit import Habit, HabitYear
+from app.models.metric import MetricPoint, MetricBlock, MetricRollup
+from app.models.food import Food
+from app.models.workout import WorkoutSet, ExerciseSummary, ExerciseDay, MuscleGroupWeek
+from app.models.finance import Transaction, CategoryRule, Budget, BudgetAggregate
+from app.models.focus import FocusEvent
+from app.models.schedule import BusyBlock, TaskDependency, SchedulePlan, ScheduleBlock
+from app.models.journal import JournalEntry
+from app.models.job import Job
+from app.models.trigger import Trigger
+from app.models.idempotency import IdempotencyKey
+from app.models.rollup import DailyRollup
 
 def run_schema_sql():
     """
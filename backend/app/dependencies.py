@@ -0,0 +1,35 @@
+"""
+Shared FastAPI dependencies
+"""
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from app.schemas.auth import TokenData
+from app.services.auth import AuthService
+
+
+security = HTTPBearer()
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> TokenData:
+    """
+    Resolve the authenticated user from the Bearer token
+
+    Only the signed token is checked; no database lookup is made, so this is
+    cheap enough to run on every request to user-owned resources.
+
+    Raises:
+        HTTPException: If the token is missing, invalid or expired
+    """
+    token_data = AuthService.verify_token(credentials.credentials)
+    if not token_data:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail={
+                "error": "authentication_error",
+                "message": "Invalid or expired token",
+                "details": None
+            }
+        )
+    return token_data
@@ -0,0 +1,268 @@
+"""
+Idempotency-Key support for POST and PATCH requests
+
+A client that may retry a request (a phone on a flaky network) sends an
+``Idempotency-Key`` header with a value unique to the operation. The first
+request with the key runs normally and its response is stored; retries
+with the same key get that stored response back, marked with
+``Idempotent-Replayed: true``, without the endpoint running again — a
+replayed task creation does no inserts. Duplicates that arrive while the
+first request is still running wait for it and then replay its response.
+
+Only 2xx responses and deterministic 4xx ones are stored. Server errors,
+requests that raise, and the transient statuses in RETRYABLE_STATUSES
+(timeouts, conflicts, locks and rate limits, which a client is meant to
+retry) release the key, so the retry runs the request again. Reusing a key for a
+different request (another path or body) is rejected with 422. Requests
+without the header are not affected, and neither are the paths in
+IDEMPOTENCY_EXCLUDED_PREFIXES: a replayed login would skip the password
+check, and a replayed refresh would hand out a rotated token without
+rotation or reuse detection.
+
+Registration answers with access and refresh tokens too, which must not sit
+in plaintext in the key table. For the paths in IDEMPOTENCY_REMINTED_PATHS
+the tokens are blanked before the response is stored, and a replay mints
+fresh ones for the stored user, so a retried registration still skips
+bcrypt and the insert.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import time
+import weakref
+from typing import Dict, List, Optional
+from anyio import to_thread
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.services.idempotency import (
+    CLAIMED, COMPLETED, IDEMPOTENCY_LOCK_SECONDS, IDEMPOTENCY_TTL_SECONDS, MISMATCH, IdempotencyService
+)
+
+
+IDEMPOTENT_METHODS = ("POST", "PATCH")
+# Client errors that say "try again later" rather than "this request is wrong"
+RETRYABLE_STATUSES = frozenset((408, 409, 423, 429))
+MAX_KEY_LENGTH = 255
+# A duplicate waits this long for the first request with its key before giving up with 409
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "30"))
+# How often a duplicate checks on a request running in another process
+IDEMPOTENCY_POLL_SECONDS = float(os.getenv("IDEMPOTENCY_POLL_MS", "50")) / 1000
+# Responses larger than this are sent but not stored; their key is released
+IDEMPOTENCY_MAX_BODY_BYTES = int(os.getenv("IDEMPOTENCY_MAX_BODY_BYTES", str(1024 * 1024)))
+# Paths that must check credentials on every request; the header is ignored there
+IDEMPOTENCY_EXCLUDED_PREFIXES = ("/api/auth/login", "/api/auth/refresh")
+# Paths whose successful responses are stored without their tokens and re-minted on replay
+IDEMPOTENCY_REMINTED_PATHS = ("/api/auth/register",)
+# Response fields holding credentials, blanked in stored responses
+TOKEN_FIELDS = ("token", "refresh_token")
+
+
+def _error(status_code: int, error: str, message: str) -> JSONResponse:
+    # Same shape as the routers' HTTPException details
+    return JSONResponse({"detail": {"error": error, "message": message, "details": None}}, status_code=status_code)
+
+
+def _strip_tokens(body: bytes) -> Optional[bytes]:
+    """Response body with its token fields blanked, or None if it is not an auth response"""
+    try:
+        response = json.loads(body)
+    except ValueError:
+        return None
+    if not isinstance(response, dict) or "user_id" not in response:
+        return None
+    for field in TOKEN_FIELDS:
+        if field in response:
+            response[field] = None
+    return json.dumps(response, separators=(",", ":")).encode()
+
+
+def _remint_tokens(db, body: bytes, request_body: bytes) -> bytes:
+    """Stored auth response with a new access token and a new refresh token session for the device"""
+    from app.services.auth import AuthService, ACCESS_TOKEN_EXPIRE_MINUTES
+    response = json.loads(body)
+    request = json.loads(request_body)
+    response["token"] = AuthService.create_access_token(
+        data={"user_id": response["user_id"], "username": response["username"]}
+    )
+    response["expires_in"] = ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    response["refresh_token"] = AuthService.create_refresh_token(
+        db, response["user_id"], request.get("device_id"), request.get("device_name")
+    )
+    return json.dumps(response, separators=(",", ":")).encode()
+
+
+class IdempotencyMiddleware:
+    """ASGI middleware storing and replaying responses by Idempotency-Key"""
+
+    def __init__(self, app: ASGIApp, session_factory=None, ttl_seconds: float = IDEMPOTENCY_TTL_SECONDS,
+                 lock_seconds: float = IDEMPOTENCY_LOCK_SECONDS, wait_seconds: float = IDEMPOTENCY_WAIT_SECONDS,
+                 poll_seconds: float = IDEMPOTENCY_POLL_SECONDS, max_body_size: int = IDEMPOTENCY_MAX_BODY_BYTES,
+                 excluded_prefixes=IDEMPOTENCY_EXCLUDED_PREFIXES, reminted_paths=IDEMPOTENCY_REMINTED_PATHS):
+        self.app = app
+        self.session_factory = session_factory
+        self.ttl_seconds = ttl_seconds
+        self.lock_seconds = lock_seconds
+        self.wait_seconds = wait_seconds
+        self.poll_seconds = poll_seconds
+        self.max_body_size = max_body_size
+        self.excluded_prefixes = tuple(excluded_prefixes)
+        self.reminted_paths = frozenset(reminted_paths)
+        # Keys being run by this process, per event loop: duplicates here wait on
+        # the event instead of polling the database
+        self._running = weakref.WeakKeyDictionary()
+
+    def _session(self):
+        if self.session_factory is None:
+            from app.database import SessionLocal
+            return SessionLocal()
+        return self.session_factory()
+
+    def _db(self, method, *args):
+        db = self._session()
+        try:
+            return method(db, *args)
+        finally:
+            db.close()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (scope["type"] != "http" or scope["method"] not in IDEMPOTENT_METHODS
+                or scope["path"].startswith(self.excluded_prefixes)):
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        key = headers.get("idempotency-key")
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not key or len(key) > MAX_KEY_LENGTH:
+            await _error(400, "validation_error",
+                         f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters")(scope, receive, send)
+            return
+
+        body = await self._read_body(receive)
+        # Keys belong to whoever holds the credentials; hashing the header keeps
+        # token checks (and AuthService) out of the replay path
+        owner = hashlib.sha256(headers.get("authorization", "").encode()).hexdigest()
+        fingerprint = hashlib.sha256(b"\x1f".join((
+            scope["method"].encode(), scope["path"].encode(), scope.get("query_string", b""), body
+        ))).hexdigest()
+
+        running: Dict[str, asyncio.Event] = self._running.setdefault(asyncio.get_running_loop(), {})
+        name = f"{owner}:{key}"
+        deadline = time.monotonic() + self.wait_seconds
+        while True:
+            event = running.get(name)
+            if event is not None:
+                try:
+                    await asyncio.wait_for(event.wait(), max(0.0, deadline - time.monotonic()))
+                except asyncio.TimeoutError:
+                    await self._in_progress(scope, receive, send)
+                    return
+                continue
+            # Taken before the claim so duplicates on this loop wait here rather than poll
+            event = running[name] = asyncio.Event()
+            try:
+                outcome, stored = await to_thread.run_sync(
+                    self._db, IdempotencyService.claim, owner, key, fingerprint, self.ttl_seconds, self.lock_seconds
+                )
+            except BaseException:
+                del running[name]
+                event.set()
+                raise
+            if outcome == CLAIMED:
+                try:
+                    await self._run(scope, body, receive, send, owner, key)
+                finally:
+                    del running[name]
+                    event.set()
+                return
+            del running[name]
+            event.set()
+
+            if outcome == COMPLETED:
+                status, headers, stored_body = stored
+                if scope["path"] in self.reminted_paths and 200 <= status < 300:
+                    stored_body = await to_thread.run_sync(self._db, _remint_tokens, stored_body, body)
+                await self._replay((status, headers, stored_body), send)
+                return
+            if outcome == MISMATCH:
+                await _error(422, "idempotency_key_reused",
+                             "Idempotency-Key was already used for a different request")(scope, receive, send)
+                return
+            # Another process is running the request
+            if time.monotonic() >= deadline:
+                await self._in_progress(scope, receive, send)
+                return
+            await asyncio.sleep(self.poll_seconds)
+
+    @staticmethod
+    async def _in_progress(scope: Scope, receive: Receive, send: Send) -> None:
+        await _error(409, "request_in_progress",
+                     "A request with this Idempotency-Key is still being processed")(scope, receive, send)
+
+    @staticmethod
+    async def _read_body(receive: Receive) -> bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        return b"".join(chunks)
+
+    async def _run(self, scope: Scope, body: bytes, receive: Receive, send: Send, owner: str, key: str) -> None:
+        body_sent = False
+
+        async def replay_receive() -> Message:
+            # The endpoint reads the body that was already taken off the wire for the fingerprint
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        status: Optional[int] = None
+        headers: List[List[str]] = []
+        chunks: List[bytes] = []
+        size = 0
+
+        async def capture_send(message: Message) -> None:
+            nonlocal status, headers, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = [[name.decode("latin-1"), value.decode("latin-1")]
+                           for name, value in message.get("headers", [])]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+                if size <= self.max_body_size:
+                    chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, capture_send)
+        except BaseException:
+            await to_thread.run_sync(self._db, IdempotencyService.release, owner, key)
+            raise
+        stored_body: Optional[bytes] = b"".join(chunks)
+        if status is not None and 200 <= status < 300 and scope["path"] in self.reminted_paths:
+            stored_body = _strip_tokens(stored_body)
+        if (status is None or status >= 500 or status in RETRYABLE_STATUSES or size > self.max_body_size
+                or stored_body is None):
+            await to_thread.run_sync(self._db, IdempotencyService.release, owner, key)
+        else:
+            await to_thread.run_sync(self._db, IdempotencyService.complete, owner, key, status, headers, stored_body)
+
+    @staticmethod
+    async def _replay(stored, send: Send) -> None:
+        status, headers, body = stored
+        # Re-minted bodies differ in length from the one first sent
+        raw = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in headers
+               if name.lower() != "content-length"]
+        raw.append((b"content-length", str(len(body)).encode("latin-1")))
+        raw.append((b"idempotent-replayed", b"true"))
+        await send({"type": "http.response.start", "status": status, "headers": raw})
+        await send({"type": "http.response.body", "body": body, "more_body": False})
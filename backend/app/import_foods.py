@@ -0,0 +1,41 @@
+"""
+Bulk import a food catalogue CSV and rebuild the autocomplete index
+
+Usage:
+    python -m app.import_foods foods.csv     # import, then rebuild the index
+    python -m app.import_foods --index-only  # rebuild the index from the database
+
+The CSV needs the columns: name, calories, protein, carbs, fat (per 100 g).
+"""
+import argparse
+import time
+from app.database import SessionLocal, init_database
+from app.services.foods import FoodService, FOOD_INDEX_PATH
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import LifeOS food catalogue")
+    parser.add_argument("csv_path", nargs="?", help="CSV file to import")
+    parser.add_argument("--index-only", action="store_true", help="Only rebuild the prefix index")
+    args = parser.parse_args()
+    if not args.csv_path and not args.index_only:
+        parser.error("a CSV path is required unless --index-only is given")
+
+    init_database()
+    db = SessionLocal()
+    try:
+        if args.csv_path:
+            started = time.perf_counter()
+            with open(args.csv_path, newline="", encoding="utf-8") as source:
+                imported = FoodService.import_csv(db, source)
+            print(f"Imported {imported} foods in {time.perf_counter() - started:.1f}s")
+
+        started = time.perf_counter()
+        entries = FoodService.rebuild_index(db)
+        print(f"Wrote {entries} index entries to {FOOD_INDEX_PATH} in {time.perf_counter() - started:.1f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
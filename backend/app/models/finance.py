@@ -0,0 +1,114 @@
+"""
+Personal finance models for SQLAlchemy ORM
+"""
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.database import Base
+from app.models.sync import SyncMixin
+
+
+class Transaction(SyncMixin, Base):
+    """
+    Bank or card transaction; amounts are signed integer cents (spending is negative)
+    """
+    __tablename__ = "transactions"
+    __table_args__ = (
+        Index("idx_transactions_user_seq", "user_id", "seq"),
+        Index("idx_transactions_user_dedup", "user_id", "dedup_hash", unique=True),
+        Index("idx_transactions_user_posted", "user_id", "posted_on"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    account = Column(String(50), nullable=False)
+    posted_on = Column(Date, nullable=False)
+    amount_cents = Column(Integer, nullable=False)
+    payee = Column(String(200), nullable=False)
+    category = Column(String(50), nullable=True)
+    dedup_hash = Column(String(32), nullable=False)
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<Transaction(id={self.id}, posted_on={self.posted_on}, amount_cents={self.amount_cents})>"
+
+    def to_dict(self):
+        """
+        Convert Transaction instance to dictionary
+        """
+        return {
+            "id": self.id,
+            "account": self.account,
+            "posted_on": self.posted_on.isoformat() if self.posted_on else None,
+            "amount_cents": self.amount_cents,
+            "payee": self.payee,
+            "category": self.category,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "seq": self.seq
+        }
+
+
+class CategoryRule(Base):
+    """
+    User rule assigning a category to transactions whose payee contains the words of ``pattern``
+
+    Rules are tried in ascending ``priority`` (then id) order; the first match wins.
+    """
+    __tablename__ = "category_rules"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
+    pattern = Column(String(100), nullable=False)
+    category = Column(String(50), nullable=False)
+    priority = Column(Integer, nullable=False, default=100)
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<CategoryRule(id={self.id}, pattern='{self.pattern}', category='{self.category}')>"
+
+    def to_dict(self):
+        """
+        Convert CategoryRule instance to dictionary
+        """
+        return {
+            "id": self.id,
+            "pattern": self.pattern,
+            "category": self.category,
+            "priority": self.priority
+        }
+
+
+class Budget(Base):
+    """
+    Monthly spending limit for one category
+    """
+    __tablename__ = "budgets"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    category = Column(String(50), primary_key=True)
+    limit_cents = Column(Integer, nullable=False)
+
+    def __repr__(self):
+        return f"<Budget(user_id={self.user_id}, category='{self.category}', limit_cents={self.limit_cents})>"
+
+
+class BudgetAggregate(Base):
+    """
+    Per-user, per-month, per-category transaction totals
+
+    Maintained in the same transaction as every import and edit, so budget
+    screens read one row per category instead of summing transactions.
+    Uncategorized transactions are kept under the "uncategorized" key.
+    """
+    __tablename__ = "budget_aggregates"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    month = Column(Date, primary_key=True)
+    category = Column(String(50), primary_key=True)
+    spent_cents = Column(Integer, nullable=False, default=0)
+    income_cents = Column(Integer, nullable=False, default=0)
+    transaction_count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<BudgetAggregate(user_id={self.user_id}, month={self.month}, category='{self.category}')>"
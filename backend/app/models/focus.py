@@ -0,0 +1,42 @@
+"""
+Focus session event model for SQLAlchemy ORM
+"""
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from app.database import Base
+
+
+class FocusEvent(Base):
+    """
+    One event of a focus or Pomodoro session (start, pause, tick, distraction, ...)
+
+    Rows are append-only and written in group commits by the ingestion buffer.
+    """
+    __tablename__ = "focus_events"
+    __table_args__ = (
+        Index("idx_focus_events_user_ts", "user_id", "ts"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    session_id = Column(String(64), nullable=True)
+    kind = Column(String(20), nullable=False)
+    ts = Column(DateTime, nullable=False)
+    value = Column(Integer, nullable=True)
+    note = Column(String(200), nullable=True)
+    received_at = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<FocusEvent(id={self.id}, kind='{self.kind}', ts={self.ts})>"
+
+    def to_dict(self):
+        """
+        Convert FocusEvent instance to dictionary
+        """
+        return {
+            "id": self.id,
+            "session_id": self.session_id,
+            "kind": self.kind,
+            "ts": self.ts.isoformat(),
+            "value": self.value,
+            "note": self.note
+        }
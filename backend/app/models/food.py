@@ -0,0 +1,35 @@
+"""
+Food catalogue model for SQLAlchemy ORM
+"""
+from sqlalchemy import Column, Integer, String, Float
+from app.database import Base
+
+
+class Food(Base):
+    """
+    Shared food catalogue entry with macros per 100 g
+    """
+    __tablename__ = "foods"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(200), nullable=False)
+    calories = Column(Float, nullable=False, default=0)
+    protein = Column(Float, nullable=False, default=0)
+    carbs = Column(Float, nullable=False, default=0)
+    fat = Column(Float, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<Food(id={self.id}, name='{self.name}')>"
+
+    def to_dict(self):
+        """
+        Convert Food instance to dictionary
+        """
+        return {
+            "id": self.id,
+            "name": self.name,
+            "calories": self.calories,
+            "protein": self.protein,
+            "carbs": self.carbs,
+            "fat": self.fat
+        }
@@ -0,0 +1,79 @@
+"""
+Habit models for SQLAlchemy ORM
+"""
+from datetime import date, datetime
+from sqlalchemy import Column, Integer, String, Date, DateTime, LargeBinary, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.database import Base
+from app.models.sync import SyncMixin
+
+
+# One bit per day of the year, leap years included
+HABIT_YEAR_BYTES = 46
+
+
+class Habit(SyncMixin, Base):
+    """
+    Habit model with incrementally maintained streak counters
+    """
+    __tablename__ = "habits"
+    __table_args__ = (
+        Index("idx_habits_user_seq", "user_id", "seq"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
+    name = Column(String(100), nullable=False)
+    category = Column(String(20), nullable=False, default="life")
+    current_streak = Column(Integer, nullable=False, default=0)
+    longest_streak = Column(Integer, nullable=False, default=0)
+    total_checkins = Column(Integer, nullable=False, default=0)
+    last_checkin = Column(Date, nullable=True)
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<Habit(id={self.id}, user_id={self.user_id}, name='{self.name}')>"
+
+    def streak_as_of(self, today: date) -> int:
+        """
+        Current streak as seen on ``today``; the stored run only counts if it
+        ended today or yesterday
+        """
+        if self.last_checkin and (today - self.last_checkin).days <= 1:
+            return self.current_streak
+        return 0
+
+    def to_dict(self):
+        """
+        Convert Habit instance to dictionary
+        """
+        return {
+            "id": self.id,
+            "name": self.name,
+            "category": self.category,
+            "current_streak": self.streak_as_of(datetime.utcnow().date()),
+            "longest_streak": self.longest_streak,
+            "total_checkins": self.total_checkins,
+            "last_checkin": self.last_checkin.isoformat() if self.last_checkin else None,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "seq": self.seq
+        }
+
+
+class HabitYear(Base):
+    """
+    Check-in history of one habit for one calendar year
+
+    ``bits`` holds one bit per day (bit 0 of byte 0 is January 1st), so a
+    full year of history costs 46 bytes instead of up to 366 rows.
+    """
+    __tablename__ = "habit_years"
+
+    habit_id = Column(Integer, ForeignKey("habits.id"), primary_key=True)
+    year = Column(Integer, primary_key=True)
+    bits = Column(LargeBinary(HABIT_YEAR_BYTES), nullable=False)
+
+    def __repr__(self):
+        return f"<HabitYear(habit_id={self.habit_id}, year={self.year})>"
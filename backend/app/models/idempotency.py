@@ -0,0 +1,39 @@
+"""
+Stored responses of requests sent with an Idempotency-Key header
+"""
+from sqlalchemy import Column, Integer, String, Text, DateTime, LargeBinary, Index
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class IdempotencyKey(Base):
+    """
+    One idempotency key and, once its request has finished, the response to replay
+
+    A row is inserted as ``pending`` by the request that claims the key and
+    holds a lock until ``locked_until``; when that request finishes the row
+    becomes ``completed`` with the status, headers and body it sent. Keys
+    are scoped by ``scope`` (a hash of the caller's credentials) so two
+    clients picking the same key never see each other's responses, and
+    every row is deleted after ``expires_at``.
+    """
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        Index("idx_idempotency_keys_scope_key", "scope", "key", unique=True),
+        Index("idx_idempotency_keys_expires", "expires_at"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    scope = Column(String(64), nullable=False)
+    key = Column(String(255), nullable=False)
+    fingerprint = Column(String(64), nullable=False)
+    status = Column(String(20), nullable=False, default="pending")  # pending, completed
+    locked_until = Column(DateTime, nullable=True)
+    response_status = Column(Integer, nullable=True)
+    response_headers = Column(Text, nullable=True)
+    response_body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime, server_default=func.now())
+    expires_at = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<IdempotencyKey(id={self.id}, key='{self.key}', status='{self.status}')>"
@@ -0,0 +1,62 @@
+"""
+Background job model for SQLAlchemy ORM
+"""
+import json
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class Job(Base):
+    """
+    A unit of background work (report, rebuild, export) and its outcome
+
+    Workers claim rows atomically and hold them under a lease that they
+    extend while running; a row whose lease ran out belongs to a dead worker
+    and is claimed again.
+    """
+    __tablename__ = "jobs"
+    __table_args__ = (
+        Index("idx_jobs_status_run_after", "status", "run_after"),
+        Index("idx_jobs_user_created", "user_id", "created_at"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    kind = Column(String(50), nullable=False)
+    status = Column(String(20), nullable=False, default="queued")  # queued, running, succeeded, failed, cancelled
+    payload = Column(Text, nullable=False, default="{}")
+    result = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    run_after = Column(DateTime, nullable=False)
+    locked_by = Column(String(64), nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, server_default=func.now())
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<Job(id={self.id}, kind='{self.kind}', status='{self.status}')>"
+
+    def to_dict(self, include_result: bool = True):
+        """
+        Convert Job instance to dictionary
+        """
+        data = {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "payload": json.loads(self.payload),
+            "attempts": self.attempts,
+            "max_attempts": self.max_attempts,
+            "error": self.error,
+            "run_after": self.run_after.isoformat(),
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None
+        }
+        if include_result:
+            data["result"] = json.loads(self.result) if self.result is not None else None
+        return data
@@ -0,0 +1,43 @@
+"""
+Journal and reflection entry model for SQLAlchemy ORM
+"""
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.database import Base
+from app.models.sync import SyncMixin
+
+
+class JournalEntry(SyncMixin, Base):
+    """
+    Free-text journal note, evening reflection or check-in answer
+    """
+    __tablename__ = "journal_entries"
+    __table_args__ = (
+        Index("idx_journal_entries_user_seq", "user_id", "seq"),
+        Index("idx_journal_entries_user_date", "user_id", "entry_date"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    kind = Column(String(20), nullable=False, default="journal")
+    entry_date = Column(Date, nullable=False)
+    body = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<JournalEntry(id={self.id}, kind='{self.kind}', entry_date={self.entry_date})>"
+
+    def to_dict(self):
+        """
+        Convert JournalEntry instance to dictionary
+        """
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "entry_date": self.entry_date.isoformat() if self.entry_date else None,
+            "body": self.body,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "seq": self.seq
+        }
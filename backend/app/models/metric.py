@@ -0,0 +1,63 @@
+"""
+Wellness metric time-series models for SQLAlchemy ORM
+"""
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, LargeBinary, ForeignKey, Index
+from app.database import Base
+
+
+class MetricPoint(Base):
+    """
+    Raw metric sample, kept for the recent retention window only
+    """
+    __tablename__ = "metric_points"
+    __table_args__ = (
+        Index("idx_metric_points_user_metric_ts", "user_id", "metric", "ts"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    metric = Column(String(30), nullable=False)
+    ts = Column(DateTime, nullable=False)
+    value = Column(Float, nullable=False)
+
+    def __repr__(self):
+        return f"<MetricPoint(user_id={self.user_id}, metric='{self.metric}', ts={self.ts}, value={self.value})>"
+
+
+class MetricBlock(Base):
+    """
+    One day of compacted raw samples for a metric
+
+    ``data`` holds ``count`` int32 second-of-day offsets followed by ``count``
+    float64 values (native byte order, timestamps kept to the second),
+    replacing ``count`` rows with a single one.
+    """
+    __tablename__ = "metric_blocks"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    metric = Column(String(30), primary_key=True)
+    day = Column(Date, primary_key=True)
+    count = Column(Integer, nullable=False)
+    data = Column(LargeBinary, nullable=False)
+
+    def __repr__(self):
+        return f"<MetricBlock(user_id={self.user_id}, metric='{self.metric}', day={self.day}, count={self.count})>"
+
+
+class MetricRollup(Base):
+    """
+    Aggregate of a metric over one hour, day or week bucket
+    """
+    __tablename__ = "metric_rollups"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    metric = Column(String(30), primary_key=True)
+    tier = Column(String(10), primary_key=True)
+    bucket = Column(DateTime, primary_key=True)
+    count = Column(Integer, nullable=False)
+    sum = Column(Float, nullable=False)
+    min = Column(Float, nullable=False)
+    max = Column(Float, nullable=False)
+
+    def __repr__(self):
+        return f"<MetricRollup(user_id={self.user_id}, metric='{self.metric}', tier='{self.tier}', bucket={self.bucket})>"
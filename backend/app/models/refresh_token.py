@@ -0,0 +1,49 @@
+"""
+Refresh token model for SQLAlchemy ORM
+"""
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class RefreshToken(Base):
+    """
+    A long-lived credential one device exchanges for fresh access tokens
+
+    Only the SHA-256 hash of the token is stored, under a unique index, so
+    a refresh is one indexed lookup and a leaked table gives nothing away.
+    Every use rotates the token: the row is revoked and points to its
+    successor through ``replaced_by_id``. Presenting a rotated token again
+    means it was copied, and revokes the device's whole session.
+    """
+    __tablename__ = "refresh_tokens"
+    __table_args__ = (
+        Index("idx_refresh_tokens_hash", "token_hash", unique=True),
+        Index("idx_refresh_tokens_user_device", "user_id", "device_id"),
+        Index("idx_refresh_tokens_expires", "expires_at"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    token_hash = Column(String(64), nullable=False)
+    device_id = Column(String(100), nullable=False, default="default")
+    device_name = Column(String(100), nullable=True)
+    created_at = Column(DateTime, server_default=func.now())
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, nullable=True)
+    replaced_by_id = Column(Integer, nullable=True)
+
+    def __repr__(self):
+        return f"<RefreshToken(id={self.id}, user_id={self.user_id}, device_id='{self.device_id}')>"
+
+    def to_dict(self):
+        """
+        Convert RefreshToken instance to dictionary
+        Excludes the token hash
+        """
+        return {
+            "device_id": self.device_id,
+            "device_name": self.device_name,
+            "last_refreshed_at": self.created_at.isoformat() if self.created_at else None,
+            "expires_at": self.expires_at.isoformat()
+        }
@@ -0,0 +1,37 @@
+"""
+Daily rollup model for analytics
+"""
+from sqlalchemy import Column, Integer, String, Date, ForeignKey
+from app.database import Base
+
+
+class DailyRollup(Base):
+    """
+    Per-user, per-day, per-category activity counters
+
+    Maintained incrementally on every write so analytics read one row per
+    day and category instead of scanning raw history.
+    """
+    __tablename__ = "daily_rollups"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    category = Column(String(20), primary_key=True)
+    tasks_created = Column(Integer, nullable=False, default=0)
+    tasks_completed = Column(Integer, nullable=False, default=0)
+    habit_checkins = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<DailyRollup(user_id={self.user_id}, day={self.day}, category='{self.category}')>"
+
+    def to_dict(self):
+        """
+        Convert DailyRollup instance to dictionary
+        """
+        return {
+            "day": self.day.isoformat(),
+            "category": self.category,
+            "tasks_created": self.tasks_created,
+            "tasks_completed": self.tasks_completed,
+            "habit_checkins": self.habit_checkins
+        }
@@ -0,0 +1,79 @@
+"""
+Scheduling models for SQLAlchemy ORM: busy blocks, task dependencies and stored plans
+"""
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class BusyBlock(Base):
+    """
+    Calendar time that is not available for task work (meetings, appointments)
+    """
+    __tablename__ = "busy_blocks"
+    __table_args__ = (
+        Index("idx_busy_blocks_user_start", "user_id", "start"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    title = Column(String(200), nullable=True)
+    start = Column(DateTime, nullable=False)
+    end = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<BusyBlock(id={self.id}, start={self.start}, end={self.end})>"
+
+    def to_dict(self):
+        """
+        Convert BusyBlock instance to dictionary
+        """
+        return {
+            "id": self.id,
+            "title": self.title,
+            "start": self.start.isoformat(),
+            "end": self.end.isoformat()
+        }
+
+
+class TaskDependency(Base):
+    """
+    Edge saying ``task_id`` cannot start before ``depends_on_id`` is finished
+    """
+    __tablename__ = "task_dependencies"
+
+    task_id = Column(Integer, ForeignKey("tasks.id"), primary_key=True)
+    depends_on_id = Column(Integer, ForeignKey("tasks.id"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
+
+
+class SchedulePlan(Base):
+    """
+    Settings and horizon of a user's current plan, kept for incremental re-planning
+    """
+    __tablename__ = "schedule_plans"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    horizon_start = Column(DateTime, nullable=False)
+    horizon_end = Column(DateTime, nullable=False)
+    settings = Column(Text, nullable=False)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+
+
+class ScheduleBlock(Base):
+    """
+    One time block of the current plan; a task may be split over several blocks
+    """
+    __tablename__ = "schedule_blocks"
+    __table_args__ = (
+        Index("idx_schedule_blocks_user_start", "user_id", "start"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False)
+    start = Column(DateTime, nullable=False)
+    end = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<ScheduleBlock(task_id={self.task_id}, start={self.start}, end={self.end})>"
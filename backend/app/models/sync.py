@@ -0,0 +1,34 @@
+"""
+Change-tracking primitives shared by all user-owned models
+"""
+from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from app.database import Base
+
+
+class SyncMixin:
+    """
+    Mixin for user-owned tables that take part in the delta-sync feed
+
+    Every write stamps the row with the next value of the owner's change
+    sequence. Deletes are soft: ``deleted_at`` is set and the row is kept as a
+    tombstone so clients that synced before the delete can learn about it.
+    """
+    seq = Column(Integer, nullable=False, default=0)
+    deleted_at = Column(DateTime, nullable=True)
+
+    @property
+    def is_deleted(self) -> bool:
+        return self.deleted_at is not None
+
+
+class SyncCounter(Base):
+    """
+    Per-user monotonically increasing change sequence
+    """
+    __tablename__ = "sync_counters"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    last_seq = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<SyncCounter(user_id={self.user_id}, last_seq={self.last_seq})>"
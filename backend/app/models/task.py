@@ -0,0 +1,72 @@
+"""
+Task model for SQLAlchemy ORM
+"""
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.database import Base
+from app.models.sync import SyncMixin
+
+
+class Task(SyncMixin, Base):
+    """
+    Task model for life and work task management
+
+    Tasks form trees (goal > project > subtask) through ``parent_id``. Each
+    row stores its materialized ``path`` of ancestor ids ("/3/17/42/",
+    ending with its own id) so a subtree is one index range scan, and cached
+    ``subtree_total``/``subtree_done`` counters covering itself and all live
+    descendants, so progress is a single-row read at any depth.
+    """
+    __tablename__ = "tasks"
+    __table_args__ = (
+        Index("idx_tasks_user_seq", "user_id", "seq"),
+        Index("idx_tasks_user_path", "user_id", "path"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
+    title = Column(String(200), nullable=False)
+    description = Column(Text, nullable=True)
+    category = Column(String(20), nullable=False, default="life")
+    status = Column(String(20), nullable=False, default="todo")
+    priority = Column(Integer, nullable=False, default=2)
+    due_date = Column(DateTime, nullable=True)
+    estimate_minutes = Column(Integer, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
+    kind = Column(String(20), nullable=False, default="task")
+    parent_id = Column(Integer, ForeignKey("tasks.id"), nullable=True)
+    path = Column(String(512), nullable=False, default="")
+    depth = Column(Integer, nullable=False, default=0)
+    subtree_total = Column(Integer, nullable=False, default=0)
+    subtree_done = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<Task(id={self.id}, user_id={self.user_id}, title='{self.title}', status='{self.status}')>"
+
+    def to_dict(self):
+        """
+        Convert Task instance to dictionary
+        """
+        return {
+            "id": self.id,
+            "title": self.title,
+            "description": self.description,
+            "category": self.category,
+            "status": self.status,
+            "priority": self.priority,
+            "due_date": self.due_date.isoformat() if self.due_date else None,
+            "estimate_minutes": self.estimate_minutes,
+            "completed_at": self.completed_at.isoformat() if self.completed_at else None,
+            "kind": self.kind,
+            "parent_id": self.parent_id,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "seq": self.seq
+        }
+
+    @property
+    def progress(self) -> float:
+        """Share of done tasks in this subtree, from the cached counters"""
+        return self.subtree_done / self.subtree_total if self.subtree_total else 0.0
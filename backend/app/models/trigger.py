@@ -0,0 +1,62 @@
+"""
+Scheduled trigger model for SQLAlchemy ORM: reminders, nudges and recurring maintenance
+"""
+import json
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.database import Base
+from app.models.sync import SyncMixin
+
+
+class Trigger(SyncMixin, Base):
+    """
+    Something that must happen at ``next_fire_at``, once or every ``repeat_seconds``
+
+    User reminders have a user_id and take part in the sync feed; system
+    maintenance triggers have no user and a unique ``key``. Firing moves
+    ``next_fire_at`` forward (or finishes the trigger) with a compare-and-set
+    on (next_fire_at, version), which is what makes each occurrence fire
+    exactly once however many schedulers are running. User edits bump
+    ``version`` so occurrences loaded before the edit cannot fire.
+    """
+    __tablename__ = "triggers"
+    __table_args__ = (
+        Index("idx_triggers_status_next_fire", "status", "next_fire_at"),
+        Index("idx_triggers_user_seq", "user_id", "seq"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    key = Column(String(100), unique=True, nullable=True)
+    kind = Column(String(50), nullable=False, default="reminder")
+    title = Column(String(200), nullable=True)
+    payload = Column(Text, nullable=False, default="{}")
+    next_fire_at = Column(DateTime, nullable=True)
+    repeat_seconds = Column(Integer, nullable=True)
+    status = Column(String(20), nullable=False, default="active")  # active, done, cancelled
+    version = Column(Integer, nullable=False, default=0)
+    fire_count = Column(Integer, nullable=False, default=0)
+    last_fired_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<Trigger(id={self.id}, kind='{self.kind}', next_fire_at={self.next_fire_at})>"
+
+    def to_dict(self):
+        """
+        Convert Trigger instance to dictionary
+        """
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "title": self.title,
+            "payload": json.loads(self.payload),
+            "next_fire_at": self.next_fire_at.isoformat() if self.next_fire_at else None,
+            "repeat_seconds": self.repeat_seconds,
+            "status": self.status,
+            "fire_count": self.fire_count,
+            "last_fired_at": self.last_fired_at.isoformat() if self.last_fired_at else None,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "seq": self.seq
+        }
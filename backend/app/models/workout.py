@@ -0,0 +1,117 @@
+"""
+Workout models for SQLAlchemy ORM
+"""
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.database import Base
+from app.models.sync import SyncMixin
+
+
+class WorkoutSet(SyncMixin, Base):
+    """
+    A single logged set of an exercise
+    """
+    __tablename__ = "workout_sets"
+    __table_args__ = (
+        Index("idx_workout_sets_user_seq", "user_id", "seq"),
+        Index("idx_workout_sets_user_exercise", "user_id", "exercise"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    exercise = Column(String(100), nullable=False)
+    muscle_group = Column(String(30), nullable=False, default="other")
+    reps = Column(Integer, nullable=False, default=0)
+    weight = Column(Float, nullable=False, default=0)
+    duration_seconds = Column(Integer, nullable=True)
+    performed_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<WorkoutSet(id={self.id}, exercise='{self.exercise}', reps={self.reps}, weight={self.weight})>"
+
+    @property
+    def volume(self) -> float:
+        return self.reps * self.weight
+
+    @property
+    def e1rm(self) -> float:
+        """Estimated one-rep max (Epley formula)"""
+        if self.reps <= 0 or self.weight <= 0:
+            return 0.0
+        return self.weight if self.reps == 1 else self.weight * (1 + self.reps / 30)
+
+    def to_dict(self):
+        """
+        Convert WorkoutSet instance to dictionary
+        """
+        return {
+            "id": self.id,
+            "exercise": self.exercise,
+            "muscle_group": self.muscle_group,
+            "reps": self.reps,
+            "weight": self.weight,
+            "duration_seconds": self.duration_seconds,
+            "performed_at": self.performed_at.isoformat() if self.performed_at else None,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "seq": self.seq
+        }
+
+
+class ExerciseSummary(Base):
+    """
+    Per-user, per-exercise totals and personal records
+    """
+    __tablename__ = "exercise_summaries"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    exercise = Column(String(100), primary_key=True)
+    total_sets = Column(Integer, nullable=False, default=0)
+    total_reps = Column(Integer, nullable=False, default=0)
+    total_volume = Column(Float, nullable=False, default=0)
+    best_weight = Column(Float, nullable=False, default=0)
+    best_e1rm = Column(Float, nullable=False, default=0)
+    last_performed = Column(DateTime, nullable=True)
+
+    def to_dict(self):
+        """
+        Convert ExerciseSummary instance to dictionary
+        """
+        return {
+            "exercise": self.exercise,
+            "total_sets": self.total_sets,
+            "total_reps": self.total_reps,
+            "total_volume": round(self.total_volume, 3),
+            "best_weight": self.best_weight,
+            "best_e1rm": round(self.best_e1rm, 3),
+            "last_performed": self.last_performed.isoformat() if self.last_performed else None
+        }
+
+
+class ExerciseDay(Base):
+    """
+    Per-exercise daily best estimated 1RM and volume, for progress trends
+    """
+    __tablename__ = "exercise_days"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    exercise = Column(String(100), primary_key=True)
+    day = Column(Date, primary_key=True)
+    sets = Column(Integer, nullable=False, default=0)
+    volume = Column(Float, nullable=False, default=0)
+    best_e1rm = Column(Float, nullable=False, default=0)
+
+
+class MuscleGroupWeek(Base):
+    """
+    Weekly training volume per muscle group (weeks start on Monday)
+    """
+    __tablename__ = "muscle_group_weeks"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    week = Column(Date, primary_key=True)
+    muscle_group = Column(String(30), primary_key=True)
+    sets = Column(Integer, nullable=False, default=0)
+    volume = Column(Float, nullable=False, default=0)
@@ -0,0 +1,32 @@
+"""
+Rebuild daily analytics rollups from raw history
+
+Usage:
+    python -m app.rebuild_rollups            # all users
+    python -m app.rebuild_rollups --user 42  # a single user
+"""
+import argparse
+from app.database import each_user_database, init_database, session_for_user
+from app.services.rollups import RollupService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild LifeOS daily rollups")
+    parser.add_argument("--user", type=int, default=None, help="Only rebuild this user id")
+    args = parser.parse_args()
+
+    init_database()
+    db = session_for_user(args.user)
+    try:
+        if args.user is not None:
+            written = RollupService.rebuild(db, args.user)
+        else:
+            written = sum(RollupService.rebuild(user_db) for user_db in each_user_database(db))
+        scope = f"user {args.user}" if args.user is not None else "all users"
+        print(f"Rebuilt {written} rollup rows for {scope}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""
+Reconcile budget aggregates against raw transactions, repairing any drift
+
+Usage:
+    python -m app.reconcile_budgets            # all users
+    python -m app.reconcile_budgets --user 42  # a single user
+"""
+import argparse
+from app.database import each_user_database, init_database, session_for_user
+from app.services.budgets import BudgetService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconcile LifeOS budget aggregates")
+    parser.add_argument("--user", type=int, default=None, help="Only reconcile this user id")
+    args = parser.parse_args()
+
+    init_database()
+    db = session_for_user(args.user)
+    try:
+        if args.user is not None:
+            repaired = BudgetService.reconcile(db, args.user)
+        else:
+            repaired = sum(BudgetService.reconcile(user_db) for user_db in each_user_database(db))
+        scope = f"user {args.user}" if args.user is not None else "all users"
+        print(f"Repaired {repaired} budget aggregate rows for {scope}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
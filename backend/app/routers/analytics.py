@@ -0,0 +1,70 @@
+"""
+Analytics router: summaries and streaks served from daily rollups
+"""
+from datetime import date, datetime, timedelta
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from app.database import get_database
+from app.dependencies import get_current_user
+from app.schemas.auth import TokenData
+from app.schemas.analytics import SummaryResponse, StreakResponse, SummaryPeriod
+from app.services.analytics import AnalyticsService
+from app.services.patterns import PatternService
+
+
+router = APIRouter(prefix="/api/analytics", tags=["analytics"])
+
+# Longest range a single summary request may cover
+MAX_RANGE_DAYS = 3660
+
+
+@router.get("/summary", response_model=SummaryResponse)
+async def get_summary(
+    start: Optional[date] = Query(None, description="First day (defaults to 30 days ago)"),
+    end: Optional[date] = Query(None, description="Last day (defaults to today)"),
+    period: SummaryPeriod = Query("day", description="Bucket size"),
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Get created/completed counts and completion rates per day, week or month
+    """
+    end = end or datetime.utcnow().date()
+    start = start or end - timedelta(days=29)
+    if start > end or (end - start).days > MAX_RANGE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "error": "validation_error",
+                "message": f"Range must be non-empty and at most {MAX_RANGE_DAYS} days",
+                "details": {"field": "start", "code": "invalid_range"}
+            }
+        )
+    return AnalyticsService.summary(db, current_user.user_id, start, end, period)
+
+
+@router.get("/streak", response_model=StreakResponse)
+async def get_streak(
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Get the current and longest daily task completion streaks
+    """
+    return AnalyticsService.streaks(db, current_user.user_id, datetime.utcnow().date())
+
+
+@router.get("/patterns")
+async def get_patterns(
+    days: int = Query(90, ge=1, le=MAX_RANGE_DAYS, description="Number of days ending today"),
+    window: int = Query(7, ge=1, le=365, description="Rolling completion rate window in days"),
+    tz_offset_minutes: int = Query(0, ge=-840, le=840, description="Client UTC offset for hour/weekday bucketing"),
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Get productivity patterns: hour-of-day by weekday heatmap, weekday and
+    hourly histograms, daily series, rolling completion rate and trend line
+    """
+    return PatternService.patterns(db, current_user.user_id, days, window, tz_offset_minutes)
@@ -1,21 +1,35 @@
 """
-Authentication router with registration and login endpoints
+Authentication router with registration, login, token refresh and session endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from app.database import get_database
-from app.schemas.auth import UserCreate, UserLogin, AuthResponse, ErrorResponse, TokenData
-from app.services.auth import AuthService
+from app.dependencies import get_current_user
+from app.schemas.auth import (
+    UserCreate, UserLogin, AuthResponse, ErrorResponse, TokenData, RefreshRequest, SessionResponse
+)
+from app.services.auth import AuthService, ACCESS_TOKEN_EXPIRE_MINUTES
 from app.models.user import User
-from typing import Optional
+from typing import List, Optional
 
 
 router = APIRouter(prefix="/api/auth", tags=["authentication"])
 security = HTTPBearer()
 
 
+def _auth_response(user_id: int, username: str, refresh_token: str) -> AuthResponse:
+    token_data = {"user_id": user_id, "username": username}
+    return AuthResponse(
+        user_id=user_id,
+        username=username,
+        token=AuthService.create_access_token(data=token_data),
+        expires_in=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        refresh_token=refresh_token
+    )
+
+
 @router.post("/register", response_model=AuthResponse, status_code=status.HTTP_201_CREATED)
 async def register_user(
     user_data: UserCreate,
@@ -61,15 +75,9 @@ async def register_user(
         # Create new user
         new_user = AuthService.create_user(db, user_data)
         
-        # Generate JWT token
-        token_data = {"user_id": new_user.id, "username": new_user.username}
-        access_token = AuthService.create_access_token(data=token_data)
-        
-        return AuthResponse(
-            user_id=new_user.id,
-            username=new_user.username,
-            token=access_token
-        )
+        # Generate JWT access token and start the device's refresh token session
+        refresh_token = AuthService.create_refresh_token(db, new_user.id, user_data.device_id, user_data.device_name)
+        return _auth_response(new_user.id, new_user.username, refresh_token)
         
     except IntegrityError as e:
         db.rollback()
@@ -145,15 +153,9 @@ async def login_user(
                 }
             )
         
-        # Generate JWT token
-        token_data = {"user_id": user.id, "username": user.username}
-        access_token = AuthService.create_access_token(data=token_data)
-        
-        return AuthResponse(
-            user_id=user.id,
-            username=user.username,
-            token=access_token
-        )
+        # Generate JWT access token and start the device's refresh token session
+        refresh_token = AuthService.create_refresh_token(db, user.id, login_data.device_id, login_data.device_name)
+        return _auth_response(user.id, user.username, refresh_token)
         
     except HTTPException:
         # Re-raise HTTP exceptions
@@ -232,4 +234,88 @@ async def verify_token(
                 "message": "An unexpected error occurred during token verification",
                 "details": None
             }
-        )
\ No newline at end of file
+        )
+
+
+@router.post("/refresh", response_model=AuthResponse)
+async def refresh_token(
+    refresh_data: RefreshRequest,
+    db: Session = Depends(get_database)
+):
+    """
+    Exchange a refresh token for a new access token and a new refresh token
+
+    The presented refresh token is used up: keep the one in the response.
+    No password check is made, so clients refresh instead of logging in
+    again when their access token expires.
+
+    Args:
+        refresh_data: The current refresh token
+        db: Database session
+
+    Returns:
+        AuthResponse with a new JWT token and refresh token
+
+    Raises:
+        HTTPException: If the refresh token is unknown, expired or revoked
+    """
+    rotated = AuthService.rotate_refresh_token(db, refresh_data.refresh_token)
+    if rotated is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail={
+                "error": "authentication_error",
+                "message": "Invalid or expired refresh token",
+                "details": None
+            }
+        )
+    return _auth_response(*rotated)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    refresh_data: RefreshRequest,
+    db: Session = Depends(get_database)
+):
+    """
+    End the refresh token session of the device holding the token
+
+    Logging out twice is not an error.
+    """
+    AuthService.revoke_refresh_token(db, refresh_data.refresh_token)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.get("/sessions", response_model=List[SessionResponse])
+async def list_sessions(
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """List the devices with an active refresh token session"""
+    return [session.to_dict() for session in AuthService.list_sessions(db, current_user.user_id)]
+
+
+@router.delete("/sessions/{device_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def revoke_session(
+    device_id: str,
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Sign a device out: its refresh token stops working
+
+    Access tokens already issued to it stay valid until they expire.
+
+    Raises:
+        HTTPException: If the device has no active session
+    """
+    if not AuthService.revoke_device(db, current_user.user_id, device_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "error": "not_found",
+                "message": "No active session for this device",
+                "details": {"device_id": device_id}
+            }
+        )
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
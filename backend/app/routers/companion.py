@@ -0,0 +1,68 @@
+"""
+Companion router: streamed AI companion answers and pipeline metrics
+"""
+import json
+from typing import AsyncIterator
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from app.dependencies import get_current_user
+from app.schemas.auth import TokenData
+from app.schemas.companion import CompanionAsk
+from app.services.companion import CompanionBusyError, CompanionStream, companion
+
+
+router = APIRouter(prefix="/api/companion", tags=["companion"])
+
+
+async def answer_stream(stream: CompanionStream) -> AsyncIterator[str]:
+    """
+    Server-sent events for one answer: a ``token`` event per token, then ``done``
+
+    A model failure ends the stream with an ``error`` event instead.
+    """
+    try:
+        async for token in stream:
+            yield f"event: token\ndata: {json.dumps({'text': token})}\n\n"
+    except Exception as e:
+        yield f"event: error\ndata: {json.dumps({'error': 'companion_error', 'message': str(e)})}\n\n"
+        return
+    finally:
+        stream.close()
+    yield f"event: done\ndata: {json.dumps({'source': stream.source})}\n\n"
+
+
+@router.post("/ask")
+async def ask(
+    request: CompanionAsk,
+    current_user: TokenData = Depends(get_current_user)
+):
+    """
+    Ask the companion; the answer streams back as server-sent events
+
+    Identical prompts with the same context are answered from the cache.
+    """
+    try:
+        stream = companion.open(current_user.user_id, request.kind, request.prompt, request.context)
+    except CompanionBusyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail={
+                "error": "too_many_requests",
+                "message": str(e),
+                "details": None
+            },
+            headers={"Retry-After": "1"}
+        )
+    return StreamingResponse(
+        answer_stream(stream),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/stats")
+async def get_stats(current_user: TokenData = Depends(get_current_user)):
+    """
+    Request, cache-hit and batching counters with latency percentiles
+    """
+    return companion.stats()
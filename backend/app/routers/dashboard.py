@@ -0,0 +1,44 @@
+"""
+Dashboard router: one call returns everything the dashboard screen needs
+"""
+import time
+from fastapi import APIRouter, Depends
+from fastapi.responses import Response
+from app.dependencies import get_current_user
+from app.schemas.auth import TokenData
+from app.services.dashboard import DashboardService, dashboard_cache
+
+
+router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
+
+
+@router.get("")
+async def get_dashboard(current_user: TokenData = Depends(get_current_user)):
+    """
+    Get the complete dashboard payload for the authenticated user
+
+    The payload is served from a per-user cache that is invalidated by any
+    write to the user's data. Cache status and server time are reported in
+    the ``X-Cache`` and ``Server-Timing`` headers.
+    """
+    started = time.perf_counter()
+    body, hit = await DashboardService.get_dashboard(current_user.user_id)
+    elapsed = time.perf_counter() - started
+    dashboard_cache.record_ttfb(hit, elapsed)
+
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={
+            "X-Cache": "HIT" if hit else "MISS",
+            "Server-Timing": f'dashboard;dur={elapsed * 1000:.2f};desc="{"hit" if hit else "miss"}"'
+        }
+    )
+
+
+@router.get("/stats")
+async def get_dashboard_stats(current_user: TokenData = Depends(get_current_user)):
+    """
+    Report dashboard cache hit ratio and average server time to first byte
+    """
+    return dashboard_cache.stats()
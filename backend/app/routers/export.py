@@ -0,0 +1,53 @@
+"""
+Export router: streams a user's entire data set as NDJSON
+"""
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from app.dependencies import get_current_user
+from app.schemas.auth import TokenData
+from app.services.export import ExportService, ExportCursorError
+
+
+router = APIRouter(prefix="/api/export", tags=["export"])
+
+
+@router.get("")
+async def export_data(
+    cursor: Optional[str] = Query(None, description="Resume after this record cursor (from an interrupted export)"),
+    gzip: bool = Query(False, description="Compress the stream with gzip"),
+    current_user: TokenData = Depends(get_current_user)
+):
+    """
+    Stream all data owned by the authenticated user
+
+    The response is NDJSON, one record per line, ending with ``{"done": true}``.
+    Memory use is independent of the amount of data exported.
+
+    Args:
+        cursor: Optional resume cursor taken from the last record received
+        gzip: Whether to gzip the stream
+        current_user: Authenticated user
+
+    Returns:
+        StreamingResponse with the export
+    """
+    try:
+        parsed_cursor = ExportService.parse_cursor(cursor)
+    except ExportCursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "error": "validation_error",
+                "message": str(e),
+                "details": {"field": "cursor", "code": "invalid_cursor"}
+            }
+        )
+
+    lines = ExportService.iter_lines(current_user.user_id, parsed_cursor)
+    filename = "lifeos-export.ndjson.gz" if gzip else "lifeos-export.ndjson"
+    return StreamingResponse(
+        ExportService.iter_chunks(lines, compress=gzip),
+        media_type="application/gzip" if gzip else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -0,0 +1,185 @@
+"""
+Finance router: statement import, transactions and categorization rules
+"""
+from datetime import date, datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from app.database import get_database
+from app.dependencies import get_current_user
+from app.schemas.auth import TokenData
+from app.schemas.finance import (
+    BudgetMonth, BudgetUpdate, CategoryRuleCreate, ImportReport, TransactionResponse, TransactionUpdate
+)
+from app.services.budgets import BudgetService, parse_month
+from app.services.finance import FinanceService, StatementFormatError
+from app.services.packing import packed_rows, wants_msgpack
+
+
+router = APIRouter(prefix="/api/finance", tags=["finance"])
+
+
+def _not_found(message: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail={
+            "error": "not_found",
+            "message": message,
+            "details": None
+        }
+    )
+
+
+@router.post("/import", response_model=ImportReport)
+async def import_statement(
+    file: UploadFile = File(...),
+    account: str = Form("default", min_length=1, max_length=50),
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Import a CSV or OFX bank statement; already imported lines are skipped
+    """
+    try:
+        # Parsing and batched inserts are blocking work, keep them off the event loop
+        return await run_in_threadpool(
+            FinanceService.import_statement, db, current_user.user_id, file.file, file.filename or "", account
+        )
+    except StatementFormatError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "error": "invalid_statement",
+                "message": str(e),
+                "details": None
+            }
+        )
+
+
+@router.get("/transactions", response_model=List[TransactionResponse])
+async def list_transactions(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    limit: int = Query(500, ge=1, le=5000),
+    binary: bool = Depends(wants_msgpack),
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    List transactions, most recent first (columnar MessagePack with Accept: application/msgpack)
+    """
+    transactions = FinanceService.list_transactions(db, current_user.user_id, start, end, limit)
+    return packed_rows(transactions, TransactionResponse) if binary else transactions
+
+
+@router.patch("/transactions/{transaction_id}", response_model=TransactionResponse)
+async def update_transaction(
+    transaction_id: int,
+    data: TransactionUpdate,
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Edit a transaction, e.g. to recategorize it
+    """
+    transaction = FinanceService.get_transaction(db, current_user.user_id, transaction_id)
+    if not transaction:
+        raise _not_found("Transaction not found")
+    return FinanceService.update_transaction(db, transaction, data)
+
+
+@router.delete("/transactions/{transaction_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_transaction(
+    transaction_id: int,
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Delete a transaction
+    """
+    transaction = FinanceService.get_transaction(db, current_user.user_id, transaction_id)
+    if not transaction:
+        raise _not_found("Transaction not found")
+    FinanceService.delete_transaction(db, transaction)
+
+
+@router.get("/rules")
+async def list_rules(
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    List categorization rules in the order they are tried
+    """
+    return [rule.to_dict() for rule in FinanceService.list_rules(db, current_user.user_id)]
+
+
+@router.post("/rules", status_code=status.HTTP_201_CREATED)
+async def create_rule(
+    rule_data: CategoryRuleCreate,
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Add a rule; it applies to transactions imported afterwards
+    """
+    rule = FinanceService.create_rule(db, current_user.user_id, rule_data.pattern, rule_data.category, rule_data.priority)
+    return rule.to_dict()
+
+
+@router.delete("/rules/{rule_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_rule(
+    rule_id: int,
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Delete a rule
+    """
+    if not FinanceService.delete_rule(db, current_user.user_id, rule_id):
+        raise _not_found("Rule not found")
+
+
+@router.get("/budgets", response_model=BudgetMonth)
+async def get_budgets(
+    month: Optional[str] = Query(None, pattern=r"^\d{4}-(0[1-9]|1[0-2])$", description="YYYY-MM, defaults to the current month"),
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Spent vs. budget per category for a month, served from the aggregates
+    """
+    month_day = parse_month(month) if month else datetime.utcnow().date().replace(day=1)
+    return {
+        "month": month_day.strftime("%Y-%m"),
+        "categories": BudgetService.month_summary(db, current_user.user_id, month_day)
+    }
+
+
+@router.put("/budgets/{category}")
+async def set_budget(
+    category: str,
+    data: BudgetUpdate,
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Set the monthly limit of a category
+    """
+    budget = BudgetService.set_budget(db, current_user.user_id, category[:50], data.limit_cents)
+    return {"category": budget.category, "limit_cents": budget.limit_cents}
+
+
+@router.delete("/budgets/{category}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_budget(
+    category: str,
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Remove the monthly limit of a category
+    """
+    if not BudgetService.delete_budget(db, current_user.user_id, category):
+        raise _not_found("Budget not found")
@@ -0,0 +1,74 @@
+"""
+Focus router: buffered high-frequency event ingestion and event reads
+"""
+from datetime import datetime, timedelta
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from app.database import get_database
+from app.dependencies import get_current_user
+from app.schemas.auth import TokenData
+from app.schemas.focus import FocusEventBatch, FocusEventPayload, IngestAck
+from app.services.focus import BufferFullError, FocusService, focus_buffer
+from app.utils import to_utc_naive
+
+
+router = APIRouter(prefix="/api/focus", tags=["focus"])
+
+
+@router.post("/events", response_model=IngestAck, status_code=status.HTTP_202_ACCEPTED)
+async def ingest_events(
+    payload: FocusEventPayload,
+    current_user: TokenData = Depends(get_current_user)
+):
+    """
+    Accept one event, an array of events or {"events": [...]}
+
+    Events are acknowledged once buffered and written by the background
+    flusher in group commits; they become readable within the flush interval.
+    """
+    if isinstance(payload, FocusEventBatch):
+        events = payload.events
+    elif isinstance(payload, list):
+        events = payload
+    else:
+        events = [payload]
+    try:
+        buffered = FocusService.ingest(current_user.user_id, events)
+    except BufferFullError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={
+                "error": "ingest_overloaded",
+                "message": str(e),
+                "details": None
+            },
+            headers={"Retry-After": "1"}
+        )
+    return {"accepted": len(events), "buffered": buffered}
+
+
+@router.get("/events")
+async def list_events(
+    start: Optional[datetime] = Query(None, description="Range start (defaults to 24 hours before end)"),
+    end: Optional[datetime] = Query(None, description="Range end (defaults to now)"),
+    session_id: Optional[str] = Query(None, max_length=64),
+    limit: int = Query(1000, ge=1, le=10000),
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    List flushed focus events, oldest first
+    """
+    end = to_utc_naive(end) if end else datetime.utcnow()
+    start = to_utc_naive(start) if start else end - timedelta(days=1)
+    events = FocusService.list_events(db, current_user.user_id, start, end, session_id, limit)
+    return [event.to_dict() for event in events]
+
+
+@router.get("/ingest/stats")
+async def get_ingest_stats(current_user: TokenData = Depends(get_current_user)):
+    """
+    Buffer depth, group-commit sizes and rejection counters of the ingestion pipeline
+    """
+    return focus_buffer.stats()
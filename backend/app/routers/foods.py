@@ -0,0 +1,27 @@
+"""
+Food catalogue router with type-ahead suggestions
+"""
+from typing import List
+from fastapi import APIRouter, Depends, Query
+from app.dependencies import get_current_user
+from app.schemas.auth import TokenData
+from app.schemas.food import FoodSuggestion
+from app.services.foods import FoodService
+
+
+router = APIRouter(prefix="/api/foods", tags=["foods"])
+
+
+@router.get("/suggest", response_model=List[FoodSuggestion])
+async def suggest_foods(
+    q: str = Query(..., min_length=1, max_length=100, description="What the user has typed so far"),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: TokenData = Depends(get_current_user)
+):
+    """
+    Suggest foods whose name, or any word in it, starts with the query
+
+    Served from the memory-mapped prefix index and an LRU cache of recent
+    prefixes; no database query is made.
+    """
+    return FoodService.suggest(q, limit)
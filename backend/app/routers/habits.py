@@ -0,0 +1,126 @@
+"""
+Habit router with CRUD, check-in and heatmap endpoints
+"""
+from datetime import date, datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from app.database import get_database
+from app.dependencies import get_current_user
+from app.schemas.auth import TokenData
+from app.schemas.habit import HabitCreate, HabitUpdate, HabitResponse, CheckInRequest, HeatmapResponse
+from app.services.habits import HabitService
+from app.services.packing import packed_rows, wants_msgpack
+
+
+router = APIRouter(prefix="/api/habits", tags=["habits"])
+
+
+def _get_habit_or_404(db: Session, user_id: int, habit_id: int):
+    habit = HabitService.get_habit(db, user_id, habit_id)
+    if not habit:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "error": "not_found",
+                "message": "Habit not found",
+                "details": None
+            }
+        )
+    return habit
+
+
+@router.get("", response_model=List[HabitResponse])
+async def list_habits(
+    binary: bool = Depends(wants_msgpack),
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    List all habits of the authenticated user with their streaks (columnar MessagePack with Accept: application/msgpack)
+    """
+    habits = [habit.to_dict() for habit in HabitService.list_habits(db, current_user.user_id)]
+    return packed_rows(habits, HabitResponse) if binary else habits
+
+
+@router.post("", response_model=HabitResponse, status_code=status.HTTP_201_CREATED)
+async def create_habit(
+    habit_data: HabitCreate,
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Create a new habit
+    """
+    return HabitService.create_habit(db, current_user.user_id, habit_data).to_dict()
+
+
+@router.patch("/{habit_id}", response_model=HabitResponse)
+async def update_habit(
+    habit_id: int,
+    habit_data: HabitUpdate,
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Rename or recategorize a habit
+    """
+    habit = _get_habit_or_404(db, current_user.user_id, habit_id)
+    return HabitService.update_habit(db, habit, habit_data).to_dict()
+
+
+@router.delete("/{habit_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_habit(
+    habit_id: int,
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Delete a habit (kept as a tombstone for the sync feed)
+    """
+    habit = _get_habit_or_404(db, current_user.user_id, habit_id)
+    HabitService.delete_habit(db, habit)
+
+
+@router.post("/{habit_id}/checkins", response_model=HabitResponse)
+async def check_in(
+    habit_id: int,
+    checkin: CheckInRequest,
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Check in a habit for a day (today by default); repeated check-ins are no-ops
+    """
+    habit = _get_habit_or_404(db, current_user.user_id, habit_id)
+    HabitService.check_in(db, habit, checkin.day or datetime.utcnow().date())
+    return habit.to_dict()
+
+
+@router.delete("/{habit_id}/checkins/{day}", response_model=HabitResponse)
+async def undo_check_in(
+    habit_id: int,
+    day: date,
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Remove the check-in for a day
+    """
+    habit = _get_habit_or_404(db, current_user.user_id, habit_id)
+    HabitService.undo_check_in(db, habit, day)
+    return habit.to_dict()
+
+
+@router.get("/{habit_id}/heatmap", response_model=HeatmapResponse)
+async def get_heatmap(
+    habit_id: int,
+    year: Optional[int] = Query(None, ge=1970, le=9999, description="Calendar year (defaults to the current year)"),
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Get one year of check-ins decoded straight from the habit's bitset
+    """
+    habit = _get_habit_or_404(db, current_user.user_id, habit_id)
+    return HabitService.heatmap(db, habit, year or datetime.utcnow().year)
@@ -0,0 +1,102 @@
+"""
+Jobs router: enqueue background work and poll its status and result
+"""
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from app.database import get_database
+from app.dependencies import get_current_user
+from app.schemas.auth import TokenData
+from app.schemas.job import JobCreate, JobStatus
+from app.services.jobs import JobService, job_workers
+
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+
+def _not_found() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail={
+            "error": "not_found",
+            "message": "Job not found",
+            "details": None
+        }
+    )
+
+
+@router.post("", status_code=status.HTTP_202_ACCEPTED)
+async def enqueue_job(
+    data: JobCreate,
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Queue a report or rebuild for the current user; poll GET /api/jobs/{id} for the result
+    """
+    job = JobService.enqueue(db, data.kind, data.payload, current_user.user_id, data.delay_seconds)
+    return job.to_dict(include_result=False)
+
+
+@router.get("")
+async def list_jobs(
+    status_filter: Optional[JobStatus] = Query(None, alias="status"),
+    limit: int = Query(50, ge=1, le=500),
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    List the current user's jobs, newest first, optionally by status
+    """
+    jobs = JobService.list_jobs(db, current_user.user_id, status_filter, limit)
+    return [job.to_dict(include_result=False) for job in jobs]
+
+
+@router.get("/stats")
+async def get_job_stats(
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Queue depth by status and this process's worker throughput and latencies
+    """
+    return {"queue": JobService.status_counts(db), "workers": job_workers.stats()}
+
+
+@router.get("/{job_id}")
+async def get_job(
+    job_id: int,
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Get a job with its stored result once it has succeeded
+    """
+    job = JobService.get_job(db, current_user.user_id, job_id)
+    if not job:
+        raise _not_found()
+    return job.to_dict()
+
+
+@router.post("/{job_id}/cancel")
+async def cancel_job(
+    job_id: int,
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Cancel a job that has not started yet
+    """
+    job = JobService.get_job(db, current_user.user_id, job_id)
+    if not job:
+        raise _not_found()
+    if not JobService.cancel(db, job):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={
+                "error": "job_not_queued",
+                "message": f"Job is already {job.status}",
+                "details": None
+            }
+        )
+    return job.to_dict(include_result=False)
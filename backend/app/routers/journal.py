@@ -0,0 +1,140 @@
+"""
+Journal router: entries and semantic similarity search
+"""
+from datetime import date
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from app.database import get_database
+from app.dependencies import get_current_user
+from app.schemas.auth import TokenData
+from app.schemas.journal import (
+    JournalEntryCreate, JournalEntryResponse, JournalEntryUpdate, JournalKind, SimilarEntries
+)
+from app.services.journal import JournalService
+from app.services.packing import packed_rows, wants_msgpack
+
+
+router = APIRouter(prefix="/api/journal", tags=["journal"])
+
+
+def _not_found() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail={
+            "error": "not_found",
+            "message": "Journal entry not found",
+            "details": None
+        }
+    )
+
+
+def _similar_response(results) -> dict:
+    return {"results": [{"entry": entry, "score": round(score, 4)} for entry, score in results]}
+
+
+@router.post("/entries", response_model=JournalEntryResponse, status_code=status.HTTP_201_CREATED)
+async def create_entry(
+    data: JournalEntryCreate,
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Write a journal entry, reflection or check-in answer
+    """
+    return await run_in_threadpool(JournalService.create_entry, db, current_user.user_id, data)
+
+
+@router.get("/entries", response_model=List[JournalEntryResponse])
+async def list_entries(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    binary: bool = Depends(wants_msgpack),
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    List entries, most recent first (columnar MessagePack with Accept: application/msgpack)
+    """
+    entries = JournalService.list_entries(db, current_user.user_id, start, end, limit)
+    return packed_rows(entries, JournalEntryResponse) if binary else entries
+
+
+@router.get("/similar", response_model=SimilarEntries)
+async def search_similar(
+    q: str = Query(..., min_length=1, max_length=20000, description="Text to find similar entries for"),
+    k: int = Query(10, ge=1, le=100),
+    kind: Optional[JournalKind] = None,
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Past entries most similar to a piece of text
+    """
+    results = await run_in_threadpool(JournalService.similar, db, current_user.user_id, q, k, kind)
+    return _similar_response(results)
+
+
+@router.get("/entries/{entry_id}/similar", response_model=SimilarEntries)
+async def entry_similar(
+    entry_id: int,
+    k: int = Query(10, ge=1, le=100),
+    kind: Optional[JournalKind] = None,
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Past entries most similar to an existing entry
+    """
+    entry = JournalService.get_entry(db, current_user.user_id, entry_id)
+    if not entry:
+        raise _not_found()
+    results = await run_in_threadpool(
+        JournalService.similar, db, current_user.user_id, entry.body, k, kind, entry.id
+    )
+    return _similar_response(results)
+
+
+@router.patch("/entries/{entry_id}", response_model=JournalEntryResponse)
+async def update_entry(
+    entry_id: int,
+    data: JournalEntryUpdate,
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Edit an entry
+    """
+    entry = JournalService.get_entry(db, current_user.user_id, entry_id)
+    if not entry:
+        raise _not_found()
+    return await run_in_threadpool(JournalService.update_entry, db, entry, data)
+
+
+@router.delete("/entries/{entry_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_entry(
+    entry_id: int,
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Delete an entry and drop it from the similarity index
+    """
+    entry = JournalService.get_entry(db, current_user.user_id, entry_id)
+    if not entry:
+        raise _not_found()
+    JournalService.delete_entry(db, entry)
+
+
+@router.post("/reindex")
+async def reindex(
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Rebuild the similarity index from stored entries
+    """
+    indexed = await run_in_threadpool(JournalService.reindex, db, current_user.user_id)
+    return {"indexed": indexed}
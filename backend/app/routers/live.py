@@ -0,0 +1,191 @@
+"""
+Live router: server-push change notifications over SSE and WebSocket
+"""
+import asyncio
+import json
+from datetime import datetime
+from typing import AsyncIterator, Optional, Tuple
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, WebSocket, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
+from app.database import session_for_user
+from app.dependencies import get_current_user, security
+from app.schemas.auth import TokenData
+from app.services.auth import STREAM_TICKET_SECONDS, AuthService
+from app.services import live
+from app.services.live import live_broker
+from app.services.sync import SyncService
+
+
+router = APIRouter(prefix="/api/live", tags=["live"])
+
+
+def _authenticate(authorization: Optional[str], ticket: Optional[str]) -> Optional[Tuple[TokenData, datetime]]:
+    """
+    Resolve a live connection's user and the time its access ends
+
+    A Bearer header is checked like on every other endpoint; clients that
+    cannot set headers (EventSource, browser WebSockets) pass a stream ticket
+    from POST /api/live/ticket instead of their access token.
+    """
+    if authorization:
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() != "bearer":
+            return None
+        token_data = AuthService.verify_token(token)
+        expires_at = AuthService.token_expires_at(token)
+        return (token_data, expires_at) if token_data and expires_at else None
+    if ticket:
+        return AuthService.verify_stream_ticket(ticket)
+    return None
+
+
+def _unauthorized() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail={
+            "error": "authentication_error",
+            "message": "Invalid or expired token",
+            "details": None
+        }
+    )
+
+
+def _wait_seconds(expires_at: Optional[datetime]) -> float:
+    """Time to wait for the next change: a heartbeat, or less when access ends sooner"""
+    if expires_at is None:
+        return live.HEARTBEAT_SECONDS
+    return max(0.0, min(live.HEARTBEAT_SECONDS, (expires_at - datetime.utcnow()).total_seconds()))
+
+
+def _expired(expires_at: Optional[datetime]) -> bool:
+    return expires_at is not None and datetime.utcnow() >= expires_at
+
+
+def _current_cursor(user_id: int) -> int:
+    # A blocking query: the async handlers run it in the threadpool
+    db = session_for_user(user_id)
+    try:
+        return SyncService.current_seq(db, user_id)
+    finally:
+        db.close()
+
+
+async def event_stream(user_id: int, since: int, latest: int,
+                       expires_at: Optional[datetime] = None) -> AsyncIterator[str]:
+    """
+    Server-sent events for one connection
+
+    Emits a ``changes`` event carrying the newest sync cursor whenever the
+    user's data changes (clients then pull ``/api/sync?since=``), and a
+    comment line as keep-alive while idle. A slow reader simply receives
+    the latest cursor once it catches up. When the access token behind the
+    connection expires, an ``expired`` event is sent and the stream ends.
+    """
+    subscriber = live_broker.subscribe(user_id, since)
+    try:
+        yield "retry: 5000\n\n"
+        subscriber.notify(latest)
+        while True:
+            cursor = await subscriber.next_cursor(_wait_seconds(expires_at))
+            if cursor is not None:
+                yield f"id: {cursor}\nevent: changes\ndata: {json.dumps({'cursor': cursor})}\n\n"
+            elif _expired(expires_at):
+                yield "event: expired\ndata: {}\n\n"
+                return
+            else:
+                yield ": keep-alive\n\n"
+    finally:
+        live_broker.unsubscribe(subscriber)
+
+
+@router.post("/ticket")
+async def create_stream_ticket(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """
+    Issue a short-lived ticket for opening /events or /ws from a URL
+
+    Keeps the access token itself out of URLs, which access logs and
+    proxies record. The stream opened with it closes when the access token
+    used here expires.
+    """
+    token_data = AuthService.verify_token(credentials.credentials)
+    expires_at = AuthService.token_expires_at(credentials.credentials)
+    if not token_data or not expires_at:
+        raise _unauthorized()
+    return {"ticket": AuthService.create_stream_ticket(token_data, expires_at), "expires_in": STREAM_TICKET_SECONDS}
+
+
+@router.get("/events")
+async def stream_events(
+    since: Optional[int] = Query(None, ge=0, description="Last sync cursor the client has seen"),
+    ticket: Optional[str] = Query(None, description="Stream ticket, for clients that cannot set headers (EventSource)"),
+    authorization: Optional[str] = Header(None),
+    last_event_id: Optional[int] = Header(None, ge=0)
+):
+    """
+    Stream change notifications as server-sent events
+
+    Credentials are checked when the connection opens, and the stream ends
+    with an ``expired`` event when the access token expires. Reconnecting
+    clients resume from Last-Event-ID and get an immediate event if they
+    missed changes.
+    """
+    authenticated = _authenticate(authorization, ticket)
+    if not authenticated:
+        raise _unauthorized()
+    token_data, expires_at = authenticated
+    latest = await run_in_threadpool(_current_cursor, token_data.user_id)
+    resume = last_event_id if last_event_id is not None else since
+    return StreamingResponse(
+        event_stream(token_data.user_id, latest if resume is None else resume, latest, expires_at),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.websocket("/ws")
+async def websocket_events(websocket: WebSocket, ticket: Optional[str] = None, since: Optional[int] = None):
+    """
+    Same notifications as /events over a WebSocket: {"type": "changes", "cursor": n}
+
+    Sends {"type": "expired"} and closes when the access token expires.
+    """
+    authenticated = _authenticate(websocket.headers.get("authorization"), ticket)
+    if not authenticated:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    token_data, expires_at = authenticated
+    await websocket.accept()
+    latest = await run_in_threadpool(_current_cursor, token_data.user_id)
+    subscriber = live_broker.subscribe(token_data.user_id, latest if since is None else since)
+    subscriber.notify(latest)
+
+    async def push():
+        while True:
+            cursor = await subscriber.next_cursor(_wait_seconds(expires_at))
+            if cursor is not None:
+                await websocket.send_json({"type": "changes", "cursor": cursor})
+            elif _expired(expires_at):
+                await websocket.send_json({"type": "expired"})
+                await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+                return
+            else:
+                await websocket.send_json({"type": "ping"})
+
+    # Pushing runs in its own task; this one only watches for the client going away
+    sender = asyncio.create_task(push())
+    try:
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    finally:
+        sender.cancel()
+        live_broker.unsubscribe(subscriber)
+
+
+@router.get("/stats")
+async def get_live_stats(current_user: TokenData = Depends(get_current_user)):
+    """
+    Open connections and publish counters of this worker's broker
+    """
+    return live_broker.stats()
@@ -0,0 +1,58 @@
+"""
+Wellness metrics router: record samples and query tiered series
+"""
+from datetime import datetime, timedelta
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from sqlalchemy.orm import Session
+from app.database import get_database
+from app.dependencies import get_current_user
+from app.schemas.auth import TokenData
+from app.schemas.metric import MetricBatch, SeriesResponse, METRIC_NAME_PATTERN
+from app.services.metrics import MetricService, DEFAULT_MAX_POINTS
+from app.utils import to_utc_naive
+
+
+router = APIRouter(prefix="/api/metrics", tags=["metrics"])
+
+
+@router.post("", status_code=status.HTTP_201_CREATED)
+async def record_metrics(
+    batch: MetricBatch,
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Record one or more wellness samples (sleep, mood, energy, weight, stress, ...)
+    """
+    recorded = MetricService.record_points(
+        db, current_user.user_id, ((p.metric, p.ts, p.value) for p in batch.points)
+    )
+    return {"recorded": recorded}
+
+
+@router.get("/{metric}/series", response_model=SeriesResponse)
+async def get_series(
+    metric: str = Path(..., pattern=METRIC_NAME_PATTERN),
+    start: Optional[datetime] = Query(None, description="Range start (defaults to 30 days before end)"),
+    end: Optional[datetime] = Query(None, description="Range end (defaults to now)"),
+    resolution: Optional[int] = Query(None, ge=1, description="Seconds per point; picks the coarsest fitting tier"),
+    max_points: int = Query(DEFAULT_MAX_POINTS, ge=10, le=10000, description="Target points when no resolution is given"),
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Get a metric series, served from raw samples or hourly/daily/weekly rollups
+    """
+    end = to_utc_naive(end) if end else datetime.utcnow()
+    start = to_utc_naive(start) if start else end - timedelta(days=30)
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "error": "validation_error",
+                "message": "start must be before end",
+                "details": {"field": "start", "code": "invalid_range"}
+            }
+        )
+    return MetricService.series(db, current_user.user_id, metric, start, end, resolution, max_points)
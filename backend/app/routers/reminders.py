@@ -0,0 +1,95 @@
+"""
+Reminders router: schedule one-off and repeating reminders delivered through the change feed
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from app.database import get_database
+from app.dependencies import get_current_user
+from app.schemas.auth import TokenData
+from app.schemas.trigger import ReminderCreate, ReminderUpdate
+from app.services.triggers import TriggerService, trigger_scheduler
+from app.services.packing import packed_rows, wants_msgpack
+
+
+router = APIRouter(prefix="/api/reminders", tags=["reminders"])
+
+
+def _get_reminder_or_404(db: Session, user_id: int, reminder_id: int):
+    reminder = TriggerService.get_reminder(db, user_id, reminder_id)
+    if not reminder:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "error": "not_found",
+                "message": "Reminder not found",
+                "details": None
+            }
+        )
+    return reminder
+
+
+@router.post("", status_code=status.HTTP_201_CREATED)
+async def create_reminder(
+    data: ReminderCreate,
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Schedule a reminder; when it fires its last_fired_at changes and the client hears about it via sync
+    """
+    reminder = TriggerService.create_reminder(
+        db, current_user.user_id, data.title, data.fire_at, data.repeat_seconds, data.payload
+    )
+    return reminder.to_dict()
+
+
+@router.get("")
+async def list_reminders(
+    include_finished: bool = False,
+    limit: int = Query(100, ge=1, le=1000),
+    binary: bool = Depends(wants_msgpack),
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    List reminders, soonest first (columnar MessagePack with Accept: application/msgpack)
+    """
+    reminders = [reminder.to_dict() for reminder in TriggerService.list_reminders(
+        db, current_user.user_id, include_finished, limit
+    )]
+    return packed_rows(reminders) if binary else reminders
+
+
+@router.get("/scheduler/stats")
+async def get_scheduler_stats(current_user: TokenData = Depends(get_current_user)):
+    """
+    Timer wheel size, fire counters and tick and refill timings of this process's scheduler
+    """
+    return trigger_scheduler.stats()
+
+
+@router.patch("/{reminder_id}")
+async def update_reminder(
+    reminder_id: int,
+    data: ReminderUpdate,
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Edit a reminder; a new fire_at reschedules it, also after it has fired
+    """
+    reminder = _get_reminder_or_404(db, current_user.user_id, reminder_id)
+    return TriggerService.update_reminder(db, reminder, data.model_dump(exclude_unset=True)).to_dict()
+
+
+@router.delete("/{reminder_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_reminder(
+    reminder_id: int,
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Cancel and delete a reminder
+    """
+    reminder = _get_reminder_or_404(db, current_user.user_id, reminder_id)
+    TriggerService.delete_reminder(db, reminder)
@@ -0,0 +1,154 @@
+"""
+Schedule router: time-blocked plans, busy blocks and task dependencies
+"""
+from datetime import datetime, timedelta
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from app.database import get_database
+from app.dependencies import get_current_user
+from app.schemas.auth import TokenData
+from app.schemas.schedule import (
+    BusyBlockCreate, DependencyUpdate, PlanRequest, PlanResponse, ReplanRequest, StoredPlan
+)
+from app.services.scheduler import DependencyError, ScheduleService
+from app.utils import to_utc_naive
+
+
+router = APIRouter(prefix="/api/schedule", tags=["schedule"])
+
+
+def _invalid_range(message: str, field: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail={
+            "error": "validation_error",
+            "message": message,
+            "details": {"field": field, "code": "invalid_range"}
+        }
+    )
+
+
+def _not_found(message: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail={
+            "error": "not_found",
+            "message": message,
+            "details": None
+        }
+    )
+
+
+@router.post("/plan", response_model=PlanResponse)
+async def create_plan(
+    request: PlanRequest,
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Build a new plan of all open tasks and replace the stored one
+    """
+    if request.day_end <= request.day_start:
+        raise _invalid_range("day_end must be after day_start", "day_end")
+    settings = request.model_dump(exclude={"start"})
+    start = to_utc_naive(request.start) if request.start else None
+    return await run_in_threadpool(ScheduleService.create_plan, db, current_user.user_id, settings, start)
+
+
+@router.post("/replan", response_model=PlanResponse)
+async def replan(
+    request: ReplanRequest,
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Update the stored plan after the given tasks changed, keeping unaffected blocks
+    """
+    result = await run_in_threadpool(ScheduleService.replan, db, current_user.user_id, set(request.task_ids))
+    if result is None:
+        raise _not_found("No plan exists yet")
+    return result
+
+
+@router.get("", response_model=StoredPlan)
+async def get_plan(
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    The current plan's blocks in time order
+    """
+    plan = ScheduleService.get_plan(db, current_user.user_id)
+    if plan is None:
+        raise _not_found("No plan exists yet")
+    return plan
+
+
+@router.post("/busy", status_code=status.HTTP_201_CREATED)
+async def add_busy_block(
+    data: BusyBlockCreate,
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Block calendar time so no task work is planned in it
+    """
+    start, end = to_utc_naive(data.start), to_utc_naive(data.end)
+    if end <= start:
+        raise _invalid_range("end must be after start", "end")
+    block = ScheduleService.add_busy_block(db, current_user.user_id, data.title, start, end)
+    return block.to_dict()
+
+
+@router.get("/busy")
+async def list_busy_blocks(
+    start: Optional[datetime] = Query(None, description="Range start (defaults to now)"),
+    end: Optional[datetime] = Query(None, description="Range end (defaults to 4 weeks after start)"),
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    List busy blocks overlapping a range
+    """
+    start = to_utc_naive(start) if start else datetime.utcnow()
+    end = to_utc_naive(end) if end else start + timedelta(days=28)
+    return [block.to_dict() for block in ScheduleService.list_busy_blocks(db, current_user.user_id, start, end)]
+
+
+@router.delete("/busy/{block_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_busy_block(
+    block_id: int,
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Delete a busy block
+    """
+    if not ScheduleService.delete_busy_block(db, current_user.user_id, block_id):
+        raise _not_found("Busy block not found")
+
+
+@router.put("/dependencies/{task_id}")
+async def set_dependencies(
+    task_id: int,
+    data: DependencyUpdate,
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Replace the tasks that must be finished before this one can be scheduled
+    """
+    try:
+        depends_on = ScheduleService.set_dependencies(db, current_user.user_id, task_id, data.depends_on)
+    except DependencyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "error": "validation_error",
+                "message": str(e),
+                "details": {"code": "invalid_dependency"}
+            }
+        )
+    return {"task_id": task_id, "depends_on": depends_on}
@@ -0,0 +1,41 @@
+"""
+Delta-sync router: lets clients fetch only rows changed since their cursor
+"""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from app.database import get_database
+from app.dependencies import get_current_user
+from app.schemas.auth import TokenData
+from app.schemas.sync import SyncResponse
+from app.services.packing import packed_sync_page, wants_msgpack
+from app.services.sync import SyncService, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+
+router = APIRouter(prefix="/api/sync", tags=["sync"])
+
+
+@router.get("", response_model=SyncResponse)
+async def get_changes(
+    since: int = Query(0, ge=0, description="Cursor returned by the previous sync call (0 for a full sync)"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum rows per page"),
+    binary: bool = Depends(wants_msgpack),
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Return one page of changes made after the given cursor
+
+    With ``Accept: application/msgpack`` the page is MessagePack and each
+    table's upserts are packed into columns.
+
+    Args:
+        since: Last cursor the client has applied
+        limit: Page size
+        current_user: Authenticated user
+        db: Database session
+
+    Returns:
+        SyncResponse with upserted rows, deleted ids and the next cursor
+    """
+    page = SyncService.changes_since(db, current_user.user_id, since, limit)
+    return packed_sync_page(page) if binary else page
@@ -0,0 +1,173 @@
+"""
+Task router with CRUD endpoints for user tasks
+"""
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from app.database import get_database
+from app.dependencies import get_current_user
+from app.schemas.auth import TokenData
+from app.schemas.task import TaskCreate, TaskUpdate, TaskResponse, TaskProgress
+from app.services.tasks import TaskService
+from app.services.packing import packed_rows, wants_msgpack
+from app.services.task_tree import TaskTreeError, TaskTreeService
+
+
+router = APIRouter(prefix="/api/tasks", tags=["tasks"])
+
+
+def _invalid_tree(e: TaskTreeError) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail={
+            "error": "validation_error",
+            "message": str(e),
+            "details": {"field": "parent_id", "code": "invalid_parent"}
+        }
+    )
+
+
+def _task_not_found() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail={
+            "error": "not_found",
+            "message": "Task not found",
+            "details": None
+        }
+    )
+
+
+@router.get("", response_model=List[TaskResponse])
+async def list_tasks(
+    binary: bool = Depends(wants_msgpack),
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    List all tasks of the authenticated user (columnar MessagePack with Accept: application/msgpack)
+    """
+    tasks = TaskService.list_tasks(db, current_user.user_id)
+    return packed_rows(tasks, TaskResponse) if binary else tasks
+
+
+@router.post("", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
+async def create_task(
+    task_data: TaskCreate,
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Create a new task for the authenticated user
+    """
+    try:
+        return TaskService.create_task(db, current_user.user_id, task_data)
+    except TaskTreeError as e:
+        db.rollback()
+        raise _invalid_tree(e)
+    except Exception:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={
+                "error": "database_error",
+                "message": "Failed to create task",
+                "details": None
+            }
+        )
+
+
+@router.get("/{task_id}", response_model=TaskResponse)
+async def get_task(
+    task_id: int,
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Get a single task by id
+    """
+    task = TaskService.get_task(db, current_user.user_id, task_id)
+    if not task:
+        raise _task_not_found()
+    return task
+
+
+@router.get("/{task_id}/subtree", response_model=List[TaskResponse])
+async def get_subtree(
+    task_id: int,
+    max_depth: Optional[int] = Query(None, ge=0, description="Levels below the task to include (all when omitted)"),
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Get a task and its subtasks, parents before children, in a single query
+    """
+    task = TaskService.get_task(db, current_user.user_id, task_id)
+    if not task:
+        raise _task_not_found()
+    return TaskTreeService.subtree(db, task, max_depth)
+
+
+@router.get("/{task_id}/progress", response_model=TaskProgress)
+async def get_progress(
+    task_id: int,
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Completion of a task's whole subtree, read from its cached counters
+    """
+    task = TaskService.get_task(db, current_user.user_id, task_id)
+    if not task:
+        raise _task_not_found()
+    return {
+        "task_id": task.id,
+        "total": task.subtree_total,
+        "done": task.subtree_done,
+        "percent": round(task.progress * 100, 1)
+    }
+
+
+@router.patch("/{task_id}", response_model=TaskResponse)
+async def update_task(
+    task_id: int,
+    task_data: TaskUpdate,
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Partially update a task
+    """
+    task = TaskService.get_task(db, current_user.user_id, task_id)
+    if not task:
+        raise _task_not_found()
+    try:
+        return TaskService.update_task(db, task, task_data)
+    except TaskTreeError as e:
+        db.rollback()
+        raise _invalid_tree(e)
+    except Exception:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={
+                "error": "database_error",
+                "message": "Failed to update task",
+                "details": None
+            }
+        )
+
+
+@router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_task(
+    task_id: int,
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Delete a task with its subtasks (kept as tombstones for the sync feed)
+    """
+    task = TaskService.get_task(db, current_user.user_id, task_id)
+    if not task:
+        raise _task_not_found()
+    TaskService.delete_task(db, task)
@@ -0,0 +1,122 @@
+"""
+Workout router: set logging and progress views served from summary tables
+"""
+from datetime import datetime, timedelta
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from app.database import get_database
+from app.dependencies import get_current_user
+from app.schemas.auth import TokenData
+from app.schemas.workout import WorkoutSetCreate, WorkoutSetUpdate, WorkoutSetResponse
+from app.services.workouts import WorkoutService
+from app.services.packing import packed_rows, wants_msgpack
+
+
+router = APIRouter(prefix="/api/workouts", tags=["workouts"])
+
+
+def _get_set_or_404(db: Session, user_id: int, set_id: int):
+    workout_set = WorkoutService.get_set(db, user_id, set_id)
+    if not workout_set:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "error": "not_found",
+                "message": "Workout set not found",
+                "details": None
+            }
+        )
+    return workout_set
+
+
+@router.get("/sets", response_model=List[WorkoutSetResponse])
+async def list_sets(
+    exercise: Optional[str] = Query(None, max_length=100),
+    limit: int = Query(200, ge=1, le=1000),
+    binary: bool = Depends(wants_msgpack),
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    List the most recent sets, optionally for one exercise (columnar MessagePack with Accept: application/msgpack)
+    """
+    sets = WorkoutService.list_sets(db, current_user.user_id, exercise, limit)
+    return packed_rows(sets, WorkoutSetResponse) if binary else sets
+
+
+@router.post("/sets", response_model=WorkoutSetResponse, status_code=status.HTTP_201_CREATED)
+async def log_set(
+    set_data: WorkoutSetCreate,
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Log a set (exercise, reps, weight, duration)
+    """
+    return WorkoutService.log_set(db, current_user.user_id, set_data)
+
+
+@router.patch("/sets/{set_id}", response_model=WorkoutSetResponse)
+async def update_set(
+    set_id: int,
+    set_data: WorkoutSetUpdate,
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Edit a logged set
+    """
+    workout_set = _get_set_or_404(db, current_user.user_id, set_id)
+    return WorkoutService.update_set(db, workout_set, set_data)
+
+
+@router.delete("/sets/{set_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_set(
+    set_id: int,
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Delete a logged set
+    """
+    workout_set = _get_set_or_404(db, current_user.user_id, set_id)
+    WorkoutService.delete_set(db, workout_set)
+
+
+@router.get("/records")
+async def get_records(
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Personal records (best weight, best estimated 1RM) and totals per exercise
+    """
+    return [summary.to_dict() for summary in WorkoutService.records(db, current_user.user_id)]
+
+
+@router.get("/progress/e1rm")
+async def get_e1rm_trend(
+    exercise: str = Query(..., min_length=1, max_length=100),
+    days: int = Query(180, ge=1, le=3660),
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Daily best estimated 1RM for an exercise over the last ``days`` days
+    """
+    end = datetime.utcnow().date()
+    return WorkoutService.e1rm_trend(db, current_user.user_id, exercise, end - timedelta(days=days - 1), end)
+
+
+@router.get("/progress/volume")
+async def get_weekly_volume(
+    weeks: int = Query(12, ge=1, le=520),
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_database)
+):
+    """
+    Weekly sets and volume per muscle group over the last ``weeks`` weeks
+    """
+    end = datetime.utcnow().date()
+    return WorkoutService.weekly_volume(db, current_user.user_id, end - timedelta(weeks=weeks - 1), end)
@@ -0,0 +1,37 @@
+"""
+Pydantic schemas for analytics endpoints
+"""
+from pydantic import BaseModel
+from typing import Dict, List, Literal, Optional
+
+
+SummaryPeriod = Literal["day", "week", "month"]
+
+
+class CounterSet(BaseModel):
+    """Activity counters with the derived completion rate"""
+    tasks_created: int
+    tasks_completed: int
+    habit_checkins: int = 0
+    completion_rate: Optional[float] = None
+
+
+class SummaryBucket(CounterSet):
+    """Counters for one day, week or month"""
+    start: str
+    by_category: Dict[str, CounterSet] = {}
+
+
+class SummaryResponse(BaseModel):
+    """Schema for the period summary response"""
+    start: str
+    end: str
+    period: SummaryPeriod
+    buckets: List[SummaryBucket]
+    totals: CounterSet
+
+
+class StreakResponse(BaseModel):
+    """Schema for completion streaks in days"""
+    current: int
+    longest: int
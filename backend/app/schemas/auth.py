@@ -1,54 +1,43 @@
 """
 Pydantic schemas for authentication endpoints
 """
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 from datetime import datetime
-import re
+from app.schemas.types import DeviceId, DeviceName, Email, NewPassword, OpaqueToken, Password, Username
 
 
 class UserBase(BaseModel):
     """Base user schema with common fields"""
-    username: str = Field(..., min_length=3, max_length=50, description="Username must be 3-50 characters")
-    email: str = Field(..., description="Valid email address")
-    
-    @validator('email')
-    def validate_email(cls, v):
-        """Basic email validation"""
-        email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        if not re.match(email_pattern, v):
-            raise ValueError('Invalid email format')
-        return v
-
-
-class UserCreate(UserBase):
+    username: Username
+    email: Email
+
+
+class DeviceInfo(BaseModel):
+    """Optional device fields identifying the refresh token session a login starts"""
+    device_id: Optional[DeviceId] = None
+    device_name: Optional[DeviceName] = None
+
+
+class UserCreate(DeviceInfo, UserBase):
     """Schema for user registration"""
-    password: str = Field(..., min_length=6, description="Password must be at least 6 characters")
+    password: NewPassword
 
 
-class UserLogin(BaseModel):
+class UserLogin(DeviceInfo):
     """Schema for user login"""
-    email: str = Field(..., description="Valid email address")
-    password: str = Field(..., min_length=1, description="Password is required")
-    
-    @validator('email')
-    def validate_email(cls, v):
-        """Basic email validation"""
-        email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        if not re.match(email_pattern, v):
-            raise ValueError('Invalid email format')
-        return v
+    email: Email
+    password: Password
 
 
 class UserResponse(UserBase):
     """Schema for user data in responses (excludes password)"""
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
-
 
 class AuthResponse(BaseModel):
     """Schema for authentication response with token"""
@@ -56,6 +45,21 @@ class AuthResponse(BaseModel):
     username: str
     token: str
     token_type: str = "bearer"
+    expires_in: Optional[int] = None
+    refresh_token: Optional[str] = None
+
+
+class RefreshRequest(BaseModel):
+    """Schema for exchanging or revoking a refresh token"""
+    refresh_token: OpaqueToken
+
+
+class SessionResponse(BaseModel):
+    """Schema for one device's refresh token session"""
+    device_id: str
+    device_name: Optional[str] = None
+    last_refreshed_at: Optional[datetime] = None
+    expires_at: datetime
 
 
 class TokenData(BaseModel):
@@ -0,0 +1,15 @@
+"""
+Pydantic schemas for the AI companion
+"""
+from pydantic import BaseModel, Field
+from typing import Any, Dict, Literal, Optional
+
+
+CompanionKind = Literal["checkin", "insight", "chat"]
+
+
+class CompanionAsk(BaseModel):
+    """A prompt for the companion, answered as a token stream"""
+    kind: CompanionKind = "chat"
+    prompt: str = Field(..., min_length=1, max_length=4000)
+    context: Optional[Dict[str, Any]] = Field(None, description="Extra facts for the model, part of the cache key")
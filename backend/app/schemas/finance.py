@@ -0,0 +1,67 @@
+"""
+Pydantic schemas for personal finance endpoints
+"""
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import date
+
+
+class CategoryRuleCreate(BaseModel):
+    """Schema for creating a categorization rule"""
+    pattern: str = Field(..., min_length=1, max_length=100, description="Words the payee must contain (case-insensitive)")
+    category: str = Field(..., min_length=1, max_length=50)
+    priority: int = Field(100, ge=0, le=10000, description="Lower values are tried first")
+
+
+class TransactionUpdate(BaseModel):
+    """Schema for editing a transaction; a null category uncategorizes it"""
+    category: Optional[str] = Field(None, max_length=50)
+    amount_cents: int = None
+    posted_on: date = None
+    payee: str = Field(None, min_length=1, max_length=200)
+
+
+class TransactionResponse(BaseModel):
+    """Schema for transaction data in responses"""
+    id: int
+    account: str
+    posted_on: date
+    amount_cents: int
+    payee: str
+    category: Optional[str] = None
+    seq: int
+
+    class Config:
+        from_attributes = True
+
+
+class ImportReport(BaseModel):
+    """Outcome of a statement import"""
+    format: str
+    rows: int
+    inserted: int
+    duplicates: int
+    errors: int
+    seconds: float
+    rows_per_second: float
+
+
+class BudgetUpdate(BaseModel):
+    """Schema for setting a category's monthly limit"""
+    limit_cents: int = Field(..., ge=0)
+
+
+class BudgetLine(BaseModel):
+    """Spent vs. budget for one category in one month"""
+    category: str
+    spent_cents: int
+    income_cents: int
+    transaction_count: int
+    limit_cents: Optional[int] = None
+    remaining_cents: Optional[int] = None
+
+
+class BudgetMonth(BaseModel):
+    """Budget overview of a month"""
+    month: str
+    categories: List[BudgetLine]
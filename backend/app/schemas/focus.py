@@ -0,0 +1,33 @@
+"""
+Pydantic schemas for focus event ingestion
+"""
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional, Union
+from datetime import datetime
+
+
+FocusEventKind = Literal["start", "pause", "resume", "tick", "distraction", "stop"]
+
+
+class FocusEventIn(BaseModel):
+    """A single focus session event"""
+    kind: FocusEventKind
+    ts: datetime
+    session_id: Optional[str] = Field(None, max_length=64, description="Client-generated session identifier")
+    value: Optional[int] = Field(None, description="Kind-specific number, e.g. elapsed seconds for ticks")
+    note: Optional[str] = Field(None, max_length=200)
+
+
+class FocusEventBatch(BaseModel):
+    """Client-side batch of events sent in one request"""
+    events: List[FocusEventIn] = Field(..., min_length=1, max_length=5000)
+
+
+# The ingestion endpoint accepts a single event, a bare array or a wrapped batch
+FocusEventPayload = Union[FocusEventBatch, List[FocusEventIn], FocusEventIn]
+
+
+class IngestAck(BaseModel):
+    """Acknowledgement returned before events are durably written"""
+    accepted: int
+    buffered: int
@@ -0,0 +1,14 @@
+"""
+Pydantic schemas for food catalogue endpoints
+"""
+from pydantic import BaseModel
+
+
+class FoodSuggestion(BaseModel):
+    """Autocomplete result with macros per 100 g"""
+    id: int
+    name: str
+    calories: float
+    protein: float
+    carbs: float
+    fat: float
@@ -0,0 +1,45 @@
+"""
+Pydantic schemas for habit endpoints
+"""
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import date
+
+
+class HabitCreate(BaseModel):
+    """Schema for habit creation"""
+    name: str = Field(..., min_length=1, max_length=100, description="Habit name")
+    category: str = Field("life", min_length=1, max_length=20)
+
+
+class HabitUpdate(BaseModel):
+    """Schema for partial habit updates; neither field can be cleared"""
+    name: str = Field(None, min_length=1, max_length=100)
+    category: str = Field(None, min_length=1, max_length=20)
+
+
+class CheckInRequest(BaseModel):
+    """Schema for a habit check-in; defaults to today (UTC)"""
+    day: Optional[date] = None
+
+
+class HabitResponse(BaseModel):
+    """Schema for habit data in responses"""
+    id: int
+    name: str
+    category: str
+    current_streak: int
+    longest_streak: int
+    total_checkins: int
+    last_checkin: Optional[date] = None
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+    seq: int
+
+
+class HeatmapResponse(BaseModel):
+    """One year of check-ins, one 0/1 entry per day starting January 1st"""
+    habit_id: int
+    year: int
+    days: List[int]
+    count: int
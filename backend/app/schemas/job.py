@@ -0,0 +1,16 @@
+"""
+Pydantic schemas for background jobs
+"""
+from pydantic import BaseModel, Field
+from typing import Any, Dict, Literal
+
+
+JobKind = Literal["analytics.summary", "analytics.patterns", "rollups.rebuild", "journal.reindex"]
+JobStatus = Literal["queued", "running", "succeeded", "failed", "cancelled"]
+
+
+class JobCreate(BaseModel):
+    """Schema for enqueueing a job for the current user"""
+    kind: JobKind
+    payload: Dict[str, Any] = Field(default_factory=dict)
+    delay_seconds: float = Field(0, ge=0, le=7 * 86400)
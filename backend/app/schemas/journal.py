@@ -0,0 +1,47 @@
+"""
+Pydantic schemas for journal entries and similarity search
+"""
+from pydantic import BaseModel, Field
+from typing import List, Literal
+from datetime import date, datetime
+
+
+JournalKind = Literal["journal", "reflection", "checkin"]
+
+
+class JournalEntryCreate(BaseModel):
+    """Schema for writing an entry"""
+    kind: JournalKind = "journal"
+    entry_date: date
+    body: str = Field(..., min_length=1, max_length=20000)
+
+
+class JournalEntryUpdate(BaseModel):
+    """Schema for editing an entry; only provided fields are changed, and none can be cleared"""
+    kind: JournalKind = None
+    entry_date: date = None
+    body: str = Field(None, min_length=1, max_length=20000)
+
+
+class JournalEntryResponse(BaseModel):
+    """Schema for entry data in responses"""
+    id: int
+    kind: str
+    entry_date: date
+    body: str
+    created_at: datetime
+    updated_at: datetime
+    seq: int
+
+    class Config:
+        from_attributes = True
+
+
+class SimilarEntry(BaseModel):
+    """An entry with its similarity to the query"""
+    entry: JournalEntryResponse
+    score: float
+
+
+class SimilarEntries(BaseModel):
+    results: List[SimilarEntry]
@@ -0,0 +1,39 @@
+"""
+Pydantic schemas for wellness metric endpoints
+"""
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import datetime
+
+
+METRIC_NAME_PATTERN = r"^[a-z][a-z0-9_]{0,29}$"
+
+
+class MetricPointIn(BaseModel):
+    """A single metric sample, e.g. sleep hours, mood score or weight"""
+    metric: str = Field(..., pattern=METRIC_NAME_PATTERN, description="Metric name such as sleep, mood or weight")
+    ts: datetime
+    value: float
+
+
+class MetricBatch(BaseModel):
+    """Schema for recording one or more samples in a single request"""
+    points: List[MetricPointIn] = Field(..., min_length=1, max_length=10000)
+
+
+class SeriesPoint(BaseModel):
+    """One point of a series; raw samples have count 1 and min == max == avg"""
+    ts: datetime
+    avg: float
+    min: float
+    max: float
+    count: int
+
+
+class SeriesResponse(BaseModel):
+    """Schema for a metric series query"""
+    metric: str
+    tier: str
+    resolution_seconds: Optional[int] = None
+    rows_read: int
+    points: List[SeriesPoint]
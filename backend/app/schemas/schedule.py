@@ -0,0 +1,72 @@
+"""
+Pydantic schemas for time-block scheduling
+"""
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import datetime
+from app.schemas.types import ClockEnd, ClockTime, Weekday
+
+
+class PlanRequest(BaseModel):
+    """Horizon and working hours for building a plan; the router checks that day_end is after day_start"""
+    start: Optional[datetime] = Field(None, description="Horizon start in UTC (defaults to now)")
+    days: int = Field(28, ge=1, le=90)
+    day_start: ClockTime = Field("09:00", description="Local working-day start")
+    day_end: ClockEnd = Field("17:00", description="Local working-day end")
+    weekdays: List[Weekday] = Field(default_factory=lambda: [0, 1, 2, 3, 4], min_length=1, max_length=7,
+                                    description="Working days, Monday is 0")
+    tz_offset_minutes: int = Field(0, ge=-840, le=840, description="Local time minus UTC")
+    min_block_minutes: int = Field(25, ge=5, le=240, description="Shortest block a task is split into")
+
+
+class ReplanRequest(BaseModel):
+    """Tasks that were added, edited or removed since the last plan"""
+    task_ids: List[int] = Field(..., min_length=1, max_length=1000)
+
+
+class BusyBlockCreate(BaseModel):
+    """Schema for blocking calendar time; the router checks that end is after start"""
+    title: Optional[str] = Field(None, max_length=200)
+    start: datetime
+    end: datetime
+
+
+class DependencyUpdate(BaseModel):
+    """Prerequisites of a task"""
+    depends_on: List[int] = Field(default_factory=list, max_length=100)
+
+
+class PlannedBlock(BaseModel):
+    task_id: int
+    start: datetime
+    end: datetime
+
+
+class UnscheduledTask(BaseModel):
+    task_id: int
+    reason: str
+
+
+class PlanStats(BaseModel):
+    tasks: int
+    replanned_tasks: int
+    blocks: int
+    repaired: int
+    compute_ms: float
+
+
+class PlanResponse(BaseModel):
+    """A time-blocked plan"""
+    start: datetime
+    end: datetime
+    blocks: List[PlannedBlock]
+    unscheduled: List[UnscheduledTask]
+    late: List[int]
+    stats: PlanStats
+
+
+class StoredPlan(BaseModel):
+    """The current plan as stored"""
+    start: datetime
+    end: datetime
+    blocks: List[PlannedBlock]
@@ -0,0 +1,23 @@
+"""
+Pydantic schemas for the delta-sync change feed
+"""
+from pydantic import BaseModel
+from typing import Any, Dict, List
+
+
+class TableChanges(BaseModel):
+    """Changes for a single table: rows to upsert and ids to delete"""
+    upserts: List[Dict[str, Any]] = []
+    deletes: List[int] = []
+
+
+class SyncResponse(BaseModel):
+    """
+    One page of the change feed
+
+    ``cursor`` is passed back as ``since`` on the next call. When ``has_more``
+    is true the client should keep paging before considering itself in sync.
+    """
+    cursor: int
+    has_more: bool
+    changes: Dict[str, TableChanges] = {}
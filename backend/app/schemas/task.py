@@ -0,0 +1,77 @@
+"""
+Pydantic schemas for task endpoints
+"""
+from pydantic import BaseModel, Field
+from typing import Optional, Literal
+from datetime import datetime
+
+
+TaskCategory = Literal["life", "work"]
+TaskStatus = Literal["todo", "in_progress", "done"]
+TaskKind = Literal["task", "project", "goal"]
+
+
+class TaskCreate(BaseModel):
+    """Schema for task creation"""
+    title: str = Field(..., min_length=1, max_length=200, description="Task title")
+    description: Optional[str] = None
+    category: TaskCategory = "life"
+    status: TaskStatus = "todo"
+    priority: int = Field(2, ge=1, le=4, description="Priority from 1 (highest) to 4 (lowest)")
+    due_date: Optional[datetime] = None
+    estimate_minutes: Optional[int] = Field(None, ge=1)
+    kind: TaskKind = "task"
+    parent_id: Optional[int] = Field(None, description="Parent goal, project or task")
+
+
+class TaskUpdate(BaseModel):
+    """
+    Schema for partial task updates; only provided fields are changed
+
+    This is the convention for every update schema: fields that cannot be
+    cleared keep their non-Optional type with a None default. Defaults are
+    not validated, so such a field may be omitted, but an explicit null
+    fails type validation with a 422. Optional fields accept null to clear
+    the value.
+    """
+    title: str = Field(None, min_length=1, max_length=200)
+    description: Optional[str] = None
+    category: TaskCategory = None
+    status: TaskStatus = None
+    priority: int = Field(None, ge=1, le=4)
+    due_date: Optional[datetime] = None
+    estimate_minutes: Optional[int] = Field(None, ge=1)
+    kind: TaskKind = None
+    parent_id: Optional[int] = Field(None, description="New parent; null moves the task to the top level")
+
+
+class TaskResponse(BaseModel):
+    """Schema for task data in responses"""
+    id: int
+    title: str
+    description: Optional[str] = None
+    category: str
+    status: str
+    priority: int
+    due_date: Optional[datetime] = None
+    estimate_minutes: Optional[int] = None
+    completed_at: Optional[datetime] = None
+    kind: str
+    parent_id: Optional[int] = None
+    depth: int
+    subtree_total: int
+    subtree_done: int
+    created_at: datetime
+    updated_at: datetime
+    seq: int
+
+    class Config:
+        from_attributes = True
+
+
+class TaskProgress(BaseModel):
+    """Completion of a task's subtree, read from cached counters"""
+    task_id: int
+    total: int
+    done: int
+    percent: float
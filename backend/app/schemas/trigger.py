@@ -0,0 +1,22 @@
+"""
+Pydantic schemas for reminders
+"""
+from pydantic import BaseModel, Field
+from typing import Any, Dict, Optional
+from datetime import datetime
+
+
+class ReminderCreate(BaseModel):
+    """Schema for scheduling a reminder, once or repeating"""
+    title: str = Field(..., min_length=1, max_length=200)
+    fire_at: datetime
+    repeat_seconds: Optional[int] = Field(None, ge=60, le=366 * 86400)
+    payload: Dict[str, Any] = Field(default_factory=dict, description="Client data, e.g. a habit_id for habit nudges")
+
+
+class ReminderUpdate(BaseModel):
+    """Schema for editing a reminder; only provided fields are changed, and null repeat_seconds makes it one-off"""
+    title: str = Field(None, min_length=1, max_length=200)
+    fire_at: datetime = None
+    repeat_seconds: Optional[int] = Field(None, ge=60, le=366 * 86400)
+    payload: Dict[str, Any] = None
@@ -0,0 +1,74 @@
+"""
+Shared constrained field types for request and response schemas
+
+Each type is a plain ``str`` or ``int`` with its constraints declared through
+``StringConstraints`` or ``Field``, so pydantic-core checks them in compiled
+code when a model's validator is built — patterns included — with no Python
+function called per value. Use these instead of redefining the same ``Field`` or a
+``field_validator`` in every schema.
+
+A failed pattern check reports the raw regex; ``readable_errors`` swaps that
+for the message clients got from the validator functions these types replace.
+"""
+from typing import Annotated, Any, Dict, List
+from pydantic import Field, StringConstraints
+
+
+EMAIL_PATTERN = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
+CLOCK_TIME_PATTERN = r"^([01]\d|2[0-3]):[0-5]\d$"
+# Like CLOCK_TIME_PATTERN, but a day may also end at 24:00
+CLOCK_END_PATTERN = r"^([01]\d|2[0-4]):[0-5]\d$"
+# Client-facing messages for the patterns above, keyed by pattern
+PATTERN_MESSAGES = {
+    EMAIL_PATTERN: "Invalid email format",
+    CLOCK_TIME_PATTERN: "Time must be HH:MM",
+    CLOCK_END_PATTERN: "Time must be HH:MM",
+}
+
+Email = Annotated[
+    str,
+    StringConstraints(pattern=EMAIL_PATTERN),
+    Field(description="Valid email address", examples=["ada@example.com"])
+]
+Username = Annotated[
+    str,
+    StringConstraints(min_length=3, max_length=50),
+    Field(description="Username must be 3-50 characters")
+]
+NewPassword = Annotated[
+    str,
+    StringConstraints(min_length=6),
+    Field(description="Password must be at least 6 characters")
+]
+Password = Annotated[str, StringConstraints(min_length=1), Field(description="Password is required")]
+DeviceId = Annotated[
+    str,
+    StringConstraints(min_length=1, max_length=100),
+    Field(description="Stable identifier of the client device")
+]
+DeviceName = Annotated[
+    str,
+    StringConstraints(max_length=100),
+    Field(description="Device name shown in the session list")
+]
+OpaqueToken = Annotated[str, StringConstraints(min_length=1, max_length=200)]
+ClockTime = Annotated[str, StringConstraints(pattern=CLOCK_TIME_PATTERN)]
+ClockEnd = Annotated[str, StringConstraints(pattern=CLOCK_END_PATTERN)]
+Weekday = Annotated[int, Field(ge=0, le=6, description="Day of the week, Monday is 0")]
+
+
+def readable_errors(errors: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Validation errors with pattern mismatches of the types above reworded
+
+    The entry takes the shape a ``ValueError`` raised in a validator gives,
+    so the regex itself never reaches the client.
+    """
+    readable = []
+    for error in errors:
+        message = PATTERN_MESSAGES.get((error.get("ctx") or {}).get("pattern"))
+        if error.get("type") == "string_pattern_mismatch" and message is not None:
+            error = {key: value for key, value in error.items() if key not in ("ctx", "url")}
+            error.update(type="value_error", msg=f"Value error, {message}")
+        readable.append(error)
+    return readable
@@ -0,0 +1,41 @@
+"""
+Pydantic schemas for workout endpoints
+"""
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+
+
+class WorkoutSetCreate(BaseModel):
+    """Schema for logging a set"""
+    exercise: str = Field(..., min_length=1, max_length=100, description="Exercise name, e.g. 'Bench Press'")
+    muscle_group: str = Field("other", min_length=1, max_length=30)
+    reps: int = Field(0, ge=0, le=1000)
+    weight: float = Field(0, ge=0, description="Load in kg")
+    duration_seconds: Optional[int] = Field(None, ge=0)
+    performed_at: Optional[datetime] = None
+
+
+class WorkoutSetUpdate(BaseModel):
+    """Schema for editing a logged set; null clears duration_seconds and is rejected elsewhere"""
+    exercise: str = Field(None, min_length=1, max_length=100)
+    muscle_group: str = Field(None, min_length=1, max_length=30)
+    reps: int = Field(None, ge=0, le=1000)
+    weight: float = Field(None, ge=0)
+    duration_seconds: Optional[int] = Field(None, ge=0)
+    performed_at: datetime = None
+
+
+class WorkoutSetResponse(BaseModel):
+    """Schema for set data in responses"""
+    id: int
+    exercise: str
+    muscle_group: str
+    reps: int
+    weight: float
+    duration_seconds: Optional[int] = None
+    performed_at: datetime
+    seq: int
+
+    class Config:
+        from_attributes = True
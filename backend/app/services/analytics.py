@@ -0,0 +1,120 @@
+"""
+Analytics service: completion rates, period summaries and streaks read from daily rollups
+"""
+from datetime import date, timedelta
+from typing import Dict, List
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.models.rollup import DailyRollup
+from app.services.rollups import RollupService, ROLLUP_COUNTERS
+
+
+def _period_start(day: date, period: str) -> date:
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    if period == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _with_rate(counters: Dict[str, int]) -> Dict[str, object]:
+    created = counters.get("tasks_created", 0)
+    completed = counters.get("tasks_completed", 0)
+    return {
+        **counters,
+        "completion_rate": round(completed / created, 4) if created else None
+    }
+
+
+class AnalyticsService:
+    """Service class for analytics over daily rollups"""
+
+    @staticmethod
+    def summary(db: Session, user_id: int, start: date, end: date, period: str = "day") -> Dict[str, object]:
+        """
+        Summarize activity between two days, bucketed by day, week or month
+
+        Reads only rollup rows, so the cost is proportional to the number of
+        days in the range regardless of how many tasks they contain.
+
+        Args:
+            db: Database session
+            user_id: Owner of the data
+            start: First day (inclusive)
+            end: Last day (inclusive)
+            period: Bucket size: "day", "week" or "month"
+
+        Returns:
+            Dictionary with per-bucket counters and totals
+        """
+        buckets: Dict[date, Dict[str, object]] = {}
+        totals = {name: 0 for name in ROLLUP_COUNTERS}
+
+        for row in RollupService.get_range(db, user_id, start, end):
+            bucket = buckets.setdefault(_period_start(row.day, period), {
+                **{name: 0 for name in ROLLUP_COUNTERS}, "by_category": {}
+            })
+            category = bucket["by_category"].setdefault(row.category, {name: 0 for name in ROLLUP_COUNTERS})
+            for name in ROLLUP_COUNTERS:
+                value = getattr(row, name)
+                bucket[name] += value
+                category[name] += value
+                totals[name] += value
+
+        return {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "period": period,
+            "buckets": [
+                {
+                    "start": bucket_start.isoformat(),
+                    **_with_rate({name: values[name] for name in ROLLUP_COUNTERS}),
+                    "by_category": {name: _with_rate(c) for name, c in values["by_category"].items()}
+                }
+                for bucket_start, values in sorted(buckets.items())
+            ],
+            "totals": _with_rate(totals)
+        }
+
+    @staticmethod
+    def completion_days(db: Session, user_id: int) -> List[date]:
+        """
+        Get the days on which the user completed at least one task, newest first
+        """
+        total = func.sum(DailyRollup.tasks_completed)
+        rows = db.execute(
+            select(DailyRollup.day)
+            .where(DailyRollup.user_id == user_id)
+            .group_by(DailyRollup.day)
+            .having(total > 0)
+            .order_by(DailyRollup.day.desc())
+        ).all()
+        return [row.day for row in rows]
+
+    @staticmethod
+    def streaks(db: Session, user_id: int, today: date) -> Dict[str, int]:
+        """
+        Compute current and longest task completion streaks in days
+
+        A streak still counts as current if the last completion was yesterday,
+        so it does not reset before the user has had a chance to act today.
+        """
+        days = AnalyticsService.completion_days(db, user_id)
+        one_day = timedelta(days=1)
+
+        current = 0
+        if days and today - days[0] <= one_day:
+            current = 1
+            for newer, older in zip(days, days[1:]):
+                if newer - older != one_day:
+                    break
+                current += 1
+
+        longest = run = 0
+        previous = None
+        for day in days:
+            run = run + 1 if previous is not None and previous - day == one_day else 1
+            longest = max(longest, run)
+            previous = day
+
+        return {"current": current, "longest": longest}
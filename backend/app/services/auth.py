@@ -1,12 +1,17 @@
 """
-Authentication service for user registration, login, and JWT token management
+Authentication service for user registration, login, JWT access tokens and refresh tokens
 """
+import calendar
+import hashlib
 import os
+import secrets
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import List, Optional, Tuple
 import bcrypt
 from jose import JWTError, jwt
+from sqlalchemy import bindparam, delete, or_, select, update
 from sqlalchemy.orm import Session
+from app.models.refresh_token import RefreshToken
 from app.models.user import User
 from app.schemas.auth import UserCreate, TokenData
 
@@ -15,6 +20,33 @@ from app.schemas.auth import UserCreate, TokenData
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# A device that has not refreshed for this long has to log in again
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
+# A rotated token presented again within this window is taken for a client retry
+# racing its own refresh; later it is taken for a stolen copy and ends the session
+REFRESH_REUSE_GRACE_SECONDS = float(os.getenv("REFRESH_REUSE_GRACE_SECONDS", "30"))
+DEFAULT_DEVICE_ID = "default"
+# Stream tickets only open live connections, so they may travel in a URL; they are
+# good for this long and never accepted as access tokens
+STREAM_TICKET_SECONDS = int(os.getenv("STREAM_TICKET_SECONDS", "60"))
+STREAM_TICKET_SCOPE = "live"
+
+# A refresh is this one statement on the unique token hash index: it revokes the
+# presented token and returns what the new access token needs
+_tokens = RefreshToken.__table__
+_ROTATE = (
+    update(_tokens)
+    .where(_tokens.c.token_hash == bindparam("presented_hash"), _tokens.c.revoked_at.is_(None),
+           _tokens.c.expires_at > bindparam("now"))
+    .values(revoked_at=bindparam("now"))
+    .returning(_tokens.c.id, _tokens.c.user_id, _tokens.c.device_id, _tokens.c.device_name,
+               select(User.username).where(User.id == _tokens.c.user_id).scalar_subquery())
+)
+
+
+def hash_refresh_token(token: str) -> str:
+    """SHA-256 of a refresh token, the only form in which it is stored"""
+    return hashlib.sha256(token.encode()).hexdigest()
 
 
 class AuthService:
@@ -94,6 +126,50 @@ class AuthService:
         except JWTError:
             return None
     
+    @staticmethod
+    def token_expires_at(token: str) -> Optional[datetime]:
+        """
+        Expiry of a JWT access token, or None if it is invalid
+        """
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError:
+            return None
+        return datetime.utcfromtimestamp(payload["exp"]) if "exp" in payload else None
+
+    @staticmethod
+    def create_stream_ticket(token_data: TokenData, access_expires_at: datetime) -> str:
+        """
+        Create a short-lived ticket for opening a live stream from a URL
+
+        The ticket carries no ``user_id`` claim, so ``verify_token`` rejects it;
+        it names the access token's expiry, at which the stream is closed.
+        """
+        return jwt.encode({
+            "scope": STREAM_TICKET_SCOPE,
+            "sub": str(token_data.user_id),
+            "username": token_data.username,
+            "stream_exp": calendar.timegm(access_expires_at.utctimetuple()),
+            "exp": datetime.utcnow() + timedelta(seconds=STREAM_TICKET_SECONDS)
+        }, SECRET_KEY, algorithm=ALGORITHM)
+
+    @staticmethod
+    def verify_stream_ticket(ticket: str) -> Optional[Tuple[TokenData, datetime]]:
+        """
+        Verify a stream ticket
+
+        Returns:
+            (TokenData, time at which the stream must close) if valid, None otherwise
+        """
+        try:
+            payload = jwt.decode(ticket, SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError:
+            return None
+        if payload.get("scope") != STREAM_TICKET_SCOPE or "sub" not in payload or "stream_exp" not in payload:
+            return None
+        return (TokenData(user_id=int(payload["sub"]), username=payload.get("username")),
+                datetime.utcfromtimestamp(payload["stream_exp"]))
+
     @staticmethod
     def get_user_by_email(db: Session, email: str) -> Optional[User]:
         """
@@ -143,6 +219,10 @@ class AuthService:
         )
         
         db.add(db_user)
+        db.flush()
+        # SQLite hands out the ids of deleted users again; sessions of a previous
+        # owner of this id must not carry over
+        db.execute(delete(RefreshToken).where(RefreshToken.user_id == db_user.id))
         db.commit()
         db.refresh(db_user)
         
@@ -168,4 +248,152 @@ class AuthService:
         if not AuthService.verify_password(password, user.password_hash):
             return None
             
-        return user
\ No newline at end of file
+        return user
+
+    @staticmethod
+    def _insert_refresh_token(db: Session, user_id: int, device_id: str, device_name: Optional[str],
+                              now: datetime) -> Tuple[RefreshToken, str]:
+        token = secrets.token_urlsafe(32)
+        row = RefreshToken(
+            user_id=user_id,
+            token_hash=hash_refresh_token(token),
+            device_id=device_id,
+            device_name=device_name,
+            created_at=now,
+            expires_at=now + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+        )
+        db.add(row)
+        db.flush()
+        return row, token
+
+    @staticmethod
+    def create_refresh_token(db: Session, user_id: int, device_id: Optional[str] = None,
+                             device_name: Optional[str] = None) -> str:
+        """
+        Start a refresh token session for one device of a user
+
+        A device that logs in again replaces its previous session.
+
+        Args:
+            db: Database session
+            user_id: Owner of the token
+            device_id: Client-chosen identifier of the device
+            device_name: Human-readable device name for the session list
+
+        Returns:
+            The opaque refresh token; only its hash is stored
+        """
+        now = datetime.utcnow()
+        device_id = device_id or DEFAULT_DEVICE_ID
+        AuthService._revoke(db, user_id, device_id, now)
+        _, token = AuthService._insert_refresh_token(db, user_id, device_id, device_name, now)
+        db.commit()
+        return token
+
+    @staticmethod
+    def rotate_refresh_token(db: Session, token: str) -> Optional[Tuple[int, str, str]]:
+        """
+        Exchange a refresh token for its successor
+
+        No password hashing is involved: the presented token is revoked and
+        its owner read in one statement on the token hash index.
+
+        Args:
+            db: Database session
+            token: Refresh token presented by the client
+
+        Returns:
+            (user_id, username, new refresh token), or None if the token is
+            unknown, expired or revoked
+        """
+        now = datetime.utcnow()
+        token_hash = hash_refresh_token(token)
+        row = db.execute(_ROTATE, {"presented_hash": token_hash, "now": now}).first()
+        if row is None or row[4] is None:
+            db.rollback()
+            AuthService._check_reuse(db, token_hash, now)
+            return None
+        old_id, user_id, device_id, device_name, username = row
+        successor, new_token = AuthService._insert_refresh_token(db, user_id, device_id, device_name, now)
+        db.execute(update(RefreshToken).where(RefreshToken.id == old_id).values(replaced_by_id=successor.id))
+        db.commit()
+        return user_id, username, new_token
+
+    @staticmethod
+    def _check_reuse(db: Session, token_hash: str, now: datetime) -> None:
+        # A token that was rotated a while ago should never come back; if it does,
+        # someone else holds a copy, so the device's current token is revoked too
+        stale = db.execute(
+            select(RefreshToken.user_id, RefreshToken.device_id)
+            .where(RefreshToken.token_hash == token_hash, RefreshToken.replaced_by_id.is_not(None),
+                   RefreshToken.revoked_at < now - timedelta(seconds=REFRESH_REUSE_GRACE_SECONDS))
+        ).first()
+        if stale is not None:
+            AuthService._revoke(db, stale.user_id, stale.device_id, now)
+            db.commit()
+
+    @staticmethod
+    def _revoke(db: Session, user_id: int, device_id: str, now: datetime) -> int:
+        return db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.user_id == user_id, RefreshToken.device_id == device_id,
+                   RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=now)
+        ).rowcount
+
+    @staticmethod
+    def revoke_device(db: Session, user_id: int, device_id: str) -> bool:
+        """
+        End the refresh token session of one device
+
+        Access tokens already issued stay valid until they expire.
+
+        Returns:
+            False if the device had no active session
+        """
+        revoked = AuthService._revoke(db, user_id, device_id, datetime.utcnow())
+        db.commit()
+        return bool(revoked)
+
+    @staticmethod
+    def revoke_refresh_token(db: Session, token: str) -> bool:
+        """
+        End the session a refresh token belongs to (logout)
+
+        Returns:
+            False if the token is unknown or its session already ended
+        """
+        row = db.execute(
+            select(RefreshToken.user_id, RefreshToken.device_id)
+            .where(RefreshToken.token_hash == hash_refresh_token(token), RefreshToken.revoked_at.is_(None))
+        ).first()
+        if row is None:
+            return False
+        return AuthService.revoke_device(db, row.user_id, row.device_id)
+
+    @staticmethod
+    def list_sessions(db: Session, user_id: int) -> List[RefreshToken]:
+        """Active refresh token sessions of a user, one per device"""
+        return (
+            db.query(RefreshToken)
+            .filter(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None),
+                    RefreshToken.expires_at > datetime.utcnow())
+            .order_by(RefreshToken.created_at.desc())
+            .all()
+        )
+
+    @staticmethod
+    def purge_refresh_tokens(db: Session, before: datetime) -> int:
+        """
+        Delete refresh tokens that expired or were revoked before a cutoff
+
+        Rotated tokens are kept until then so that reuse can still be detected.
+
+        Returns:
+            Number of tokens deleted
+        """
+        deleted = db.execute(
+            delete(RefreshToken).where(or_(RefreshToken.expires_at < before, RefreshToken.revoked_at < before))
+        ).rowcount
+        db.commit()
+        return deleted
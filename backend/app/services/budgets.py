@@ -0,0 +1,203 @@
+"""
+Budget service: incremental (user, month, category) aggregates and their reconciliation
+"""
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import case, delete, func, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+from app.models.finance import Transaction, Budget, BudgetAggregate
+
+
+UNCATEGORIZED = "uncategorized"
+
+# Counter columns adjusted through BudgetService.apply
+AGGREGATE_COUNTERS = ("spent_cents", "income_cents", "transaction_count")
+
+AggregateKey = Tuple[int, date, str]
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def parse_month(text: str) -> date:
+    """Parse 'YYYY-MM' into the first day of that month"""
+    return date.fromisoformat(f"{text}-01")
+
+
+def _month_sql(column):
+    return func.strftime("%Y-%m-01", column)
+
+
+def _counter_sql():
+    """Aggregate columns computed from raw transactions, matching the incremental deltas"""
+    return (
+        func.coalesce(Transaction.category, UNCATEGORIZED).label("category"),
+        func.sum(case((Transaction.amount_cents < 0, -Transaction.amount_cents), else_=0)).label("spent_cents"),
+        func.sum(case((Transaction.amount_cents > 0, Transaction.amount_cents), else_=0)).label("income_cents"),
+        func.count(Transaction.id).label("transaction_count"),
+    )
+
+
+class BudgetService:
+    """Service class for budget aggregates and limits"""
+
+    @staticmethod
+    def apply(db: Session, user_id: int, month: date, category: str, **deltas: int) -> None:
+        """
+        Add deltas to one aggregate row, creating it if needed
+
+        Must run in the same transaction as the write that caused it.
+        """
+        deltas = {name: value for name, value in deltas.items() if value}
+        if not deltas:
+            return
+        unknown = set(deltas) - set(AGGREGATE_COUNTERS)
+        if unknown:
+            raise ValueError(f"Unknown aggregate counters: {sorted(unknown)}")
+
+        stmt = insert(BudgetAggregate).values(user_id=user_id, month=month, category=category, **deltas)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[BudgetAggregate.user_id, BudgetAggregate.month, BudgetAggregate.category],
+            set_={name: getattr(BudgetAggregate, name) + getattr(stmt.excluded, name) for name in deltas}
+        )
+        db.execute(stmt)
+
+    @staticmethod
+    def transaction_contribution(db: Session, transaction: Transaction, sign: int) -> None:
+        """
+        Add (sign=1) or remove (sign=-1) a transaction's contribution
+
+        Edits are expressed as "remove old state, add new state", so changes of
+        amount, month or category need no special cases.
+        """
+        amount = transaction.amount_cents
+        BudgetService.apply(
+            db, transaction.user_id, month_start(transaction.posted_on), transaction.category or UNCATEGORIZED,
+            spent_cents=sign * max(-amount, 0),
+            income_cents=sign * max(amount, 0),
+            transaction_count=sign
+        )
+
+    @staticmethod
+    def apply_seq_range(db: Session, user_id: int, first_seq: int, last_seq: int) -> None:
+        """
+        Fold transactions written with seqs in [first_seq, last_seq] into the aggregates
+
+        Used by the bulk import: the rows actually inserted are exactly the
+        ones carrying seqs of the reserved block, so a single INSERT ... SELECT
+        ... GROUP BY over the (user_id, seq) index upserts every touched
+        aggregate without round-tripping rows through Python.
+        """
+        grouped = (
+            select(Transaction.user_id, _month_sql(Transaction.posted_on).label("month"), *_counter_sql())
+            .where(Transaction.user_id == user_id, Transaction.seq.between(first_seq, last_seq),
+                   Transaction.deleted_at.is_(None))
+            .group_by("month", "category")
+        )
+        stmt = insert(BudgetAggregate).from_select(
+            ["user_id", "month", "category", *AGGREGATE_COUNTERS], grouped
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[BudgetAggregate.user_id, BudgetAggregate.month, BudgetAggregate.category],
+            set_={name: getattr(BudgetAggregate, name) + getattr(stmt.excluded, name) for name in AGGREGATE_COUNTERS}
+        )
+        db.execute(stmt)
+
+    @staticmethod
+    def month_summary(db: Session, user_id: int, month: date) -> List[dict]:
+        """
+        Spent vs. budget per category for one month, read from aggregates only
+
+        Cost depends on the number of categories, not on transaction volume.
+        """
+        aggregates = {
+            row.category: row
+            for row in db.query(BudgetAggregate).filter(
+                BudgetAggregate.user_id == user_id, BudgetAggregate.month == month
+            )
+        }
+        limits = {
+            budget.category: budget.limit_cents
+            for budget in db.query(Budget).filter(Budget.user_id == user_id)
+        }
+        summary = []
+        for category in sorted(set(aggregates) | set(limits)):
+            aggregate = aggregates.get(category)
+            spent = aggregate.spent_cents if aggregate else 0
+            limit = limits.get(category)
+            summary.append({
+                "category": category,
+                "spent_cents": spent,
+                "income_cents": aggregate.income_cents if aggregate else 0,
+                "transaction_count": aggregate.transaction_count if aggregate else 0,
+                "limit_cents": limit,
+                "remaining_cents": limit - spent if limit is not None else None
+            })
+        return summary
+
+    @staticmethod
+    def set_budget(db: Session, user_id: int, category: str, limit_cents: int) -> Budget:
+        stmt = insert(Budget).values(user_id=user_id, category=category, limit_cents=limit_cents)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[Budget.user_id, Budget.category],
+            set_={"limit_cents": stmt.excluded.limit_cents}
+        ))
+        db.commit()
+        return db.get(Budget, (user_id, category))
+
+    @staticmethod
+    def delete_budget(db: Session, user_id: int, category: str) -> bool:
+        deleted = db.query(Budget).filter(Budget.user_id == user_id, Budget.category == category).delete()
+        db.commit()
+        return bool(deleted)
+
+    @staticmethod
+    def reconcile(db: Session, user_id: Optional[int] = None) -> int:
+        """
+        Recompute aggregates from transactions and repair rows that drifted
+
+        Args:
+            db: Database session
+            user_id: Only reconcile this user; all users when None
+
+        Returns:
+            Number of aggregate rows inserted, corrected or removed
+        """
+        month = _month_sql(Transaction.posted_on).label("month")
+        query = (
+            select(Transaction.user_id, month, *_counter_sql())
+            .where(Transaction.deleted_at.is_(None))
+            .group_by(Transaction.user_id, month, "category")
+        )
+        stored_query = db.query(BudgetAggregate)
+        if user_id is not None:
+            query = query.where(Transaction.user_id == user_id)
+            stored_query = stored_query.filter(BudgetAggregate.user_id == user_id)
+
+        expected: Dict[AggregateKey, tuple] = {
+            (row.user_id, date.fromisoformat(row.month), row.category):
+                (row.spent_cents, row.income_cents, row.transaction_count)
+            for row in db.execute(query)
+        }
+        repaired = 0
+        for aggregate in stored_query:
+            key = (aggregate.user_id, aggregate.month, aggregate.category)
+            values = expected.pop(key, None)
+            if values is None:
+                db.execute(delete(BudgetAggregate).where(
+                    BudgetAggregate.user_id == aggregate.user_id,
+                    BudgetAggregate.month == aggregate.month,
+                    BudgetAggregate.category == aggregate.category
+                ))
+                repaired += 1
+            elif values != (aggregate.spent_cents, aggregate.income_cents, aggregate.transaction_count):
+                aggregate.spent_cents, aggregate.income_cents, aggregate.transaction_count = values
+                repaired += 1
+        for (uid, month_day, category), values in expected.items():
+            db.add(BudgetAggregate(user_id=uid, month=month_day, category=category,
+                                   **dict(zip(AGGREGATE_COUNTERS, values))))
+            repaired += 1
+        db.commit()
+        return repaired
@@ -0,0 +1,417 @@
+"""
+AI companion: provider-agnostic LLM request pipeline with micro-batching, a response cache and token streaming
+
+Requests are queued on the event loop and a background batcher sends
+compatible prompts (same kind, hence same system prompt) to the model in one
+call once ``max_batch`` are waiting or the batching window closes. Answers
+stream back token by token; finished answers are cached by normalized prompt
+and context hash, and identical requests already in flight share one
+generation instead of calling the model again.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+import weakref
+from collections import OrderedDict, deque
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+
+
+# Prompts sent to the model in one call
+MAX_BATCH = int(os.getenv("COMPANION_MAX_BATCH", "8"))
+# How long the first queued prompt waits for others to join its batch
+BATCH_WAIT_SECONDS = float(os.getenv("COMPANION_BATCH_WAIT_MS", "20")) / 1000
+# Batches sent to the model at the same time; while all are busy the queue
+# keeps filling, so batches grow with load
+MAX_INFLIGHT_BATCHES = int(os.getenv("COMPANION_MAX_INFLIGHT_BATCHES", "4"))
+CACHE_TTL_SECONDS = float(os.getenv("COMPANION_CACHE_TTL_SECONDS", "3600"))
+CACHE_SIZE = int(os.getenv("COMPANION_CACHE_SIZE", "10000"))
+# Open companion streams allowed per user
+USER_CONCURRENCY = int(os.getenv("COMPANION_USER_CONCURRENCY", "2"))
+PROVIDER = os.getenv("COMPANION_PROVIDER", "stub")
+
+SYSTEM_PROMPTS = {
+    "checkin": "You are a supportive daily check-in companion. Ask one short follow-up question.",
+    "insight": "You summarize patterns in the user's tasks, habits and metrics in two sentences.",
+    "chat": "You are a concise, friendly personal-productivity assistant."
+}
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class CompanionBusyError(Exception):
+    """Raised when a user already has the maximum number of open companion requests"""
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Case and whitespace insensitive form of a prompt, for cache keys"""
+    return _WHITESPACE.sub(" ", prompt).strip().casefold()
+
+
+def context_hash(context: Optional[dict]) -> str:
+    """Stable hash of request context regardless of key order"""
+    encoded = json.dumps(context or {}, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def cache_key(model: str, kind: str, prompt: str, context: Optional[dict]) -> str:
+    raw = f"{model}\x1f{kind}\x1f{normalize_prompt(prompt)}\x1f{context_hash(context)}"
+    return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+
+def build_prompt(kind: str, prompt: str, context: Optional[dict]) -> str:
+    parts = [SYSTEM_PROMPTS[kind]]
+    if context:
+        parts.append("Context: " + json.dumps(context, sort_keys=True, default=str))
+    parts.append("User: " + prompt.strip())
+    return "\n".join(parts)
+
+
+class CompanionModel:
+    """
+    Interface every LLM provider implements
+
+    ``generate`` receives a batch of prompts sharing a system prompt and
+    returns one async token iterator per prompt, in order.
+    """
+    name = "base"
+
+    async def generate(self, prompts: List[str]) -> List[AsyncIterator[str]]:
+        raise NotImplementedError
+
+
+class StubModel(CompanionModel):
+    """
+    Deterministic local model for tests and offline load tests
+
+    Simulates a provider with a fixed round-trip per call, a per-token delay
+    and a cap on concurrent calls, so batching and caching effects show up
+    the way they would against a real endpoint.
+    """
+    name = "stub"
+    VOCABULARY = (
+        "you", "focus", "today", "progress", "habit", "steady", "rest", "plan", "small", "win",
+        "energy", "next", "step", "consider", "great", "week", "balance", "goal", "time", "keep"
+    )
+
+    def __init__(self, latency: float = 0.05, token_delay: float = 0.002, tokens: int = 24,
+                 max_concurrent_calls: int = 4):
+        self.latency = latency
+        self.token_delay = token_delay
+        self.tokens = tokens
+        self.max_concurrent_calls = max_concurrent_calls
+        self.calls = 0
+        self.prompts = 0
+        self._slots = weakref.WeakKeyDictionary()
+
+    def answer(self, prompt: str) -> List[str]:
+        """The tokens this model produces for ``prompt``"""
+        digest = hashlib.blake2b(prompt.encode(), digest_size=self.tokens).digest()
+        return [self.VOCABULARY[byte % len(self.VOCABULARY)] + " " for byte in digest]
+
+    async def generate(self, prompts: List[str]) -> List[AsyncIterator[str]]:
+        loop = asyncio.get_running_loop()
+        slots = self._slots.setdefault(loop, asyncio.Semaphore(self.max_concurrent_calls))
+        async with slots:
+            await asyncio.sleep(self.latency)
+        self.calls += 1
+        self.prompts += len(prompts)
+        return [self._stream(prompt) for prompt in prompts]
+
+    async def _stream(self, prompt: str) -> AsyncIterator[str]:
+        for token in self.answer(prompt):
+            if self.token_delay:
+                await asyncio.sleep(self.token_delay)
+            yield token
+
+
+PROVIDERS = {"stub": StubModel}
+
+
+class ResponseCache:
+    """Finished answers keyed by cache_key, with a TTL and LRU eviction"""
+
+    def __init__(self, ttl: float = CACHE_TTL_SECONDS, capacity: int = CACHE_SIZE):
+        self.ttl = ttl
+        self.capacity = capacity
+        self._entries: OrderedDict[str, Tuple[float, List[str]]] = OrderedDict()
+
+    def get(self, key: str) -> Optional[List[str]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key: str, tokens: List[str]) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, tokens)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class Generation:
+    """
+    One model answer being produced, readable by any number of streams
+
+    Tokens are appended as they arrive; readers keep their own position and
+    wait on a fresh event whenever they have caught up.
+    """
+    __slots__ = ("key", "kind", "prompt", "tokens", "done", "error", "_changed")
+
+    def __init__(self, key: str, kind: str, prompt: str):
+        self.key = key
+        self.kind = kind
+        self.prompt = prompt
+        self.tokens: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self._changed = asyncio.Event()
+
+    def _wake(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def append(self, token: str) -> None:
+        self.tokens.append(token)
+        self._wake()
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        self.done = True
+        self.error = error
+        self._wake()
+
+    async def stream(self) -> AsyncIterator[str]:
+        position = 0
+        while True:
+            while position < len(self.tokens):
+                yield self.tokens[position]
+                position += 1
+            if self.done:
+                if self.error is not None:
+                    raise self.error
+                return
+            await self._changed.wait()
+
+
+class CompanionStream:
+    """
+    A user's answer stream; holds one of the user's concurrency slots until closed
+
+    ``source`` is "cache", "shared" (joined an identical request in flight)
+    or "model".
+    """
+
+    def __init__(self, pipeline: "CompanionPipeline", user_id: int, source: str,
+                 cached: Optional[List[str]] = None, generation: Optional[Generation] = None):
+        self.pipeline = pipeline
+        self.user_id = user_id
+        self.source = source
+        self._cached = cached
+        self._generation = generation
+        self._opened = time.perf_counter()
+        self._closed = False
+
+    async def _tokens(self) -> AsyncIterator[str]:
+        if self._cached is not None:
+            for token in self._cached:
+                yield token
+        else:
+            async for token in self._generation.stream():
+                yield token
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        first = True
+        try:
+            async for token in self._tokens():
+                if first:
+                    self.pipeline._first_token_ms.append((time.perf_counter() - self._opened) * 1000)
+                    first = False
+                yield token
+            self.pipeline._total_ms.append((time.perf_counter() - self._opened) * 1000)
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self.pipeline._release(self.user_id)
+
+
+class CompanionPipeline:
+    """Queue, batcher, cache and per-user limits in front of a CompanionModel"""
+
+    def __init__(self, model: CompanionModel, max_batch: int = MAX_BATCH, batch_wait: float = BATCH_WAIT_SECONDS,
+                 cache: Optional[ResponseCache] = None, user_concurrency: int = USER_CONCURRENCY,
+                 max_inflight: int = MAX_INFLIGHT_BATCHES):
+        self.model = model
+        self.max_batch = max_batch
+        self.batch_wait = batch_wait
+        self.max_inflight = max_inflight
+        self.cache = cache if cache is not None else ResponseCache()
+        self.user_concurrency = user_concurrency
+        self._open: Dict[int, int] = {}
+        self._inflight: Dict[str, Generation] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._batches: Set[asyncio.Task] = set()
+        self._first_token_ms = deque(maxlen=2000)
+        self._total_ms = deque(maxlen=2000)
+        self._batch_sizes = deque(maxlen=2000)
+        self.counters = {"requests": 0, "cache_hits": 0, "shared": 0, "model_prompts": 0, "batches": 0,
+                         "rejected": 0, "errors": 0}
+
+    def open(self, user_id: int, kind: str, prompt: str, context: Optional[dict] = None) -> CompanionStream:
+        """
+        Start answering a prompt; must be called on the event loop
+
+        Raises:
+            CompanionBusyError: If the user has ``user_concurrency`` streams open
+        """
+        if self._open.get(user_id, 0) >= self.user_concurrency:
+            self.counters["rejected"] += 1
+            raise CompanionBusyError(f"At most {self.user_concurrency} companion requests may run at once")
+        self._open[user_id] = self._open.get(user_id, 0) + 1
+        self.counters["requests"] += 1
+
+        key = cache_key(self.model.name, kind, prompt, context)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.counters["cache_hits"] += 1
+            return CompanionStream(self, user_id, "cache", cached=cached)
+        generation = self._inflight.get(key)
+        if generation is not None:
+            self.counters["shared"] += 1
+            return CompanionStream(self, user_id, "shared", generation=generation)
+
+        generation = Generation(key, kind, build_prompt(kind, prompt, context))
+        self._inflight[key] = generation
+        self._ensure_worker()
+        self._queue.put_nowait(generation)
+        return CompanionStream(self, user_id, "model", generation=generation)
+
+    def _release(self, user_id: int) -> None:
+        remaining = self._open.get(user_id, 0) - 1
+        if remaining > 0:
+            self._open[user_id] = remaining
+        else:
+            self._open.pop(user_id, None)
+
+    def _ensure_worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._batch_loop(self._queue, asyncio.Semaphore(self.max_inflight)))
+
+    async def _batch_loop(self, queue: asyncio.Queue, inflight: asyncio.Semaphore) -> None:
+        """
+        Dispatch one batch per free slot, from the kind with the most prompts waiting
+
+        Prompts of other kinds stay pending for the next slot, so batches fill
+        up per kind instead of splitting every window across kinds.
+        """
+        loop = asyncio.get_running_loop()
+        pending: Dict[str, List[Generation]] = {}
+
+        def take(generation: Generation) -> None:
+            pending.setdefault(generation.kind, []).append(generation)
+
+        while True:
+            await inflight.acquire()
+            if not pending:
+                take(await queue.get())
+            while not queue.empty():
+                take(queue.get_nowait())
+            deadline = loop.time() + self.batch_wait
+            while max(len(group) for group in pending.values()) < self.max_batch:
+                try:
+                    take(await asyncio.wait_for(queue.get(), max(0.0, deadline - loop.time())))
+                except asyncio.TimeoutError:
+                    break
+            kind = max(pending, key=lambda k: len(pending[k]))
+            group, rest = pending[kind][:self.max_batch], pending[kind][self.max_batch:]
+            if rest:
+                pending[kind] = rest
+            else:
+                del pending[kind]
+            task = loop.create_task(self._run_window([group], inflight))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _run_window(self, groups: List[List[Generation]], inflight: asyncio.Semaphore) -> None:
+        """Call the model once per group, then free the batch slot while the answers stream"""
+        try:
+            calls = await asyncio.gather(*(self._call(group) for group in groups))
+        finally:
+            inflight.release()
+        await asyncio.gather(*(
+            self._pump(generation, stream)
+            for group, streams in zip(groups, calls) if streams is not None
+            for generation, stream in zip(group, streams)
+        ))
+
+    async def _call(self, group: List[Generation]) -> Optional[List[AsyncIterator[str]]]:
+        self.counters["batches"] += 1
+        self.counters["model_prompts"] += len(group)
+        self._batch_sizes.append(len(group))
+        try:
+            return await self.model.generate([generation.prompt for generation in group])
+        except Exception as e:
+            for generation in group:
+                self._finish(generation, e)
+            return None
+
+    async def _pump(self, generation: Generation, stream: AsyncIterator[str]) -> None:
+        try:
+            async for token in stream:
+                generation.append(token)
+        except Exception as e:
+            self._finish(generation, e)
+            return
+        self._finish(generation, None)
+
+    def _finish(self, generation: Generation, error: Optional[BaseException]) -> None:
+        self._inflight.pop(generation.key, None)
+        if error is None:
+            self.cache.put(generation.key, generation.tokens)
+        else:
+            self.counters["errors"] += 1
+        generation.finish(error)
+
+    def stats(self) -> dict:
+        """Request, cache and batching counters plus latency percentiles in milliseconds"""
+        def pct(samples, p):
+            if not samples:
+                return None
+            ordered = sorted(samples)
+            return round(ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))], 2)
+
+        requests = self.counters["requests"]
+        return {
+            **self.counters,
+            "provider": self.model.name,
+            "cache_entries": len(self.cache),
+            "cache_hit_rate": round(self.counters["cache_hits"] / requests, 3) if requests else 0.0,
+            "mean_batch_size": round(sum(self._batch_sizes) / len(self._batch_sizes), 2) if self._batch_sizes else 0.0,
+            "open_streams": sum(self._open.values()),
+            "first_token_p50_ms": pct(self._first_token_ms, 50),
+            "first_token_p95_ms": pct(self._first_token_ms, 95),
+            "total_p50_ms": pct(self._total_ms, 50),
+            "total_p95_ms": pct(self._total_ms, 95)
+        }
+
+
+companion = CompanionPipeline(PROVIDERS[PROVIDER]())
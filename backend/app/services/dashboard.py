@@ -0,0 +1,239 @@
+"""
+Dashboard service: builds the whole dashboard payload in one call and caches it per user
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.database import session_for_user
+from app.models.task import Task
+from app.models.rollup import DailyRollup
+from app.models.habit import Habit, HabitYear
+from app.services.sync import SyncService
+
+
+def _today_tasks(db: Session, user_id: int, today: date) -> list:
+    """Open tasks due today or overdue, most urgent first"""
+    end_of_day = datetime.combine(today + timedelta(days=1), datetime.min.time())
+    rows = db.execute(
+        select(Task.id, Task.title, Task.category, Task.status, Task.priority, Task.due_date)
+        .where(
+            Task.user_id == user_id,
+            Task.deleted_at.is_(None),
+            Task.status != "done",
+            Task.due_date < end_of_day
+        )
+        .order_by(Task.priority, Task.due_date)
+        .limit(50)
+    ).all()
+    return [
+        {
+            "id": row.id,
+            "title": row.title,
+            "category": row.category,
+            "status": row.status,
+            "priority": row.priority,
+            "due_date": row.due_date.isoformat(),
+            "overdue": row.due_date.date() < today
+        }
+        for row in rows
+    ]
+
+
+def _task_metrics(db: Session, user_id: int, today: date) -> dict:
+    """Headline task counts computed in a single aggregate query"""
+    start_of_day = datetime.combine(today, datetime.min.time())
+    done = Task.status == "done"
+    row = db.execute(
+        select(
+            func.count(Task.id).label("total"),
+            func.sum(case((done, 1), else_=0)).label("done"),
+            func.sum(case((Task.category == "work", 1), else_=0)).label("work"),
+            func.sum(case((Task.category == "life", 1), else_=0)).label("life"),
+            func.sum(case((Task.completed_at >= start_of_day, 1), else_=0)).label("done_today"),
+            func.sum(case(((~done) & (Task.due_date < start_of_day), 1), else_=0)).label("overdue")
+        )
+        .where(Task.user_id == user_id, Task.deleted_at.is_(None))
+    ).one()
+    total = row.total or 0
+    completed = row.done or 0
+    return {
+        "total": total,
+        "completed": completed,
+        "open": total - completed,
+        "completed_today": row.done_today or 0,
+        "overdue": row.overdue or 0,
+        "by_category": {"work": row.work or 0, "life": row.life or 0},
+        "completion_rate": round(completed / total, 4) if total else 0.0
+    }
+
+
+def _weekly_progress(db: Session, user_id: int, today: date) -> list:
+    """Tasks completed per day over the last seven days, read from the daily rollups"""
+    start = today - timedelta(days=6)
+    rows = db.execute(
+        select(DailyRollup.day, func.sum(DailyRollup.tasks_completed).label("completed"))
+        .where(DailyRollup.user_id == user_id, DailyRollup.day >= start, DailyRollup.day <= today)
+        .group_by(DailyRollup.day)
+    ).all()
+    counts = {row.day: row.completed for row in rows}
+    return [
+        {"day": (start + timedelta(days=i)).isoformat(), "completed": counts.get(start + timedelta(days=i), 0)}
+        for i in range(7)
+    ]
+
+
+def _habits_today(db: Session, user_id: int, today: date) -> list:
+    """Habits with their streaks and whether they were checked in today"""
+    rows = db.execute(
+        select(Habit, HabitYear.bits)
+        .outerjoin(HabitYear, (HabitYear.habit_id == Habit.id) & (HabitYear.year == today.year))
+        .where(Habit.user_id == user_id, Habit.deleted_at.is_(None))
+        .order_by(Habit.id)
+    ).all()
+    bit = today.timetuple().tm_yday - 1
+    return [
+        {
+            "id": habit.id,
+            "name": habit.name,
+            "current_streak": habit.streak_as_of(today),
+            "longest_streak": habit.longest_streak,
+            "checked_today": bool(bits and int.from_bytes(bits, "little") >> bit & 1)
+        }
+        for habit, bits in rows
+    ]
+
+
+# Dashboard sections, each built with one query on its own session and
+# run concurrently. Future domains (habits, metrics, ...) register here.
+DASHBOARD_SECTIONS: Dict[str, Callable[[Session, int, date], object]] = {
+    "today": _today_tasks,
+    "habits": _habits_today,
+    "metrics": _task_metrics,
+    "progress": _weekly_progress,
+}
+
+
+class DashboardCache:
+    """
+    Per-user cache of serialized dashboard payloads
+
+    Entries are tagged with the user's change sequence at build time. Any
+    write bumps the sequence, so a lookup with the current sequence is a hit
+    only if nothing has changed since. Entries also expire at the end of the
+    day they were built for and after ``ttl_seconds``.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: int = 300):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[int, Tuple[int, date, float, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._ttfb_total = {"hit": 0.0, "miss": 0.0}
+
+    def get(self, user_id: int, seq: int, today: date) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry and entry[0] == seq and entry[1] == today and time.monotonic() - entry[2] < self.ttl_seconds:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[3]
+            self.misses += 1
+            return None
+
+    def put(self, user_id: int, seq: int, today: date, body: bytes) -> None:
+        with self._lock:
+            self._entries[user_id] = (seq, today, time.monotonic(), body)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def record_ttfb(self, hit: bool, seconds: float) -> None:
+        with self._lock:
+            self._ttfb_total["hit" if hit else "miss"] += seconds
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "avg_ttfb_ms_hit": round(self._ttfb_total["hit"] * 1000 / self.hits, 3) if self.hits else None,
+                "avg_ttfb_ms_miss": round(self._ttfb_total["miss"] * 1000 / self.misses, 3) if self.misses else None
+            }
+
+
+dashboard_cache = DashboardCache()
+
+
+class DashboardService:
+    """Service class for building the dashboard payload"""
+
+    @staticmethod
+    def _run_section(builder: Callable, user_id: int, today: date):
+        db = session_for_user(user_id)
+        try:
+            return builder(db, user_id, today)
+        finally:
+            db.close()
+
+    @staticmethod
+    def _current_seq(user_id: int) -> int:
+        db = session_for_user(user_id)
+        try:
+            return SyncService.current_seq(db, user_id)
+        finally:
+            db.close()
+
+    @staticmethod
+    async def build(user_id: int, today: date) -> dict:
+        """
+        Build every dashboard section concurrently
+
+        Args:
+            user_id: Owner of the dashboard
+            today: Day the dashboard is built for
+
+        Returns:
+            Dictionary with one key per section
+        """
+        names = list(DASHBOARD_SECTIONS)
+        results = await asyncio.gather(*(
+            run_in_threadpool(DashboardService._run_section, DASHBOARD_SECTIONS[name], user_id, today)
+            for name in names
+        ))
+        return dict(zip(names, results))
+
+    @staticmethod
+    async def get_dashboard(user_id: int) -> Tuple[bytes, bool]:
+        """
+        Get the serialized dashboard for a user, from cache when still valid
+
+        Args:
+            user_id: Owner of the dashboard
+
+        Returns:
+            (JSON body, whether it was a cache hit)
+        """
+        today = datetime.utcnow().date()
+        seq = await run_in_threadpool(DashboardService._current_seq, user_id)
+        body = dashboard_cache.get(user_id, seq, today)
+        if body is not None:
+            return body, True
+
+        payload = await DashboardService.build(user_id, today)
+        payload["generated_at"] = datetime.utcnow().isoformat()
+        payload["seq"] = seq
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        dashboard_cache.put(user_id, seq, today, body)
+        return body, False
@@ -0,0 +1,78 @@
+"""
+Text embedding functions for semantic retrieval
+
+An embedder turns texts into L2-normalized float32 vectors, so the dot
+product of two embeddings is their cosine similarity. Providers register in
+EMBEDDERS and are selected with EMBEDDING_PROVIDER.
+"""
+import hashlib
+import os
+import re
+from functools import lru_cache
+from typing import List
+import numpy as np
+
+
+EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER", "hashing")
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "256"))
+
+_TOKEN = re.compile(r"[^\W_]+")
+
+
+class Embedder:
+    """
+    Interface every embedding provider implements
+
+    ``name`` identifies the vector space: indexes built with one embedder are
+    rebuilt when another one is configured.
+    """
+    name = "base"
+    dim = 0
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Returns:
+            float32 array of shape (len(texts), dim) with unit-length rows
+            (all-zero rows for texts without any content)
+        """
+        raise NotImplementedError
+
+
+@lru_cache(maxsize=200_000)
+def _feature_hash(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+
+
+class HashingEmbedder(Embedder):
+    """
+    Deterministic local embedder: signed feature hashing of words and word pairs
+
+    Needs no model files or network and gives the same vector for the same
+    text on every machine, which is what tests and offline benchmarks need.
+    Similarity reflects shared vocabulary rather than meaning.
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+        self.name = f"hashing-v1-{dim}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = _TOKEN.findall(text.casefold())
+            features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+            if not features:
+                continue
+            hashes = np.fromiter((_feature_hash(f) for f in features), dtype=np.uint64, count=len(features))
+            signs = np.where(hashes >> np.uint64(63), -1.0, 1.0).astype(np.float32)
+            np.add.at(vectors[row], (hashes % np.uint64(self.dim)).astype(np.intp), signs)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+
+EMBEDDERS = {"hashing": HashingEmbedder}
+
+
+def get_embedder() -> Embedder:
+    return EMBEDDERS[EMBEDDING_PROVIDER]()
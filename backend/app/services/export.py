@@ -0,0 +1,214 @@
+"""
+Streaming export of a user's full data set as NDJSON
+"""
+import base64
+import json
+import zlib
+from datetime import date, datetime, timedelta
+from typing import Iterator, Optional, Tuple
+from sqlalchemy import literal_column, select
+from app.database import session_for_user
+from app.models.finance import Budget, BudgetAggregate, CategoryRule
+from app.models.focus import FocusEvent
+from app.models.habit import Habit, HabitYear
+from app.models.job import Job
+from app.models.metric import MetricBlock, MetricPoint, MetricRollup
+from app.models.rollup import DailyRollup
+from app.models.schedule import BusyBlock, ScheduleBlock, SchedulePlan, TaskDependency
+from app.models.user import User
+from app.models.workout import ExerciseDay, ExerciseSummary, MuscleGroupWeek
+from app.services.habits import days_in_year, decode_bits
+from app.services.metrics import unpack_block
+from app.services.sync import SYNC_MODELS
+
+
+# Rows fetched per round trip; also the granularity of output chunks
+EXPORT_BATCH_SIZE = 1000
+
+# Every table holding a user's data, in export order. The synced tables come
+# first so that cursors from earlier exports still resume at the same place.
+# A new per-user model goes here or into EXPORT_EXCLUDED.
+EXPORT_TABLES = {
+    **SYNC_MODELS,
+    HabitYear.__tablename__: HabitYear,
+    TaskDependency.__tablename__: TaskDependency,
+    MetricPoint.__tablename__: MetricPoint,
+    MetricBlock.__tablename__: MetricBlock,
+    MetricRollup.__tablename__: MetricRollup,
+    FocusEvent.__tablename__: FocusEvent,
+    CategoryRule.__tablename__: CategoryRule,
+    Budget.__tablename__: Budget,
+    BudgetAggregate.__tablename__: BudgetAggregate,
+    ExerciseSummary.__tablename__: ExerciseSummary,
+    ExerciseDay.__tablename__: ExerciseDay,
+    MuscleGroupWeek.__tablename__: MuscleGroupWeek,
+    DailyRollup.__tablename__: DailyRollup,
+    BusyBlock.__tablename__: BusyBlock,
+    SchedulePlan.__tablename__: SchedulePlan,
+    ScheduleBlock.__tablename__: ScheduleBlock,
+    Job.__tablename__: Job,
+}
+
+# Per-user tables left out of the export, with the reason
+EXPORT_EXCLUDED = {
+    "refresh_tokens": "credentials (token hashes), not personal data",
+    "sync_counters": "change-feed bookkeeping",
+}
+
+
+def _column_dict(row) -> dict:
+    """Every column but the owner, with dates as ISO strings and binary data in base64"""
+    data = {}
+    for column in row.__table__.columns:
+        if column.name == "user_id":
+            continue
+        value = getattr(row, column.key)
+        if isinstance(value, (date, datetime)):
+            value = value.isoformat()
+        elif isinstance(value, bytes):
+            value = base64.b64encode(value).decode("ascii")
+        data[column.name] = value
+    return data
+
+
+def _record(row) -> dict:
+    if isinstance(row, MetricBlock):
+        start = datetime.combine(row.day, datetime.min.time())
+        return {
+            "metric": row.metric,
+            "day": row.day.isoformat(),
+            "points": [[(start + timedelta(seconds=offset)).isoformat(), value]
+                       for offset, value in unpack_block(row.data, row.count)]
+        }
+    if isinstance(row, HabitYear):
+        bits, first = decode_bits(row.bits), date(row.year, 1, 1)
+        return {
+            "habit_id": row.habit_id,
+            "year": row.year,
+            "days": [(first + timedelta(days=n)).isoformat() for n in range(days_in_year(row.year)) if bits >> n & 1]
+        }
+    if hasattr(row, "to_dict"):
+        return row.to_dict()
+    return _column_dict(row)
+
+
+def _owned(model, user_id: int):
+    """Statement selecting a user's live rows of ``model`` with their rowid, the resume position"""
+    rowid = literal_column(f"{model.__tablename__}.rowid")
+    stmt = select(model, rowid).order_by(rowid)
+    if model is HabitYear:
+        return stmt.join(Habit, Habit.id == HabitYear.habit_id).where(
+            Habit.user_id == user_id, Habit.deleted_at.is_(None)
+        ), rowid
+    stmt = stmt.where(model.user_id == user_id)
+    if "deleted_at" in model.__table__.c:
+        stmt = stmt.where(model.deleted_at.is_(None))
+    return stmt, rowid
+
+
+class ExportCursorError(ValueError):
+    """Raised when a resume cursor cannot be parsed"""
+
+
+class ExportService:
+    """Service class for streaming data exports"""
+
+    @staticmethod
+    def parse_cursor(cursor: Optional[str]) -> Optional[Tuple[str, int]]:
+        """
+        Parse a resume cursor of the form ``<table>:<last rowid>``
+
+        Args:
+            cursor: Cursor string from a previous, interrupted export
+
+        Returns:
+            (table name, last exported rowid) or None to start from the beginning
+
+        Raises:
+            ExportCursorError: If the cursor is malformed or names an unknown table
+        """
+        if not cursor:
+            return None
+        table, _, last_id = cursor.partition(":")
+        if table not in EXPORT_TABLES or not last_id.isdigit():
+            raise ExportCursorError(f"Invalid export cursor: {cursor}")
+        return table, int(last_id)
+
+    @staticmethod
+    def iter_lines(user_id: int, cursor: Optional[Tuple[str, int]] = None) -> Iterator[str]:
+        """
+        Yield the export as NDJSON lines, one table at a time
+
+        Each table in EXPORT_TABLES is read in rowid order (the id, for tables
+        that have one) through a streaming result with ``yield_per``, so only
+        one batch of rows is alive at any time. Every record carries the
+        cursor that resumes the export right after it.
+
+        Args:
+            user_id: Owner of the data
+            cursor: Parsed resume cursor, or None for a full export
+
+        Yields:
+            Newline-terminated JSON strings
+        """
+        db = session_for_user(user_id)
+        try:
+            tables = list(EXPORT_TABLES.items())
+            if cursor is None:
+                user = db.query(User).filter(User.id == user_id).first()
+                yield json.dumps({"table": "users", "cursor": None, "data": user.to_dict() if user else None}) + "\n"
+            else:
+                start = [name for name, _ in tables].index(cursor[0])
+                tables = tables[start:]
+
+            for table_name, model in tables:
+                last_rowid = cursor[1] if cursor and cursor[0] == table_name else 0
+                stmt, rowid = _owned(model, user_id)
+                stmt = stmt.where(rowid > last_rowid).execution_options(yield_per=EXPORT_BATCH_SIZE)
+                for row, position in db.execute(stmt):
+                    yield json.dumps({
+                        "table": table_name,
+                        "cursor": f"{table_name}:{position}",
+                        "data": _record(row)
+                    }) + "\n"
+                # Release the identity map between tables
+                db.expunge_all()
+
+            yield json.dumps({"done": True}) + "\n"
+        finally:
+            db.close()
+
+    @staticmethod
+    def iter_chunks(lines: Iterator[str], compress: bool = False, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        """
+        Group lines into chunks of roughly ``chunk_size`` bytes, gzip-compressing on the fly
+
+        Args:
+            lines: NDJSON lines
+            compress: Whether to emit a gzip stream
+            chunk_size: Target size of uncompressed data per chunk
+
+        Yields:
+            Byte chunks ready to be written to the response
+        """
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if compress else None
+        buffer = []
+        size = 0
+        for line in lines:
+            data = line.encode("utf-8")
+            buffer.append(data)
+            size += len(data)
+            if size >= chunk_size:
+                chunk = b"".join(buffer)
+                buffer, size = [], 0
+                if compressor:
+                    chunk = compressor.compress(chunk)
+                    if not chunk:
+                        continue
+                yield chunk
+
+        chunk = b"".join(buffer)
+        if compressor:
+            chunk = compressor.compress(chunk) + compressor.flush()
+        if chunk:
+            yield chunk
@@ -0,0 +1,259 @@
+"""
+Focus event ingestion: in-process buffer with a background group-commit flusher
+"""
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy import insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from app import database
+from app.database import SessionLocal
+from app.models.focus import FocusEvent
+from app.schemas.focus import FocusEventIn
+from app.utils import to_utc_naive
+
+
+# A flush runs when this many events are pending ...
+FLUSH_BATCH_SIZE = int(os.getenv("FOCUS_FLUSH_BATCH_SIZE", "500"))
+# ... or when the oldest pending event has waited this long
+FLUSH_INTERVAL_SECONDS = float(os.getenv("FOCUS_FLUSH_INTERVAL_MS", "250")) / 1000
+# Acknowledged but unwritten events are capped here; beyond it clients get 503
+BUFFER_CAPACITY = int(os.getenv("FOCUS_BUFFER_CAPACITY", "50000"))
+
+
+class BufferFullError(Exception):
+    """Raised when the ingestion buffer cannot take more events"""
+
+
+def to_row(user_id: int, event: FocusEventIn, received_at: datetime) -> dict:
+    return {
+        "user_id": user_id,
+        "session_id": event.session_id,
+        "kind": event.kind,
+        "ts": to_utc_naive(event.ts),
+        "value": event.value,
+        "note": event.note,
+        "received_at": received_at
+    }
+
+
+class FocusEventBuffer:
+    """
+    Append-only event buffer drained by a background thread in group commits
+
+    ``append`` only takes a lock, so requests are acknowledged without
+    touching the database. The flusher writes everything pending in one
+    transaction whenever ``max_batch`` events are waiting or ``interval``
+    seconds have passed. Loss is bounded: a crash can lose at most the
+    events acknowledged since the last flush, never more than ``capacity``.
+
+    When a batch fails to insert, its rows are retried one by one: a row
+    that is rejected on its own (a constraint or a bad value) is dropped
+    and counted as dead-lettered instead of blocking every later batch.
+    When the database itself is unavailable (``OperationalError``, such as
+    a locked or unreachable file) the rows go back in front of the queue,
+    as many as the capacity leaves room for; the rest are dropped.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], max_batch: int = FLUSH_BATCH_SIZE,
+                 interval: float = FLUSH_INTERVAL_SECONDS, capacity: int = BUFFER_CAPACITY):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.interval = interval
+        self.capacity = capacity
+        self._pending: List[dict] = []
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self.accepted = 0
+        self.rejected = 0
+        self.flushed = 0
+        self.batches = 0
+        self.failed_flushes = 0
+        self.dead_lettered = 0
+        self.dropped = 0
+        self.last_flush_ms = 0.0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def append(self, rows: List[dict]) -> int:
+        """
+        Queue rows for the next group commit
+
+        Returns:
+            Number of events pending after the append
+
+        Raises:
+            BufferFullError: If the rows would exceed the buffer capacity
+        """
+        with self._condition:
+            if len(self._pending) + len(rows) > self.capacity:
+                self.rejected += len(rows)
+                raise BufferFullError(f"Focus event buffer is full ({self.capacity} events pending)")
+            self._pending.extend(rows)
+            self.accepted += len(rows)
+            if len(self._pending) >= self.max_batch:
+                self._condition.notify()
+            return len(self._pending)
+
+    def flush(self) -> int:
+        """
+        Write every pending event in one transaction
+
+        With sharding enabled that is one transaction per shard; the events
+        of a shard that cannot be reached go back in front of the queue.
+
+        Returns:
+            Number of events written
+        """
+        with self._flush_lock:
+            with self._condition:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            started = time.perf_counter()
+            router = database.shard_router
+            groups = router.partition(batch) if router else [(self.session_factory, batch)]
+            written = 0
+            requeue: List[dict] = []
+            for session_factory, rows in groups:
+                inserted, failed = self._write(session_factory, rows)
+                written += inserted
+                requeue.extend(failed)
+            if requeue:
+                with self._condition:
+                    room = max(0, self.capacity - len(self._pending))
+                    self._pending[:0] = requeue[:room]
+                    self.dropped += len(requeue[room:])
+                    self.failed_flushes += 1
+                if len(requeue) > room:
+                    print(f"Focus event buffer full, {len(requeue) - room} unwritten events dropped")
+            if written:
+                self.flushed += written
+                self.batches += 1
+                self.last_flush_ms = (time.perf_counter() - started) * 1000
+            return written
+
+    def _write(self, session_factory: Callable[[], Session], rows: List[dict]) -> Tuple[int, List[dict]]:
+        """
+        Insert rows in one transaction, falling back to one savepoint per row
+
+        Returns:
+            (rows written, rows to requeue because the database was unavailable)
+        """
+        db = session_factory()
+        try:
+            try:
+                db.execute(insert(FocusEvent), rows)
+                db.commit()
+                return len(rows), []
+            except OperationalError as e:
+                db.rollback()
+                print(f"Focus event flush failed, {len(rows)} events requeued: {e}")
+                return 0, rows
+            except Exception as e:
+                db.rollback()
+                print(f"Focus event flush failed, retrying {len(rows)} events one by one: {e}")
+
+            dead = 0
+            try:
+                for row in rows:
+                    try:
+                        with db.begin_nested():
+                            db.execute(insert(FocusEvent), [row])
+                    except OperationalError:
+                        raise
+                    except Exception as e:
+                        dead += 1
+                        print(f"Focus event dead-lettered: {e}")
+                db.commit()
+            except OperationalError as e:
+                db.rollback()
+                print(f"Focus event flush failed, {len(rows)} events requeued: {e}")
+                return 0, rows
+            with self._condition:
+                self.dead_lettered += dead
+            return len(rows) - dead, []
+        finally:
+            db.close()
+
+    def start(self) -> None:
+        """Start the background flusher (idempotent)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="focus-event-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the flusher and write whatever is still pending"""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: self._stopping or len(self._pending) >= self.max_batch, timeout=self.interval
+                )
+                if self._stopping:
+                    return
+            self.flush()
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "pending": len(self._pending),
+            "capacity": self.capacity,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "flushed": self.flushed,
+            "batches": self.batches,
+            "failed_flushes": self.failed_flushes,
+            "dead_lettered": self.dead_lettered,
+            "dropped": self.dropped,
+            "avg_batch": round(self.flushed / self.batches, 1) if self.batches else 0.0,
+            "last_flush_ms": round(self.last_flush_ms, 3),
+            "flush_interval_ms": self.interval * 1000,
+            "flush_batch_size": self.max_batch
+        }
+
+
+focus_buffer = FocusEventBuffer(SessionLocal)
+
+
+class FocusService:
+    """Service class for focus event ingestion and reads"""
+
+    @staticmethod
+    def ingest(user_id: int, events: List[FocusEventIn], buffer: FocusEventBuffer = focus_buffer) -> int:
+        """
+        Buffer events for the background writer
+
+        Returns:
+            Number of events pending after the append
+        """
+        received_at = datetime.utcnow()
+        return buffer.append([to_row(user_id, event, received_at) for event in events])
+
+    @staticmethod
+    def list_events(db: Session, user_id: int, start: datetime, end: datetime,
+                    session_id: Optional[str] = None, limit: int = 1000) -> List[FocusEvent]:
+        """
+        Get flushed events of a user in a time range, oldest first
+        """
+        query = db.query(FocusEvent).filter(
+            FocusEvent.user_id == user_id, FocusEvent.ts >= start, FocusEvent.ts < end
+        )
+        if session_id:
+            query = query.filter(FocusEvent.session_id == session_id)
+        return query.order_by(FocusEvent.ts, FocusEvent.id).limit(limit).all()
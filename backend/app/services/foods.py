@@ -0,0 +1,263 @@
+"""
+Food catalogue service: bulk import and a memory-mapped prefix index for autocomplete
+"""
+import csv
+import mmap
+import os
+import re
+import struct
+import threading
+import unicodedata
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Optional, TextIO, Tuple
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+from app.models.food import Food
+
+
+FOOD_INDEX_PATH = os.getenv("FOOD_INDEX_PATH", "./food_index.bin")
+IMPORT_BATCH_SIZE = 5000
+
+# Index file layout (little-endian):
+#   header   MAGIC, version u32, entry count u32
+#   offsets  entry count x u32, byte offset of each entry in the entries region
+#   entries  sorted by key: food id u32, calories/protein/carbs/fat 4 x f32,
+#            key length u16, key bytes, name length u16, name bytes
+MAGIC = b"LFIX"
+VERSION = 1
+HEADER = struct.Struct("<4sII")
+ENTRY_HEAD = struct.Struct("<I4fH")
+U16 = struct.Struct("<H")
+U32 = struct.Struct("<I")
+
+# Keys are cut to this many characters; longer prefixes are checked on the full name
+MAX_KEY_CHARS = 48
+
+_non_alnum = re.compile(r"[^a-z0-9 ]+")
+_spaces = re.compile(r" +")
+
+
+def normalize(text: str) -> str:
+    """Lowercase, strip accents and punctuation, collapse whitespace"""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    return _spaces.sub(" ", _non_alnum.sub(" ", text)).strip()
+
+
+def index_keys(name: str) -> List[str]:
+    """Keys a food is findable under: its normalized name from every word start"""
+    words = normalize(name).split(" ")
+    return [" ".join(words[i:])[:MAX_KEY_CHARS] for i in range(len(words)) if words[i]]
+
+
+class FoodIndex:
+    """
+    Read-only prefix index over a memory-mapped index file
+
+    Lookups binary-search the sorted keys directly in the mapped pages, so
+    worker processes opening the same file share one copy in the page cache.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a food index file: {path}")
+        self._offsets = HEADER.size
+        self._entries = HEADER.size + self.count * U32.size
+        self.mtime = os.stat(path).st_mtime
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+    def _entry_pos(self, i: int) -> int:
+        return self._entries + U32.unpack_from(self._map, self._offsets + i * U32.size)[0]
+
+    def _key(self, pos: int) -> bytes:
+        key_len = U16.unpack_from(self._map, pos + ENTRY_HEAD.size - U16.size)[0]
+        start = pos + ENTRY_HEAD.size
+        return self._map[start:start + key_len]
+
+    def _entry(self, pos: int) -> dict:
+        food_id, calories, protein, carbs, fat, key_len = ENTRY_HEAD.unpack_from(self._map, pos)
+        name_pos = pos + ENTRY_HEAD.size + key_len
+        name_len = U16.unpack_from(self._map, name_pos)[0]
+        name = self._map[name_pos + U16.size:name_pos + U16.size + name_len].decode("utf-8")
+        return {"id": food_id, "name": name, "calories": round(calories, 2), "protein": round(protein, 2),
+                "carbs": round(carbs, 2), "fat": round(fat, 2)}
+
+    def lower_bound(self, prefix: bytes) -> int:
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(self._entry_pos(mid)) < prefix:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def search(self, query: str, limit: int = 10) -> List[dict]:
+        """
+        Find foods with a key starting with the normalized query
+
+        Args:
+            query: Raw user input
+            limit: Maximum number of distinct foods to return
+
+        Returns:
+            Foods in key order
+        """
+        prefix_text = normalize(query)
+        if not prefix_text:
+            return []
+        prefix = prefix_text[:MAX_KEY_CHARS].encode("utf-8")
+        results, seen = [], set()
+        i = self.lower_bound(prefix)
+        scanned = 0
+        while i < self.count and len(results) < limit and scanned < limit * 20:
+            pos = self._entry_pos(i)
+            if not self._key(pos).startswith(prefix):
+                break
+            entry = self._entry(pos)
+            if entry["id"] not in seen and (len(prefix_text) <= MAX_KEY_CHARS or prefix_text in normalize(entry["name"])):
+                seen.add(entry["id"])
+                results.append(entry)
+            i += 1
+            scanned += 1
+        return results
+
+    @staticmethod
+    def build(foods: Iterable[Tuple[int, str, float, float, float, float]], path: str) -> int:
+        """
+        Write an index file for (id, name, calories, protein, carbs, fat) rows
+
+        The file is written next to ``path`` and atomically renamed into
+        place, so running workers keep their old mapping until they reload.
+
+        Returns:
+            Number of index entries written
+        """
+        entries = []
+        for food_id, name, calories, protein, carbs, fat in foods:
+            name_bytes = name.encode("utf-8")[:65535]
+            for key in index_keys(name):
+                entries.append((key.encode("utf-8"), food_id, calories, protein, carbs, fat, name_bytes))
+        entries.sort(key=lambda e: (e[0], e[1]))
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(entries)))
+            offset = 0
+            offsets = bytearray()
+            for key, _, _, _, _, _, name_bytes in entries:
+                offsets += U32.pack(offset)
+                offset += ENTRY_HEAD.size + len(key) + U16.size + len(name_bytes)
+            f.write(offsets)
+            for key, food_id, calories, protein, carbs, fat, name_bytes in entries:
+                f.write(ENTRY_HEAD.pack(food_id, calories, protein, carbs, fat, len(key)))
+                f.write(key)
+                f.write(U16.pack(len(name_bytes)))
+                f.write(name_bytes)
+        os.replace(tmp_path, path)
+        return len(entries)
+
+
+_index: Optional[FoodIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_index(path: str = None) -> Optional[FoodIndex]:
+    """
+    Lazily open the index file, reopening it when it has been rebuilt
+
+    Returns:
+        FoodIndex, or None if no index has been built yet
+    """
+    global _index
+    path = path or FOOD_INDEX_PATH
+    try:
+        mtime = os.stat(path).st_mtime
+    except FileNotFoundError:
+        return None
+    if _index is None or _index.path != path or _index.mtime != mtime:
+        with _index_lock:
+            if _index is None or _index.path != path or _index.mtime != mtime:
+                _index = FoodIndex(path)
+                _cached_search.cache_clear()
+    return _index
+
+
+@lru_cache(maxsize=8192)
+def _cached_search(path: str, mtime: float, query: str, limit: int) -> Tuple[dict, ...]:
+    return tuple(get_index(path).search(query, limit))
+
+
+class FoodService:
+    """Service class for the food catalogue"""
+
+    @staticmethod
+    def import_csv(db: Session, source: TextIO) -> int:
+        """
+        Stream foods from CSV into the catalogue in batches
+
+        Expected columns: name, calories, protein, carbs, fat (per 100 g).
+
+        Returns:
+            Number of foods imported
+        """
+        batch, imported = [], 0
+        for row in csv.DictReader(source):
+            name = (row.get("name") or "").strip()
+            if not name:
+                continue
+            batch.append({
+                "name": name[:200],
+                "calories": float(row.get("calories") or 0),
+                "protein": float(row.get("protein") or 0),
+                "carbs": float(row.get("carbs") or 0),
+                "fat": float(row.get("fat") or 0)
+            })
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                db.execute(insert(Food), batch)
+                imported += len(batch)
+                batch = []
+        if batch:
+            db.execute(insert(Food), batch)
+            imported += len(batch)
+        db.commit()
+        return imported
+
+    @staticmethod
+    def iter_catalogue(db: Session) -> Iterator[Tuple[int, str, float, float, float, float]]:
+        result = db.execute(
+            select(Food.id, Food.name, Food.calories, Food.protein, Food.carbs, Food.fat)
+            .execution_options(yield_per=IMPORT_BATCH_SIZE)
+        )
+        for row in result:
+            yield tuple(row)
+
+    @staticmethod
+    def rebuild_index(db: Session, path: str = None) -> int:
+        """
+        Rebuild the on-disk prefix index from the catalogue
+
+        Returns:
+            Number of index entries written
+        """
+        return FoodIndex.build(FoodService.iter_catalogue(db), path or FOOD_INDEX_PATH)
+
+    @staticmethod
+    def suggest(query: str, limit: int = 10, path: str = None) -> List[dict]:
+        """
+        Autocomplete foods by prefix, through the per-prefix LRU cache
+
+        Returns:
+            Matching foods, or an empty list if no index has been built
+        """
+        index = get_index(path)
+        if index is None:
+            return []
+        return list(_cached_search(index.path, index.mtime, normalize(query), limit))
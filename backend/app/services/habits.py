@@ -0,0 +1,254 @@
+"""
+Habit service: bitset-encoded check-in history with incrementally maintained streaks
+"""
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy.orm import Session
+from app.models.habit import Habit, HabitYear, HABIT_YEAR_BYTES
+from app.schemas.habit import HabitCreate, HabitUpdate
+from app.services.sync import SyncService
+from app.services.rollups import RollupService
+
+
+ONE_DAY = timedelta(days=1)
+
+
+def day_index(day: date) -> int:
+    """Zero-based day of the year, the bit position of ``day`` in its year's bitset"""
+    return day.timetuple().tm_yday - 1
+
+
+def days_in_year(year: int) -> int:
+    return (date(year + 1, 1, 1) - date(year, 1, 1)).days
+
+
+def decode_bits(bits: bytes) -> int:
+    return int.from_bytes(bits, "little")
+
+
+def encode_bits(value: int) -> bytes:
+    return value.to_bytes(HABIT_YEAR_BYTES, "little")
+
+
+def longest_run(value: int) -> int:
+    """Length of the longest run of set bits, in O(run length) big-int operations"""
+    run = 0
+    while value:
+        value &= value >> 1
+        run += 1
+    return run
+
+
+class _YearBits:
+    """Lazily loaded, per-call view of a habit's yearly bitsets"""
+
+    def __init__(self, db: Session, habit_id: int):
+        self.db = db
+        self.habit_id = habit_id
+        self.years: Dict[int, int] = {}
+
+    def get(self, year: int) -> int:
+        if year not in self.years:
+            row = self.db.get(HabitYear, (self.habit_id, year))
+            self.years[year] = decode_bits(row.bits) if row else 0
+        return self.years[year]
+
+    def checked(self, day: date) -> bool:
+        return bool(self.get(day.year) >> day_index(day) & 1)
+
+    def run_length(self, day: date, step: timedelta) -> int:
+        """Number of consecutive checked days starting after ``day`` in direction ``step``"""
+        count = 0
+        day += step
+        while self.checked(day):
+            count += 1
+            day += step
+        return count
+
+
+class HabitService:
+    """Service class for habit operations"""
+
+    @staticmethod
+    def list_habits(db: Session, user_id: int) -> List[Habit]:
+        """
+        Get all live habits of a user
+        """
+        return (
+            db.query(Habit)
+            .filter(Habit.user_id == user_id, Habit.deleted_at.is_(None))
+            .order_by(Habit.id)
+            .all()
+        )
+
+    @staticmethod
+    def get_habit(db: Session, user_id: int, habit_id: int) -> Optional[Habit]:
+        """
+        Get a single live habit owned by the user
+        """
+        return (
+            db.query(Habit)
+            .filter(Habit.id == habit_id, Habit.user_id == user_id, Habit.deleted_at.is_(None))
+            .first()
+        )
+
+    @staticmethod
+    def create_habit(db: Session, user_id: int, habit_data: HabitCreate) -> Habit:
+        """
+        Create a new habit
+        """
+        habit = Habit(user_id=user_id, **habit_data.model_dump())
+        SyncService.record_change(db, habit)
+        db.add(habit)
+        db.commit()
+        db.refresh(habit)
+        return habit
+
+    @staticmethod
+    def update_habit(db: Session, habit: Habit, habit_data: HabitUpdate) -> Habit:
+        """
+        Rename or recategorize a habit
+        """
+        changes = habit_data.model_dump(exclude_unset=True)
+        if "category" in changes and changes["category"] != habit.category:
+            HabitService._rollup_history(db, habit, -1)
+            habit.category = changes["category"]
+            HabitService._rollup_history(db, habit, 1)
+        for field, value in changes.items():
+            setattr(habit, field, value)
+        SyncService.record_change(db, habit)
+        db.commit()
+        db.refresh(habit)
+        return habit
+
+    @staticmethod
+    def delete_habit(db: Session, habit: Habit) -> None:
+        """
+        Soft-delete a habit and remove its check-ins from the rollups
+        """
+        HabitService._rollup_history(db, habit, -1)
+        SyncService.mark_deleted(db, habit)
+        db.commit()
+
+    @staticmethod
+    def _rollup_history(db: Session, habit: Habit, sign: int) -> None:
+        for row in db.query(HabitYear).filter(HabitYear.habit_id == habit.id):
+            value = decode_bits(row.bits)
+            start = date(row.year, 1, 1)
+            for index in range(days_in_year(row.year)):
+                if value >> index & 1:
+                    RollupService.apply(db, habit.user_id, start + timedelta(days=index),
+                                        habit.category, habit_checkins=sign)
+
+    @staticmethod
+    def check_in(db: Session, habit: Habit, day: date) -> bool:
+        """
+        Record a check-in and update streaks incrementally
+
+        Checking in on the day after the last check-in, the common case,
+        touches one 46-byte row and a few counters. Backfilled days walk only
+        the neighbouring run of check-ins.
+
+        Args:
+            db: Database session
+            habit: Habit to check in
+            day: Day of the check-in
+
+        Returns:
+            True if the day was newly checked in, False if it already was
+        """
+        row = db.get(HabitYear, (habit.id, day.year))
+        if row is None:
+            row = HabitYear(habit_id=habit.id, year=day.year, bits=encode_bits(0))
+            db.add(row)
+        value = decode_bits(row.bits)
+        mask = 1 << day_index(day)
+        if value & mask:
+            return False
+        row.bits = encode_bits(value | mask)
+
+        last = habit.last_checkin
+        if last is None or day > last:
+            habit.current_streak = habit.current_streak + 1 if last == day - ONE_DAY else 1
+            habit.last_checkin = day
+            habit.longest_streak = max(habit.longest_streak, habit.current_streak)
+        else:
+            years = _YearBits(db, habit.id)
+            years.years[day.year] = value | mask
+            after = years.run_length(day, ONE_DAY)
+            run = years.run_length(day, -ONE_DAY) + 1 + after
+            if day + timedelta(days=after) == last:
+                habit.current_streak = run
+            habit.longest_streak = max(habit.longest_streak, run)
+
+        habit.total_checkins += 1
+        RollupService.apply(db, habit.user_id, day, habit.category, habit_checkins=1)
+        SyncService.record_change(db, habit)
+        db.commit()
+        return True
+
+    @staticmethod
+    def undo_check_in(db: Session, habit: Habit, day: date) -> bool:
+        """
+        Remove a check-in, recomputing only the streak values it can affect
+
+        Returns:
+            True if the day had been checked in, False otherwise
+        """
+        row = db.get(HabitYear, (habit.id, day.year))
+        value = decode_bits(row.bits) if row else 0
+        mask = 1 << day_index(day)
+        if not value & mask:
+            return False
+        row.bits = encode_bits(value & ~mask)
+
+        years = _YearBits(db, habit.id)
+        years.years[day.year] = value & ~mask
+        last = habit.last_checkin
+        if day == last:
+            previous = None
+            if habit.total_checkins > 1:
+                # Walk back to the previous check-in; bounded by the gap length
+                previous = day - ONE_DAY
+                earliest = min(r.year for r in db.query(HabitYear.year).filter(HabitYear.habit_id == habit.id))
+                while previous.year >= earliest and not years.checked(previous):
+                    previous -= ONE_DAY
+                if previous.year < earliest:
+                    previous = None
+            habit.last_checkin = previous
+            habit.current_streak = years.run_length(previous, -ONE_DAY) + 1 if previous else 0
+        elif last - timedelta(days=habit.current_streak) < day < last:
+            habit.current_streak = (last - day).days
+
+        habit.longest_streak = HabitService._longest_streak(db, habit.id, years)
+        habit.total_checkins -= 1
+        RollupService.apply(db, habit.user_id, day, habit.category, habit_checkins=-1)
+        SyncService.record_change(db, habit)
+        db.commit()
+        return True
+
+    @staticmethod
+    def _longest_streak(db: Session, habit_id: int, years: _YearBits) -> int:
+        """Longest streak across all years, by concatenating the yearly bitsets"""
+        stored = [row.year for row in db.query(HabitYear.year).filter(HabitYear.habit_id == habit_id)]
+        if not stored:
+            return 0
+        combined = 0
+        offset = 0
+        for year in range(min(stored), max(stored) + 1):
+            combined |= years.get(year) << offset
+            offset += days_in_year(year)
+        return longest_run(combined)
+
+    @staticmethod
+    def heatmap(db: Session, habit: Habit, year: int) -> Dict[str, object]:
+        """
+        Decode one year of check-ins straight from the bitset
+
+        Returns:
+            Dictionary with the year, one 0/1 entry per day and the count
+        """
+        row = db.get(HabitYear, (habit.id, year))
+        value = decode_bits(row.bits) if row else 0
+        days = [value >> index & 1 for index in range(days_in_year(year))]
+        return {"habit_id": habit.id, "year": year, "days": days, "count": sum(days)}
@@ -0,0 +1,122 @@
+"""
+Idempotency keys: claiming a key, storing the response it produced and replaying it
+
+The first request with a key inserts a pending row; the unique index on
+(scope, key) makes that insert the claim, so exactly one request runs the
+endpoint however many duplicates arrive at once, in this process or
+another. Duplicates find the pending row and wait for it to complete, or
+take it over once its lock has run out (the owner died mid-request).
+"""
+import json
+import os
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+from app.models.idempotency import IdempotencyKey
+
+
+# Stored responses are replayed for this long after the first request
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", str(24 * 3600)))
+# A pending key whose request has not finished within this long is taken over by the next duplicate
+IDEMPOTENCY_LOCK_SECONDS = float(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "60"))
+
+CLAIMED = "claimed"
+PENDING = "pending"
+COMPLETED = "completed"
+MISMATCH = "mismatch"
+
+StoredResponse = Tuple[int, List[List[str]], bytes]
+
+
+class IdempotencyService:
+    """Service class for idempotency key rows"""
+
+    @staticmethod
+    def claim(db: Session, scope: str, key: str, fingerprint: str, ttl_seconds: float = IDEMPOTENCY_TTL_SECONDS,
+              lock_seconds: float = IDEMPOTENCY_LOCK_SECONDS) -> Tuple[str, Optional[StoredResponse]]:
+        """
+        Try to become the request that runs the endpoint for a key
+
+        Returns:
+            (CLAIMED, None) if the caller must run the request and then call
+            ``complete`` or ``release``; (COMPLETED, response) if a stored
+            response should be replayed; (PENDING, None) if another request
+            holds the key; (MISMATCH, None) if the key was used for a
+            different request
+        """
+        while True:
+            now = datetime.utcnow()
+            claimed = db.execute(
+                insert(IdempotencyKey)
+                .values(scope=scope, key=key, fingerprint=fingerprint, status="pending",
+                        locked_until=now + timedelta(seconds=lock_seconds),
+                        expires_at=now + timedelta(seconds=ttl_seconds), created_at=now)
+                .on_conflict_do_nothing(index_elements=[IdempotencyKey.scope, IdempotencyKey.key])
+            ).rowcount
+            db.commit()
+            if claimed:
+                return CLAIMED, None
+
+            row = db.execute(
+                select(IdempotencyKey).where(IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+            ).scalar_one_or_none()
+            if row is None:
+                continue  # released or purged since the insert; try again
+            if row.expires_at <= now:
+                db.execute(delete(IdempotencyKey).where(IdempotencyKey.id == row.id,
+                                                        IdempotencyKey.expires_at == row.expires_at))
+                db.commit()
+                continue
+            if row.fingerprint != fingerprint:
+                return MISMATCH, None
+            if row.status == "completed":
+                return COMPLETED, (row.response_status, json.loads(row.response_headers), row.response_body)
+            if row.locked_until is not None and row.locked_until <= now:
+                # The owner gave up without completing or releasing; take the lock over
+                took = db.execute(
+                    update(IdempotencyKey)
+                    .where(IdempotencyKey.id == row.id, IdempotencyKey.status == "pending",
+                           IdempotencyKey.locked_until == row.locked_until)
+                    .values(locked_until=now + timedelta(seconds=lock_seconds))
+                ).rowcount
+                db.commit()
+                if took:
+                    return CLAIMED, None
+            db.rollback()
+            return PENDING, None
+
+    @staticmethod
+    def complete(db: Session, scope: str, key: str, status: int, headers: List[List[str]], body: bytes) -> None:
+        """Store the response of a claimed key so duplicates replay it"""
+        db.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+            .values(status="completed", locked_until=None, response_status=status,
+                    response_headers=json.dumps(headers), response_body=body)
+        )
+        db.commit()
+
+    @staticmethod
+    def release(db: Session, scope: str, key: str) -> None:
+        """Give up a claimed key without a response to store, so the next duplicate runs the request"""
+        db.execute(
+            delete(IdempotencyKey)
+            .where(IdempotencyKey.scope == scope, IdempotencyKey.key == key, IdempotencyKey.status == "pending")
+        )
+        db.commit()
+
+    @staticmethod
+    def purge(db: Session, now: Optional[datetime] = None) -> int:
+        """
+        Delete expired keys and their stored responses
+
+        Returns:
+            Number of keys deleted
+        """
+        deleted = db.execute(
+            delete(IdempotencyKey).where(IdempotencyKey.expires_at <= (now or datetime.utcnow()))
+        ).rowcount
+        db.commit()
+        return deleted
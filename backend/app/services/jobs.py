@@ -0,0 +1,486 @@
+"""
+Background jobs: a durable queue in the jobs table and worker threads that drain it
+
+Jobs are claimed with one atomic UPDATE ... RETURNING, so any number of
+worker threads or processes can share the queue. A claimed job carries a
+lease that its worker keeps extending; when a worker dies the lease runs
+out and the job is claimed again. Delivery is therefore at-least-once and
+handlers must be safe to re-run.
+"""
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import bindparam, delete, func, select, update
+from sqlalchemy.orm import Session
+from app import database
+from app.database import SessionLocal
+from app.models.job import Job
+from app.services.analytics import AnalyticsService
+from app.services.auth import AuthService
+from app.services.budgets import BudgetService
+from app.services.idempotency import IdempotencyService
+from app.services.journal import JournalService
+from app.services.metrics import MetricService
+from app.services.patterns import PatternService
+from app.services.rollups import RollupService
+
+
+# Worker threads started with the API process (0 leaves the queue to separate worker processes)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# A running job is considered abandoned when its worker has not renewed the lease for this long
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+# Idle workers look for due jobs this often; new jobs in the same process wake them at once
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_MS", "1000")) / 1000
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+# Retry n waits about RETRY_BASE * 2^(n-1) seconds, capped at RETRY_MAX
+RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", "5"))
+RETRY_MAX_SECONDS = float(os.getenv("JOB_RETRY_MAX_SECONDS", "900"))
+
+FINISHED_STATUSES = ("succeeded", "failed", "cancelled")
+
+JobHandler = Callable[[Session, Optional[int], dict], object]
+JOB_HANDLERS: Dict[str, JobHandler] = {}
+
+
+class UnknownJobKindError(ValueError):
+    """Raised when a job kind has no registered handler"""
+
+
+class PermanentJobError(Exception):
+    """Raised by handlers for failures that retrying cannot fix, such as a bad payload"""
+
+
+def job_handler(kind: str):
+    """
+    Register a function as the handler of a job kind
+
+    Handlers receive a session, the job's user id and its payload, and
+    return a JSON-serializable result. They may run more than once.
+    """
+    def register(func: JobHandler) -> JobHandler:
+        JOB_HANDLERS[kind] = func
+        return func
+    return register
+
+
+def retry_delay(attempts: int, base: float = RETRY_BASE_SECONDS, cap: float = RETRY_MAX_SECONDS) -> float:
+    """Exponential backoff with jitter; half the delay is fixed so retries never bunch up at zero"""
+    delay = min(cap, base * 2 ** max(0, attempts - 1))
+    return delay / 2 + random.random() * delay / 2
+
+
+def _payload_date(payload: dict, key: str) -> date:
+    try:
+        return date.fromisoformat(payload[key])
+    except (KeyError, TypeError, ValueError):
+        raise PermanentJobError(f"Payload field '{key}' must be an ISO date")
+
+
+@job_handler("analytics.summary")
+def _analytics_summary(db: Session, user_id: Optional[int], payload: dict) -> dict:
+    period = payload.get("period", "week")
+    if period not in ("day", "week", "month"):
+        raise PermanentJobError("Payload field 'period' must be day, week or month")
+    return AnalyticsService.summary(db, user_id, _payload_date(payload, "start"), _payload_date(payload, "end"), period)
+
+
+@job_handler("analytics.patterns")
+def _analytics_patterns(db: Session, user_id: Optional[int], payload: dict) -> dict:
+    return PatternService.patterns(
+        db, user_id, days=int(payload.get("days", 90)), window=int(payload.get("window", 7)),
+        tz_offset_minutes=int(payload.get("tz_offset_minutes", 0))
+    )
+
+
+@job_handler("rollups.rebuild")
+def _rollups_rebuild(db: Session, user_id: Optional[int], payload: dict) -> dict:
+    if user_id is not None:
+        return {"rows": RollupService.rebuild(db, user_id)}
+    return {"rows": sum(RollupService.rebuild(user_db) for user_db in database.each_user_database(db))}
+
+
+@job_handler("journal.reindex")
+def _journal_reindex(db: Session, user_id: Optional[int], payload: dict) -> dict:
+    return {"indexed": JournalService.reindex(db, user_id)}
+
+
+@job_handler("metrics.compact")
+def _metrics_compact(db: Session, user_id: Optional[int], payload: dict) -> dict:
+    if user_id is not None:
+        return {"compacted": MetricService.compact(db, user_id=user_id)}
+    return {"compacted": sum(MetricService.compact(user_db) for user_db in database.each_user_database(db))}
+
+
+@job_handler("budgets.reconcile")
+def _budgets_reconcile(db: Session, user_id: Optional[int], payload: dict) -> dict:
+    if user_id is not None:
+        return {"repaired": BudgetService.reconcile(db, user_id)}
+    return {"repaired": sum(BudgetService.reconcile(user_db) for user_db in database.each_user_database(db))}
+
+
+# Claim and finish run twice per job, so they are built once with bound parameters.
+# Both subqueries walk idx_jobs_status_run_after (rowid breaks ties), so a claim
+# costs the same with ten or a million queued jobs.
+_jobs = Job.__table__
+_expired = (
+    select(_jobs.c.id)
+    .where(_jobs.c.status == "running", _jobs.c.lease_expires_at < bindparam("now"))
+    .limit(1)
+    .scalar_subquery()
+)
+_due = (
+    select(_jobs.c.id)
+    .where(_jobs.c.status == "queued", _jobs.c.run_after <= bindparam("now"))
+    .order_by(_jobs.c.run_after, _jobs.c.id)
+    .limit(1)
+    .scalar_subquery()
+)
+_CLAIM = (
+    update(_jobs)
+    .where(_jobs.c.id == func.coalesce(_expired, _due))
+    .values(
+        status="running",
+        locked_by=bindparam("worker_id"),
+        lease_expires_at=bindparam("lease_expires_at"),
+        attempts=_jobs.c.attempts + 1,
+        started_at=bindparam("now")
+    )
+    .returning(_jobs.c.id, _jobs.c.kind, _jobs.c.user_id, _jobs.c.payload, _jobs.c.attempts,
+               _jobs.c.max_attempts, _jobs.c.run_after)
+)
+_FINISH = (
+    update(_jobs)
+    .where(_jobs.c.id == bindparam("job_id"), _jobs.c.locked_by == bindparam("worker_id"),
+           _jobs.c.status == "running")
+    .values(
+        status=bindparam("status"),
+        result=bindparam("result"),
+        error=bindparam("error"),
+        run_after=bindparam("run_after"),
+        finished_at=bindparam("finished_at"),
+        locked_by=None,
+        lease_expires_at=None
+    )
+)
+
+
+@job_handler("jobs.purge")
+def _jobs_purge(db: Session, user_id: Optional[int], payload: dict) -> dict:
+    keep = timedelta(days=float(payload.get("keep_days", 7)))
+    return {"deleted": JobService.purge(db, datetime.utcnow() - keep)}
+
+
+@job_handler("idempotency.purge")
+def _idempotency_purge(db: Session, user_id: Optional[int], payload: dict) -> dict:
+    return {"deleted": IdempotencyService.purge(db)}
+
+
+@job_handler("refresh_tokens.purge")
+def _refresh_tokens_purge(db: Session, user_id: Optional[int], payload: dict) -> dict:
+    keep = timedelta(days=float(payload.get("keep_days", 7)))
+    return {"deleted": AuthService.purge_refresh_tokens(db, datetime.utcnow() - keep)}
+
+
+class JobService:
+    """Service class for enqueueing and inspecting jobs"""
+
+    @staticmethod
+    def enqueue(db: Session, kind: str, payload: Optional[dict] = None, user_id: Optional[int] = None,
+                delay_seconds: float = 0, max_attempts: int = JOB_MAX_ATTEMPTS) -> Job:
+        """
+        Store a job for the workers
+
+        Raises:
+            UnknownJobKindError: If no handler is registered for ``kind``
+        """
+        if kind not in JOB_HANDLERS:
+            raise UnknownJobKindError(f"Unknown job kind '{kind}'")
+        job = Job(
+            user_id=user_id,
+            kind=kind,
+            payload=json.dumps(payload or {}),
+            max_attempts=max_attempts,
+            run_after=datetime.utcnow() + timedelta(seconds=delay_seconds)
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        job_workers.wake()
+        return job
+
+    @staticmethod
+    def get_job(db: Session, user_id: int, job_id: int) -> Optional[Job]:
+        return db.query(Job).filter(Job.id == job_id, Job.user_id == user_id).first()
+
+    @staticmethod
+    def list_jobs(db: Session, user_id: int, status: Optional[str] = None, limit: int = 50) -> List[Job]:
+        query = db.query(Job).filter(Job.user_id == user_id)
+        if status:
+            query = query.filter(Job.status == status)
+        return query.order_by(Job.id.desc()).limit(limit).all()
+
+    @staticmethod
+    def cancel(db: Session, job: Job) -> bool:
+        """
+        Cancel a job that no worker has claimed yet
+
+        Returns:
+            False if the job is already running or finished
+        """
+        cancelled = db.execute(
+            update(Job)
+            .where(Job.id == job.id, Job.status == "queued")
+            .values(status="cancelled", finished_at=datetime.utcnow())
+        ).rowcount
+        db.commit()
+        db.refresh(job)
+        return bool(cancelled)
+
+    @staticmethod
+    def status_counts(db: Session) -> Dict[str, int]:
+        return dict(db.execute(select(Job.status, func.count(Job.id)).group_by(Job.status)).all())
+
+    @staticmethod
+    def purge(db: Session, finished_before: datetime) -> int:
+        """
+        Delete finished jobs and their results older than a cutoff
+
+        Returns:
+            Number of jobs deleted
+        """
+        deleted = db.execute(
+            delete(Job).where(Job.status.in_(FINISHED_STATUSES), Job.finished_at < finished_before)
+        ).rowcount
+        db.commit()
+        return deleted
+
+    @staticmethod
+    def claim(db: Session, worker_id: str, lease_seconds: float = JOB_LEASE_SECONDS):
+        """
+        Atomically take the next job: one whose lease expired first, otherwise the oldest due one
+
+        Returns:
+            The claimed row (id, kind, user_id, payload, attempts, max_attempts, run_after) or None
+        """
+        now = datetime.utcnow()
+        row = db.execute(_CLAIM, {
+            "now": now, "worker_id": worker_id, "lease_expires_at": now + timedelta(seconds=lease_seconds)
+        }).first()
+        db.commit()
+        return row
+
+    @staticmethod
+    def finish(db: Session, job, worker_id: str, status: str, result: Optional[str] = None,
+               error: Optional[str] = None, run_after: Optional[datetime] = None) -> bool:
+        """
+        Record the outcome of a claimed job, unless another worker has taken it over since
+
+        Args:
+            job: The row returned by ``claim``
+            run_after: When a retry is due; keeps the original time when None
+
+        Returns:
+            False if this worker no longer holds the job
+        """
+        updated = db.execute(_FINISH, {
+            "job_id": job.id,
+            "worker_id": worker_id,
+            "status": status,
+            "result": result,
+            "error": error,
+            "run_after": run_after or job.run_after,
+            "finished_at": datetime.utcnow() if status in FINISHED_STATUSES else None
+        }).rowcount
+        db.commit()
+        return bool(updated)
+
+    @staticmethod
+    def renew(db: Session, job_ids: List[int], worker_id: str, lease_seconds: float = JOB_LEASE_SECONDS) -> int:
+        """Extend the leases of jobs this worker is running"""
+        renewed = db.execute(
+            update(Job)
+            .where(Job.id.in_(job_ids), Job.locked_by == worker_id, Job.status == "running")
+            .values(lease_expires_at=datetime.utcnow() + timedelta(seconds=lease_seconds))
+        ).rowcount
+        db.commit()
+        return renewed
+
+
+class JobWorkerPool:
+    """
+    Worker threads that claim and run jobs, plus one heartbeat thread renewing their leases
+
+    Each pool has its own worker id, so jobs it loses to lease expiry
+    cannot be completed by it afterwards. Counters cover this process only;
+    queue depth comes from the table.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], workers: int = JOB_WORKERS,
+                 lease_seconds: float = JOB_LEASE_SECONDS, poll_seconds: float = JOB_POLL_SECONDS,
+                 retry_base: float = RETRY_BASE_SECONDS, retry_max: float = RETRY_MAX_SECONDS):
+        self.session_factory = session_factory
+        self.workers = workers
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._threads: List[threading.Thread] = []
+        self._stopping = threading.Event()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._running: Dict[int, float] = {}
+        self.counters = {"claimed": 0, "succeeded": 0, "retried": 0, "failed": 0, "reclaimed": 0, "lost": 0}
+        self._completed_at = deque(maxlen=10000)
+        self._wait_ms = deque(maxlen=2000)
+        self._run_ms = deque(maxlen=2000)
+        self._started_at = time.monotonic()
+
+    def start(self) -> None:
+        """Start the workers and the heartbeat (idempotent; does nothing with zero workers)"""
+        if self._threads or self.workers <= 0:
+            return
+        self._stopping.clear()
+        self._started_at = time.monotonic()
+        for n in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{n}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        heartbeat = threading.Thread(target=self._heartbeat, name="job-heartbeat", daemon=True)
+        heartbeat.start()
+        self._threads.append(heartbeat)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop claiming; jobs already running finish first"""
+        self._stopping.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def wake(self) -> None:
+        """Tell idle workers that a job was just enqueued"""
+        self._wake.set()
+
+    def run_next(self, db: Session) -> bool:
+        """
+        Claim and run one job
+
+        Returns:
+            False if no job was due
+        """
+        job = JobService.claim(db, self.worker_id, self.lease_seconds)
+        if job is None:
+            return False
+        claimed_at = time.monotonic()
+        with self._lock:
+            self._running[job.id] = claimed_at
+            self.counters["claimed"] += 1
+            if job.attempts > 1:
+                self.counters["reclaimed"] += 1
+            self._wait_ms.append(max(0.0, (datetime.utcnow() - job.run_after).total_seconds() * 1000))
+        try:
+            outcome = self._execute(db, job)
+        finally:
+            with self._lock:
+                self._running.pop(job.id, None)
+        with self._lock:
+            self.counters[outcome] += 1
+            self._run_ms.append((time.monotonic() - claimed_at) * 1000)
+            if outcome in ("succeeded", "failed"):
+                self._completed_at.append(time.monotonic())
+        return True
+
+    def _execute(self, db: Session, job) -> str:
+        handler = JOB_HANDLERS.get(job.kind)
+        try:
+            if handler is None:
+                raise PermanentJobError(f"No handler for job kind '{job.kind}'")
+            if job.attempts > job.max_attempts:
+                raise PermanentJobError("Abandoned by its worker too many times")
+            # With sharding enabled a user's job reads and writes that user's shard
+            handler_db = db if database.shard_router is None or job.user_id is None else (
+                database.shard_router.session(job.user_id)
+            )
+            try:
+                result = json.dumps(handler(handler_db, job.user_id, json.loads(job.payload)), default=str)
+                if handler_db is not db:
+                    handler_db.commit()
+            finally:
+                if handler_db is not db:
+                    handler_db.close()
+        except Exception as e:
+            db.rollback()
+            error = f"{type(e).__name__}: {e}"
+            if isinstance(e, PermanentJobError) or job.attempts >= job.max_attempts:
+                finished = JobService.finish(db, job, self.worker_id, "failed", error=error)
+                return "failed" if finished else "lost"
+            run_after = datetime.utcnow() + timedelta(
+                seconds=retry_delay(job.attempts, self.retry_base, self.retry_max)
+            )
+            finished = JobService.finish(db, job, self.worker_id, "queued", error=error, run_after=run_after)
+            return "retried" if finished else "lost"
+        finished = JobService.finish(db, job, self.worker_id, "succeeded", result=result)
+        return "succeeded" if finished else "lost"
+
+    def _work(self) -> None:
+        while not self._stopping.is_set():
+            db = self.session_factory()
+            try:
+                ran = self.run_next(db)
+            except Exception as e:
+                print(f"Job worker error: {e}")
+                ran = False
+            finally:
+                db.close()
+            if not ran:
+                self._wake.wait(self.poll_seconds)
+                self._wake.clear()
+
+    def _heartbeat(self) -> None:
+        while not self._stopping.wait(self.lease_seconds / 3):
+            with self._lock:
+                job_ids = list(self._running)
+            if not job_ids:
+                continue
+            db = self.session_factory()
+            try:
+                JobService.renew(db, job_ids, self.worker_id, self.lease_seconds)
+            except Exception as e:
+                print(f"Job lease renewal failed: {e}")
+            finally:
+                db.close()
+
+    def stats(self) -> Dict[str, object]:
+        """Counters, throughput over the last minute and latency percentiles in milliseconds"""
+        def pct(samples, p):
+            if not samples:
+                return None
+            ordered = sorted(samples)
+            return round(ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))], 2)
+
+        now = time.monotonic()
+        window = min(60.0, max(now - self._started_at, 1e-9))
+        with self._lock:
+            recent = sum(1 for finished in self._completed_at if finished >= now - window)
+            running = len(self._running)
+        return {
+            **self.counters,
+            "worker_id": self.worker_id,
+            "workers": len([t for t in self._threads if t.name.startswith("job-worker")]),
+            "running": running,
+            "jobs_per_second_1m": round(recent / window, 2),
+            "queue_wait_p50_ms": pct(self._wait_ms, 50),
+            "queue_wait_p95_ms": pct(self._wait_ms, 95),
+            "run_p50_ms": pct(self._run_ms, 50),
+            "run_p95_ms": pct(self._run_ms, 95)
+        }
+
+
+job_workers = JobWorkerPool(SessionLocal)
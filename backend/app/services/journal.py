@@ -0,0 +1,136 @@
+"""
+Journal service: entries plus semantic "find similar entries" search over a per-user vector index
+"""
+from datetime import date
+from typing import List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.models.journal import JournalEntry
+from app.schemas.journal import JournalEntryCreate, JournalEntryUpdate
+from app.services.embeddings import Embedder, get_embedder
+from app.services.sync import SyncService
+from app.services.vector_index import VectorIndex, vector_store
+
+
+REINDEX_BATCH_SIZE = 2000
+
+embedder: Embedder = get_embedder()
+
+
+class JournalService:
+    """Service class for journal entries and their vector index"""
+
+    @staticmethod
+    def index(db: Session, user_id: int) -> VectorIndex:
+        """
+        The user's vector index, rebuilt from the database if it was made by another embedder
+        """
+        index = vector_store.get(user_id, embedder.dim, embedder.name)
+        if index.needs_rebuild:
+            JournalService.reindex(db, user_id, index)
+        return index
+
+    @staticmethod
+    def create_entry(db: Session, user_id: int, data: JournalEntryCreate) -> JournalEntry:
+        entry = JournalEntry(user_id=user_id, **data.model_dump())
+        SyncService.record_change(db, entry)
+        db.add(entry)
+        db.commit()
+        db.refresh(entry)
+        JournalService.index(db, user_id).upsert([entry.id], embedder.embed([entry.body]))
+        return entry
+
+    @staticmethod
+    def get_entry(db: Session, user_id: int, entry_id: int) -> Optional[JournalEntry]:
+        return (
+            db.query(JournalEntry)
+            .filter(JournalEntry.id == entry_id, JournalEntry.user_id == user_id, JournalEntry.deleted_at.is_(None))
+            .first()
+        )
+
+    @staticmethod
+    def list_entries(db: Session, user_id: int, start: Optional[date], end: Optional[date],
+                     limit: int) -> List[JournalEntry]:
+        query = db.query(JournalEntry).filter(JournalEntry.user_id == user_id, JournalEntry.deleted_at.is_(None))
+        if start:
+            query = query.filter(JournalEntry.entry_date >= start)
+        if end:
+            query = query.filter(JournalEntry.entry_date <= end)
+        return query.order_by(JournalEntry.entry_date.desc(), JournalEntry.id.desc()).limit(limit).all()
+
+    @staticmethod
+    def update_entry(db: Session, entry: JournalEntry, data: JournalEntryUpdate) -> JournalEntry:
+        """Edit an entry; its vector is replaced only when the text changed"""
+        old_body = entry.body
+        for field, value in data.model_dump(exclude_unset=True).items():
+            setattr(entry, field, value)
+        SyncService.record_change(db, entry)
+        db.commit()
+        db.refresh(entry)
+        if entry.body != old_body:
+            JournalService.index(db, entry.user_id).upsert([entry.id], embedder.embed([entry.body]))
+        return entry
+
+    @staticmethod
+    def delete_entry(db: Session, entry: JournalEntry) -> None:
+        SyncService.mark_deleted(db, entry)
+        db.commit()
+        JournalService.index(db, entry.user_id).remove([entry.id])
+
+    @staticmethod
+    def similar(db: Session, user_id: int, text: str, k: int = 10, kind: Optional[str] = None,
+                exclude_id: Optional[int] = None) -> List[Tuple[JournalEntry, float]]:
+        """
+        Entries most similar to ``text``, best first
+
+        The index is asked for extra candidates so that filtering by kind or
+        dropping the query entry itself still leaves ``k`` results.
+
+        Returns:
+            (entry, cosine similarity) pairs
+        """
+        index = JournalService.index(db, user_id)
+        query = embedder.embed([text])[0]
+        if not query.any():
+            return []
+        wanted = k + (1 if exclude_id is not None else 0)
+        hits = index.search(query, wanted * (4 if kind else 1))
+        scores = {entry_id: score for entry_id, score in hits if entry_id != exclude_id}
+        if not scores:
+            return []
+        query_rows = db.query(JournalEntry).filter(
+            JournalEntry.user_id == user_id,
+            JournalEntry.id.in_(list(scores)),
+            JournalEntry.deleted_at.is_(None)
+        )
+        if kind:
+            query_rows = query_rows.filter(JournalEntry.kind == kind)
+        entries = sorted(query_rows.all(), key=lambda entry: -scores[entry.id])
+        return [(entry, scores[entry.id]) for entry in entries[:k]]
+
+    @staticmethod
+    def reindex(db: Session, user_id: int, index: Optional[VectorIndex] = None) -> int:
+        """
+        Rebuild a user's index from the database, for repairs and embedder changes
+
+        Returns:
+            Number of entries indexed
+        """
+        index = index or vector_store.get(user_id, embedder.dim, embedder.name)
+        index.clear()
+        total = 0
+        last_id = 0
+        while True:
+            rows = (
+                db.query(JournalEntry.id, JournalEntry.body)
+                .filter(JournalEntry.user_id == user_id, JournalEntry.deleted_at.is_(None), JournalEntry.id > last_id)
+                .order_by(JournalEntry.id)
+                .limit(REINDEX_BATCH_SIZE)
+                .all()
+            )
+            if not rows:
+                break
+            index.upsert([row.id for row in rows], embedder.embed([row.body for row in rows]))
+            total += len(rows)
+            last_id = rows[-1].id
+        index.needs_rebuild = False
+        return total
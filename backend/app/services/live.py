@@ -0,0 +1,136 @@
+"""
+Live updates: in-process per-user fan-out of change notifications
+
+Write paths never talk to the broker directly. Every change sequence number
+allocated through SyncService is noted on the session, and once that session
+commits the highest new cursor is published to the user's subscribers.
+Nothing is published for rolled back work.
+"""
+import asyncio
+import threading
+from typing import Dict, Optional, Set
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+# Seconds between keep-alive comments on idle streams
+HEARTBEAT_SECONDS = 15.0
+
+_PENDING_KEY = "live_pending_cursors"
+
+
+class Subscriber:
+    """
+    One open connection's view of a user's change feed
+
+    State is a single coalesced cursor plus a wake-up event, so a slow or idle
+    consumer costs the same memory no matter how many changes it misses:
+    publishes overwrite the cursor and the consumer reads the latest value
+    when it is ready. Delivery never queues.
+    """
+    __slots__ = ("user_id", "cursor", "delivered", "loop", "_event", "_signaled")
+
+    def __init__(self, user_id: int, cursor: int, loop: asyncio.AbstractEventLoop):
+        self.user_id = user_id
+        self.cursor = cursor
+        self.delivered = cursor
+        self.loop = loop
+        self._event = asyncio.Event()
+        self._signaled = False
+
+    def notify(self, cursor: int) -> None:
+        """Record a newer cursor; safe to call from any thread"""
+        if cursor <= self.cursor:
+            return
+        self.cursor = cursor
+        if not self._signaled:
+            self._signaled = True
+            self.loop.call_soon_threadsafe(self._event.set)
+
+    async def next_cursor(self, timeout: float) -> Optional[int]:
+        """
+        Wait for a cursor newer than the last delivered one
+
+        Returns:
+            The latest cursor, or None if ``timeout`` passed without changes
+        """
+        if self.cursor <= self.delivered:
+            try:
+                await asyncio.wait_for(self._event.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        self._event.clear()
+        self._signaled = False
+        if self.cursor <= self.delivered:
+            return None
+        self.delivered = self.cursor
+        return self.delivered
+
+
+class LiveBroker:
+    """Registry of subscribers per user"""
+
+    def __init__(self):
+        self._subscribers: Dict[int, Set[Subscriber]] = {}
+        self._lock = threading.Lock()
+        self.published = 0
+
+    def subscribe(self, user_id: int, cursor: int) -> Subscriber:
+        """Register a connection; must be called from the event loop that will consume it"""
+        subscriber = Subscriber(user_id, cursor, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscriber.user_id)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._subscribers[subscriber.user_id]
+
+    def publish(self, user_id: int, cursor: int) -> int:
+        """
+        Tell every connection of a user that changes up to ``cursor`` exist
+
+        Returns:
+            Number of connections notified
+        """
+        with self._lock:
+            subscribers = tuple(self._subscribers.get(user_id, ()))
+        for subscriber in subscribers:
+            subscriber.notify(cursor)
+        self.published += 1
+        return len(subscribers)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "users": len(self._subscribers),
+                "connections": sum(len(s) for s in self._subscribers.values()),
+                "published": self.published
+            }
+
+
+live_broker = LiveBroker()
+
+
+def note_change(db: Session, user_id: int, seq: int) -> None:
+    """Remember a new change cursor, to be published when ``db`` commits"""
+    pending = db.info.setdefault(_PENDING_KEY, {})
+    if seq > pending.get(user_id, 0):
+        pending[user_id] = seq
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        for user_id, cursor in pending.items():
+            live_broker.publish(user_id, cursor)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
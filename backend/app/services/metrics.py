@@ -0,0 +1,238 @@
+"""
+Wellness metric store: raw samples, tiered rollups and compacted raw blocks
+"""
+import os
+from array import array
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+from app.models.metric import MetricPoint, MetricBlock, MetricRollup
+from app.utils import to_utc_naive
+
+
+# Rollup tiers from finest to coarsest, with their bucket width in seconds
+TIERS = (("hour", 3600), ("day", 86400), ("week", 7 * 86400))
+
+# Raw samples older than this are packed into per-day blocks
+RAW_RETENTION_DAYS = int(os.getenv("METRIC_RAW_RETENTION_DAYS", "30"))
+
+# Default number of points a series query aims for when no resolution is given
+DEFAULT_MAX_POINTS = 500
+
+
+def bucket_start(ts: datetime, tier: str) -> datetime:
+    """Start of the hour, day or week (Monday) bucket containing ``ts``"""
+    if tier == "hour":
+        return ts.replace(minute=0, second=0, microsecond=0)
+    day = ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    if tier == "week":
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def pack_block(samples: List[Tuple[int, float]]) -> bytes:
+    """Pack (second-of-day, value) pairs into offsets-then-values arrays"""
+    offsets = array("i", (offset for offset, _ in samples))
+    values = array("d", (value for _, value in samples))
+    return offsets.tobytes() + values.tobytes()
+
+
+def unpack_block(data: bytes, count: int) -> List[Tuple[int, float]]:
+    """Inverse of pack_block"""
+    offsets = array("i")
+    offsets.frombytes(data[:count * offsets.itemsize])
+    values = array("d")
+    values.frombytes(data[count * offsets.itemsize:])
+    return list(zip(offsets, values))
+
+
+class MetricService:
+    """Service class for wellness metric time series"""
+
+    @staticmethod
+    def record_points(db: Session, user_id: int, points: Iterable[Tuple[str, datetime, float]]) -> int:
+        """
+        Store raw samples and fold them into every rollup tier
+
+        Samples in the batch are pre-aggregated per bucket, so each touched
+        bucket costs one upsert regardless of how many samples fall into it.
+
+        Args:
+            db: Database session
+            user_id: Owner of the samples
+            points: (metric, timestamp, value) tuples
+
+        Returns:
+            Number of samples stored
+        """
+        raw = []
+        buckets: Dict[Tuple[str, str, datetime], List[float]] = {}
+        for metric, ts, value in points:
+            ts = to_utc_naive(ts)
+            raw.append({"user_id": user_id, "metric": metric, "ts": ts, "value": value})
+            for tier, _ in TIERS:
+                agg = buckets.get((metric, tier, bucket_start(ts, tier)))
+                if agg is None:
+                    buckets[(metric, tier, bucket_start(ts, tier))] = [1, value, value, value]
+                else:
+                    agg[0] += 1
+                    agg[1] += value
+                    agg[2] = min(agg[2], value)
+                    agg[3] = max(agg[3], value)
+        if not raw:
+            return 0
+
+        db.execute(insert(MetricPoint), raw)
+        stmt = insert(MetricRollup)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[MetricRollup.user_id, MetricRollup.metric, MetricRollup.tier, MetricRollup.bucket],
+            set_={
+                "count": MetricRollup.count + stmt.excluded.count,
+                "sum": MetricRollup.sum + stmt.excluded.sum,
+                "min": func.min(MetricRollup.min, stmt.excluded.min),
+                "max": func.max(MetricRollup.max, stmt.excluded.max),
+            }
+        )
+        db.execute(stmt, [
+            {"user_id": user_id, "metric": metric, "tier": tier, "bucket": bucket,
+             "count": agg[0], "sum": agg[1], "min": agg[2], "max": agg[3]}
+            for (metric, tier, bucket), agg in buckets.items()
+        ])
+        db.commit()
+        return len(raw)
+
+    @staticmethod
+    def compact(db: Session, before: Optional[datetime] = None, user_id: Optional[int] = None) -> int:
+        """
+        Pack raw samples older than ``before`` into one block row per day
+
+        Args:
+            db: Database session
+            before: Cut-off; defaults to the start of the day RAW_RETENTION_DAYS ago
+            user_id: Only compact this user; all users when None
+
+        Returns:
+            Number of raw samples compacted
+        """
+        if before is None:
+            before = bucket_start(datetime.utcnow() - timedelta(days=RAW_RETENTION_DAYS), "day")
+        conditions = [MetricPoint.ts < before]
+        if user_id is not None:
+            conditions.append(MetricPoint.user_id == user_id)
+
+        groups: Dict[Tuple[int, str, date], List[Tuple[int, float]]] = {}
+        rows = db.execute(
+            select(MetricPoint.user_id, MetricPoint.metric, MetricPoint.ts, MetricPoint.value)
+            .where(*conditions)
+            .order_by(MetricPoint.user_id, MetricPoint.metric, MetricPoint.ts)
+        )
+        compacted = 0
+        for row in rows:
+            day_start = bucket_start(row.ts, "day")
+            offset = int((row.ts - day_start).total_seconds())
+            groups.setdefault((row.user_id, row.metric, day_start.date()), []).append((offset, row.value))
+            compacted += 1
+
+        for (uid, metric, day), samples in groups.items():
+            block = db.get(MetricBlock, (uid, metric, day))
+            if block is not None:
+                samples = sorted(unpack_block(block.data, block.count) + samples)
+                block.count = len(samples)
+                block.data = pack_block(samples)
+            else:
+                db.add(MetricBlock(user_id=uid, metric=metric, day=day, count=len(samples), data=pack_block(samples)))
+
+        db.execute(delete(MetricPoint).where(*conditions))
+        db.commit()
+        return compacted
+
+    @staticmethod
+    def choose_tier(start: datetime, end: datetime, resolution: Optional[int] = None,
+                    max_points: int = DEFAULT_MAX_POINTS) -> Tuple[str, int]:
+        """
+        Pick the coarsest tier whose buckets are no wider than the resolution
+
+        Args:
+            start: Range start
+            end: Range end
+            resolution: Wanted seconds per point; derived from max_points when None
+            max_points: Target number of points when no resolution is given
+
+        Returns:
+            (tier name, resolution in seconds); tier is "raw" when no rollup is fine enough
+        """
+        if resolution is None:
+            resolution = max(1, int((end - start).total_seconds() // max_points))
+        chosen = "raw"
+        for tier, width in TIERS:
+            if width <= resolution:
+                chosen = tier
+        return chosen, resolution
+
+    @staticmethod
+    def series(db: Session, user_id: int, metric: str, start: datetime, end: datetime,
+               resolution: Optional[int] = None, max_points: int = DEFAULT_MAX_POINTS) -> Dict[str, object]:
+        """
+        Read a metric series from the coarsest tier that satisfies the request
+
+        Returns:
+            Dictionary with the tier used, rows read and the points
+        """
+        start, end = to_utc_naive(start), to_utc_naive(end)
+        tier, resolution = MetricService.choose_tier(start, end, resolution, max_points)
+        if tier == "raw":
+            points, rows_read = MetricService._raw_series(db, user_id, metric, start, end)
+        else:
+            rollups = db.execute(
+                select(MetricRollup.bucket, MetricRollup.count, MetricRollup.sum, MetricRollup.min, MetricRollup.max)
+                .where(
+                    MetricRollup.user_id == user_id,
+                    MetricRollup.metric == metric,
+                    MetricRollup.tier == tier,
+                    MetricRollup.bucket >= bucket_start(start, tier),
+                    MetricRollup.bucket <= end
+                )
+                .order_by(MetricRollup.bucket)
+            ).all()
+            points = [
+                {"ts": row.bucket, "avg": row.sum / row.count, "min": row.min, "max": row.max, "count": row.count}
+                for row in rollups
+            ]
+            rows_read = len(rollups)
+        return {"metric": metric, "tier": tier, "resolution_seconds": resolution,
+                "rows_read": rows_read, "points": points}
+
+    @staticmethod
+    def _raw_series(db: Session, user_id: int, metric: str, start: datetime, end: datetime):
+        samples = []
+        blocks = db.execute(
+            select(MetricBlock.day, MetricBlock.count, MetricBlock.data)
+            .where(
+                MetricBlock.user_id == user_id,
+                MetricBlock.metric == metric,
+                MetricBlock.day >= start.date(),
+                MetricBlock.day <= end.date()
+            )
+        ).all()
+        for block in blocks:
+            day_start = datetime.combine(block.day, datetime.min.time())
+            for offset, value in unpack_block(block.data, block.count):
+                ts = day_start + timedelta(seconds=offset)
+                if start <= ts <= end:
+                    samples.append((ts, value))
+
+        raw = db.execute(
+            select(MetricPoint.ts, MetricPoint.value)
+            .where(
+                MetricPoint.user_id == user_id,
+                MetricPoint.metric == metric,
+                MetricPoint.ts >= start,
+                MetricPoint.ts <= end
+            )
+        ).all()
+        samples.extend((row.ts, row.value) for row in raw)
+        samples.sort()
+        points = [{"ts": ts, "avg": value, "min": value, "max": value, "count": 1} for ts, value in samples]
+        return points, len(blocks) + len(raw)
@@ -0,0 +1,137 @@
+"""
+Compact binary responses: MessagePack with columnar-packed rows for clients that ask for it
+
+A client that sends ``Accept: application/msgpack`` gets list and sync
+payloads as MessagePack, with each list of rows turned into columns so the
+field names travel once per page instead of once per row:
+
+    {"fields": ["id", "title", ...], "columns": [[1, 2, ...], ["Run", "Read", ...], ...], "count": 2}
+
+Values are exactly those of the JSON response (dates stay ISO strings), so
+a client decodes both formats into the same objects. Everyone else keeps
+getting JSON.
+"""
+from typing import Any, Dict, List, Optional, Type
+import msgpack
+from fastapi import Header, Response
+from pydantic import BaseModel, TypeAdapter
+
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack", "application/vnd.msgpack")
+
+_adapters: Dict[type, TypeAdapter] = {}
+
+
+def prefers_msgpack(accept: Optional[str]) -> bool:
+    """
+    Whether an Accept header asks for MessagePack over JSON
+
+    MessagePack must be listed explicitly, with a quality above any explicit
+    JSON entry and at least that of a wildcard.
+    """
+    if not accept or "msgpack" not in accept:
+        return False
+    msgpack_q = json_q = wildcard_q = 0.0
+    for part in accept.split(","):
+        media, _, params = part.partition(";")
+        media = media.strip().lower()
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if media in MSGPACK_MEDIA_TYPES:
+            msgpack_q = max(msgpack_q, q)
+        elif media == "application/json":
+            json_q = max(json_q, q)
+        elif media in ("*/*", "application/*"):
+            wildcard_q = max(wildcard_q, q)
+    return msgpack_q > 0 and msgpack_q > json_q and msgpack_q >= wildcard_q
+
+
+def wants_msgpack(response: Response, accept: Optional[str] = Header(None)) -> bool:
+    """
+    Dependency: True when the client negotiated MessagePack
+
+    Also marks the response as varying by Accept, so caches keep the two
+    representations apart.
+    """
+    response.headers["Vary"] = "Accept"
+    return prefers_msgpack(accept)
+
+
+def pack_columns(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Turn a list of row dictionaries into field names plus one list per field
+
+    Fields come in order of first appearance; a row without a field gets None.
+    """
+    fields: Dict[str, None] = {}
+    for row in rows:
+        for name in row:
+            if name not in fields:
+                fields[name] = None
+    return {
+        "fields": list(fields),
+        "columns": [[row.get(name) for row in rows] for name in fields],
+        "count": len(rows)
+    }
+
+
+def unpack_columns(packed: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Inverse of ``pack_columns``"""
+    return [dict(zip(packed["fields"], values)) for values in zip(*packed["columns"])] if packed["fields"] else []
+
+
+def pack_sync_page(page: Dict[str, Any]) -> Dict[str, Any]:
+    """Columnar form of a change feed page: each table's upserts become columns, deletes stay id lists"""
+    return {
+        "cursor": page["cursor"],
+        "has_more": page["has_more"],
+        "changes": {
+            table: {"upserts": pack_columns(changes["upserts"]), "deletes": changes["deletes"]}
+            for table, changes in page["changes"].items()
+        }
+    }
+
+
+def _to_json_rows(rows: list, schema: Type[BaseModel]) -> List[Dict[str, Any]]:
+    # The same validation and JSON-mode dump FastAPI applies for response_model=List[schema]
+    adapter = _adapters.get(schema)
+    if adapter is None:
+        adapter = _adapters[schema] = TypeAdapter(List[schema])
+    return adapter.dump_python(adapter.validate_python(rows, from_attributes=True), mode="json")
+
+
+class MsgPackResponse(Response):
+    """Response rendered with MessagePack"""
+    media_type = MSGPACK_MEDIA_TYPE
+
+    def render(self, content: Any) -> bytes:
+        return msgpack.packb(content, use_bin_type=True)
+
+
+def packed_rows(rows: list, schema: Optional[Type[BaseModel]] = None) -> MsgPackResponse:
+    """
+    MessagePack response for a list endpoint
+
+    Args:
+        rows: ORM objects or dictionaries, as the endpoint returns them for JSON
+        schema: The endpoint's response model for one row; None when the rows
+            are already JSON-ready dictionaries
+
+    Returns:
+        Response holding the columnar-packed rows
+    """
+    if schema is not None:
+        rows = _to_json_rows(rows, schema)
+    return MsgPackResponse(pack_columns(rows), headers={"Vary": "Accept"})
+
+
+def packed_sync_page(page: Dict[str, Any]) -> MsgPackResponse:
+    """MessagePack response for a change feed page"""
+    return MsgPackResponse(pack_sync_page(page), headers={"Vary": "Accept"})
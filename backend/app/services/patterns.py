@@ -0,0 +1,125 @@
+"""
+Productivity pattern engine: vectorized time-of-day, weekday and trend analysis with NumPy
+"""
+from datetime import datetime, timedelta
+from typing import Dict
+import numpy as np
+from sqlalchemy import Integer, cast, func, or_, select
+from sqlalchemy.orm import Session
+from app.models.task import Task
+
+
+SECONDS_PER_DAY = 86400
+
+
+def _epoch(column):
+    """SQL expression converting a stored timestamp to integer epoch seconds"""
+    return cast(func.strftime("%s", column), Integer)
+
+
+class PatternService:
+    """Service class for productivity pattern analysis"""
+
+    @staticmethod
+    def load_columns(db: Session, user_id: int, since: datetime) -> Dict[str, np.ndarray]:
+        """
+        Fetch task timestamps as columnar int64 arrays of epoch seconds
+
+        Only the two needed columns are selected and converted to integers in
+        SQL; no ORM objects are built. Tasks that are not completed have a
+        completed value of -1.
+
+        Args:
+            db: Database session
+            user_id: Owner of the tasks
+            since: Ignore tasks neither created nor completed after this moment
+
+        Returns:
+            Dictionary with "created" and "completed" arrays
+        """
+        result = db.execute(
+            select(_epoch(Task.created_at), func.coalesce(_epoch(Task.completed_at), -1))
+            .where(
+                Task.user_id == user_id,
+                Task.deleted_at.is_(None),
+                or_(Task.created_at >= since, Task.completed_at >= since)
+            )
+        )
+        flat = np.fromiter(
+            (value for row in result for value in row),
+            dtype=np.int64
+        )
+        pairs = flat.reshape(-1, 2)
+        return {"created": pairs[:, 0], "completed": pairs[:, 1]}
+
+    @staticmethod
+    def compute(created: np.ndarray, completed: np.ndarray, start: int, days: int,
+                window: int = 7, tz_offset_seconds: int = 0) -> Dict[str, object]:
+        """
+        Compute productivity series from epoch-second arrays
+
+        Args:
+            created: Task creation times
+            completed: Task completion times (-1 when not completed)
+            start: Epoch seconds of the first day of the range (UTC midnight)
+            days: Number of days in the range
+            window: Rolling window in days for the completion rate
+            tz_offset_seconds: Offset added before bucketing into local hours/days
+
+        Returns:
+            Dictionary with heatmap, weekday histogram, daily series,
+            rolling completion rate and trend line
+        """
+        done = completed[(completed >= start) & (completed < start + days * SECONDS_PER_DAY)]
+        local_done = done + tz_offset_seconds
+        # 1970-01-01 was a Thursday; shift so Monday is 0
+        weekday = (local_done // SECONDS_PER_DAY + 3) % 7
+        hour = (local_done % SECONDS_PER_DAY) // 3600
+        heatmap = np.bincount(weekday * 24 + hour, minlength=7 * 24).reshape(7, 24)
+
+        daily_done = np.bincount((done - start) // SECONDS_PER_DAY, minlength=days)[:days]
+        in_range = created[(created >= start) & (created < start + days * SECONDS_PER_DAY)]
+        daily_created = np.bincount((in_range - start) // SECONDS_PER_DAY, minlength=days)[:days]
+
+        # Rolling sums via cumulative sums: O(days) independent of window size
+        window = max(1, min(window, days))
+        done_cum = np.concatenate(([0], np.cumsum(daily_done)))
+        created_cum = np.concatenate(([0], np.cumsum(daily_created)))
+        lo = np.maximum(np.arange(1, days + 1) - window, 0)
+        rolling_done = done_cum[1:] - done_cum[lo]
+        rolling_created = created_cum[1:] - created_cum[lo]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rolling_rate = np.where(rolling_created > 0, rolling_done / np.maximum(rolling_created, 1), np.nan)
+
+        if days >= 2:
+            slope, intercept = np.polyfit(np.arange(days, dtype=np.float64), daily_done.astype(np.float64), 1)
+        else:
+            slope, intercept = 0.0, float(daily_done[0]) if days else 0.0
+
+        return {
+            "heatmap": heatmap.tolist(),
+            "weekday": heatmap.sum(axis=1).tolist(),
+            "hourly": heatmap.sum(axis=0).tolist(),
+            "daily_completed": daily_done.tolist(),
+            "daily_created": daily_created.tolist(),
+            "rolling_completion_rate": [None if np.isnan(v) else round(float(v), 4) for v in rolling_rate],
+            "trend": {"slope_per_day": round(float(slope), 6), "intercept": round(float(intercept), 4)}
+        }
+
+    @staticmethod
+    def patterns(db: Session, user_id: int, days: int = 90, window: int = 7,
+                 tz_offset_minutes: int = 0) -> Dict[str, object]:
+        """
+        Productivity patterns for the last ``days`` days ending today (UTC)
+        """
+        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        start = today - timedelta(days=days - 1)
+        columns = PatternService.load_columns(db, user_id, start - timedelta(days=window))
+        start_epoch = int((start - datetime(1970, 1, 1)).total_seconds())
+        result = PatternService.compute(
+            columns["created"], columns["completed"], start_epoch, days,
+            window=window, tz_offset_seconds=tz_offset_minutes * 60
+        )
+        result["start"] = start.date().isoformat()
+        result["days"] = days
+        return result
@@ -0,0 +1,138 @@
+"""
+Rollup service: incremental maintenance and backfill of daily analytics counters
+"""
+from datetime import date, timedelta
+from typing import Optional
+from sqlalchemy import func, select, delete
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+from app.models.rollup import DailyRollup
+from app.models.task import Task
+from app.models.habit import Habit, HabitYear
+
+
+# Counter columns that can be adjusted through RollupService.apply
+ROLLUP_COUNTERS = ("tasks_created", "tasks_completed", "habit_checkins")
+
+
+class RollupService:
+    """Service class for daily rollup maintenance"""
+
+    @staticmethod
+    def apply(db: Session, user_id: int, day: date, category: str, **deltas: int) -> None:
+        """
+        Add deltas to one rollup row, creating it if needed
+
+        Must run in the same transaction as the write that caused it.
+
+        Args:
+            db: Database session
+            user_id: Owner of the activity
+            day: Day the activity is attributed to
+            category: Category bucket
+            **deltas: Counter name to increment (may be negative)
+        """
+        deltas = {name: value for name, value in deltas.items() if value}
+        if not deltas:
+            return
+        unknown = set(deltas) - set(ROLLUP_COUNTERS)
+        if unknown:
+            raise ValueError(f"Unknown rollup counters: {sorted(unknown)}")
+
+        stmt = insert(DailyRollup).values(user_id=user_id, day=day, category=category, **deltas)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[DailyRollup.user_id, DailyRollup.day, DailyRollup.category],
+            set_={name: getattr(DailyRollup, name) + getattr(stmt.excluded, name) for name in deltas}
+        )
+        db.execute(stmt)
+
+    @staticmethod
+    def task_contribution(db: Session, task: Task, sign: int) -> None:
+        """
+        Add (sign=1) or remove (sign=-1) a task's contribution to the rollups
+
+        Updates are expressed as "remove old state, add new state", which keeps
+        category changes and reopened tasks correct without special cases.
+        """
+        RollupService.apply(db, task.user_id, task.created_at.date(), task.category, tasks_created=sign)
+        if task.status == "done" and task.completed_at:
+            RollupService.apply(db, task.user_id, task.completed_at.date(), task.category, tasks_completed=sign)
+
+    @staticmethod
+    def get_range(db: Session, user_id: int, start: date, end: date):
+        """
+        Get rollup rows for a user between two days (inclusive)
+
+        Returns:
+            List of DailyRollup rows ordered by day
+        """
+        return (
+            db.query(DailyRollup)
+            .filter(DailyRollup.user_id == user_id, DailyRollup.day >= start, DailyRollup.day <= end)
+            .order_by(DailyRollup.day, DailyRollup.category)
+            .all()
+        )
+
+    @staticmethod
+    def rebuild(db: Session, user_id: Optional[int] = None) -> int:
+        """
+        Recompute rollups from raw history, for backfills and repairs
+
+        Args:
+            db: Database session
+            user_id: Only rebuild this user; all users when None
+
+        Returns:
+            Number of rollup rows written
+        """
+        clear = delete(DailyRollup)
+        live = [Task.deleted_at.is_(None)]
+        if user_id is not None:
+            clear = clear.where(DailyRollup.user_id == user_id)
+            live.append(Task.user_id == user_id)
+        db.execute(clear)
+
+        counters = {}
+        created_day = func.date(Task.created_at)
+        for row in db.execute(
+            select(Task.user_id, created_day.label("day"), Task.category, func.count(Task.id).label("n"))
+            .where(*live)
+            .group_by(Task.user_id, created_day, Task.category)
+        ):
+            counters.setdefault((row.user_id, row.day, row.category), {})["tasks_created"] = row.n
+
+        completed_day = func.date(Task.completed_at)
+        for row in db.execute(
+            select(Task.user_id, completed_day.label("day"), Task.category, func.count(Task.id).label("n"))
+            .where(*live, Task.status == "done", Task.completed_at.is_not(None))
+            .group_by(Task.user_id, completed_day, Task.category)
+        ):
+            counters.setdefault((row.user_id, row.day, row.category), {})["tasks_completed"] = row.n
+
+        habit_filter = [Habit.deleted_at.is_(None)]
+        if user_id is not None:
+            habit_filter.append(Habit.user_id == user_id)
+        for row in db.execute(
+            select(Habit.user_id, Habit.category, HabitYear.year, HabitYear.bits)
+            .join(HabitYear, HabitYear.habit_id == Habit.id)
+            .where(*habit_filter)
+        ):
+            value = int.from_bytes(row.bits, "little")
+            start = date(row.year, 1, 1)
+            while value:
+                index = (value & -value).bit_length() - 1
+                day = (start + timedelta(days=index)).isoformat()
+                key = (row.user_id, day, row.category)
+                counters.setdefault(key, {})
+                counters[key]["habit_checkins"] = counters[key].get("habit_checkins", 0) + 1
+                value &= value - 1
+
+        rows = [
+            {"user_id": uid, "day": date.fromisoformat(day), "category": category,
+             **{name: values.get(name, 0) for name in ROLLUP_COUNTERS}}
+            for (uid, day, category), values in counters.items()
+        ]
+        if rows:
+            db.execute(insert(DailyRollup), rows)
+        db.commit()
+        return len(rows)
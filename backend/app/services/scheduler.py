@@ -0,0 +1,654 @@
+"""
+Time-block scheduler: greedy earliest-deadline placement with repair, and incremental re-planning
+
+The engine works on integer minutes from the start of the planning horizon
+and has no database access; ScheduleService translates tasks, busy blocks
+and working hours into that form and stores the resulting blocks.
+"""
+import heapq
+import json
+import time
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+from app.models.schedule import BusyBlock, TaskDependency, SchedulePlan, ScheduleBlock
+from app.models.task import Task
+
+
+MINUTES_PER_DAY = 1440
+DEFAULT_ESTIMATE_MINUTES = 30
+NO_DEADLINE = 1 << 40
+# Late tasks the repair pass tries to move per plan
+MAX_REPAIRS = 200
+
+Interval = Tuple[int, int]
+
+
+class DependencyError(ValueError):
+    """Raised when a dependency points at a missing task or at the task itself"""
+
+
+class PlanTask:
+    """A task as the engine sees it; ``deadline`` is in horizon minutes"""
+    __slots__ = ("id", "minutes", "priority", "deadline", "depends_on", "rank")
+
+    def __init__(self, id: int, minutes: int, priority: int = 2, deadline: Optional[int] = None,
+                 depends_on: Iterable[int] = ()):
+        self.id = id
+        self.minutes = minutes
+        self.priority = priority
+        self.deadline = deadline
+        self.depends_on = tuple(depends_on)
+        self.rank = (priority, NO_DEADLINE if deadline is None else deadline, id)
+
+
+class FreeTime:
+    """
+    Sorted, non-overlapping free intervals with bisect lookups
+
+    Starts and ends are kept in parallel lists so the interval holding a
+    minute is found in O(log n).
+    """
+
+    def __init__(self, intervals: Iterable[Interval] = ()):
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        for start, end in sorted(intervals):
+            if end > start:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    def copy(self) -> "FreeTime":
+        clone = FreeTime()
+        clone.starts = list(self.starts)
+        clone.ends = list(self.ends)
+        return clone
+
+    def intervals(self) -> List[Interval]:
+        return list(zip(self.starts, self.ends))
+
+    def find(self, earliest: int, minutes: int, min_chunk: int) -> Optional[List[Interval]]:
+        """
+        Earliest chunks totalling ``minutes`` at or after ``earliest``, without taking them
+
+        Free gaps shorter than ``min_chunk`` are skipped unless they fit the
+        whole remainder.
+
+        Returns:
+            List of (start, end) chunks, or None if the horizon has no room
+        """
+        index = bisect_right(self.starts, earliest) - 1
+        if index < 0 or self.ends[index] <= earliest:
+            index += 1
+        remaining = minutes
+        chunks = []
+        while remaining > 0 and index < len(self.starts):
+            start = max(self.starts[index], earliest)
+            length = self.ends[index] - start
+            if length >= min(min_chunk, remaining):
+                taken = min(length, remaining)
+                chunks.append((start, start + taken))
+                remaining -= taken
+            index += 1
+        return chunks if remaining == 0 else None
+
+    def covers(self, chunks: Iterable[Interval]) -> bool:
+        """Whether every chunk lies inside a free interval"""
+        for start, end in chunks:
+            index = bisect_right(self.starts, start) - 1
+            if index < 0 or self.ends[index] < end:
+                return False
+        return True
+
+    def occupy(self, chunks: Iterable[Interval]) -> None:
+        """Remove chunks that lie inside free intervals"""
+        for start, end in chunks:
+            index = bisect_right(self.starts, start) - 1
+            if index < 0 or self.ends[index] < end:
+                raise ValueError(f"Interval {start}-{end} is not free")
+            left_start, right_end = self.starts[index], self.ends[index]
+            if left_start < start and end < right_end:
+                self.ends[index] = start
+                self.starts.insert(index + 1, end)
+                self.ends.insert(index + 1, right_end)
+            elif left_start < start:
+                self.ends[index] = start
+            elif end < right_end:
+                self.starts[index] = end
+            else:
+                del self.starts[index]
+                del self.ends[index]
+
+    def release(self, chunks: Iterable[Interval]) -> None:
+        """Give chunks back, merging them with adjacent free intervals"""
+        for start, end in chunks:
+            index = bisect_right(self.starts, start)
+            if index > 0 and self.ends[index - 1] == start:
+                index -= 1
+                self.ends[index] = end
+            else:
+                self.starts.insert(index, start)
+                self.ends.insert(index, end)
+            if index + 1 < len(self.starts) and self.starts[index + 1] == self.ends[index]:
+                self.ends[index] = self.ends[index + 1]
+                del self.starts[index + 1]
+                del self.ends[index + 1]
+
+
+def subtract(windows: List[Interval], busy: List[Interval]) -> List[Interval]:
+    """Remove busy intervals from sorted working windows"""
+    busy = sorted(busy)
+    free = []
+    pointer = 0
+    for start, end in windows:
+        while pointer < len(busy) and busy[pointer][1] <= start:
+            pointer += 1
+        cursor = start
+        scan = pointer
+        while scan < len(busy) and busy[scan][0] < end:
+            if busy[scan][0] > cursor:
+                free.append((cursor, busy[scan][0]))
+            cursor = max(cursor, busy[scan][1])
+            scan += 1
+        if cursor < end:
+            free.append((cursor, end))
+    return free
+
+
+class PlanResult:
+    """Blocks per task plus tasks that could not be placed or miss their deadline"""
+
+    def __init__(self):
+        self.blocks: Dict[int, List[Interval]] = {}
+        self.unscheduled: Dict[int, str] = {}
+        self.late: Set[int] = set()
+        self.repaired = 0
+
+    def finish(self, task_id: int) -> int:
+        return self.blocks[task_id][-1][1]
+
+
+def _dependents(tasks: List[PlanTask], by_id: Dict[int, PlanTask]) -> Dict[int, List[int]]:
+    dependents: Dict[int, List[int]] = {task.id: [] for task in tasks}
+    for task in tasks:
+        for dep in task.depends_on:
+            if dep in by_id:
+                dependents[dep].append(task.id)
+    return dependents
+
+
+def rank_tasks(tasks: List[PlanTask], dependents: Dict[int, List[int]]) -> None:
+    """
+    Set each task's placement rank: (priority, deadline, id), inherited by prerequisites
+
+    A prerequisite is as important as the most important task waiting on it,
+    and must finish early enough to leave that task room before its
+    deadline. Tasks on dependency cycles keep their own rank.
+    """
+    by_id = {task.id: task for task in tasks}
+    remaining = {task.id: len(dependents[task.id]) for task in tasks}
+    stack = [task.id for task in tasks if remaining[task.id] == 0]
+    for task in tasks:
+        task.rank = (task.priority, NO_DEADLINE if task.deadline is None else task.deadline, task.id)
+    while stack:
+        task = by_id[stack.pop()]
+        for dep in task.depends_on:
+            prerequisite = by_id.get(dep)
+            if prerequisite is None:
+                continue
+            priority, deadline, _ = prerequisite.rank
+            if task.rank[1] < NO_DEADLINE:
+                deadline = min(deadline, task.rank[1] - task.minutes)
+            prerequisite.rank = (min(priority, task.rank[0]), deadline, prerequisite.id)
+            remaining[dep] -= 1
+            if remaining[dep] == 0:
+                stack.append(dep)
+
+
+def plan(tasks: List[PlanTask], free: FreeTime, min_chunk: int = 25,
+         fixed_finish: Optional[Dict[int, int]] = None) -> PlanResult:
+    """
+    Place tasks into free time
+
+    Greedy list scheduling: tasks become ready once their dependencies are
+    placed, and the best ranked ready task (priority, then deadline) takes
+    the earliest free chunks after its dependencies finish. Deadlines are
+    then enforced by a repair pass that pulls late tasks forward past work
+    with later or no deadlines.
+
+    Args:
+        tasks: Tasks to place
+        free: Free time, consumed in place
+        min_chunk: Shortest block a task is split into
+        fixed_finish: Finish minute of already placed tasks other tasks may depend on
+
+    Returns:
+        PlanResult
+    """
+    fixed_finish = fixed_finish or {}
+    result = PlanResult()
+    by_id = {task.id: task for task in tasks}
+    dependents = _dependents(tasks, by_id)
+    rank_tasks(tasks, dependents)
+    waiting = {task.id: sum(1 for dep in task.depends_on if dep in by_id) for task in tasks}
+
+    ready = [task.rank for task in tasks if waiting[task.id] == 0]
+    heapq.heapify(ready)
+    while ready:
+        task = by_id[heapq.heappop(ready)[2]]
+        if any(dep in result.unscheduled for dep in task.depends_on):
+            result.unscheduled[task.id] = "dependency_unscheduled"
+        else:
+            chunks = free.find(_earliest(task, result, fixed_finish), task.minutes, min_chunk)
+            if chunks is None:
+                result.unscheduled[task.id] = "no_capacity"
+            else:
+                free.occupy(chunks)
+                result.blocks[task.id] = chunks
+                if task.deadline is not None and chunks[-1][1] > task.deadline:
+                    result.late.add(task.id)
+        for child in dependents[task.id]:
+            waiting[child] -= 1
+            if waiting[child] == 0:
+                heapq.heappush(ready, by_id[child].rank)
+
+    for task in tasks:
+        if task.id not in result.blocks and task.id not in result.unscheduled:
+            result.unscheduled[task.id] = "dependency_cycle"
+
+    if result.late:
+        _repair(result, by_id, dependents, free, min_chunk, fixed_finish)
+    return result
+
+
+def _earliest(task: PlanTask, result: PlanResult, fixed_finish: Dict[int, int]) -> int:
+    earliest = 0
+    for dep in task.depends_on:
+        if dep in result.blocks:
+            earliest = max(earliest, result.finish(dep))
+        elif dep in fixed_finish:
+            earliest = max(earliest, fixed_finish[dep])
+    return earliest
+
+
+def _repair(result: PlanResult, by_id: Dict[int, PlanTask], dependents: Dict[int, List[int]],
+            free: FreeTime, min_chunk: int, fixed_finish: Dict[int, int]) -> None:
+    """
+    Move late tasks before their deadline by displacing work with later or no deadlines
+
+    Only tasks nothing placed depends on are displaced, latest first, until
+    the late task fits. The displaced tasks are then placed again, earliest
+    deadline first; if any of them can no longer be placed, or becomes late,
+    the whole move is rolled back, so a repair never makes the plan worse.
+    """
+    for task_id in sorted(result.late, key=lambda i: (by_id[i].deadline, i))[:MAX_REPAIRS]:
+        task = by_id[task_id]
+        earliest = _earliest(task, result, fixed_finish)
+        if earliest + task.minutes > task.deadline:
+            continue
+        candidates = sorted(
+            (
+                other for other, blocks in result.blocks.items()
+                if other != task_id
+                and by_id[other].rank[1] > task.deadline
+                and blocks[0][0] < task.deadline and blocks[-1][1] > earliest
+                and not any(child in result.blocks for child in dependents[other])
+            ),
+            key=lambda other: result.blocks[other][0][0],
+            reverse=True
+        )
+        original = {task_id: result.blocks.pop(task_id)}
+        free.release(original[task_id])
+        chunks = free.find(earliest, task.minutes, min_chunk)
+        for other in candidates:
+            if chunks is not None and chunks[-1][1] <= task.deadline:
+                break
+            original[other] = result.blocks.pop(other)
+            free.release(original[other])
+            chunks = free.find(earliest, task.minutes, min_chunk)
+
+        moved = {}
+        if chunks is not None and chunks[-1][1] <= task.deadline:
+            free.occupy(chunks)
+            moved[task_id] = chunks
+            for other in sorted(original, key=lambda o: (by_id[o].rank[1], by_id[o].rank)):
+                if other == task_id:
+                    continue
+                deadline = by_id[other].deadline
+                placed = free.find(_earliest(by_id[other], result, fixed_finish), by_id[other].minutes, min_chunk)
+                if placed is None or (deadline is not None and placed[-1][1] > deadline and other not in result.late):
+                    break
+                free.occupy(placed)
+                moved[other] = placed
+
+        if len(moved) < len(original):
+            for blocks in moved.values():
+                free.release(blocks)
+            for blocks in original.values():
+                free.occupy(blocks)
+            result.blocks.update(original)
+            continue
+        result.blocks.update(moved)
+        result.late.discard(task_id)
+        for other, blocks in moved.items():
+            if other in result.late and blocks[-1][1] <= by_id[other].deadline:
+                result.late.discard(other)
+        result.repaired += 1
+
+
+def _landing(task: PlanTask, by_id: Dict[int, PlanTask], affected: Set[int], free: FreeTime,
+             previous: Dict[int, List[Interval]], min_chunk: int) -> int:
+    """
+    Start minute ``task`` would get next to the previous blocks of higher ranked tasks
+
+    Blocks of tasks with a deadline count as taken whatever their rank: the
+    repair pass may have pulled them ahead of better ranked work.
+    """
+    probe = free.copy()
+    for other, blocks in previous.items():
+        if other in by_id and other not in affected and (
+            by_id[other].rank < task.rank or by_id[other].deadline is not None
+        ):
+            probe.occupy(blocks)
+    earliest = max((previous[dep][-1][1] for dep in task.depends_on if dep in previous), default=0)
+    chunks = probe.find(earliest, task.minutes, min_chunk)
+    return chunks[0][0] if chunks else NO_DEADLINE
+
+
+def replan(tasks: List[PlanTask], free: FreeTime, previous: Dict[int, List[Interval]], changed: Set[int],
+           min_chunk: int = 25) -> Tuple[PlanResult, int]:
+    """
+    Re-plan after some tasks changed, keeping the unaffected head of the previous plan
+
+    Greedy placement puts a task at the earliest time left free by the tasks
+    ranked above it, so a changed task disturbs nothing before the earlier
+    of its old slot and where it would land now. Every block that ends before
+    that point stays where it is and only the tail is solved again. A task
+    whose old blocks are no longer free (a busy block was added over them)
+    counts as changed.
+
+    Args:
+        tasks: Current tasks (changed ones included, removed ones absent)
+        free: Free time of the whole horizon before any task was placed
+        previous: Blocks of the previous plan per task
+        changed: Ids of tasks that were added, edited or removed
+        min_chunk: Shortest block a task is split into
+
+    Returns:
+        (PlanResult for every current task, minute from which the plan was recomputed)
+    """
+    by_id = {task.id: task for task in tasks}
+    rank_tasks(tasks, _dependents(tasks, by_id))
+    # A change also re-ranks everything the changed task depends on
+    affected = set(changed)
+    stack = [task_id for task_id in changed if task_id in by_id]
+    while stack:
+        for dep in by_id[stack.pop()].depends_on:
+            if dep in by_id and dep not in affected:
+                affected.add(dep)
+                stack.append(dep)
+    affected.update(
+        task_id for task_id, blocks in previous.items()
+        if task_id in by_id and task_id not in affected and not free.covers(blocks)
+    )
+
+    freeze = NO_DEADLINE
+    for task_id in affected:
+        if task_id in previous:
+            freeze = min(freeze, previous[task_id][0][0])
+        task = by_id.get(task_id)
+        if task is not None:
+            freeze = min(freeze, _landing(task, by_id, affected, free, previous, min_chunk))
+
+    kept: Dict[int, List[Interval]] = {}
+    for task_id, blocks in previous.items():
+        if task_id in by_id and task_id not in affected and blocks[-1][1] <= freeze:
+            kept[task_id] = blocks
+            free.occupy(blocks)
+    rest = [task for task in tasks if task.id not in kept]
+    result = plan(rest, free, min_chunk, fixed_finish={task_id: blocks[-1][1] for task_id, blocks in kept.items()})
+    result.blocks.update(kept)
+    for task_id, blocks in kept.items():
+        deadline = by_id[task_id].deadline
+        if deadline is not None and blocks[-1][1] > deadline:
+            result.late.add(task_id)
+    return result, freeze
+
+
+class ScheduleService:
+    """Service class for building and storing time-blocked plans"""
+
+    @staticmethod
+    def working_windows(start: datetime, days: int, settings: dict) -> List[Interval]:
+        """
+        Working-hour windows of the horizon in minutes from ``start``
+
+        Working hours and weekdays are in the user's local time, given by
+        ``tz_offset_minutes``; the horizon itself is naive UTC.
+        """
+        offset = settings["tz_offset_minutes"]
+        day_start = _clock_minutes(settings["day_start"])
+        day_end = _clock_minutes(settings["day_end"])
+        local_midnight = (start + timedelta(minutes=offset)).replace(hour=0, minute=0, second=0, microsecond=0)
+        base = int((local_midnight - timedelta(minutes=offset) - start).total_seconds() // 60)
+        horizon = days * MINUTES_PER_DAY
+        windows = []
+        for day in range(days + 1):
+            if (local_midnight + timedelta(days=day)).weekday() not in settings["weekdays"]:
+                continue
+            window_start = max(0, base + day * MINUTES_PER_DAY + day_start)
+            window_end = min(horizon, base + day * MINUTES_PER_DAY + day_end)
+            if window_end > window_start:
+                windows.append((window_start, window_end))
+        return windows
+
+    @staticmethod
+    def load_inputs(db: Session, user_id: int, start: datetime, end: datetime):
+        """
+        Open leaf tasks with their dependencies and busy intervals of the horizon, in minutes
+
+        Goals and projects with subtasks are not work of their own; their
+        subtasks are scheduled instead.
+        """
+        dependencies: Dict[int, List[int]] = {}
+        for edge in db.query(TaskDependency).filter(TaskDependency.user_id == user_id):
+            dependencies.setdefault(edge.task_id, []).append(edge.depends_on_id)
+        rows = (
+            db.query(Task.id, Task.estimate_minutes, Task.priority, Task.due_date)
+            .filter(
+                Task.user_id == user_id, Task.deleted_at.is_(None), Task.status != "done", Task.subtree_total <= 1
+            )
+            .all()
+        )
+        tasks = [
+            PlanTask(
+                row.id,
+                row.estimate_minutes or DEFAULT_ESTIMATE_MINUTES,
+                row.priority,
+                _to_minutes(row.due_date, start) if row.due_date else None,
+                dependencies.get(row.id, ())
+            )
+            for row in rows
+        ]
+        busy = [
+            (_to_minutes(block.start, start), _to_minutes(block.end, start))
+            for block in db.query(BusyBlock).filter(
+                BusyBlock.user_id == user_id, BusyBlock.end > start, BusyBlock.start < end
+            )
+        ]
+        return tasks, busy
+
+    @staticmethod
+    def create_plan(db: Session, user_id: int, settings: dict, start: Optional[datetime] = None) -> dict:
+        """
+        Build a plan from scratch and store it
+
+        Args:
+            db: Database session
+            user_id: Owner of the tasks
+            settings: days, day_start, day_end, weekdays, tz_offset_minutes, min_block_minutes
+            start: Horizon start (defaults to now, rounded up to 5 minutes)
+
+        Returns:
+            Plan dictionary as served by the API
+        """
+        started = time.perf_counter()
+        start = start or _round_up(datetime.utcnow())
+        end = start + timedelta(days=settings["days"])
+        tasks, busy = ScheduleService.load_inputs(db, user_id, start, end)
+        free = FreeTime(subtract(ScheduleService.working_windows(start, settings["days"], settings), busy))
+        result = plan(tasks, free, settings["min_block_minutes"])
+        compute_ms = (time.perf_counter() - started) * 1000
+
+        db.merge(SchedulePlan(user_id=user_id, horizon_start=start, horizon_end=end, settings=json.dumps(settings)))
+        db.execute(delete(ScheduleBlock).where(ScheduleBlock.user_id == user_id))
+        ScheduleService._store_blocks(db, user_id, start, result.blocks)
+        db.commit()
+        return ScheduleService._response(start, end, result, len(tasks), len(tasks), compute_ms)
+
+    @staticmethod
+    def replan(db: Session, user_id: int, task_ids: Set[int]) -> Optional[dict]:
+        """
+        Incrementally update the stored plan after ``task_ids`` changed
+
+        Returns:
+            Plan dictionary, or None if the user has no plan yet
+        """
+        stored = db.get(SchedulePlan, user_id)
+        if stored is None:
+            return None
+        started = time.perf_counter()
+        settings = json.loads(stored.settings)
+        start, end = stored.horizon_start, stored.horizon_end
+        tasks, busy = ScheduleService.load_inputs(db, user_id, start, end)
+        free = FreeTime(subtract(ScheduleService.working_windows(start, settings["days"], settings), busy))
+        previous: Dict[int, List[Interval]] = {}
+        for block in db.query(ScheduleBlock).filter(ScheduleBlock.user_id == user_id).order_by(ScheduleBlock.start):
+            previous.setdefault(block.task_id, []).append((_to_minutes(block.start, start), _to_minutes(block.end, start)))
+
+        result, freeze = replan(tasks, free, previous, set(task_ids), settings["min_block_minutes"])
+        compute_ms = (time.perf_counter() - started) * 1000
+
+        # Rewrite only the recomputed tail of the plan
+        db.execute(delete(ScheduleBlock).where(
+            ScheduleBlock.user_id == user_id,
+            ScheduleBlock.task_id.in_([task_id for task_id in previous if task_id not in result.blocks
+                                       or result.blocks[task_id] != previous[task_id]])
+        ))
+        changed_blocks = {
+            task_id: blocks for task_id, blocks in result.blocks.items() if previous.get(task_id) != blocks
+        }
+        ScheduleService._store_blocks(db, user_id, start, changed_blocks)
+        db.commit()
+        return ScheduleService._response(start, end, result, len(tasks), len(changed_blocks), compute_ms)
+
+    @staticmethod
+    def get_plan(db: Session, user_id: int) -> Optional[dict]:
+        stored = db.get(SchedulePlan, user_id)
+        if stored is None:
+            return None
+        blocks = (
+            db.query(ScheduleBlock)
+            .filter(ScheduleBlock.user_id == user_id)
+            .order_by(ScheduleBlock.start)
+            .all()
+        )
+        return {
+            "start": stored.horizon_start,
+            "end": stored.horizon_end,
+            "blocks": [{"task_id": b.task_id, "start": b.start, "end": b.end} for b in blocks]
+        }
+
+    @staticmethod
+    def set_dependencies(db: Session, user_id: int, task_id: int, depends_on: List[int]) -> List[int]:
+        """
+        Replace the prerequisites of a task
+
+        Raises:
+            DependencyError: If any id is not another live task of the user
+        """
+        ids = set(depends_on) | {task_id}
+        owned = {
+            row.id for row in db.query(Task.id).filter(
+                Task.user_id == user_id, Task.id.in_(ids), Task.deleted_at.is_(None)
+            )
+        }
+        if owned != ids or task_id in depends_on:
+            raise DependencyError("Dependencies must be other existing tasks")
+        db.execute(delete(TaskDependency).where(TaskDependency.task_id == task_id))
+        for dep in sorted(set(depends_on)):
+            db.add(TaskDependency(task_id=task_id, depends_on_id=dep, user_id=user_id))
+        db.commit()
+        return sorted(set(depends_on))
+
+    @staticmethod
+    def add_busy_block(db: Session, user_id: int, title: Optional[str], start: datetime, end: datetime) -> BusyBlock:
+        block = BusyBlock(user_id=user_id, title=title, start=start, end=end)
+        db.add(block)
+        db.commit()
+        db.refresh(block)
+        return block
+
+    @staticmethod
+    def list_busy_blocks(db: Session, user_id: int, start: datetime, end: datetime) -> List[BusyBlock]:
+        return (
+            db.query(BusyBlock)
+            .filter(BusyBlock.user_id == user_id, BusyBlock.end > start, BusyBlock.start < end)
+            .order_by(BusyBlock.start)
+            .all()
+        )
+
+    @staticmethod
+    def delete_busy_block(db: Session, user_id: int, block_id: int) -> bool:
+        deleted = db.query(BusyBlock).filter(BusyBlock.id == block_id, BusyBlock.user_id == user_id).delete()
+        db.commit()
+        return bool(deleted)
+
+    @staticmethod
+    def _store_blocks(db: Session, user_id: int, start: datetime, blocks: Dict[int, List[Interval]]) -> None:
+        rows = [
+            {"user_id": user_id, "task_id": task_id,
+             "start": start + timedelta(minutes=s), "end": start + timedelta(minutes=e)}
+            for task_id, chunks in blocks.items() for s, e in chunks
+        ]
+        if rows:
+            db.execute(ScheduleBlock.__table__.insert(), rows)
+
+    @staticmethod
+    def _response(start: datetime, end: datetime, result: PlanResult, task_count: int, planned: int,
+                  compute_ms: float) -> dict:
+        blocks = sorted(
+            ({"task_id": task_id, "start": start + timedelta(minutes=s), "end": start + timedelta(minutes=e)}
+             for task_id, chunks in result.blocks.items() for s, e in chunks),
+            key=lambda block: block["start"]
+        )
+        return {
+            "start": start,
+            "end": end,
+            "blocks": blocks,
+            "unscheduled": [{"task_id": t, "reason": r} for t, r in sorted(result.unscheduled.items())],
+            "late": sorted(result.late),
+            "stats": {
+                "tasks": task_count,
+                "replanned_tasks": planned,
+                "blocks": len(blocks),
+                "repaired": result.repaired,
+                "compute_ms": round(compute_ms, 2)
+            }
+        }
+
+
+def _clock_minutes(text: str) -> int:
+    hours, minutes = text.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def _to_minutes(ts: datetime, start: datetime) -> int:
+    return int((ts - start).total_seconds() // 60)
+
+
+def _round_up(ts: datetime, step: int = 5) -> datetime:
+    ts = ts.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    return ts + timedelta(minutes=(-ts.minute) % step)
@@ -0,0 +1,171 @@
+"""
+Delta-sync service: per-user change sequence and change feed queries
+"""
+from datetime import datetime
+from typing import Dict, Any
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+from app.models.sync import SyncCounter
+from app.models.task import Task
+from app.models.habit import Habit
+from app.models.workout import WorkoutSet
+from app.models.finance import Transaction
+from app.models.journal import JournalEntry
+from app.models.trigger import Trigger
+from app.services.live import note_change
+
+
+# User-owned tables exposed through the change feed, keyed by table name.
+# Every model listed here must use SyncMixin and have a user_id column.
+SYNC_MODELS = {
+    Task.__tablename__: Task,
+    Habit.__tablename__: Habit,
+    WorkoutSet.__tablename__: WorkoutSet,
+    Transaction.__tablename__: Transaction,
+    JournalEntry.__tablename__: JournalEntry,
+    Trigger.__tablename__: Trigger,
+}
+
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 2000
+
+
+class SyncService:
+    """Service class for change tracking and delta-sync operations"""
+
+    @staticmethod
+    def next_seq(db: Session, user_id: int) -> int:
+        """
+        Atomically allocate the next change sequence number for a user
+
+        Uses a single upsert with RETURNING so concurrent writers for the same
+        user never receive the same value. The value is announced to live
+        subscribers once the session commits.
+
+        Args:
+            db: Database session
+            user_id: Owner of the change
+
+        Returns:
+            The newly allocated sequence number
+        """
+        stmt = (
+            insert(SyncCounter)
+            .values(user_id=user_id, last_seq=1)
+            .on_conflict_do_update(
+                index_elements=[SyncCounter.user_id],
+                set_={"last_seq": SyncCounter.last_seq + 1}
+            )
+            .returning(SyncCounter.last_seq)
+        )
+        seq = db.execute(stmt).scalar_one()
+        note_change(db, user_id, seq)
+        return seq
+
+    @staticmethod
+    def reserve_seqs(db: Session, user_id: int, count: int) -> int:
+        """
+        Atomically allocate ``count`` consecutive sequence numbers for bulk writes
+
+        Args:
+            db: Database session
+            user_id: Owner of the changes
+            count: Number of sequence numbers needed
+
+        Returns:
+            The first allocated sequence number
+        """
+        stmt = (
+            insert(SyncCounter)
+            .values(user_id=user_id, last_seq=count)
+            .on_conflict_do_update(
+                index_elements=[SyncCounter.user_id],
+                set_={"last_seq": SyncCounter.last_seq + count}
+            )
+            .returning(SyncCounter.last_seq)
+        )
+        last = db.execute(stmt).scalar_one()
+        note_change(db, user_id, last)
+        return last - count + 1
+
+    @staticmethod
+    def current_seq(db: Session, user_id: int) -> int:
+        """
+        Get the latest change sequence number for a user (0 if none)
+        """
+        seq = db.execute(
+            select(SyncCounter.last_seq).where(SyncCounter.user_id == user_id)
+        ).scalar_one_or_none()
+        return seq or 0
+
+    @staticmethod
+    def record_change(db: Session, row) -> None:
+        """
+        Stamp a user-owned row with the next change sequence number
+
+        Must be called in the same transaction as the write itself.
+
+        Args:
+            db: Database session
+            row: SyncMixin model instance with a user_id
+        """
+        row.seq = SyncService.next_seq(db, row.user_id)
+
+    @staticmethod
+    def mark_deleted(db: Session, row) -> None:
+        """
+        Soft-delete a row, leaving a tombstone for the change feed
+        """
+        row.deleted_at = datetime.utcnow()
+        SyncService.record_change(db, row)
+
+    @staticmethod
+    def changes_since(db: Session, user_id: int, since: int, limit: int = DEFAULT_PAGE_SIZE) -> Dict[str, Any]:
+        """
+        Collect one page of rows changed after ``since``
+
+        Pages are cut on the global per-user sequence, so a page never splits
+        a single change and the returned cursor is always safe to resume from.
+
+        Args:
+            db: Database session
+            user_id: Owner of the data
+            since: Last sequence number the client has seen
+            limit: Maximum number of changed rows to return
+
+        Returns:
+            Dictionary with cursor, has_more and per-table changes
+        """
+        latest = SyncService.current_seq(db, user_id)
+        if latest <= since:
+            # Fast path: nothing changed, no table is touched
+            return {"cursor": since, "has_more": False, "changes": {}}
+
+        candidates = []
+        for table_name, model in SYNC_MODELS.items():
+            rows = (
+                db.query(model)
+                .filter(model.user_id == user_id, model.seq > since)
+                .order_by(model.seq)
+                .limit(limit + 1)
+                .all()
+            )
+            candidates.extend((row.seq, table_name, row) for row in rows)
+
+        candidates.sort(key=lambda item: item[0])
+        page = candidates[:limit]
+        has_more = len(candidates) > limit
+
+        changes: Dict[str, Dict[str, list]] = {}
+        for _, table_name, row in page:
+            bucket = changes.setdefault(table_name, {"upserts": [], "deletes": []})
+            if row.is_deleted:
+                bucket["deletes"].append(row.id)
+            else:
+                bucket["upserts"].append(row.to_dict())
+
+        # An empty page means the remaining sequence numbers belong to rows
+        # the feed does not expose, so the client can skip straight past them
+        cursor = page[-1][0] if page else latest
+        return {"cursor": cursor, "has_more": has_more, "changes": changes}
@@ -0,0 +1,272 @@
+"""
+Task tree service: materialized paths and incrementally propagated subtree counters
+"""
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import func, literal, update
+from sqlalchemy.orm import Session
+from app.models.task import Task
+from app.services.rollups import RollupService
+from app.services.sync import SyncService
+
+
+# Deepest allowed nesting; keeps paths well inside their column
+MAX_DEPTH = 50
+
+
+class TaskTreeError(ValueError):
+    """Raised when a requested parent is missing or would create a cycle"""
+
+
+def ancestor_ids(path: str) -> List[int]:
+    """Ids on a materialized path, root first and the node itself last"""
+    return [int(part) for part in path.strip("/").split("/") if part]
+
+
+def subtree_bounds(path: str):
+    """
+    Half-open string range holding ``path`` and every descendant path
+
+    "/3/17/" covers "/3/17/..." up to, but excluding, "/3/170": the final "/"
+    is replaced by "0", the next character in byte order, so an index range
+    scan on (user_id, path) returns exactly the subtree.
+
+    Raises:
+        ValueError: If ``path`` is empty; ("", "0") would cover every task of the user
+    """
+    if not path:
+        raise ValueError("Task has no materialized path; run TaskTreeService.backfill first")
+    return path, path[:-1] + "0"
+
+
+class TaskTreeService:
+    """Service class for task hierarchy maintenance"""
+
+    @staticmethod
+    def propagate(db: Session, path: str, total: int, done: int, include_self: bool = True) -> None:
+        """
+        Add deltas to the cached counters of every node on ``path``
+
+        One UPDATE by primary key regardless of depth. Must run in the same
+        transaction as the write that caused it.
+        """
+        ids = ancestor_ids(path)
+        if not include_self:
+            ids = ids[:-1]
+        if not ids or not (total or done):
+            return
+        db.execute(
+            update(Task)
+            .where(Task.id.in_(ids))
+            .values(subtree_total=Task.subtree_total + total, subtree_done=Task.subtree_done + done)
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def ensure_path(db: Session, task: Task) -> Task:
+        """
+        Make sure a task has its tree fields before they are used
+
+        Rows written before task hierarchies existed, or bulk-inserted without
+        going through ``attach``, keep the column default ``path=""``; the
+        first time one of them is touched its owner's tree is backfilled.
+        """
+        if not task.path:
+            TaskTreeService.backfill(db, task.user_id)
+            db.refresh(task)
+        return task
+
+    @staticmethod
+    def resolve_parent(db: Session, user_id: int, parent_id: Optional[int]) -> Optional[Task]:
+        if parent_id is None:
+            return None
+        parent = (
+            db.query(Task)
+            .filter(Task.id == parent_id, Task.user_id == user_id, Task.deleted_at.is_(None))
+            .first()
+        )
+        if not parent:
+            raise TaskTreeError("Parent task not found")
+        TaskTreeService.ensure_path(db, parent)
+        if parent.depth + 1 >= MAX_DEPTH:
+            raise TaskTreeError(f"Tasks cannot be nested more than {MAX_DEPTH} levels deep")
+        return parent
+
+    @staticmethod
+    def attach(db: Session, task: Task, parent: Optional[Task]) -> None:
+        """
+        Place a newly flushed task under ``parent`` and count it in its ancestors
+        """
+        task.parent_id = parent.id if parent else None
+        task.path = f"{parent.path if parent else '/'}{task.id}/"
+        task.depth = parent.depth + 1 if parent else 0
+        task.subtree_total = 1
+        task.subtree_done = 1 if task.status == "done" else 0
+        TaskTreeService.propagate(db, task.path, task.subtree_total, task.subtree_done, include_self=False)
+
+    @staticmethod
+    def move(db: Session, task: Task, parent: Optional[Task]) -> None:
+        """
+        Re-parent a task with its whole subtree
+
+        Counters move from the old ancestor chain to the new one, and all
+        descendant paths are rewritten with a single UPDATE.
+        """
+        if parent is not None and parent.path.startswith(task.path):
+            raise TaskTreeError("A task cannot be moved under itself or its own subtasks")
+        old_path = task.path
+        new_path = f"{parent.path if parent else '/'}{task.id}/"
+        depth_delta = (parent.depth + 1 if parent else 0) - task.depth
+        height = TaskTreeService._subtree_query(db, task).with_entities(func.max(Task.depth)).scalar() - task.depth
+        if (parent.depth + 1 if parent else 0) + height >= MAX_DEPTH:
+            raise TaskTreeError(f"Tasks cannot be nested more than {MAX_DEPTH} levels deep")
+
+        TaskTreeService.propagate(db, old_path, -task.subtree_total, -task.subtree_done, include_self=False)
+        low, high = subtree_bounds(old_path)
+        db.execute(
+            update(Task)
+            .where(Task.user_id == task.user_id, Task.path >= low, Task.path < high)
+            .values(path=literal(new_path) + func.substr(Task.path, len(old_path) + 1), depth=Task.depth + depth_delta)
+            .execution_options(synchronize_session=False)
+        )
+        task.parent_id = parent.id if parent else None
+        task.path = new_path
+        task.depth += depth_delta
+        TaskTreeService.propagate(db, new_path, task.subtree_total, task.subtree_done, include_self=False)
+
+    @staticmethod
+    def delete_subtree(db: Session, task: Task) -> int:
+        """
+        Soft-delete a task and all its live descendants
+
+        Returns:
+            Number of tasks deleted
+        """
+        TaskTreeService.propagate(db, task.path, -task.subtree_total, -task.subtree_done, include_self=False)
+        rows = TaskTreeService._subtree_query(db, task).all()
+        now = datetime.utcnow()
+        first_seq = SyncService.reserve_seqs(db, task.user_id, len(rows))
+        for offset, row in enumerate(rows):
+            RollupService.task_contribution(db, row, -1)
+            row.deleted_at = now
+            row.seq = first_seq + offset
+        return len(rows)
+
+    @staticmethod
+    def _subtree_query(db: Session, task: Task):
+        low, high = subtree_bounds(task.path)
+        return db.query(Task).filter(
+            Task.user_id == task.user_id,
+            Task.path >= low,
+            Task.path < high,
+            Task.deleted_at.is_(None)
+        )
+
+    @staticmethod
+    def subtree(db: Session, task: Task, max_depth: Optional[int] = None) -> List[Task]:
+        """
+        Fetch a task and its live descendants in one range query
+
+        Returns:
+            Tasks in depth-first order (parents before their children)
+        """
+        query = TaskTreeService._subtree_query(db, task)
+        if max_depth is not None:
+            query = query.filter(Task.depth <= task.depth + max_depth)
+        return query.order_by(Task.path).all()
+
+    @staticmethod
+    def _counter_changes(rows, paths: Optional[Dict[int, str]] = None) -> List[dict]:
+        """
+        Counter updates for the live ``rows`` whose cached values are off
+
+        Paths are read from the rows unless given in ``paths`` by task id.
+        """
+        totals: Dict[int, List[int]] = {row.id: [0, 0] for row in rows}
+        for row in rows:
+            done = 1 if row.status == "done" else 0
+            for node_id in ancestor_ids(paths[row.id] if paths else row.path):
+                counters = totals.get(node_id)
+                if counters is not None:
+                    counters[0] += 1
+                    counters[1] += done
+        return [
+            {"id": row.id, "subtree_total": totals[row.id][0], "subtree_done": totals[row.id][1]}
+            for row in rows
+            if (row.subtree_total, row.subtree_done) != tuple(totals[row.id])
+        ]
+
+    @staticmethod
+    def rebuild_counters(db: Session, user_id: int) -> int:
+        """
+        Recompute every subtree counter of a user from scratch, for repairs
+
+        Returns:
+            Number of tasks whose counters were corrected
+        """
+        rows = (
+            db.query(Task.id, Task.path, Task.status, Task.subtree_total, Task.subtree_done)
+            .filter(Task.user_id == user_id, Task.deleted_at.is_(None))
+            .all()
+        )
+        changed = TaskTreeService._counter_changes(rows)
+        if changed:
+            db.execute(update(Task), changed)
+        db.commit()
+        return len(changed)
+
+    @staticmethod
+    def backfill(db: Session, user_id: Optional[int] = None) -> int:
+        """
+        Derive path, depth and subtree counters from ``parent_id``
+
+        Covers every user that has tasks without a path (or only ``user_id``).
+        A parent that is missing, or a parent chain that loops, makes the task
+        a root. Tombstones get paths too, but only live tasks are counted.
+
+        Returns:
+            Number of tasks whose tree fields were written
+        """
+        users = db.query(Task.user_id).filter(Task.path == "").distinct()
+        if user_id is not None:
+            users = users.filter(Task.user_id == user_id)
+        written = 0
+        for (owner_id,) in users.all():
+            rows = (
+                db.query(Task.id, Task.parent_id, Task.path, Task.depth, Task.status, Task.deleted_at,
+                         Task.subtree_total, Task.subtree_done)
+                .filter(Task.user_id == owner_id)
+                .all()
+            )
+            parents = {row.id: row.parent_id for row in rows}
+            paths: Dict[int, str] = {}
+            for row in rows:
+                chain, node_id = [], row.id
+                while node_id in parents and node_id not in paths and node_id not in chain:
+                    chain.append(node_id)
+                    node_id = parents[node_id]
+                prefix = paths.get(node_id, "/")
+                for node_id in reversed(chain):
+                    prefix = paths[node_id] = f"{prefix}{node_id}/"
+
+            live = [row for row in rows if row.deleted_at is None]
+            counters = {change["id"]: change for change in TaskTreeService._counter_changes(live, paths)}
+            fields = []
+            for row in rows:
+                path = paths[row.id]
+                depth = path.count("/") - 2
+                counter = counters.get(row.id)
+                if counter is None and (row.path, row.depth) == (path, depth):
+                    continue
+                fields.append({
+                    "id": row.id,
+                    "path": path,
+                    "depth": depth,
+                    "subtree_total": counter["subtree_total"] if counter else row.subtree_total,
+                    "subtree_done": counter["subtree_done"] if counter else row.subtree_done,
+                })
+            if fields:
+                db.execute(update(Task), fields)
+            written += len(fields)
+        db.commit()
+        return written
@@ -0,0 +1,141 @@
+"""
+Task service for creating, updating and deleting user tasks
+"""
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from app.models.task import Task
+from app.schemas.task import TaskCreate, TaskUpdate
+from app.services.sync import SyncService
+from app.services.rollups import RollupService
+from app.services.task_tree import TaskTreeService
+from app.utils import to_utc_naive
+
+
+class TaskService:
+    """Service class for task operations"""
+
+    @staticmethod
+    def list_tasks(db: Session, user_id: int) -> List[Task]:
+        """
+        Get all live (not deleted) tasks for a user
+
+        Args:
+            db: Database session
+            user_id: Owner of the tasks
+
+        Returns:
+            List of Task objects ordered by creation
+        """
+        return (
+            db.query(Task)
+            .filter(Task.user_id == user_id, Task.deleted_at.is_(None))
+            .order_by(Task.id)
+            .all()
+        )
+
+    @staticmethod
+    def get_task(db: Session, user_id: int, task_id: int) -> Optional[Task]:
+        """
+        Get a single live task owned by the user, with its tree fields filled in
+
+        Returns:
+            Task object if found, None otherwise
+        """
+        task = (
+            db.query(Task)
+            .filter(Task.id == task_id, Task.user_id == user_id, Task.deleted_at.is_(None))
+            .first()
+        )
+        return TaskTreeService.ensure_path(db, task) if task else None
+
+    @staticmethod
+    def create_task(db: Session, user_id: int, task_data: TaskCreate) -> Task:
+        """
+        Create a new task and record it in the change feed
+
+        Args:
+            db: Database session
+            user_id: Owner of the task
+            task_data: Task creation data
+
+        Returns:
+            Created Task object
+
+        Raises:
+            TaskTreeError: If the parent does not exist or is too deep
+        """
+        values = task_data.model_dump()
+        if values["due_date"] is not None:
+            values["due_date"] = to_utc_naive(values["due_date"])
+        parent = TaskTreeService.resolve_parent(db, user_id, values.pop("parent_id"))
+        now = datetime.utcnow()
+        task = Task(user_id=user_id, created_at=now, updated_at=now, **values)
+        if task.status == "done":
+            task.completed_at = now
+
+        SyncService.record_change(db, task)
+        RollupService.task_contribution(db, task, 1)
+        db.add(task)
+        db.flush()
+        TaskTreeService.attach(db, task, parent)
+        db.commit()
+        db.refresh(task)
+
+        return task
+
+    @staticmethod
+    def update_task(db: Session, task: Task, task_data: TaskUpdate) -> Task:
+        """
+        Apply a partial update to a task and record it in the change feed
+
+        Args:
+            db: Database session
+            task: Task to update
+            task_data: Fields to change
+
+        Returns:
+            Updated Task object
+
+        Raises:
+            TaskTreeError: If the new parent is missing or inside the task's subtree
+        """
+        changes = task_data.model_dump(exclude_unset=True)
+        if changes.get("due_date") is not None:
+            changes["due_date"] = to_utc_naive(changes["due_date"])
+        if "parent_id" in changes:
+            new_parent_id = changes.pop("parent_id")
+            if new_parent_id != task.parent_id:
+                parent = TaskTreeService.resolve_parent(db, task.user_id, new_parent_id)
+                TaskTreeService.move(db, task, parent)
+        affects_rollups = any(
+            field in changes and changes[field] != getattr(task, field)
+            for field in ("status", "category")
+        )
+        if affects_rollups:
+            RollupService.task_contribution(db, task, -1)
+
+        new_status = changes.get("status")
+        if new_status and new_status != task.status:
+            task.completed_at = datetime.utcnow() if new_status == "done" else None
+            done_delta = (new_status == "done") - (task.status == "done")
+            TaskTreeService.propagate(db, task.path, 0, done_delta)
+
+        for field, value in changes.items():
+            setattr(task, field, value)
+
+        if affects_rollups:
+            RollupService.task_contribution(db, task, 1)
+        SyncService.record_change(db, task)
+        db.commit()
+        db.refresh(task)
+
+        return task
+
+    @staticmethod
+    def delete_task(db: Session, task: Task) -> None:
+        """
+        Soft-delete a task and its subtasks, leaving tombstones for syncing clients
+        """
+        TaskTreeService.delete_subtree(db, task)
+        db.commit()
@@ -0,0 +1,82 @@
+"""
+Hierarchical timing wheel: O(1) insertion and O(1) work per tick regardless of how many timers are pending
+"""
+from typing import Any, List
+
+
+class TimerWheel:
+    """
+    Timers keyed by integer tick, kept in ``levels`` wheels of ``slots`` buckets
+
+    Level 0 buckets hold single ticks; a level ``l`` bucket spans
+    ``slots ** l`` ticks. A timer goes into the lowest level whose current
+    revolution contains its tick, and is moved one or more levels down when
+    the clock reaches its bucket. Each tick therefore touches one level-0
+    bucket plus, every ``slots ** l`` ticks, one bucket of level ``l``; every
+    timer is moved at most ``levels - 1`` times before it fires. Timers past
+    the top level's span wait in an overflow list that is re-sorted once per
+    top-level revolution.
+
+    Not thread-safe; the owner serializes access.
+    """
+    __slots__ = ("slots", "levels", "now", "_spans", "_wheels", "_overflow", "_ready", "_size")
+
+    def __init__(self, now: int, slots: int = 64, levels: int = 4):
+        self.slots = slots
+        self.levels = levels
+        self.now = now
+        self._spans = [slots ** level for level in range(levels + 1)]
+        self._wheels: List[List[List[Any]]] = [[[] for _ in range(slots)] for _ in range(levels)]
+        self._overflow: List[tuple] = []
+        self._ready: List[Any] = []
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, tick: int, item: Any) -> None:
+        """Schedule ``item`` for ``tick``; ticks that are already due come out of the next ``advance``"""
+        self._size += 1
+        self._place(tick, item)
+
+    def _place(self, tick: int, item: Any) -> None:
+        if tick <= self.now:
+            self._ready.append(item)
+            return
+        for level in range(self.levels):
+            revolution = self._spans[level + 1]
+            if tick // revolution == self.now // revolution:
+                self._wheels[level][(tick // self._spans[level]) % self.slots].append((tick, item))
+                return
+        self._overflow.append((tick, item))
+
+    def advance(self, to: int) -> List[Any]:
+        """
+        Move the clock to tick ``to``
+
+        Returns:
+            Items whose tick has been reached, in tick order per bucket
+        """
+        due, self._ready = self._ready, []
+        while self.now < to:
+            self.now += 1
+            if self.now % self._spans[self.levels] == 0 and self._overflow:
+                pending, self._overflow = self._overflow, []
+                for tick, item in pending:
+                    self._place(tick, item)
+            for level in range(self.levels - 1, 0, -1):
+                if self.now % self._spans[level] == 0:
+                    bucket = self._wheels[level][(self.now // self._spans[level]) % self.slots]
+                    if bucket:
+                        self._wheels[level][(self.now // self._spans[level]) % self.slots] = []
+                        for tick, item in bucket:
+                            self._place(tick, item)
+            bucket = self._wheels[0][self.now % self.slots]
+            if bucket:
+                self._wheels[0][self.now % self.slots] = []
+                due.extend(item for _, item in bucket)
+            if self._ready:
+                due.extend(self._ready)
+                self._ready = []
+        self._size -= len(due)
+        return due
@@ -0,0 +1,421 @@
+"""
+Trigger scheduler: fires reminders and recurring maintenance at their time without polling for due rows
+
+Only a window of upcoming triggers is held in memory, in a hierarchical
+timer wheel, refilled from the indexed ``next_fire_at`` column before the
+window runs out. Each tick advances the wheel to the current time and fires
+what came due in one transaction. Firing is a compare-and-set on the
+trigger's (next_fire_at, version); the scheduler whose update matches is the
+one that fires, so several API processes can run schedulers side by side.
+User reminders are delivered by the change feed (the fire stamps a new sync
+sequence number, which live subscribers are told about); other kinds enqueue
+a background job in the same transaction.
+"""
+import json
+import math
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import bindparam, select, tuple_, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+from app import database
+from app.database import SessionLocal
+from app.models.job import Job
+from app.models.trigger import Trigger
+from app.services.jobs import JOB_HANDLERS, JOB_MAX_ATTEMPTS, job_workers
+from app.services.sync import SyncService
+from app.services.timer_wheel import TimerWheel
+from app.utils import to_utc_naive
+
+
+# Tick length: the precision with which triggers fire
+TRIGGER_TICK_SECONDS = float(os.getenv("TRIGGER_TICK_MS", "1000")) / 1000
+# Upcoming triggers loaded per refill; a refill runs when half of the window is used up
+TRIGGER_WINDOW_SECONDS = float(os.getenv("TRIGGER_WINDOW_SECONDS", "600"))
+# Triggers still unfired this long after their time were missed (downtime, a dead process) and are recovered
+TRIGGER_MISFIRE_GRACE_SECONDS = float(os.getenv("TRIGGER_MISFIRE_GRACE_SECONDS", "30"))
+# Rows read per refill query page
+REFILL_PAGE_SIZE = 10000
+
+REMINDER_KIND = "reminder"
+
+EPOCH = datetime(1970, 1, 1)
+
+# Recurring maintenance created at startup: key -> (job kind, interval in seconds, payload)
+SYSTEM_TRIGGERS = {
+    "system.jobs.purge": ("jobs.purge", 86400, {"keep_days": 7}),
+    "system.idempotency.purge": ("idempotency.purge", 3600, {}),
+    "system.refresh_tokens.purge": ("refresh_tokens.purge", 86400, {"keep_days": 7}),
+    "system.metrics.compact": ("metrics.compact", 86400, {}),
+    "system.budgets.reconcile": ("budgets.reconcile", 86400, {}),
+}
+
+
+class TriggerKindError(ValueError):
+    """Raised when a trigger names a job kind without a handler"""
+
+
+def next_occurrence(scheduled: datetime, repeat_seconds: Optional[int], now: datetime) -> Optional[datetime]:
+    """
+    The first occurrence of a recurring trigger after ``now``
+
+    Occurrences missed while nothing was running are skipped, so a trigger
+    that was down for a week fires once on recovery, not once per missed day.
+    """
+    if not repeat_seconds:
+        return None
+    behind = (now - scheduled).total_seconds()
+    steps = max(1, math.floor(behind / repeat_seconds) + 1)
+    return scheduled + timedelta(seconds=steps * repeat_seconds)
+
+
+def _commit_stamped(db: Session, trigger: Trigger) -> None:
+    """
+    Stamp a user trigger with its next change sequence number and commit
+
+    Triggers stay in the central database when users are sharded, while each
+    user's change counter lives in their shard. The counter is then bumped in
+    a separate shard session committed after the trigger row, so no client can
+    see the new sequence number before the row that carries it.
+    """
+    if database.shard_router is None:
+        SyncService.record_change(db, trigger)
+        db.commit()
+        return
+    counter_db = database.shard_router.session(trigger.user_id)
+    try:
+        trigger.seq = SyncService.next_seq(counter_db, trigger.user_id)
+        db.commit()
+        counter_db.commit()
+    finally:
+        counter_db.close()
+
+
+# Built once: a tick fires many triggers and the refill runs every few minutes
+_triggers = Trigger.__table__
+_FIRE = (
+    update(_triggers)
+    .where(
+        _triggers.c.id == bindparam("trigger_id"),
+        _triggers.c.status == "active",
+        _triggers.c.next_fire_at == bindparam("scheduled"),
+        _triggers.c.version == bindparam("expected_version")
+    )
+    .values(
+        next_fire_at=bindparam("next_fire_at"),
+        status=bindparam("new_status"),
+        last_fired_at=bindparam("now"),
+        fire_count=_triggers.c.fire_count + 1
+    )
+    .returning(_triggers.c.user_id, _triggers.c.kind, _triggers.c.title, _triggers.c.payload)
+)
+_SET_SEQ = update(_triggers).where(_triggers.c.id == bindparam("trigger_id")).values(seq=bindparam("seq"))
+_UPCOMING = (
+    select(_triggers.c.id, _triggers.c.next_fire_at, _triggers.c.version, _triggers.c.repeat_seconds)
+    .where(
+        _triggers.c.status == "active",
+        tuple_(_triggers.c.next_fire_at, _triggers.c.id) > tuple_(bindparam("low"), bindparam("after_id")),
+        _triggers.c.next_fire_at < bindparam("high")
+    )
+    .order_by(_triggers.c.next_fire_at, _triggers.c.id)
+    .limit(REFILL_PAGE_SIZE)
+)
+
+
+class TriggerScheduler:
+    """
+    Timer-wheel scheduler over the triggers table
+
+    ``tick`` does all the work and takes the current time as an argument,
+    so tests and benchmarks can drive it without the background thread.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], tick_seconds: float = TRIGGER_TICK_SECONDS,
+                 window_seconds: float = TRIGGER_WINDOW_SECONDS,
+                 misfire_grace_seconds: float = TRIGGER_MISFIRE_GRACE_SECONDS):
+        self.session_factory = session_factory
+        self.tick_seconds = tick_seconds
+        self.window = timedelta(seconds=window_seconds)
+        self.misfire_grace = timedelta(seconds=misfire_grace_seconds)
+        self.wheel: Optional[TimerWheel] = None
+        self.loaded_until: Optional[datetime] = None
+        self._last_recovery: Optional[datetime] = None
+        # trigger id -> (next_fire_at, version) of the occurrence in the wheel
+        self._loaded: Dict[int, tuple] = {}
+        self._lock = threading.RLock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self.counters = {"fired": 0, "lost_races": 0, "stale": 0, "misfired": 0, "refills": 0, "loaded": 0,
+                         "jobs_enqueued": 0}
+        self.last_tick_ms = 0.0
+        self.last_refill_ms = 0.0
+
+    def _tick_of(self, moment: datetime) -> int:
+        # Fire times round up and the clock rounds down, so nothing fires before its time
+        return math.ceil((moment - EPOCH).total_seconds() / self.tick_seconds)
+
+    def _clock_tick(self, now: datetime) -> int:
+        return math.floor((now - EPOCH).total_seconds() / self.tick_seconds)
+
+    def _schedule(self, trigger_id: int, fire_at: datetime, version: int, repeat_seconds: Optional[int]) -> None:
+        if self._loaded.get(trigger_id) == (fire_at, version):
+            return
+        self._loaded[trigger_id] = (fire_at, version)
+        self.wheel.add(self._tick_of(fire_at), (trigger_id, fire_at, version, repeat_seconds))
+        self.counters["loaded"] += 1
+
+    def notify(self, trigger: Trigger) -> None:
+        """Put a trigger created or edited in this process into the wheel if it falls in the loaded window"""
+        with self._lock:
+            if self.wheel is None or self.loaded_until is None:
+                return
+            if trigger.status == "active" and trigger.next_fire_at and trigger.next_fire_at < self.loaded_until:
+                self._schedule(trigger.id, trigger.next_fire_at, trigger.version, trigger.repeat_seconds)
+
+    def _load(self, db: Session, low: datetime, high: datetime) -> None:
+        """Schedule active triggers with low <= next_fire_at < high, a page at a time"""
+        after_id = -1
+        while True:
+            rows = db.execute(_UPCOMING, {"low": low, "after_id": after_id, "high": high}).all()
+            for row in rows:
+                self._schedule(row.id, row.next_fire_at, row.version, row.repeat_seconds)
+            if len(rows) < REFILL_PAGE_SIZE:
+                return
+            low, after_id = rows[-1].next_fire_at, rows[-1].id
+
+    def refill(self, db: Session, now: datetime) -> None:
+        """Load triggers due before ``now + window`` that are not loaded yet"""
+        started = time.perf_counter()
+        horizon = now + self.window
+        self._load(db, self.loaded_until or EPOCH, horizon)
+        self.loaded_until = horizon
+        self.counters["refills"] += 1
+        self.last_refill_ms = (time.perf_counter() - started) * 1000
+
+    def recover(self, db: Session, now: datetime) -> None:
+        """Load triggers that should have fired more than the grace period ago but are still pending"""
+        self._load(db, EPOCH, now - self.misfire_grace)
+        self._last_recovery = now
+
+    def tick(self, now: Optional[datetime] = None) -> int:
+        """
+        Refill if needed, advance the wheel to ``now`` and fire what came due
+
+        Returns:
+            Number of triggers fired by this scheduler
+        """
+        now = now or datetime.utcnow()
+        started = time.perf_counter()
+        with self._lock:
+            db = self.session_factory()
+            try:
+                if self.wheel is None:
+                    self.wheel = TimerWheel(self._clock_tick(now))
+                if self.loaded_until is None or now + self.window / 2 >= self.loaded_until:
+                    self.refill(db, now)
+                if self._last_recovery is None or now - self._last_recovery >= self.misfire_grace:
+                    self.recover(db, now)
+                due = self.wheel.advance(self._clock_tick(now))
+                fired = self._fire(db, due, now) if due else 0
+            finally:
+                db.close()
+        self.last_tick_ms = (time.perf_counter() - started) * 1000
+        return fired
+
+    @staticmethod
+    def _counter_session(db: Session, user_id: int, counter_dbs: Dict[str, Session]) -> Session:
+        # One session per shard: two on the same file would wait on each other's write lock
+        if database.shard_router is None:
+            return db
+        key = database.shard_router.shard_key(user_id)
+        if key not in counter_dbs:
+            counter_dbs[key] = database.shard_router.session(user_id)
+        return counter_dbs[key]
+
+    def _fire(self, db: Session, due: List[tuple], now: datetime) -> int:
+        counter_dbs: Dict[str, Session] = {}
+        try:
+            return self._fire_due(db, due, now, counter_dbs)
+        finally:
+            for counter_db in counter_dbs.values():
+                counter_db.close()
+
+    def _fire_due(self, db: Session, due: List[tuple], now: datetime, counter_dbs: Dict[str, Session]) -> int:
+        fired = []
+        jobs = []
+        for trigger_id, scheduled, version, repeat_seconds in due:
+            if self._loaded.get(trigger_id) != (scheduled, version):
+                self.counters["stale"] += 1
+                continue
+            del self._loaded[trigger_id]
+            upcoming = next_occurrence(scheduled, repeat_seconds, now)
+            row = db.execute(_FIRE, {
+                "trigger_id": trigger_id,
+                "scheduled": scheduled,
+                "expected_version": version,
+                "next_fire_at": upcoming,
+                "new_status": "active" if upcoming else "done",
+                "now": now
+            }).first()
+            if row is None:
+                self.counters["lost_races"] += 1
+                continue
+            late = (now - scheduled).total_seconds()
+            if late > self.misfire_grace.total_seconds():
+                self.counters["misfired"] += 1
+            if row.user_id is not None:
+                seq = SyncService.next_seq(self._counter_session(db, row.user_id, counter_dbs), row.user_id)
+                db.execute(_SET_SEQ, {"trigger_id": trigger_id, "seq": seq})
+            if row.kind != REMINDER_KIND:
+                payload = json.loads(row.payload)
+                payload.update(trigger_id=trigger_id, scheduled_for=scheduled.isoformat(), late_seconds=round(late, 3))
+                jobs.append({"user_id": row.user_id, "kind": row.kind, "payload": json.dumps(payload),
+                             "status": "queued", "attempts": 0, "max_attempts": JOB_MAX_ATTEMPTS, "run_after": now})
+            fired.append((trigger_id, upcoming, version, repeat_seconds))
+        if jobs:
+            db.execute(insert(Job), jobs)
+        db.commit()
+        # Shard change counters commit after the trigger rows (see _commit_stamped)
+        for counter_db in counter_dbs.values():
+            counter_db.commit()
+        for trigger_id, upcoming, version, repeat_seconds in fired:
+            if upcoming and upcoming < self.loaded_until:
+                self._schedule(trigger_id, upcoming, version, repeat_seconds)
+        self.counters["fired"] += len(fired)
+        if jobs:
+            self.counters["jobs_enqueued"] += len(jobs)
+            job_workers.wake()
+        return len(fired)
+
+    def start(self) -> None:
+        """Start ticking in a background thread (idempotent)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="trigger-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop ticking and forget the loaded window; the next start reloads it from the table"""
+        self._stopping.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            self.wheel = None
+            self.loaded_until = None
+            self._last_recovery = None
+            self._loaded.clear()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"Trigger scheduler tick failed: {e}")
+            # Sleep to the next tick boundary
+            self._stopping.wait(self.tick_seconds - time.time() % self.tick_seconds)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            **self.counters,
+            "in_wheel": len(self.wheel) if self.wheel is not None else 0,
+            "loaded_until": self.loaded_until.isoformat() if self.loaded_until else None,
+            "last_tick_ms": round(self.last_tick_ms, 3),
+            "last_refill_ms": round(self.last_refill_ms, 3),
+            "tick_ms": self.tick_seconds * 1000,
+            "window_seconds": self.window.total_seconds()
+        }
+
+
+trigger_scheduler = TriggerScheduler(SessionLocal)
+
+
+class TriggerService:
+    """Service class for user reminders and system triggers"""
+
+    @staticmethod
+    def create_reminder(db: Session, user_id: int, title: str, fire_at: datetime,
+                        repeat_seconds: Optional[int] = None, payload: Optional[dict] = None) -> Trigger:
+        trigger = Trigger(
+            user_id=user_id,
+            kind=REMINDER_KIND,
+            title=title,
+            payload=json.dumps(payload or {}),
+            next_fire_at=to_utc_naive(fire_at),
+            repeat_seconds=repeat_seconds
+        )
+        db.add(trigger)
+        _commit_stamped(db, trigger)
+        db.refresh(trigger)
+        trigger_scheduler.notify(trigger)
+        return trigger
+
+    @staticmethod
+    def get_reminder(db: Session, user_id: int, trigger_id: int) -> Optional[Trigger]:
+        return (
+            db.query(Trigger)
+            .filter(Trigger.id == trigger_id, Trigger.user_id == user_id, Trigger.deleted_at.is_(None))
+            .first()
+        )
+
+    @staticmethod
+    def list_reminders(db: Session, user_id: int, include_finished: bool = False, limit: int = 100) -> List[Trigger]:
+        query = db.query(Trigger).filter(Trigger.user_id == user_id, Trigger.deleted_at.is_(None))
+        if not include_finished:
+            query = query.filter(Trigger.status == "active")
+        return query.order_by(Trigger.next_fire_at, Trigger.id).limit(limit).all()
+
+    @staticmethod
+    def update_reminder(db: Session, trigger: Trigger, changes: dict) -> Trigger:
+        """
+        Edit a reminder; a new fire time reactivates it
+
+        Every edit bumps the version, so an occurrence already loaded by any
+        scheduler no longer matches and cannot fire with stale settings.
+        """
+        if "title" in changes:
+            trigger.title = changes["title"]
+        if "payload" in changes:
+            trigger.payload = json.dumps(changes["payload"])
+        if "repeat_seconds" in changes:
+            trigger.repeat_seconds = changes["repeat_seconds"]
+        if "fire_at" in changes:
+            trigger.next_fire_at = to_utc_naive(changes["fire_at"])
+            trigger.status = "active"
+        trigger.version += 1
+        _commit_stamped(db, trigger)
+        db.refresh(trigger)
+        trigger_scheduler.notify(trigger)
+        return trigger
+
+    @staticmethod
+    def delete_reminder(db: Session, trigger: Trigger) -> None:
+        trigger.status = "cancelled"
+        trigger.version += 1
+        trigger.deleted_at = datetime.utcnow()
+        _commit_stamped(db, trigger)
+
+    @staticmethod
+    def ensure_system_triggers(db: Session, now: Optional[datetime] = None) -> None:
+        """
+        Create the recurring maintenance triggers if missing
+
+        Safe to run from every process at startup: the unique key makes the
+        insert a no-op when another process got there first.
+        """
+        now = now or datetime.utcnow()
+        for key, (kind, repeat_seconds, payload) in SYSTEM_TRIGGERS.items():
+            if kind not in JOB_HANDLERS:
+                raise TriggerKindError(f"System trigger '{key}' names unknown job kind '{kind}'")
+            db.execute(
+                insert(Trigger)
+                .values(key=key, kind=kind, payload=json.dumps(payload), repeat_seconds=repeat_seconds,
+                        next_fire_at=now + timedelta(seconds=repeat_seconds), status="active", version=0,
+                        fire_count=0, seq=0, created_at=now, updated_at=now)
+                .on_conflict_do_nothing(index_elements=[Trigger.key])
+            )
+        db.commit()
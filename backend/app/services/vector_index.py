@@ -0,0 +1,366 @@
+"""
+Per-user vector index on memory-mapped float32 files
+
+Each user's index lives in its own directory:
+
+    vectors.f32   (capacity, dim) float32 rows, unit length
+    ids.i64       (capacity,) entry id per row, -1 for removed rows
+    assign.i32    (capacity,) IVF list of each row (only once trained)
+    centroids.f32 (nlist, dim) IVF centroids
+    meta.json     dim, embedder, row count and IVF state
+
+Rows are append-only: updating an entry tombstones its old row and appends
+a new one, and compaction rewrites the files once tombstones dominate.
+meta.json is replaced atomically after the data files are flushed, so a
+crash never exposes half-written rows.
+
+Small indexes are searched exhaustively with one matrix-vector product.
+Past IVF_THRESHOLD live rows, spherical k-means centroids are trained and
+queries only scan the rows of the ``nprobe`` closest lists.
+"""
+import json
+import math
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+
+VECTOR_INDEX_DIR = os.getenv("VECTOR_INDEX_DIR", "./vector_index")
+# Live rows from which queries use the IVF index instead of brute force
+IVF_THRESHOLD = int(os.getenv("VECTOR_IVF_THRESHOLD", "20000"))
+# IVF lists scanned per query; more lists trade latency for recall
+IVF_NPROBE = int(os.getenv("VECTOR_IVF_NPROBE", "24"))
+# User indexes kept open at once
+OPEN_INDEXES = int(os.getenv("VECTOR_OPEN_INDEXES", "64"))
+
+MIN_CAPACITY = 1024
+KMEANS_ITERATIONS = 12
+KMEANS_SAMPLE_PER_LIST = 64
+ASSIGN_CHUNK = 16384
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the ``k`` highest scores, best first"""
+    if len(scores) > k:
+        candidates = np.argpartition(-scores, k)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+def kmeans(sample: np.ndarray, nlist: int, iterations: int = KMEANS_ITERATIONS, seed: int = 0) -> np.ndarray:
+    """
+    Spherical k-means on unit vectors
+
+    Returns:
+        (nlist, dim) float32 unit-length centroids
+    """
+    rng = np.random.default_rng(seed)
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        labels = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, sample)
+        counts = np.bincount(labels, minlength=nlist)
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            sums[empty] = sample[rng.choice(len(sample), len(empty), replace=False)]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        centroids = sums / np.maximum(norms, 1e-12)
+    return centroids.astype(np.float32)
+
+
+class VectorIndex:
+    """One user's vectors; all methods are thread-safe"""
+
+    def __init__(self, path: str, dim: int, embedder: str, ivf_threshold: int = IVF_THRESHOLD,
+                 nprobe: int = IVF_NPROBE):
+        self.path = path
+        self.dim = dim
+        self.embedder = embedder
+        self.ivf_threshold = ivf_threshold
+        self.nprobe = nprobe
+        self._lock = threading.RLock()
+        os.makedirs(path, exist_ok=True)
+        meta = self._read_meta()
+        # An index from another embedder or dimension is useless: start over
+        self.needs_rebuild = meta is not None and (meta["dim"] != dim or meta["embedder"] != embedder)
+        if meta is None or self.needs_rebuild:
+            self._reset()
+            meta = self._read_meta()
+        self.count = meta["count"]
+        self.capacity = meta["capacity"]
+        self.removed = meta["removed"]
+        self.nlist = meta["nlist"]
+        self.trained_on = meta["trained_on"]
+        self._open_files()
+        live = np.flatnonzero(self._ids[:self.count] >= 0)
+        self._rows: Dict[int, int] = dict(zip(self._ids[live].tolist(), live.tolist()))
+        self._lists: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._listed = 0
+
+    # --- storage -------------------------------------------------------
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _read_meta(self) -> Optional[dict]:
+        try:
+            with open(self._file("meta.json")) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write_meta(self) -> None:
+        meta = {
+            "dim": self.dim, "embedder": self.embedder, "count": self.count, "capacity": self.capacity,
+            "removed": self.removed, "nlist": self.nlist, "trained_on": self.trained_on
+        }
+        tmp = self._file("meta.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self._file("meta.json"))
+
+    def _reset(self) -> None:
+        for name in ("vectors.f32", "ids.i64", "assign.i32", "centroids.f32"):
+            if os.path.exists(self._file(name)):
+                os.remove(self._file(name))
+        self.count = self.removed = self.nlist = self.trained_on = 0
+        self.capacity = MIN_CAPACITY
+        self._size_files(MIN_CAPACITY)
+        self._write_meta()
+
+    def _size_files(self, capacity: int) -> None:
+        for name, width in (("vectors.f32", self.dim * 4), ("ids.i64", 8), ("assign.i32", 4)):
+            with open(self._file(name), "ab") as f:
+                f.truncate(capacity * width)
+
+    def _open_files(self) -> None:
+        self._vectors = np.memmap(self._file("vectors.f32"), dtype=np.float32, mode="r+",
+                                  shape=(self.capacity, self.dim))
+        self._ids = np.memmap(self._file("ids.i64"), dtype=np.int64, mode="r+", shape=(self.capacity,))
+        self._assign = np.memmap(self._file("assign.i32"), dtype=np.int32, mode="r+", shape=(self.capacity,))
+        self._centroids = (
+            np.fromfile(self._file("centroids.f32"), dtype=np.float32).reshape(self.nlist, self.dim)
+            if self.nlist else None
+        )
+
+    def _grow(self, needed: int) -> None:
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        if capacity == self.capacity:
+            return
+        self._flush()
+        del self._vectors, self._ids, self._assign
+        self._size_files(capacity)
+        self.capacity = capacity
+        self._open_files()
+
+    def _flush(self) -> None:
+        self._vectors.flush()
+        self._ids.flush()
+        self._assign.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush()
+
+    # --- updates -------------------------------------------------------
+
+    def upsert(self, entry_ids: Sequence[int], vectors: np.ndarray) -> None:
+        """Add or replace the vectors of entries; ``entry_ids`` must not repeat"""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        with self._lock:
+            self._tombstone(entry_ids)
+            start, end = self.count, self.count + len(entry_ids)
+            self._grow(end)
+            self._vectors[start:end] = vectors
+            self._ids[start:end] = entry_ids
+            if self.nlist:
+                self._assign[start:end] = np.argmax(vectors @ self._centroids.T, axis=1)
+            self._flush()
+            self.count = end
+            self._rows.update(zip(entry_ids, range(start, end)))
+            self._write_meta()
+            self._maybe_train()
+
+    def remove(self, entry_ids: Sequence[int]) -> int:
+        """
+        Returns:
+            Number of entries that were indexed
+        """
+        with self._lock:
+            removed = self._tombstone(entry_ids)
+            if removed:
+                self._ids.flush()
+                self._write_meta()
+                if self.removed > max(MIN_CAPACITY, len(self._rows)):
+                    self.compact()
+            return removed
+
+    def _tombstone(self, entry_ids: Sequence[int]) -> int:
+        rows = [self._rows.pop(entry_id) for entry_id in entry_ids if entry_id in self._rows]
+        if rows:
+            self._ids[rows] = -1
+            self.removed += len(rows)
+        return len(rows)
+
+    def clear(self) -> None:
+        """Remove every row and the IVF state"""
+        with self._lock:
+            del self._vectors, self._ids, self._assign
+            self._reset()
+            self._open_files()
+            self._rows = {}
+            self._lists = None
+            self._listed = 0
+
+    def compact(self) -> None:
+        """Rewrite the files without removed rows"""
+        with self._lock:
+            live = np.flatnonzero(self._ids[:self.count] >= 0)
+            vectors = np.array(self._vectors[live])
+            ids = np.array(self._ids[live])
+            assign = np.array(self._assign[live])
+            centroids = self._centroids
+            self._flush()
+            del self._vectors, self._ids, self._assign
+            for name in ("vectors.f32", "ids.i64", "assign.i32"):
+                os.remove(self._file(name))
+            self.capacity = max(MIN_CAPACITY, 1 << max(0, len(live) - 1).bit_length())
+            self._size_files(self.capacity)
+            self._open_files()
+            self._centroids = centroids
+            count = len(live)
+            self._vectors[:count] = vectors
+            self._ids[:count] = ids
+            self._assign[:count] = assign
+            self._flush()
+            self.count, self.removed = count, 0
+            self._rows = dict(zip(ids.tolist(), range(count)))
+            self._lists = None
+            self._write_meta()
+
+    def _maybe_train(self) -> None:
+        live = len(self._rows)
+        if live >= self.ivf_threshold and (not self.nlist or live >= 4 * self.trained_on):
+            self.train()
+
+    def train(self) -> None:
+        """(Re)build IVF centroids from a sample of live rows and assign every row"""
+        with self._lock:
+            live = np.flatnonzero(self._ids[:self.count] >= 0)
+            nlist = int(min(4096, max(16, math.sqrt(len(live)))))
+            rng = np.random.default_rng(len(live))
+            sample_rows = np.sort(rng.choice(live, min(len(live), nlist * KMEANS_SAMPLE_PER_LIST), replace=False))
+            centroids = kmeans(np.asarray(self._vectors[sample_rows]), nlist)
+            for start in range(0, self.count, ASSIGN_CHUNK):
+                end = min(self.count, start + ASSIGN_CHUNK)
+                self._assign[start:end] = np.argmax(self._vectors[start:end] @ centroids.T, axis=1)
+            self._assign.flush()
+            tmp = self._file("centroids.f32.tmp")
+            centroids.tofile(tmp)
+            os.replace(tmp, self._file("centroids.f32"))
+            self._centroids = centroids
+            self.nlist = nlist
+            self.trained_on = len(live)
+            self._lists = None
+            self._write_meta()
+
+    # --- search --------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _posting_lists(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Rows grouped by IVF list: (rows ordered by list, start offset of each list)
+
+        Rebuilt only when rows appended since the last build exceed a tenth
+        of the index; until then the new rows are scanned separately.
+        """
+        if self._lists is None or self.count - self._listed > max(1024, self.count // 10):
+            assign = np.asarray(self._assign[:self.count])
+            order = np.argsort(assign, kind="stable").astype(np.int64)
+            offsets = np.searchsorted(assign[order], np.arange(self.nlist + 1))
+            self._lists = (order, offsets)
+            self._listed = self.count
+        return self._lists
+
+    def search(self, query: np.ndarray, k: int = 10, nprobe: Optional[int] = None,
+               exact: bool = False) -> List[Tuple[int, float]]:
+        """
+        Most similar entries to a unit-length query vector
+
+        Returns:
+            (entry id, cosine similarity) pairs, best first
+        """
+        query = np.asarray(query, dtype=np.float32).reshape(self.dim)
+        with self._lock:
+            if not self._rows:
+                return []
+            if exact or not self.nlist or len(self._rows) < self.ivf_threshold:
+                rows = None
+                scores = self._vectors[:self.count] @ query
+            else:
+                rows = self._candidates(query, nprobe or self.nprobe)
+                scores = self._vectors[rows] @ query
+            ids = self._ids[:self.count] if rows is None else self._ids[rows]
+            scores = np.where(ids >= 0, scores, -np.inf)
+            best = top_k(scores, k)
+            best = best[np.isfinite(scores[best])]
+            return [(int(ids[i]), float(scores[i])) for i in best]
+
+    def _candidates(self, query: np.ndarray, nprobe: int) -> np.ndarray:
+        probes = top_k(self._centroids @ query, min(nprobe, self.nlist))
+        order, offsets = self._posting_lists()
+        parts = [order[offsets[p]:offsets[p + 1]] for p in probes]
+        if self._listed < self.count:
+            recent = np.arange(self._listed, self.count)
+            parts.append(recent[np.isin(self._assign[self._listed:self.count], probes)])
+        return np.sort(np.concatenate(parts))
+
+
+class VectorStore:
+    """Opens per-user indexes on demand and keeps the most recently used ones open"""
+
+    def __init__(self, root: str = VECTOR_INDEX_DIR, capacity: int = OPEN_INDEXES, **index_options):
+        self.root = root
+        self.capacity = capacity
+        self.index_options = index_options
+        self._open: "OrderedDict[int, VectorIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int, dim: int, embedder: str) -> VectorIndex:
+        with self._lock:
+            index = self._open.get(user_id)
+            if index is not None and (index.dim != dim or index.embedder != embedder):
+                index.close()
+                index = None
+            if index is None:
+                index = VectorIndex(os.path.join(self.root, f"user_{user_id}"), dim, embedder, **self.index_options)
+                self._open[user_id] = index
+                while len(self._open) > self.capacity:
+                    self._open.popitem(last=False)[1].close()
+            self._open.move_to_end(user_id)
+            return index
+
+    def drop(self, user_id: int) -> None:
+        """Delete a user's index files"""
+        with self._lock:
+            index = self._open.pop(user_id, None)
+            if index is not None:
+                index.close()
+            shutil.rmtree(os.path.join(self.root, f"user_{user_id}"), ignore_errors=True)
+
+    def close(self) -> None:
+        with self._lock:
+            while self._open:
+                self._open.popitem()[1].close()
+
+
+vector_store = VectorStore()
@@ -0,0 +1,274 @@
+"""
+Workout service: set logging with incrementally maintained progress summaries
+"""
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import case, delete, func, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+from app.models.workout import WorkoutSet, ExerciseSummary, ExerciseDay, MuscleGroupWeek
+from app.schemas.workout import WorkoutSetCreate, WorkoutSetUpdate
+from app.services.sync import SyncService
+from app.utils import to_utc_naive
+
+
+def week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+def e1rm_sql():
+    """SQL version of WorkoutSet.e1rm"""
+    return case(
+        ((WorkoutSet.reps <= 0) | (WorkoutSet.weight <= 0), 0.0),
+        (WorkoutSet.reps == 1, WorkoutSet.weight),
+        else_=WorkoutSet.weight * (1 + WorkoutSet.reps / 30.0)
+    )
+
+
+class WorkoutService:
+    """Service class for workout logging and progress metrics"""
+
+    @staticmethod
+    def list_sets(db: Session, user_id: int, exercise: Optional[str] = None, limit: int = 200) -> List[WorkoutSet]:
+        """
+        Get the most recent live sets of a user, optionally for one exercise
+        """
+        query = db.query(WorkoutSet).filter(WorkoutSet.user_id == user_id, WorkoutSet.deleted_at.is_(None))
+        if exercise:
+            query = query.filter(WorkoutSet.exercise == exercise)
+        return query.order_by(WorkoutSet.performed_at.desc(), WorkoutSet.id.desc()).limit(limit).all()
+
+    @staticmethod
+    def get_set(db: Session, user_id: int, set_id: int) -> Optional[WorkoutSet]:
+        """
+        Get a single live set owned by the user
+        """
+        return (
+            db.query(WorkoutSet)
+            .filter(WorkoutSet.id == set_id, WorkoutSet.user_id == user_id, WorkoutSet.deleted_at.is_(None))
+            .first()
+        )
+
+    @staticmethod
+    def log_set(db: Session, user_id: int, set_data: WorkoutSetCreate) -> WorkoutSet:
+        """
+        Log a set and fold it into the progress summaries
+        """
+        values = set_data.model_dump()
+        values["performed_at"] = to_utc_naive(values["performed_at"]) if values["performed_at"] else datetime.utcnow()
+        workout_set = WorkoutSet(user_id=user_id, **values)
+        SyncService.record_change(db, workout_set)
+        db.add(workout_set)
+        db.flush()
+        WorkoutService._add_to_summaries(db, workout_set)
+        db.commit()
+        db.refresh(workout_set)
+        return workout_set
+
+    @staticmethod
+    def update_set(db: Session, workout_set: WorkoutSet, set_data: WorkoutSetUpdate) -> WorkoutSet:
+        """
+        Edit a set: its old contribution is removed and the new one added
+        """
+        changes = set_data.model_dump(exclude_unset=True)
+        if "performed_at" in changes:
+            changes["performed_at"] = to_utc_naive(changes["performed_at"])
+        WorkoutService._remove_from_summaries(db, workout_set)
+        for field, value in changes.items():
+            setattr(workout_set, field, value)
+        WorkoutService._add_to_summaries(db, workout_set)
+        SyncService.record_change(db, workout_set)
+        db.commit()
+        db.refresh(workout_set)
+        return workout_set
+
+    @staticmethod
+    def delete_set(db: Session, workout_set: WorkoutSet) -> None:
+        """
+        Soft-delete a set and remove it from the progress summaries
+        """
+        WorkoutService._remove_from_summaries(db, workout_set)
+        SyncService.mark_deleted(db, workout_set)
+        db.commit()
+
+    @staticmethod
+    def _add_to_summaries(db: Session, s: WorkoutSet) -> None:
+        day = s.performed_at.date()
+        e1rm = s.e1rm
+
+        stmt = insert(ExerciseSummary).values(
+            user_id=s.user_id, exercise=s.exercise, total_sets=1, total_reps=s.reps, total_volume=s.volume,
+            best_weight=s.weight, best_e1rm=e1rm, last_performed=s.performed_at
+        )
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[ExerciseSummary.user_id, ExerciseSummary.exercise],
+            set_={
+                "total_sets": ExerciseSummary.total_sets + 1,
+                "total_reps": ExerciseSummary.total_reps + stmt.excluded.total_reps,
+                "total_volume": ExerciseSummary.total_volume + stmt.excluded.total_volume,
+                "best_weight": func.max(ExerciseSummary.best_weight, stmt.excluded.best_weight),
+                "best_e1rm": func.max(ExerciseSummary.best_e1rm, stmt.excluded.best_e1rm),
+                "last_performed": func.max(
+                    func.coalesce(ExerciseSummary.last_performed, stmt.excluded.last_performed),
+                    stmt.excluded.last_performed
+                ),
+            }
+        ))
+
+        stmt = insert(ExerciseDay).values(
+            user_id=s.user_id, exercise=s.exercise, day=day, sets=1, volume=s.volume, best_e1rm=e1rm
+        )
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[ExerciseDay.user_id, ExerciseDay.exercise, ExerciseDay.day],
+            set_={
+                "sets": ExerciseDay.sets + 1,
+                "volume": ExerciseDay.volume + stmt.excluded.volume,
+                "best_e1rm": func.max(ExerciseDay.best_e1rm, stmt.excluded.best_e1rm),
+            }
+        ))
+
+        stmt = insert(MuscleGroupWeek).values(
+            user_id=s.user_id, week=week_start(day), muscle_group=s.muscle_group, sets=1, volume=s.volume
+        )
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[MuscleGroupWeek.user_id, MuscleGroupWeek.week, MuscleGroupWeek.muscle_group],
+            set_={"sets": MuscleGroupWeek.sets + 1, "volume": MuscleGroupWeek.volume + stmt.excluded.volume}
+        ))
+
+    @staticmethod
+    def _remove_from_summaries(db: Session, s: WorkoutSet) -> None:
+        """
+        Subtract a set from the summaries; maxima are recomputed only for the
+        affected exercise, and only when the set could have been the record
+        """
+        day = s.performed_at.date()
+        e1rm = s.e1rm
+        others = [
+            WorkoutSet.user_id == s.user_id,
+            WorkoutSet.exercise == s.exercise,
+            WorkoutSet.deleted_at.is_(None),
+            WorkoutSet.id != s.id
+        ]
+
+        summary = db.get(ExerciseSummary, (s.user_id, s.exercise))
+        if summary is not None:
+            if summary.total_sets <= 1:
+                db.delete(summary)
+            else:
+                summary.total_sets -= 1
+                summary.total_reps -= s.reps
+                summary.total_volume -= s.volume
+                if (s.weight >= summary.best_weight or e1rm >= summary.best_e1rm
+                        or s.performed_at >= summary.last_performed):
+                    best = db.execute(
+                        select(func.max(WorkoutSet.weight), func.max(e1rm_sql()), func.max(WorkoutSet.performed_at))
+                        .where(*others)
+                    ).one()
+                    summary.best_weight = best[0] or 0.0
+                    summary.best_e1rm = best[1] or 0.0
+                    summary.last_performed = best[2]
+
+        exercise_day = db.get(ExerciseDay, (s.user_id, s.exercise, day))
+        if exercise_day is not None:
+            if exercise_day.sets <= 1:
+                db.delete(exercise_day)
+            else:
+                exercise_day.sets -= 1
+                exercise_day.volume -= s.volume
+                if e1rm >= exercise_day.best_e1rm:
+                    start = datetime.combine(day, datetime.min.time())
+                    exercise_day.best_e1rm = db.execute(
+                        select(func.max(e1rm_sql()))
+                        .where(*others, WorkoutSet.performed_at >= start,
+                               WorkoutSet.performed_at < start + timedelta(days=1))
+                    ).scalar() or 0.0
+
+        week = db.get(MuscleGroupWeek, (s.user_id, week_start(day), s.muscle_group))
+        if week is not None:
+            if week.sets <= 1:
+                db.delete(week)
+            else:
+                week.sets -= 1
+                week.volume -= s.volume
+        db.flush()
+
+    @staticmethod
+    def rebuild(db: Session, user_id: int) -> None:
+        """
+        Recompute all progress summaries of a user from the raw sets
+        """
+        for model in (ExerciseSummary, ExerciseDay, MuscleGroupWeek):
+            db.execute(delete(model).where(model.user_id == user_id))
+        live = [WorkoutSet.user_id == user_id, WorkoutSet.deleted_at.is_(None)]
+        volume = WorkoutSet.reps * WorkoutSet.weight
+
+        summaries = db.execute(
+            select(WorkoutSet.exercise, func.count(), func.sum(WorkoutSet.reps), func.sum(volume),
+                   func.max(WorkoutSet.weight), func.max(e1rm_sql()), func.max(WorkoutSet.performed_at))
+            .where(*live).group_by(WorkoutSet.exercise)
+        ).all()
+        for row in summaries:
+            db.add(ExerciseSummary(user_id=user_id, exercise=row[0], total_sets=row[1], total_reps=row[2],
+                                   total_volume=row[3], best_weight=row[4], best_e1rm=row[5], last_performed=row[6]))
+
+        day = func.date(WorkoutSet.performed_at)
+        for row in db.execute(
+            select(WorkoutSet.exercise, day, func.count(), func.sum(volume), func.max(e1rm_sql()))
+            .where(*live).group_by(WorkoutSet.exercise, day)
+        ):
+            db.add(ExerciseDay(user_id=user_id, exercise=row[0], day=date.fromisoformat(row[1]),
+                               sets=row[2], volume=row[3], best_e1rm=row[4]))
+
+        weeks: Dict[tuple, list] = {}
+        for row in db.execute(
+            select(day, WorkoutSet.muscle_group, func.count(), func.sum(volume))
+            .where(*live).group_by(day, WorkoutSet.muscle_group)
+        ):
+            totals = weeks.setdefault((week_start(date.fromisoformat(row[0])), row[1]), [0, 0.0])
+            totals[0] += row[2]
+            totals[1] += row[3]
+        for (week, muscle_group), (sets, vol) in weeks.items():
+            db.add(MuscleGroupWeek(user_id=user_id, week=week, muscle_group=muscle_group, sets=sets, volume=vol))
+        db.commit()
+
+    @staticmethod
+    def records(db: Session, user_id: int) -> List[ExerciseSummary]:
+        """
+        Personal records and totals for every exercise the user has logged
+        """
+        return (
+            db.query(ExerciseSummary)
+            .filter(ExerciseSummary.user_id == user_id)
+            .order_by(ExerciseSummary.exercise)
+            .all()
+        )
+
+    @staticmethod
+    def e1rm_trend(db: Session, user_id: int, exercise: str, start: date, end: date) -> List[dict]:
+        """
+        Daily best estimated 1RM and volume for one exercise
+        """
+        rows = (
+            db.query(ExerciseDay)
+            .filter(ExerciseDay.user_id == user_id, ExerciseDay.exercise == exercise,
+                    ExerciseDay.day >= start, ExerciseDay.day <= end)
+            .order_by(ExerciseDay.day)
+            .all()
+        )
+        return [{"day": r.day.isoformat(), "best_e1rm": round(r.best_e1rm, 3), "volume": round(r.volume, 3),
+                 "sets": r.sets} for r in rows]
+
+    @staticmethod
+    def weekly_volume(db: Session, user_id: int, start: date, end: date) -> List[dict]:
+        """
+        Weekly sets and volume per muscle group
+        """
+        rows = (
+            db.query(MuscleGroupWeek)
+            .filter(MuscleGroupWeek.user_id == user_id, MuscleGroupWeek.week >= week_start(start),
+                    MuscleGroupWeek.week <= end)
+            .order_by(MuscleGroupWeek.week, MuscleGroupWeek.muscle_group)
+            .all()
+        )
+        return [{"week": r.week.isoformat(), "muscle_group": r.muscle_group, "sets": r.sets,
+                 "volume": round(r.volume, 3)} for r in rows]
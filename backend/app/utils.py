@@ -0,0 +1,16 @@
+"""
+Helpers shared by routers and services
+"""
+from datetime import datetime, timezone
+
+
+def to_utc_naive(ts: datetime) -> datetime:
+    """
+    Normalize a timestamp to naive UTC, the form every timestamp is stored in
+
+    Timestamps with an offset are converted; naive ones are taken to be UTC
+    already and returned as they are.
+    """
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
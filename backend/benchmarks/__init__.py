@@ -0,0 +1,4 @@
+# Performance benchmarks package
+#
+# Each bench_*.py module exposes run(quick: bool) -> dict of named results and
+# can be run on its own; run_benchmarks.py runs them all.
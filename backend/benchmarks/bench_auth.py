@@ -0,0 +1,87 @@
+"""
+Benchmark: CPU cost of logging in again against refreshing a session
+
+A login checks the password with bcrypt (cost factor as configured by
+``bcrypt.gensalt()``), then issues an access token and a refresh token. A
+refresh rotates the refresh token with one statement on the token hash
+index and issues an access token, with no password check. Both are timed as
+the service layer runs them for ``/api/auth/login`` and
+``/api/auth/refresh``, in CPU time (process time) and wall time per call,
+with 20,000 other sessions in the table so that the lookup is not
+trivially small.
+"""
+import time
+from datetime import datetime, timedelta
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+from app.services.auth import AuthService, hash_refresh_token
+from benchmarks.common import memory_session, percentile, report
+
+
+OTHER_SESSIONS = 20000
+PASSWORD = "correct horse battery staple"
+
+
+def _seed(db):
+    user = User(username="bench", email="bench@example.com", password_hash=AuthService.hash_password(PASSWORD))
+    db.add(user)
+    db.flush()
+    now = datetime.utcnow()
+    db.bulk_insert_mappings(RefreshToken, [
+        {"user_id": user.id, "token_hash": hash_refresh_token(f"other-{n}"), "device_id": f"device-{n}",
+         "created_at": now, "expires_at": now + timedelta(days=30)}
+        for n in range(OTHER_SESSIONS)
+    ])
+    db.commit()
+    return user
+
+
+def _login(db):
+    user = AuthService.authenticate_user(db, "bench@example.com", PASSWORD)
+    AuthService.create_access_token({"user_id": user.id, "username": user.username})
+    return AuthService.create_refresh_token(db, user.id, "bench-device")
+
+
+def _measure(func, count):
+    cpu, wall = [], []
+    result = None
+    for _ in range(count):
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        result = func(result)
+        cpu.append((time.process_time() - cpu_start) * 1000)
+        wall.append((time.perf_counter() - wall_start) * 1000)
+    return sum(cpu) / count, percentile(wall, 50), percentile(wall, 95), result
+
+
+def run(quick: bool = False) -> dict:
+    db = memory_session()
+    _seed(db)
+    logins = 3 if quick else 10
+    refreshes = 200 if quick else 2000
+
+    login_cpu, login_p50, login_p95, token = _measure(lambda _: _login(db), logins)
+
+    def _refresh(previous):
+        user_id, username, new_token = AuthService.rotate_refresh_token(db, previous or token)
+        AuthService.create_access_token({"user_id": user_id, "username": username})
+        return new_token
+
+    refresh_cpu, refresh_p50, refresh_p95, _ = _measure(_refresh, refreshes)
+    db.close()
+
+    results = {
+        "login_cpu_ms": round(login_cpu, 2),
+        "login_wall_p50/p95_ms": f"{login_p50:.2f}/{login_p95:.2f}",
+        "refresh_cpu_ms": round(refresh_cpu, 3),
+        "refresh_wall_p50/p95_ms": f"{refresh_p50:.3f}/{refresh_p95:.3f}",
+        "login/refresh_cpu": f"{login_cpu / refresh_cpu:.0f}x",
+        "logins_per_cpu_second": round(1000 / login_cpu, 1),
+        "refreshes_per_cpu_second": round(1000 / refresh_cpu),
+        "sessions_in_table": OTHER_SESSIONS + refreshes + 1,
+    }
+    report("auth: login (bcrypt) vs refresh token rotation", results)
+    return results
+
+
+if __name__ == "__main__":
+    run()
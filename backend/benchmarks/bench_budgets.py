@@ -0,0 +1,52 @@
+"""
+Benchmark: budget overview latency versus transaction volume
+
+Imports statements of growing size and times the month overview, which
+reads only the aggregate table. Latency should stay flat as the number of
+transactions grows.
+"""
+import io
+import random
+from app.models.user import User
+from app.services.budgets import BudgetService, parse_month
+from app.services.finance import FinanceService
+from benchmarks.common import memory_session, report, timeit
+
+
+SIZES = (10_000, 50_000, 200_000)
+CATEGORIES = ("groceries", "coffee", "fuel", "rent", "travel", "dining", "health", "fun")
+
+
+def _statement(rng, lines):
+    rows = ["date,amount,payee"]
+    for i in range(lines):
+        rows.append(f"2024-{1 + i % 12:02d}-{1 + rng.randrange(28):02d},-{rng.randrange(1, 500)}.{i % 100:02d},"
+                    f"{rng.choice(CATEGORIES)} shop {i}")
+    return "\n".join(rows).encode()
+
+
+def run(quick: bool = False) -> dict:
+    sizes = SIZES[:2] if quick else SIZES
+    rng = random.Random(36)
+    results = {}
+    for size in sizes:
+        db = memory_session()
+        user = User(username="bench", email="bench@test.com", password_hash="x")
+        db.add(user)
+        db.commit()
+        for category in CATEGORIES:
+            FinanceService.create_rule(db, user.id, category, category, 100)
+            BudgetService.set_budget(db, user.id, category, 50_000)
+        FinanceService.import_statement(db, user.id, io.BytesIO(_statement(rng, size)), "bench.csv")
+        timing = timeit(lambda: BudgetService.month_summary(db, user.id, parse_month("2024-06")), repeat=50)
+        results[f"overview_{size}_median_ms"] = timing["median_ms"]
+        db.close()
+
+    first, last = results[f"overview_{sizes[0]}_median_ms"], results[f"overview_{sizes[-1]}_median_ms"]
+    results["growth_factor"] = round(last / first, 2) if first else None
+    report("budgets: aggregate-backed month overview", results)
+    return results
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,86 @@
+"""
+Benchmark: offline load test of the AI companion pipeline against the stub model
+
+Simulated users send check-in and insight prompts, part of them repeats of
+popular prompts, through the real queue, batcher, cache and streams. The
+stub model allows a few concurrent calls with a fixed round-trip, like a
+rate-limited provider. Runs the same load with batching off, batching on,
+and batching plus cache, and reports throughput, latency and cache hits.
+"""
+import asyncio
+import random
+import time
+from app.services.companion import CompanionPipeline, ResponseCache, StubModel
+from benchmarks.common import report
+
+
+REQUESTS = 2000
+USERS = 400
+REPEAT_SHARE = 0.3
+POPULAR_PROMPTS = 20
+ARRIVAL_SECONDS = 0.001
+
+
+def _workload(rng, count):
+    load = []
+    for n in range(count):
+        user_id = rng.randrange(USERS)
+        if rng.random() < REPEAT_SHARE:
+            load.append((user_id, "checkin", f"Daily check-in prompt {rng.randrange(POPULAR_PROMPTS)}", None))
+        else:
+            kind = rng.choice(("checkin", "insight", "chat"))
+            load.append((user_id, kind, f"Personal question {n} from user {user_id}", {"day": n % 30}))
+    return load
+
+
+async def _drive(pipeline, load):
+    """
+    Open requests at a steady arrival rate and read every stream to the end
+
+    Each simulated user keeps within the per-user limit, like a client
+    waiting for its own earlier answer.
+    """
+    users = {}
+
+    async def one(index, user_id, kind, prompt, context):
+        await asyncio.sleep(index * ARRIVAL_SECONDS)
+        slot = users.setdefault(user_id, asyncio.Semaphore(pipeline.user_concurrency))
+        async with slot:
+            async for _ in pipeline.open(user_id, kind, prompt, context):
+                pass
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i, *request) for i, request in enumerate(load)))
+    return time.perf_counter() - started
+
+
+def _scenario(name, load, max_batch, cached):
+    model = StubModel(latency=0.05, token_delay=0.001, max_concurrent_calls=4)
+    cache = ResponseCache() if cached else ResponseCache(capacity=0)
+    pipeline = CompanionPipeline(model, max_batch=max_batch, batch_wait=0.01, cache=cache, user_concurrency=2)
+    seconds = asyncio.run(_drive(pipeline, load))
+    stats = pipeline.stats()
+    return {
+        f"{name}_requests_per_s": round(len(load) / seconds, 1),
+        f"{name}_model_calls": model.calls,
+        f"{name}_mean_batch_size": stats["mean_batch_size"],
+        f"{name}_cache_hit_rate": stats["cache_hit_rate"],
+        f"{name}_shared_in_flight": stats["shared"],
+        f"{name}_first_token_p50/p95_ms": f"{stats['first_token_p50_ms']}/{stats['first_token_p95_ms']}",
+        f"{name}_total_p95_ms": stats["total_p95_ms"]
+    }
+
+
+def run(quick: bool = False) -> dict:
+    load = _workload(random.Random(41), REQUESTS // 4 if quick else REQUESTS)
+    results = {"requests": len(load)}
+    results.update(_scenario("unbatched", load, max_batch=1, cached=False))
+    results.update(_scenario("batched", load, max_batch=8, cached=False))
+    results.update(_scenario("batched_cached", load, max_batch=8, cached=True))
+    report("companion: pipeline load test (stub model)", results)
+    assert results["batched_cached_requests_per_s"] > results["unbatched_requests_per_s"]
+    return results
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,110 @@
+"""
+Benchmark: response compression ratio against CPU cost per encoding and level
+
+Compresses the payloads the API actually sends — an NDJSON export, a task
+list, a change feed page, a year of daily metric series and a login
+response — with gzip, brotli and zstd over a range of levels, and
+reports the compressed size and the CPU milliseconds spent per megabyte of
+input. The levels the middleware uses (COMPRESSION_LEVELS) are marked with
+an asterisk. Encodings whose library is not installed are skipped.
+
+The end-to-end section times the same list response through the
+middleware with and without an Accept-Encoding header, to show what
+compression adds to a request.
+"""
+import json
+import random
+from datetime import date, timedelta
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app import compression
+from app.compression import COMPRESSION_LEVELS, COMPRESSION_MIN_BYTES, CompressionMiddleware
+from app.schemas.task import TaskResponse
+from app.services.packing import _to_json_rows
+from app.services.sync import SyncService
+from app.services.tasks import TaskService
+from benchmarks.bench_packing import USER_ID, _json, _seed
+from benchmarks.common import memory_session, report, timeit
+
+
+LEVELS = {"gzip": (1, 6, 9), "br": (1, 3, 5, 9, 11), "zstd": (1, 3, 6, 12, 19)}
+
+
+def _payloads(db, rng, quick):
+    tasks = _to_json_rows(TaskService.list_tasks(db, USER_ID), TaskResponse)
+    series_days = 365
+    start = date(2030, 1, 1)
+    series = {
+        name: [{"date": (start + timedelta(days=n)).isoformat(), "value": round(rng.gauss(mean, mean / 10), 2)}
+               for n in range(series_days)]
+        for name, mean in (("steps", 8000), ("sleep_hours", 7.5), ("weight_kg", 72), ("heart_rate", 61))
+    }
+    return {
+        "export_ndjson": b"".join(_json(row) + b"\n" for row in tasks),
+        "task_list": _json(tasks),
+        "sync_page": _json(SyncService.changes_since(db, USER_ID, 0, limit=500 if quick else 2000)),
+        "metric_series": _json(series),
+        "login": _json({"access_token": "x" * 180, "token_type": "bearer", "expires_in": 1800}),
+    }
+
+
+def _levels(payload: bytes, quick: bool) -> dict:
+    results = {}
+    megabytes = len(payload) / (1024 * 1024)
+    for encoding, levels in LEVELS.items():
+        if encoding not in compression.ENCODERS:
+            results[encoding] = "not installed"
+            continue
+        for level in levels:
+            if quick and level > 12:
+                continue
+            timing = timeit(lambda: compression.compress(encoding, payload, level), repeat=1 if level > 9 else 3)
+            size = len(timing["result"])
+            marker = "*" if level in COMPRESSION_LEVELS[encoding] else ""
+            results[f"{encoding}_{level}{marker}_kb/ratio/ms_per_mb"] = (
+                f"{size / 1024:.1f}/{len(payload) / size:.1f}x/{timing['median_ms'] / max(megabytes, 1e-9):.1f}"
+            )
+    return results
+
+
+def _end_to_end(rows, repeat):
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware)
+
+    @app.get("/tasks")
+    async def tasks():
+        return rows
+
+    client = TestClient(app)
+    results = {}
+    for accept in ("identity", "gzip", "br", "zstd"):
+        if accept != "identity" and accept not in compression.ENCODERS:
+            continue
+        timing = timeit(lambda: client.get("/tasks", headers={"Accept-Encoding": accept}), repeat=repeat)
+        response = timing["result"]
+        wire = int(response.headers["content-length"])
+        results[f"request_{accept}_ms/wire_kb"] = f"{timing['median_ms']:.1f}/{wire / 1024:.1f}"
+    return results
+
+
+def run(quick: bool = False) -> dict:
+    rng = random.Random(47)
+    db = memory_session()
+    _seed(db, rng)
+    payloads = _payloads(db, rng, quick)
+    results = {}
+    for name, payload in payloads.items():
+        results[f"{name}_raw_kb"] = round(len(payload) / 1024, 1)
+        if len(payload) < COMPRESSION_MIN_BYTES:
+            results[f"{name}_note"] = "below the minimum size, sent uncompressed"
+            continue
+        for key, value in _levels(payload, quick).items():
+            results[f"{name}_{key}"] = value
+    results.update(_end_to_end(json.loads(payloads["task_list"]), repeat=3 if quick else 7))
+    db.close()
+    report("compression: size and CPU per encoding and level", results)
+    return results
+
+
+if __name__ == "__main__":
+    run()
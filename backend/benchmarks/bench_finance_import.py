@@ -0,0 +1,71 @@
+"""
+Benchmark: streaming bank-statement import throughput
+
+Generates a large CSV statement, imports it into a fresh in-memory
+database with a set of categorization rules, then re-imports it to measure
+the duplicate path. Target: 500k lines in well under a minute.
+"""
+import io
+import random
+from app.models.finance import CategoryRule
+from app.models.user import User
+from app.services.finance import FinanceService
+from benchmarks.common import memory_session, report
+
+
+LINES = 500_000
+RULES = 200
+TARGET_SECONDS = 30.0
+
+MERCHANTS = ("STARBUCKS", "WHOLE FOODS", "SHELL OIL", "AMAZON MKTPLACE", "NETFLIX.COM", "UBER TRIP",
+             "TRADER JOES", "SPOTIFY", "CVS PHARMACY", "TARGET", "COSTCO WHSE", "DELTA AIR")
+
+
+def _statement(rng, lines):
+    rows = ["Date,Description,Amount"]
+    for i in range(lines):
+        merchant = rng.choice(MERCHANTS)
+        rows.append(f"2024-{1 + i % 12:02d}-{1 + rng.randrange(28):02d},{merchant} #{rng.randrange(100000)} "
+                    f"STORE {rng.randrange(900)},-{rng.randrange(1, 900)}.{rng.randrange(100):02d}")
+    return "\n".join(rows).encode()
+
+
+def run(quick: bool = False) -> dict:
+    lines = LINES // 10 if quick else LINES
+    rng = random.Random(35)
+    data = _statement(rng, lines)
+    db = memory_session()
+    user = User(username="bench", email="bench@test.com", password_hash="x")
+    db.add(user)
+    db.commit()
+    # Mostly non-matching rules exercise the combined matcher's worst case
+    for i in range(RULES):
+        db.add(CategoryRule(user_id=user.id, pattern=f"merchant {i}", category=f"cat{i}", priority=i))
+    for i, merchant in enumerate(MERCHANTS):
+        db.add(CategoryRule(user_id=user.id, pattern=merchant, category=merchant.split()[0].lower(),
+                            priority=RULES + i))
+    db.commit()
+
+    first = FinanceService.import_statement(db, user.id, io.BytesIO(data), "bench.csv")
+    again = FinanceService.import_statement(db, user.id, io.BytesIO(data), "bench.csv")
+    db.close()
+
+    results = {
+        "lines": lines,
+        "rules": RULES + len(MERCHANTS),
+        "statement_mb": round(len(data) / 1e6, 1),
+        "import_s": first["seconds"],
+        "import_rows_per_s": first["rows_per_second"],
+        "inserted": first["inserted"],
+        "reimport_s": again["seconds"],
+        "reimport_duplicates": again["duplicates"],
+        "target_met": first["seconds"] < TARGET_SECONDS
+    }
+    report("finance: statement import", results)
+    assert again["inserted"] == 0
+    assert results["target_met"], f"import took {first['seconds']} s, target {TARGET_SECONDS} s"
+    return results
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,116 @@
+"""
+Benchmark: sustained focus event ingestion into a single SQLite file
+
+Several producer threads push small client batches into the ingestion
+buffer for a fixed duration while the background flusher group-commits
+them to a WAL-mode database file. The baseline commits every event in its
+own transaction, as a plain get_database endpoint would.
+"""
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+from app.database import Base
+from app.models.focus import FocusEvent
+from app.services.focus import BufferFullError, FocusEventBuffer
+from benchmarks.common import report
+
+
+PRODUCERS = 8
+CLIENT_BATCH = 10
+DURATION_SECONDS = 5.0
+BASELINE_EVENTS = 2000
+
+
+def _file_engine(path):
+    import app.database_init  # noqa: F401  (registers every model)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def _pragmas(dbapi_connection, connection_record):
+        dbapi_connection.execute("PRAGMA journal_mode=WAL")
+        dbapi_connection.execute("PRAGMA synchronous=NORMAL")
+
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+def _row(n):
+    now = datetime.utcnow()
+    return {"user_id": 1 + n % 50, "session_id": f"s{n % 200}", "kind": "tick", "ts": now,
+            "value": n, "note": None, "received_at": now}
+
+
+def _baseline(session_factory, count):
+    started = time.perf_counter()
+    for n in range(count):
+        db = session_factory()
+        db.execute(insert(FocusEvent), [_row(n)])
+        db.commit()
+        db.close()
+    return count / (time.perf_counter() - started)
+
+
+def run(quick: bool = False) -> dict:
+    duration = DURATION_SECONDS / 5 if quick else DURATION_SECONDS
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = _file_engine(os.path.join(tmp, "focus.db"))
+        session_factory = sessionmaker(bind=engine)
+        baseline_rate = _baseline(session_factory, BASELINE_EVENTS // (4 if quick else 1))
+
+        buffer = FocusEventBuffer(session_factory)
+        buffer.start()
+        stop_at = time.perf_counter() + duration
+        ack_samples = []
+
+        def produce(worker):
+            n = 0
+            while time.perf_counter() < stop_at:
+                rows = [_row(worker * 10_000_000 + n + i) for i in range(CLIENT_BATCH)]
+                started = time.perf_counter()
+                try:
+                    buffer.append(rows)
+                except BufferFullError:
+                    time.sleep(0.001)
+                    continue
+                ack_samples.append(time.perf_counter() - started)
+                n += CLIENT_BATCH
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=produce, args=(w,)) for w in range(PRODUCERS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        buffer.stop()
+        elapsed = time.perf_counter() - started
+
+        with engine.connect() as conn:
+            stored = conn.exec_driver_sql("SELECT COUNT(*) FROM focus_events").scalar() - BASELINE_EVENTS // (4 if quick else 1)
+        engine.dispose()
+
+    stats = buffer.stats()
+    ack_samples.sort()
+    results = {
+        "producers": PRODUCERS,
+        "client_batch": CLIENT_BATCH,
+        "duration_s": round(elapsed, 2),
+        "events_stored": stored,
+        "events_per_s": round(stored / elapsed),
+        "baseline_commit_per_event_per_s": round(baseline_rate),
+        "speedup": round(stored / elapsed / baseline_rate, 1),
+        "group_commits": stats["batches"],
+        "avg_batch": stats["avg_batch"],
+        "rejected_backpressure": stats["rejected"],
+        "ack_p99_us": round(ack_samples[int(len(ack_samples) * 0.99)] * 1e6, 1) if ack_samples else None
+    }
+    report("focus: buffered event ingestion", results)
+    assert stored == stats["accepted"], "every acknowledged event must be written"
+    return results
+
+
+if __name__ == "__main__":
+    run()
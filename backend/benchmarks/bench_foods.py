@@ -0,0 +1,86 @@
+"""
+Benchmark: food autocomplete latency over a large catalogue
+
+Builds the memory-mapped prefix index for a synthetic catalogue and
+measures lookup latency for type-ahead prefixes, uncached and through the
+LRU cache. Target: p99 under 5 ms.
+"""
+import os
+import random
+import tempfile
+import time
+from app.services import foods as food_service
+from app.services.foods import FoodIndex, FoodService
+from benchmarks.common import percentile, report
+
+
+FOODS = 300_000
+QUERIES = 20_000
+P99_TARGET_MS = 5.0
+
+WORDS = ("chicken beef pork salmon tuna rice pasta bread apple banana orange grape yogurt cheese milk "
+         "butter oat almond peanut walnut spinach kale broccoli carrot potato tomato onion garlic lentil "
+         "bean chickpea tofu egg honey maple chocolate vanilla strawberry blueberry mango coconut quinoa "
+         "barley corn pepper cucumber avocado olive mushroom turkey duck shrimp cod").split()
+STYLES = "grilled baked raw fried smoked roasted steamed organic low-fat wholegrain frozen canned".split()
+
+
+def _catalogue(rng, count):
+    for food_id in range(1, count + 1):
+        name = " ".join([rng.choice(STYLES)] * rng.randint(0, 1) + rng.sample(WORDS, rng.randint(1, 3)))
+        yield (food_id, f"{name.title()} #{food_id}", rng.uniform(10, 900), rng.uniform(0, 40),
+               rng.uniform(0, 90), rng.uniform(0, 60))
+
+
+def _queries(rng, count):
+    queries = []
+    for _ in range(count):
+        word = rng.choice(WORDS)
+        queries.append(word[:rng.randint(1, len(word))])
+    return queries
+
+
+def _latencies(func, queries):
+    samples = []
+    for query in queries:
+        started = time.perf_counter()
+        func(query)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def run(quick: bool = False) -> dict:
+    foods = FOODS // 10 if quick else FOODS
+    rng = random.Random(11)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "food_index.bin")
+        started = time.perf_counter()
+        entries = FoodIndex.build(_catalogue(rng, foods), path)
+        build_s = time.perf_counter() - started
+
+        index = FoodIndex(path)
+        queries = _queries(rng, QUERIES // (10 if quick else 1))
+        uncached = _latencies(lambda q: index.search(q, 10), queries)
+        cached = _latencies(lambda q: FoodService.suggest(q, 10, path=path), queries)
+        index.close()
+        food_service._index.close()
+        food_service._index = None
+
+        results = {
+            "foods": foods,
+            "index_entries": entries,
+            "index_mb": round(os.path.getsize(path) / 1e6, 1),
+            "build_s": round(build_s, 2),
+            "uncached_p50_ms": round(percentile(uncached, 50), 4),
+            "uncached_p99_ms": round(percentile(uncached, 99), 4),
+            "lru_p50_ms": round(percentile(cached, 50), 4),
+            "lru_p99_ms": round(percentile(cached, 99), 4),
+            "p99_target_met": percentile(uncached, 99) < P99_TARGET_MS
+        }
+    report("foods: prefix index autocomplete", results)
+    assert results["p99_target_met"], f"p99 {results['uncached_p99_ms']} ms exceeds {P99_TARGET_MS} ms"
+    return results
+
+
+if __name__ == "__main__":
+    run()
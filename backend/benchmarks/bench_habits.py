@@ -0,0 +1,121 @@
+"""
+Benchmark: bitset-encoded habit history vs. one row per check-in
+
+Compares storage size, streak reads and heatmap reads for the same
+synthetic check-in history.
+"""
+import random
+from datetime import date, timedelta
+from sqlalchemy import Column, Date, Integer, MetaData, Table, insert, select, text
+from app.models.habit import Habit, HabitYear
+from app.services.habits import HabitService, day_index, encode_bits
+from benchmarks.common import memory_session, timeit, report
+
+
+YEARS = 5
+HABITS = 200
+DENSITY = 0.75
+
+baseline_metadata = MetaData()
+checkins = Table(
+    "habit_checkins", baseline_metadata,
+    Column("habit_id", Integer, primary_key=True),
+    Column("day", Date, primary_key=True),
+)
+
+
+def _history(rng, start: date, days: int):
+    return [start + timedelta(days=n) for n in range(days) if rng.random() < DENSITY]
+
+
+def _db_bytes(db) -> int:
+    page_count = db.execute(text("PRAGMA page_count")).scalar()
+    page_size = db.execute(text("PRAGMA page_size")).scalar()
+    return page_count * page_size
+
+
+def baseline_streaks(db, habit_id: int, today: date):
+    """Scan every check-in row to compute current and longest streaks"""
+    days = [row.day for row in db.execute(select(checkins.c.day).where(checkins.c.habit_id == habit_id).order_by(checkins.c.day))]
+    longest = run = 0
+    previous = None
+    for day in days:
+        run = run + 1 if previous and day - previous == timedelta(days=1) else 1
+        longest = max(longest, run)
+        previous = day
+    current = run if previous and (today - previous).days <= 1 else 0
+    return current, longest
+
+
+def baseline_heatmap(db, habit_id: int, year: int):
+    rows = db.execute(select(checkins.c.day).where(
+        checkins.c.habit_id == habit_id,
+        checkins.c.day >= date(year, 1, 1), checkins.c.day < date(year + 1, 1, 1)))
+    days = [0] * ((date(year + 1, 1, 1) - date(year, 1, 1)).days)
+    for row in rows:
+        days[day_index(row.day)] = 1
+    return days
+
+
+def run(quick: bool = False) -> dict:
+    habits = 20 if quick else HABITS
+    today = date(2024, 12, 31)
+    start = date(today.year - YEARS + 1, 1, 1)
+    span = (today - start).days + 1
+    rng = random.Random(7)
+    histories = [_history(rng, start, span) for _ in range(habits)]
+
+    bitset_db = memory_session()
+    base_page = _db_bytes(bitset_db)
+    for habit_id, history in enumerate(histories, start=1):
+        bitset_db.add(Habit(id=habit_id, user_id=1, name=f"h{habit_id}", seq=0))
+        years = {}
+        for day in history:
+            years[day.year] = years.get(day.year, 0) | 1 << day_index(day)
+        bitset_db.execute(insert(HabitYear), [
+            {"habit_id": habit_id, "year": year, "bits": encode_bits(value)} for year, value in years.items()
+        ])
+    bitset_db.commit()
+    # Derive stored streaks once, as incremental maintenance would have
+    for habit_id, history in enumerate(histories, start=1):
+        habit = bitset_db.get(Habit, habit_id)
+        habit.last_checkin = history[-1]
+    bitset_db.commit()
+    bitset_bytes = _db_bytes(bitset_db) - base_page
+
+    row_db = memory_session()
+    baseline_metadata.create_all(bind=row_db.get_bind())
+    base_page = _db_bytes(row_db)
+    for habit_id, history in enumerate(histories, start=1):
+        row_db.execute(insert(checkins), [{"habit_id": habit_id, "day": day} for day in history])
+    row_db.commit()
+    row_bytes = _db_bytes(row_db) - base_page
+
+    ids = range(1, habits + 1)
+    row_streaks = timeit(lambda: [baseline_streaks(row_db, i, today) for i in ids], repeat=3)
+    bit_streaks = timeit(lambda: [(h.streak_as_of(today), h.longest_streak) for h in
+                                  bitset_db.query(Habit).filter(Habit.id.in_(ids))], repeat=3)
+    row_heatmap = timeit(lambda: [baseline_heatmap(row_db, i, today.year) for i in ids], repeat=3)
+    bit_heatmap = timeit(lambda: [HabitService.heatmap(bitset_db, bitset_db.get(Habit, i), today.year)["days"]
+                                  for i in ids], repeat=3)
+    assert bit_heatmap["result"] == row_heatmap["result"]
+
+    results = {
+        "habits x years": f"{habits} x {YEARS}",
+        "checkins": sum(len(h) for h in histories),
+        "row_store_bytes": row_bytes,
+        "bitset_store_bytes": bitset_bytes,
+        "storage_ratio": round(row_bytes / max(bitset_bytes, 1), 1),
+        "row_streaks_per_habit_ms": round(row_streaks["median_ms"] / habits, 4),
+        "bitset_streaks_per_habit_ms": round(bit_streaks["median_ms"] / habits, 4),
+        "row_heatmap_per_habit_ms": round(row_heatmap["median_ms"] / habits, 4),
+        "bitset_heatmap_per_habit_ms": round(bit_heatmap["median_ms"] / habits, 4),
+    }
+    report("habits: bitset history vs. row per check-in", results)
+    bitset_db.close()
+    row_db.close()
+    return results
+
+
+if __name__ == "__main__":
+    run()
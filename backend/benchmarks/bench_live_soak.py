@@ -0,0 +1,169 @@
+"""
+Benchmark: soak test of idle live-update connections on one worker
+
+Starts the API in a uvicorn subprocess against a scratch database, opens
+many idle SSE connections spread over a set of users, and measures the
+server's resident memory per connection. It then writes one task for a
+sample of users and times the fan-out until every connection of those
+users has received its change event. Memory is read with psutil, which
+is not a dependency of the API; without it the benchmark is skipped.
+"""
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+import json
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.database import Base
+from app.models.user import User
+from app.services.auth import AuthService
+from benchmarks.common import percentile, report
+
+try:
+    import psutil
+except ImportError:  # pragma: no cover - depends on the environment
+    psutil = None
+
+
+CONNECTIONS = 10_000
+USERS = 100
+WRITERS = 10
+MAX_KIB_PER_CONNECTION = 64
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _seed_users(database_url):
+    import app.database_init  # noqa: F401  (registers every model)
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    for n in range(1, USERS + 1):
+        db.add(User(id=n, username=f"soak{n}", email=f"soak{n}@test.com", password_hash="x"))
+    db.commit()
+    db.close()
+    engine.dispose()
+
+
+def _start_server(database_url, port):
+    env = dict(os.environ, DATABASE_URL=database_url)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning",
+         "--backlog", "4096"],
+        cwd=BACKEND_DIR, env=env
+    )
+    for _ in range(200):
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/api/health", timeout=1)
+            return server
+        except OSError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("uvicorn did not start")
+
+
+async def _open_stream(port, token):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(
+        f"GET /api/live/events?token={token} HTTP/1.1\r\nHost: localhost\r\nAccept: text/event-stream\r\n\r\n".encode()
+    )
+    await writer.drain()
+    while b"retry:" not in await reader.readline():
+        pass
+    return reader, writer
+
+
+async def _wait_for_change(reader, started):
+    while True:
+        line = await reader.readline()
+        if not line:
+            raise ConnectionError("stream closed")
+        if line.startswith(b"event: changes"):
+            return time.perf_counter() - started
+
+
+def _create_task(port, token):
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{port}/api/tasks",
+        data=json.dumps({"title": "soak"}).encode(),
+        headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"},
+        method="POST"
+    )
+    urllib.request.urlopen(request, timeout=30).read()
+
+
+async def _soak(port, server_pid, connections):
+    tokens = {n: AuthService.create_access_token({"user_id": n, "username": f"soak{n}"}) for n in range(1, USERS + 1)}
+    process = psutil.Process(server_pid)
+    baseline_rss = process.memory_info().rss
+
+    gate = asyncio.Semaphore(500)
+
+    async def open_one(index):
+        user_id = 1 + index % USERS
+        async with gate:
+            reader, writer = await _open_stream(port, tokens[user_id])
+        return user_id, reader, writer
+
+    started = time.perf_counter()
+    streams = await asyncio.gather(*(open_one(i) for i in range(connections)))
+    connect_s = time.perf_counter() - started
+    await asyncio.sleep(1.0)
+    loaded_rss = process.memory_info().rss
+
+    writers = list(range(1, WRITERS + 1))
+    watched = [(reader, user_id) for user_id, reader, _ in streams if user_id in writers]
+    started = time.perf_counter()
+    waits = [asyncio.create_task(_wait_for_change(reader, started)) for reader, _ in watched]
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(*(loop.run_in_executor(None, _create_task, port, tokens[u]) for u in writers))
+    latencies = await asyncio.wait_for(asyncio.gather(*waits), timeout=60)
+
+    for _, _, writer in streams:
+        writer.close()
+    return {
+        "connections": connections,
+        "users": USERS,
+        "connect_s": round(connect_s, 2),
+        "server_rss_baseline_mb": round(baseline_rss / 2**20, 1),
+        "server_rss_loaded_mb": round(loaded_rss / 2**20, 1),
+        "kib_per_connection": round((loaded_rss - baseline_rss) / connections / 1024, 1),
+        "fanout_receivers": len(latencies),
+        "fanout_p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "fanout_max_ms": round(max(latencies) * 1000, 1)
+    }
+
+
+def run(quick: bool = False) -> dict:
+    if psutil is None:
+        print("\nlive: idle SSE connection soak skipped (psutil is not installed)")
+        return {}
+    connections = CONNECTIONS // 10 if quick else CONNECTIONS
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'soak.db')}"
+        _seed_users(database_url)
+        port = _free_port()
+        server = _start_server(database_url, port)
+        try:
+            results = asyncio.run(_soak(port, server.pid, connections))
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+    report("live: idle SSE connection soak", results)
+    assert results["kib_per_connection"] < MAX_KIB_PER_CONNECTION, "per-connection memory above bound"
+    return results
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,112 @@
+"""
+Benchmark: columnar MessagePack vs. JSON for list and sync payloads
+
+Builds a realistic user — 5,000 tasks in a goal/project tree with due
+dates, estimates and some descriptions, 60 habits, and a full change feed
+page — and encodes the task list, the habit list and the sync page both
+ways. Encode time covers what differs between the two responses (JSON
+rendering vs. column packing plus MessagePack); the response-model
+validation and dump that both share is reported once. Sizes are given raw
+and gzipped, since a compressed JSON body is what the binary format has to
+beat on the wire.
+"""
+import gzip
+import json
+import random
+from datetime import datetime, timedelta
+import msgpack
+from app.models.task import Task
+from app.models.habit import Habit
+from app.models.sync import SyncCounter
+from app.schemas.habit import HabitResponse
+from app.schemas.task import TaskResponse
+from app.services.habits import HabitService
+from app.services.packing import _to_json_rows, pack_columns, pack_sync_page
+from app.services.sync import SyncService
+from app.services.tasks import TaskService
+from benchmarks.common import memory_session, report, timeit
+
+
+TASKS = 5000
+HABITS = 60
+USER_ID = 1
+WORDS = ("review", "plan", "call", "write", "fix", "read", "clean", "book", "buy", "send", "draft", "prepare")
+NOUNS = ("report", "groceries", "dentist", "budget", "slides", "garden", "taxes", "invoice", "chapter", "trip")
+
+
+def _seed(db, rng):
+    start = datetime(2030, 1, 1, 8, 0)
+    tasks = []
+    for n in range(TASKS):
+        kind = "goal" if n % 250 == 0 else "project" if n % 25 == 0 else "task"
+        done = rng.random() < 0.4
+        created = start + timedelta(minutes=17 * n)
+        tasks.append(Task(
+            user_id=USER_ID, kind=kind, seq=n + 1,
+            title=f"{rng.choice(WORDS).title()} {rng.choice(NOUNS)} {n}",
+            description=" ".join(rng.choice(WORDS + NOUNS) for _ in range(12)) if rng.random() < 0.3 else None,
+            category=rng.choice(("work", "life", "health")), status="done" if done else rng.choice(("todo", "doing")),
+            priority=rng.randint(1, 4), estimate_minutes=rng.choice((None, 15, 30, 60, 90)),
+            due_date=created + timedelta(days=rng.randint(1, 30)) if rng.random() < 0.7 else None,
+            completed_at=created + timedelta(days=2) if done else None,
+            path=f"/{n // 250}/{n // 25}/{n}", depth=0 if kind == "goal" else 1 if kind == "project" else 2,
+            created_at=created, updated_at=created
+        ))
+    habits = [
+        Habit(user_id=USER_ID, name=f"Habit {n}", category=rng.choice(("work", "life", "health")), seq=TASKS + n + 1,
+              current_streak=rng.randint(0, 40), longest_streak=rng.randint(40, 200),
+              total_checkins=rng.randint(100, 900), last_checkin=(start + timedelta(days=rng.randint(0, 5))).date(),
+              created_at=start, updated_at=start)
+        for n in range(HABITS)
+    ]
+    db.add_all(tasks + habits)
+    db.add(SyncCounter(user_id=USER_ID, last_seq=TASKS + HABITS))
+    db.commit()
+
+
+def _json(payload) -> bytes:
+    # What JSONResponse does with the already validated and dumped content
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+
+def _compare(name, payload, to_packed):
+    results = {}
+    json_body = _json(payload)
+    packed_body = msgpack.packb(to_packed(payload), use_bin_type=True)
+    row_major = msgpack.packb(payload, use_bin_type=True)
+    results[f"{name}_json_kb"] = round(len(json_body) / 1024, 1)
+    results[f"{name}_msgpack_rows_kb"] = round(len(row_major) / 1024, 1)
+    results[f"{name}_msgpack_columnar_kb"] = f"{len(packed_body) / 1024:.1f} ({len(packed_body) / len(json_body):.0%})"
+    json_gz = len(gzip.compress(json_body, 6))
+    packed_gz = len(gzip.compress(packed_body, 6))
+    results[f"{name}_gzip_json/columnar_kb"] = f"{json_gz / 1024:.1f}/{packed_gz / 1024:.1f}"
+    json_ms = timeit(lambda: _json(payload))
+    packed_ms = timeit(lambda: msgpack.packb(to_packed(payload), use_bin_type=True))
+    results[f"{name}_encode_json/columnar_ms"] = f"{json_ms['median_ms']:.2f}/{packed_ms['median_ms']:.2f}"
+    return results
+
+
+def run(quick: bool = False) -> dict:
+    rng = random.Random(46)
+    db = memory_session()
+    _seed(db, rng)
+    results = {}
+
+    tasks = TaskService.list_tasks(db, USER_ID)
+    validated = timeit(lambda: _to_json_rows(tasks, TaskResponse), repeat=3)
+    results["tasks_validate_shared_ms"] = validated["median_ms"]
+    task_rows = validated["result"]
+    results.update(_compare("tasks", task_rows, pack_columns))
+
+    habit_rows = _to_json_rows([habit.to_dict() for habit in HabitService.list_habits(db, USER_ID)], HabitResponse)
+    results.update(_compare("habits", habit_rows, pack_columns))
+
+    page = SyncService.changes_since(db, USER_ID, 0, limit=500 if quick else 2000)
+    results.update(_compare("sync_page", page, pack_sync_page))
+    db.close()
+    report("packing: columnar MessagePack vs JSON", results)
+    return results
+
+
+if __name__ == "__main__":
+    run()
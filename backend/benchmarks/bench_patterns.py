@@ -0,0 +1,98 @@
+"""
+Benchmark: vectorized pattern engine vs. ORM objects and Python loops
+
+Generates ten years of synthetic task history for one user and computes the
+same series both ways.
+"""
+import random
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from app.models.task import Task
+from app.services.patterns import PatternService, SECONDS_PER_DAY
+from benchmarks.common import memory_session, timeit, report
+
+
+YEARS = 10
+TASKS_PER_DAY = 15
+
+
+def _seed(db, user_id: int, days: int) -> datetime:
+    rng = random.Random(42)
+    start = datetime(2015, 1, 1)
+    rows = []
+    for day in range(days):
+        base = start + timedelta(days=day)
+        for _ in range(rng.randint(TASKS_PER_DAY // 2, TASKS_PER_DAY * 3 // 2)):
+            created = base + timedelta(seconds=rng.randint(0, SECONDS_PER_DAY - 1))
+            completed = created + timedelta(hours=rng.randint(0, 30)) if rng.random() < 0.7 else None
+            rows.append({"user_id": user_id, "title": "t", "category": "work", "status": "done" if completed else "todo",
+                         "priority": 2, "seq": 0, "created_at": created, "updated_at": created, "completed_at": completed})
+    db.execute(insert(Task), rows)
+    db.commit()
+    return start
+
+
+def python_baseline(db, user_id: int, start: datetime, days: int, window: int = 7) -> dict:
+    """The straightforward implementation: ORM objects and Python loops"""
+    tasks = db.query(Task).filter(Task.user_id == user_id, Task.deleted_at.is_(None)).all()
+    end = start + timedelta(days=days)
+    heatmap = [[0] * 24 for _ in range(7)]
+    daily_done = [0] * days
+    daily_created = [0] * days
+    for task in tasks:
+        if start <= task.created_at < end:
+            daily_created[(task.created_at - start).days] += 1
+        if task.completed_at and start <= task.completed_at < end:
+            heatmap[task.completed_at.weekday()][task.completed_at.hour] += 1
+            daily_done[(task.completed_at - start).days] += 1
+
+    rolling = []
+    for i in range(days):
+        lo = max(0, i - window + 1)
+        created = sum(daily_created[lo:i + 1])
+        rolling.append(sum(daily_done[lo:i + 1]) / created if created else None)
+
+    n = days
+    mean_x = (n - 1) / 2
+    mean_y = sum(daily_done) / n
+    cov = sum((x - mean_x) * (y - mean_y) for x, y in enumerate(daily_done))
+    var = sum((x - mean_x) ** 2 for x in range(n))
+    slope = cov / var
+    weekday = [sum(row) for row in heatmap]
+    return {"heatmap": heatmap, "weekday": weekday, "daily_completed": daily_done,
+            "rolling": rolling, "slope": slope}
+
+
+def vectorized(db, user_id: int, start: datetime, days: int, window: int = 7) -> dict:
+    columns = PatternService.load_columns(db, user_id, start)
+    start_epoch = int((start - datetime(1970, 1, 1)).total_seconds())
+    return PatternService.compute(columns["created"], columns["completed"], start_epoch, days, window=window)
+
+
+def run(quick: bool = False) -> dict:
+    db = memory_session()
+    days = 365 * (1 if quick else YEARS)
+    start = _seed(db, 1, days)
+    events = db.query(Task).count()
+
+    baseline = timeit(lambda: python_baseline(db, 1, start, days), repeat=3)
+    fast = timeit(lambda: vectorized(db, 1, start, days), repeat=3)
+
+    # Both implementations must agree before their timings mean anything
+    assert fast["result"]["heatmap"] == baseline["result"]["heatmap"]
+    assert fast["result"]["daily_completed"] == baseline["result"]["daily_completed"]
+    assert abs(fast["result"]["trend"]["slope_per_day"] - baseline["result"]["slope"]) < 1e-5
+
+    results = {
+        "events": events,
+        "python_median_ms": baseline["median_ms"],
+        "numpy_median_ms": fast["median_ms"],
+        "speedup": round(baseline["median_ms"] / fast["median_ms"], 1)
+    }
+    report("patterns: NumPy engine vs. ORM + Python loops", results)
+    db.close()
+    return results
+
+
+if __name__ == "__main__":
+    run()
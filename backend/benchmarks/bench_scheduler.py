@@ -0,0 +1,142 @@
+"""
+Benchmark: time-block planning of synthetic workloads
+
+Plans 1,000 tasks over a 4-week horizon of working hours with busy blocks,
+for several workload shapes (independent tasks, dependency chains, tight
+deadlines that exercise the repair pass, and an overloaded horizon). Then
+times incremental re-planning after one task changes against solving the
+whole plan again, and the full service path including database I/O.
+"""
+import random
+from datetime import datetime, timedelta
+from app.models.task import Task
+from app.models.user import User
+from app.models.schedule import BusyBlock, TaskDependency
+from app.services.scheduler import FreeTime, PlanTask, ScheduleService, plan, replan, subtract
+from benchmarks.common import memory_session, report, timeit
+
+
+TASKS = 1000
+DAYS = 28
+MAX_PLAN_MS = 200
+# 12-hour days, seven days a week: room for 1,000 short tasks around the meetings
+SETTINGS = {
+    "days": DAYS, "day_start": "08:00", "day_end": "20:00", "weekdays": [0, 1, 2, 3, 4, 5, 6],
+    "tz_offset_minutes": 0, "min_block_minutes": 10
+}
+START = datetime(2030, 1, 7, 0, 0)
+
+
+def _busy(rng):
+    """Two to four meetings per day"""
+    busy = []
+    for day in range(DAYS):
+        for _ in range(rng.randint(2, 4)):
+            start = day * 1440 + rng.randrange(480, 1140, 15)
+            busy.append((start, start + rng.choice([30, 60, 90])))
+    return busy
+
+
+def _workload(shape, rng, count):
+    horizon = DAYS * 1440
+    tasks = []
+    for n in range(1, count + 1):
+        minutes = rng.choice([5, 10, 15, 20, 30]) if shape != "overloaded" else rng.choice([30, 45, 60])
+        deadline = None
+        if shape == "tight_deadlines" or rng.random() < 0.3:
+            deadline = rng.randrange(600, horizon)
+        depends_on = ()
+        if shape == "chains" and n > 1 and rng.random() < 0.6:
+            depends_on = (n - 1,) if rng.random() < 0.5 else (rng.randint(max(1, n - 50), n - 1),)
+        tasks.append(PlanTask(n, minutes, rng.randint(1, 4), deadline, depends_on))
+    return tasks
+
+
+def _windows(rng):
+    settings_windows = ScheduleService.working_windows(START, DAYS, SETTINGS)
+    return subtract(settings_windows, _busy(rng))
+
+
+def _plan_shapes(rng, count):
+    windows = _windows(rng)
+    rows = {}
+    for shape in ("independent", "chains", "tight_deadlines", "overloaded"):
+        tasks = _workload(shape, rng, count)
+        timing = timeit(lambda: plan(tasks, FreeTime(windows), SETTINGS["min_block_minutes"]), repeat=5)
+        result = timing["result"]
+        rows[f"{shape}_median_ms"] = timing["median_ms"]
+        rows[f"{shape}_placed/late/unscheduled"] = (
+            f"{len(result.blocks)}/{len(result.late)}/{len(result.unscheduled)} (repaired {result.repaired})"
+        )
+        assert timing["median_ms"] < MAX_PLAN_MS, f"{shape} plan above {MAX_PLAN_MS} ms"
+    return rows
+
+
+def _replan(rng, count):
+    windows = _windows(rng)
+    tasks = _workload("independent", rng, count)
+    min_chunk = SETTINGS["min_block_minutes"]
+    previous = plan(tasks, FreeTime(windows), min_chunk).blocks
+    # Change a low-priority task late in the plan, the common "bump an estimate" edit
+    latest = sorted(previous, key=lambda task_id: previous[task_id][0][0])
+    changed = next(task for task in tasks if task.id == latest[int(len(latest) * 0.8)])
+    changed.minutes += 30
+    incremental = timeit(lambda: replan(tasks, FreeTime(windows), previous, {changed.id}, min_chunk), repeat=5)
+    full = timeit(lambda: plan(tasks, FreeTime(windows), min_chunk), repeat=5)
+    result, freeze = incremental["result"]
+    kept = sum(1 for task_id, blocks in previous.items() if blocks[-1][1] <= freeze and task_id != changed.id)
+    return {
+        "replan_one_task_median_ms": incremental["median_ms"],
+        "full_plan_median_ms": full["median_ms"],
+        "replan_blocks_kept": kept,
+        "replan_speedup": round(full["median_ms"] / max(incremental["median_ms"], 0.001), 1)
+    }
+
+
+def _service(rng, count):
+    db = memory_session()
+    user = User(username="sched", email="sched@test.com", password_hash="x")
+    db.add(user)
+    db.commit()
+    tasks = _workload("chains", rng, count)
+    db.bulk_insert_mappings(Task, [
+        {"id": t.id, "user_id": user.id, "title": f"task {t.id}", "priority": t.priority,
+         "estimate_minutes": t.minutes, "path": f"/{t.id}/", "subtree_total": 1,
+         "due_date": START + timedelta(minutes=t.deadline) if t.deadline is not None else None}
+        for t in tasks
+    ])
+    db.bulk_insert_mappings(TaskDependency, [
+        {"task_id": t.id, "depends_on_id": dep, "user_id": user.id} for t in tasks for dep in t.depends_on
+    ])
+    db.bulk_insert_mappings(BusyBlock, [
+        {"user_id": user.id, "start": START + timedelta(minutes=s), "end": START + timedelta(minutes=e)}
+        for s, e in _busy(rng)
+    ])
+    db.commit()
+    created = timeit(lambda: ScheduleService.create_plan(db, user.id, SETTINGS, START), repeat=3)
+    task = db.get(Task, tasks[-1].id)
+    task.estimate_minutes += 30
+    db.commit()
+    replanned = timeit(lambda: ScheduleService.replan(db, user.id, {task.id}), repeat=3)
+    db.close()
+    return {
+        "service_plan_median_ms": created["median_ms"],
+        "service_plan_engine_ms": created["result"]["stats"]["compute_ms"],
+        "service_replan_median_ms": replanned["median_ms"],
+        "service_replanned_tasks": replanned["result"]["stats"]["replanned_tasks"]
+    }
+
+
+def run(quick: bool = False) -> dict:
+    rng = random.Random(40)
+    count = TASKS // 4 if quick else TASKS
+    results = {"tasks": count, "days": DAYS}
+    results.update(_plan_shapes(rng, count))
+    results.update(_replan(rng, count))
+    results.update(_service(rng, count))
+    report("scheduler: time-block planning", results)
+    return results
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,192 @@
+"""
+Benchmark: request schema validation cost per model and per payload size
+
+Every schema in SCHEMA_CASES is validated from a typical request payload,
+the way FastAPI does it for a JSON body (parsed dicts through the model's
+validator), and timed per object. Batches of each payload (1 to 10,000
+objects through a ``List[Model]`` adapter) show how the cost grows with
+payload size. Each measurement is held to a budget: a single object must
+validate within SCHEMA_BUDGET_US microseconds and batches within
+SCHEMA_ITEM_BUDGET_US per item; a batch endpoint's body of one element
+counts as a single object. The run fails when any schema is over
+budget, so a new or changed schema (tasks, habits, finance, ...) has to be
+added to SCHEMA_CASES and meet the same budget as the rest.
+
+For reference, the auth registration schema is also timed in its previous
+form: a v1-style ``@validator`` running ``re.match`` on a raw pattern
+string, against the shared compiled ``Email`` type it uses now. Request
+schemas that have no case yet are listed as uncovered.
+"""
+import gc
+import importlib
+import inspect
+import pkgutil
+import re
+import time
+import warnings
+from typing import List
+from pydantic import BaseModel, Field, TypeAdapter
+import app.schemas
+from app.schemas.auth import RefreshRequest, UserCreate, UserLogin
+from app.schemas.finance import BudgetUpdate, CategoryRuleCreate, TransactionUpdate
+from app.schemas.focus import FocusEventBatch, FocusEventIn
+from app.schemas.habit import CheckInRequest, HabitCreate, HabitUpdate
+from app.schemas.job import JobCreate
+from app.schemas.journal import JournalEntryCreate, JournalEntryUpdate
+from app.schemas.metric import MetricBatch, MetricPointIn
+from app.schemas.schedule import BusyBlockCreate, DependencyUpdate, PlanRequest, ReplanRequest
+from app.schemas.task import TaskCreate, TaskUpdate
+from app.schemas.trigger import ReminderCreate, ReminderUpdate
+from app.schemas.workout import WorkoutSetCreate, WorkoutSetUpdate
+from benchmarks.common import report
+
+
+# Microseconds one typical request object may take to validate
+SCHEMA_BUDGET_US = 10.0
+# Microseconds per object inside a batch
+SCHEMA_ITEM_BUDGET_US = 5.0
+BATCH_SIZES = (1, 100, 1000, 10000)
+# Names of the schemas clients send; those without a case are reported
+REQUEST_SCHEMA_SUFFIXES = ("Create", "Update", "Login", "Request", "In", "Batch")
+
+SCHEMA_CASES = {
+    UserCreate: {"username": "ada_lovelace", "email": "ada.lovelace@example.com", "password": "analytical-engine",
+                 "device_id": "pixel-8", "device_name": "Ada's phone"},
+    UserLogin: {"email": "ada.lovelace@example.com", "password": "analytical-engine", "device_id": "pixel-8"},
+    RefreshRequest: {"refresh_token": "Zm9vYmFyYmF6cXV4cXV1eGNvcmdlZ3JhdWx0Z2FycGx5d2FsZG8"},
+    TaskCreate: {"title": "Prepare quarterly report", "description": "Numbers from finance and the team updates",
+                 "category": "work", "priority": 1, "due_date": "2030-03-31T17:00:00", "estimate_minutes": 90,
+                 "kind": "task", "parent_id": 42},
+    TaskUpdate: {"status": "done", "priority": 2},
+    HabitCreate: {"name": "Read 20 pages", "category": "life"},
+    HabitUpdate: {"name": "Read 30 pages"},
+    CheckInRequest: {"day": "2030-03-01"},
+    CategoryRuleCreate: {"pattern": "coffee roasters", "category": "eating_out", "priority": 50},
+    TransactionUpdate: {"category": "groceries", "amount_cents": -4599, "posted_on": "2030-03-02"},
+    BudgetUpdate: {"limit_cents": 40000},
+    WorkoutSetCreate: {"exercise": "Bench Press", "muscle_group": "chest", "reps": 8, "weight": 72.5,
+                       "performed_at": "2030-03-01T18:30:00"},
+    WorkoutSetUpdate: {"reps": 10},
+    MetricPointIn: {"metric": "sleep_hours", "ts": "2030-03-01T07:00:00", "value": 7.5},
+    FocusEventIn: {"kind": "tick", "ts": "2030-03-01T09:25:00", "session_id": "c0ffee-42", "value": 1500},
+    JobCreate: {"kind": "analytics.summary",
+                "payload": {"period": "week", "start": "2030-02-01", "end": "2030-03-01"}},
+    JournalEntryCreate: {"kind": "reflection", "entry_date": "2030-03-01",
+                         "body": "Slept well, long walk before work, finished the report draft. " * 16},
+    JournalEntryUpdate: {"body": "Edited: the walk was shorter than planned."},
+    PlanRequest: {"days": 14, "day_start": "08:30", "day_end": "17:30", "weekdays": [0, 1, 2, 3, 4],
+                  "tz_offset_minutes": 60, "min_block_minutes": 30},
+    ReplanRequest: {"task_ids": list(range(1, 21))},
+    BusyBlockCreate: {"title": "Dentist", "start": "2030-03-04T10:00:00", "end": "2030-03-04T11:00:00"},
+    DependencyUpdate: {"depends_on": [3, 5, 8]},
+    ReminderCreate: {"title": "Stretch", "fire_at": "2030-03-01T15:00:00", "repeat_seconds": 86400,
+                     "payload": {"habit_id": 7}},
+    ReminderUpdate: {"fire_at": "2030-03-01T16:00:00"},
+}
+
+# Batch endpoints: the body's list field and the schema of one element, swept over BATCH_SIZES
+BATCH_CASES = {MetricBatch: ("points", MetricPointIn), FocusEventBatch: ("events", FocusEventIn)}
+
+
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore")
+    from pydantic import validator
+
+    class LegacyUserCreate(BaseModel):
+        """The registration schema before the shared types: a v1 validator per model"""
+        username: str = Field(..., min_length=3, max_length=50)
+        email: str = Field(...)
+        device_id: str = Field(None, min_length=1, max_length=100)
+        device_name: str = Field(None, max_length=100)
+        password: str = Field(..., min_length=6)
+
+        @validator("email")
+        def validate_email(cls, v):
+            email_pattern = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
+            if not re.match(email_pattern, v):
+                raise ValueError("Invalid email format")
+            return v
+
+
+def _per_call_us(func, calls: int, repeat: int = 25) -> float:
+    # As in timeit, the collector is paused: a 10,000-object batch otherwise
+    # pays for collections of everything else alive in the process. The best
+    # of many short samples keeps a busy moment on the machine from showing
+    # up as a slow schema.
+    calls = max(1, calls // 5)
+    gc.collect()
+    gc.disable()
+    try:
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for _ in range(calls):
+                func()
+            best = min(best, (time.perf_counter() - started) / calls)
+    finally:
+        gc.enable()
+    return best * 1e6
+
+
+def _uncovered() -> List[str]:
+    names = []
+    for info in pkgutil.iter_modules(app.schemas.__path__):
+        module = importlib.import_module(f"app.schemas.{info.name}")
+        for name, model in inspect.getmembers(module, inspect.isclass):
+            if (issubclass(model, BaseModel) and model.__module__ == module.__name__
+                    and name.endswith(REQUEST_SCHEMA_SUFFIXES)
+                    and model not in SCHEMA_CASES and model not in BATCH_CASES):
+                names.append(f"{info.name}.{name}")
+    return sorted(names)
+
+
+def run(quick: bool = False) -> dict:
+    calls = 2000 if quick else 20000
+    sizes = BATCH_SIZES[:-1] if quick else BATCH_SIZES
+    results = {}
+    over_budget = []
+
+    for model, payload in SCHEMA_CASES.items():
+        model.model_validate(payload)  # fail early on a stale sample
+        single = _per_call_us(lambda: model.model_validate(payload), calls)
+        results[f"{model.__name__}_us"] = round(single, 2)
+        if single > SCHEMA_BUDGET_US:
+            over_budget.append(f"{model.__name__} ({single:.1f}us)")
+
+        adapter = TypeAdapter(List[model])
+        per_item = []
+        for size in sizes:
+            batch = [payload] * size
+            per_item.append(_per_call_us(lambda: adapter.validate_python(batch), max(1, calls // size)) / size)
+        results[f"{model.__name__}_batch_us_per_item"] = "/".join(f"{value:.2f}" for value in per_item)
+        if max(per_item) > SCHEMA_ITEM_BUDGET_US:
+            over_budget.append(f"{model.__name__} batch ({max(per_item):.1f}us/item)")
+
+    for model, (field, element) in BATCH_CASES.items():
+        limit = min((m.max_length for m in model.model_fields[field].metadata if hasattr(m, "max_length")),
+                    default=None)
+        # Sizes past what the endpoint accepts are measured at its limit
+        for size in sorted({min(size, limit or size) for size in sizes}):
+            body = {field: [SCHEMA_CASES[element]] * size}
+            elapsed = _per_call_us(lambda: model.model_validate(body), max(1, calls // size))
+            results[f"{model.__name__}_{size}_us"] = f"{elapsed:.1f} ({elapsed / size:.2f}/item)"
+            # A body of one element is a single request object, mostly the fixed
+            # cost of two model instances, and gets the single-object budget
+            if size == 1 and elapsed > SCHEMA_BUDGET_US:
+                over_budget.append(f"{model.__name__} of 1 ({elapsed:.1f}us)")
+            elif size > 1 and elapsed / size > SCHEMA_ITEM_BUDGET_US:
+                over_budget.append(f"{model.__name__} of {size} ({elapsed / size:.1f}us/item)")
+
+    legacy = _per_call_us(lambda: LegacyUserCreate.model_validate(SCHEMA_CASES[UserCreate]), calls)
+    results["UserCreate_legacy_validator_us"] = f"{legacy:.2f} ({legacy / results['UserCreate_us']:.1f}x current)"
+    results["batch_sizes"] = "/".join(str(size) for size in sizes)
+    results["budget_us_single/per_item"] = f"{SCHEMA_BUDGET_US}/{SCHEMA_ITEM_BUDGET_US}"
+    results["uncovered_request_schemas"] = ", ".join(_uncovered()) or "none"
+    report("schemas: request validation cost per model and payload size", results)
+    if over_budget:
+        raise AssertionError(f"Schemas over the validation budget: {', '.join(over_budget)}")
+    return results
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,100 @@
+"""
+Benchmark: write throughput against the number of SQLite shards
+
+Eight writer threads, each recording metric samples for its own four users
+(one small transaction per sample, as the ingestion endpoint does), run for
+a fixed time against 1, 2, 4 and 8 hashed shard files and against one file
+per user. With a single file every commit waits for the one SQLite writer;
+spread over shards, writers only wait for others in the same shard.
+
+Each layout runs twice: on the local disk as is, and with a few
+milliseconds added to every commit while the write lock is held, standing
+in for durable commits on network or cloud storage. On the local disk the
+writers are mostly bound by CPU, so the gain there depends on the cores
+available; the core count is reported alongside.
+"""
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from app.database import Base, ShardRouter, create_sqlite_engine
+from app.services.metrics import MetricService
+from benchmarks.common import report
+
+
+WRITERS = 8
+USERS_PER_WRITER = 4
+SHARD_LAYOUTS = (("hash", 1), ("hash", 2), ("hash", 4), ("hash", 8), ("user", None))
+SECONDS = 3.0
+COMMIT_LATENCY_SECONDS = 0.003
+START = datetime(2030, 1, 1)
+
+
+def _layout(mode, count, seconds, latency):
+    import app.database_init  # noqa: F401  (registers every model)
+    with tempfile.TemporaryDirectory() as directory:
+        central = create_sqlite_engine(f"sqlite:///{os.path.join(directory, 'central.db')}")
+        Base.metadata.create_all(bind=central)
+        router = ShardRouter(mode, central, count=count or 1, directory=directory,
+                             capacity=WRITERS * USERS_PER_WRITER)
+        users = [list(range(w * USERS_PER_WRITER + 1, (w + 1) * USERS_PER_WRITER + 1)) for w in range(WRITERS)]
+        # Open every shard up front so the timed run measures writes only
+        for user_id in sum(users, []):
+            db = router.session(user_id)
+            if latency:
+                event.listen(db.get_bind(), "commit", lambda connection: time.sleep(latency))
+            db.close()
+        shards = router.stats()["open_shards"]
+
+        totals = [0] * WRITERS
+        errors = [0] * WRITERS
+        deadline = time.perf_counter() + seconds
+
+        def _write(writer, user_ids):
+            n = 0
+            while time.perf_counter() < deadline:
+                user_id = user_ids[n % len(user_ids)]
+                db = router.session(user_id)
+                try:
+                    MetricService.record_points(db, user_id, [("steps", START + timedelta(seconds=n), float(n))])
+                    totals[writer] += 1
+                except Exception:
+                    errors[writer] += 1
+                finally:
+                    db.close()
+                n += 1
+
+        threads = [threading.Thread(target=_write, args=(w, user_ids)) for w, user_ids in enumerate(users)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        router.dispose()
+        central.dispose()
+    return shards, sum(totals) / seconds, sum(errors)
+
+
+def run(quick: bool = False) -> dict:
+    seconds = 1.0 if quick else SECONDS
+    results = {}
+    for latency, storage in ((0, "local"), (COMMIT_LATENCY_SECONDS, "slow_commit")):
+        baseline = None
+        for mode, count in SHARD_LAYOUTS:
+            shards, rate, errors = _layout(mode, count, seconds, latency)
+            baseline = baseline or rate
+            label = f"{storage}_{mode}_{shards}_shards"
+            results[f"{label}_writes/s"] = f"{rate:.0f} ({rate / baseline:.2f}x)"
+            if errors:
+                results[f"{label}_errors"] = errors
+    results["commit_latency_ms"] = COMMIT_LATENCY_SECONDS * 1000
+    results["cpu_count"] = os.cpu_count()
+    results["writer_threads"] = WRITERS
+    results["users"] = WRITERS * USERS_PER_WRITER
+    report("sharding: write throughput by shard count", results)
+    return results
+
+
+if __name__ == "__main__":
+    run()
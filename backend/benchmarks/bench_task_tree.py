@@ -0,0 +1,110 @@
+"""
+Benchmark: subtree progress reads on a deep 100k-node task hierarchy
+
+Progress comes from cached counters (one primary-key read) versus a
+recursive CTE aggregating the subtree on every read. Also times a status
+change on a deep leaf, which propagates up the whole ancestor chain, and a
+subtree fetch through the materialized-path range scan.
+"""
+import random
+from datetime import datetime
+from sqlalchemy import insert, text
+from app.models.task import Task
+from app.models.user import User
+from app.schemas.task import TaskUpdate
+from app.services.task_tree import TaskTreeService
+from app.services.tasks import TaskService
+from benchmarks.common import memory_session, report, timeit
+
+
+NODES = 100_000
+DEPTH = 12
+ROOTS = 50
+
+SUBTREE_CTE = text("""
+    WITH RECURSIVE subtree(id, status) AS (
+        SELECT id, status FROM tasks WHERE id = :root
+        UNION ALL
+        SELECT t.id, t.status FROM tasks t JOIN subtree s ON t.parent_id = s.id
+    )
+    SELECT SUM(status = 'done'), COUNT(*) FROM subtree
+""")
+
+
+def _build(db, user_id, nodes, rng):
+    """Insert a random forest whose levels grow geometrically down to DEPTH"""
+    now = datetime.utcnow()
+    rows, levels = [], [[]]
+    for node_id in range(1, ROOTS + 1):
+        rows.append((node_id, None, f"/{node_id}/", 0))
+        levels[0].append(node_id)
+    per_level = (nodes - ROOTS) // DEPTH
+    paths = {row[0]: row[2] for row in rows}
+    next_id = ROOTS + 1
+    for depth in range(1, DEPTH + 1):
+        levels.append([])
+        for _ in range(per_level):
+            parent = rng.choice(levels[depth - 1])
+            paths[next_id] = f"{paths[parent]}{next_id}/"
+            rows.append((next_id, parent, paths[next_id], depth))
+            levels[depth].append(next_id)
+            next_id += 1
+    db.execute(insert(Task), [
+        {"id": node_id, "user_id": user_id, "title": f"node {node_id}", "category": "work",
+         "status": "done" if rng.random() < 0.3 else "todo", "priority": 2, "kind": "task",
+         "parent_id": parent, "path": path, "depth": depth, "created_at": now, "updated_at": now}
+        for node_id, parent, path, depth in rows
+    ])
+    db.commit()
+    TaskTreeService.rebuild_counters(db, user_id)
+    return levels
+
+
+def run(quick: bool = False) -> dict:
+    nodes = NODES // 10 if quick else NODES
+    rng = random.Random(39)
+    db = memory_session()
+    user = User(username="bench", email="bench@test.com", password_hash="x")
+    db.add(user)
+    db.commit()
+    levels = _build(db, user.id, nodes, rng)
+    root = levels[0][0]
+    leaf = rng.choice(levels[-1])
+
+    def cached_progress():
+        db.expire_all()
+        task = TaskService.get_task(db, user.id, root)
+        return task.subtree_done, task.subtree_total
+
+    def cte_progress():
+        return tuple(db.execute(SUBTREE_CTE, {"root": root}).one())
+
+    cached = timeit(cached_progress, repeat=200)
+    recursive = timeit(cte_progress, repeat=20)
+    assert cached["result"] == recursive["result"]
+
+    statuses = iter(["done", "todo"] * 50)
+    toggle = timeit(
+        lambda: TaskService.update_task(db, TaskService.get_task(db, user.id, leaf), TaskUpdate(status=next(statuses))),
+        repeat=100
+    )
+    fetch = timeit(lambda: len(TaskTreeService.subtree(db, TaskService.get_task(db, user.id, root))), repeat=20)
+    db.close()
+
+    results = {
+        "nodes": nodes,
+        "depth": DEPTH,
+        "root_subtree_size": recursive["result"][1],
+        "cached_progress_median_ms": cached["median_ms"],
+        "recursive_cte_median_ms": recursive["median_ms"],
+        "speedup": round(recursive["median_ms"] / cached["median_ms"], 1),
+        "deep_status_change_median_ms": toggle["median_ms"],
+        "subtree_fetch_median_ms": fetch["median_ms"],
+        "subtree_rows": fetch["result"]
+    }
+    report("tasks: hierarchical progress", results)
+    return results
+
+
+if __name__ == "__main__":
+    run()
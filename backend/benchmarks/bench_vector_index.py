@@ -0,0 +1,95 @@
+"""
+Benchmark: journal similarity search over a memory-mapped vector index
+
+Fills one index with 100,000 synthetic clustered unit vectors (recurring
+themes, like real journal embeddings), then compares exact brute-force
+search with IVF search at several nprobe values on latency and recall@10 against the
+exact answer. Also times incremental adds, reopening the index from disk
+and the embedder itself.
+"""
+import tempfile
+import time
+import numpy as np
+from app.services.embeddings import HashingEmbedder
+from app.services.vector_index import VectorIndex
+from benchmarks.common import percentile, report, timeit
+
+
+ENTRIES = 100_000
+DIM = 256
+TOPICS = 200
+SUBTOPICS = 2000
+NOISE = 2.0
+QUERIES = 200
+K = 10
+NPROBES = (8, 16, 24, 48)
+
+
+def _unit(vectors):
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def _clustered(rng, count):
+    """Entries around subtopics around topics, like embeddings of recurring journal themes"""
+    topics = _unit(rng.standard_normal((TOPICS, DIM)))
+    subtopics = _unit(topics[rng.integers(0, TOPICS, SUBTOPICS)] + 0.5 * _unit(rng.standard_normal((SUBTOPICS, DIM))))
+    return _unit(subtopics[rng.integers(0, SUBTOPICS, count)] + NOISE * _unit(rng.standard_normal((count, DIM))))
+
+
+def _search_latency(index, queries, **options):
+    samples = []
+    results = []
+    for query in queries:
+        started = time.perf_counter()
+        results.append({entry_id for entry_id, _ in index.search(query, K, **options)})
+        samples.append((time.perf_counter() - started) * 1000)
+    return results, samples
+
+
+def run(quick: bool = False) -> dict:
+    rng = np.random.default_rng(42)
+    count = ENTRIES // 4 if quick else ENTRIES
+    vectors = _clustered(rng, count + 1000 + QUERIES)
+    queries = vectors[-QUERIES:]
+    results = {"entries": count, "dim": DIM}
+
+    with tempfile.TemporaryDirectory() as root:
+        index = VectorIndex(f"{root}/user", DIM, "bench", ivf_threshold=count)
+        started = time.perf_counter()
+        for offset in range(0, count, 2000):
+            end = min(offset + 2000, count)
+            index.upsert(list(range(offset, end)), vectors[offset:end])
+        results["build_with_training_s"] = round(time.perf_counter() - started, 2)
+        results["ivf_lists"] = index.nlist
+
+        exact, samples = _search_latency(index, queries, exact=True)
+        results["brute_force_p50/p95_ms"] = f"{percentile(samples, 50):.2f}/{percentile(samples, 95):.2f}"
+        for nprobe in NPROBES:
+            found, samples = _search_latency(index, queries, nprobe=nprobe)
+            recall = sum(len(a & b) for a, b in zip(found, exact)) / (K * QUERIES)
+            results[f"ivf_nprobe_{nprobe}_p50/p95_ms"] = f"{percentile(samples, 50):.2f}/{percentile(samples, 95):.2f}"
+            results[f"ivf_nprobe_{nprobe}_recall@10"] = round(recall, 3)
+
+        add = timeit(lambda: index.upsert([count + int(rng.integers(1000))], vectors[count:count + 1]), repeat=50)
+        results["incremental_add_median_ms"] = add["median_ms"]
+        index.close()
+        reopen = timeit(lambda: VectorIndex(f"{root}/user", DIM, "bench", ivf_threshold=count), repeat=5)
+        results["reopen_median_ms"] = reopen["median_ms"]
+        reopened = reopen["result"]
+        _, samples = _search_latency(reopened, queries)
+        results["ivf_after_reopen_p50_ms"] = round(percentile(samples, 50), 2)
+        reopened.close()
+
+    embedder = HashingEmbedder(DIM)
+    texts = [f"Entry {n}: slept well, long walk by the river, thinking about project {n % 50}" for n in range(5000)]
+    started = time.perf_counter()
+    embedder.embed(texts)
+    results["embedder_texts_per_s"] = round(len(texts) / (time.perf_counter() - started))
+
+    report("vector index: journal similarity search", results)
+    assert results[f"ivf_nprobe_{NPROBES[2]}_recall@10"] >= 0.85
+    return results
+
+
+if __name__ == "__main__":
+    run()
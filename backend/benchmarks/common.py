@@ -0,0 +1,54 @@
+"""
+Shared helpers for benchmarks
+"""
+import statistics
+import time
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.database import Base
+
+
+def memory_session():
+    """
+    Create a session bound to a fresh in-memory SQLite database with all tables
+    """
+    import app.database_init  # noqa: F401  (registers every model)
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine, autoflush=False)()
+
+
+def timeit(func, repeat: int = 5) -> dict:
+    """
+    Time a callable several times
+
+    Returns:
+        Dictionary with min, median and max in milliseconds plus the last result
+    """
+    samples = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return {
+        "min_ms": round(min(samples), 3),
+        "median_ms": round(statistics.median(samples), 3),
+        "max_ms": round(max(samples), 3),
+        "result": result
+    }
+
+
+def percentile(samples, pct: float) -> float:
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def report(name: str, rows: dict) -> None:
+    """Print benchmark results as aligned key/value lines"""
+    print(f"\n== {name}")
+    for key, value in rows.items():
+        print(f"  {key:<40} {value}")
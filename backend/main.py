@@ -1,9 +1,17 @@
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI, Request
+from fastapi.exception_handlers import request_validation_exception_handler
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
-from app.database import get_database, test_connection, init_database
-from app.models.user import User
-from app.routers import auth
+from app.compression import CompressionMiddleware
+from app.idempotency import IdempotencyMiddleware
+from app.database import SessionLocal, test_connection, init_database
+from app.schemas.types import readable_errors
+from app.services.focus import focus_buffer
+from app.services.jobs import job_workers
+from app.services.task_tree import TaskTreeService
+from app.services.triggers import TriggerService, trigger_scheduler
+from app.routers import auth, tasks, habits, metrics, foods, workouts, finance, focus, companion, journal, jobs, reminders, live, schedule, sync, export, dashboard, analytics
 
 # Create FastAPI app instance
 app = FastAPI(
@@ -12,6 +20,9 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Replay stored responses to retried POST/PATCH requests that carry an Idempotency-Key
+app.add_middleware(IdempotencyMiddleware)
+
 # Configure CORS for frontend communication
 app.add_middleware(
     CORSMiddleware,
@@ -21,8 +32,35 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Include authentication router
+# Compress large responses (exports, analytics series, sync pages) for clients that accept it
+app.add_middleware(CompressionMiddleware)
+
+@app.exception_handler(RequestValidationError)
+async def validation_exception_handler(request: Request, exc: RequestValidationError):
+    """Default 422 response, without the raw regex of failed pattern checks"""
+    return await request_validation_exception_handler(
+        request, RequestValidationError(readable_errors(exc.errors()), body=exc.body)
+    )
+
+# Include API routers
 app.include_router(auth.router)
+app.include_router(tasks.router)
+app.include_router(habits.router)
+app.include_router(metrics.router)
+app.include_router(foods.router)
+app.include_router(workouts.router)
+app.include_router(finance.router)
+app.include_router(focus.router)
+app.include_router(companion.router)
+app.include_router(journal.router)
+app.include_router(jobs.router)
+app.include_router(reminders.router)
+app.include_router(live.router)
+app.include_router(schedule.router)
+app.include_router(sync.router)
+app.include_router(export.router)
+app.include_router(dashboard.router)
+app.include_router(analytics.router)
 
 @app.get("/")
 async def root():
@@ -45,6 +83,22 @@ async def startup_event():
     print("Initializing database...")
     init_database()
     print("Database initialization complete!")
+    focus_buffer.start()
+    job_workers.start()
+    db = SessionLocal()
+    try:
+        TriggerService.ensure_system_triggers(db)
+        TaskTreeService.backfill(db)
+    finally:
+        db.close()
+    trigger_scheduler.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Write buffered focus events and let running jobs finish before the process exits"""
+    trigger_scheduler.stop()
+    focus_buffer.stop()
+    job_workers.stop()
 
 if __name__ == "__main__":
     print("Starting LifeOS API server...")
@@ -0,0 +1,53 @@
+"""
+Run the LifeOS performance benchmark suite
+
+Usage:
+    python run_benchmarks.py                 # every benchmark
+    python run_benchmarks.py patterns        # benchmarks whose name contains "patterns"
+    python run_benchmarks.py --quick         # reduced sizes for a fast smoke run
+"""
+import argparse
+import importlib
+import pkgutil
+import sys
+import time
+import benchmarks
+
+
+def discover(filters):
+    """Find benchmarks/bench_*.py modules, optionally filtered by name"""
+    names = sorted(
+        info.name for info in pkgutil.iter_modules(benchmarks.__path__)
+        if info.name.startswith("bench_")
+    )
+    if filters:
+        names = [name for name in names if any(f in name for f in filters)]
+    return names
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run LifeOS benchmarks")
+    parser.add_argument("filters", nargs="*", help="Substrings of benchmark names to run")
+    parser.add_argument("--quick", action="store_true", help="Use reduced sizes")
+    args = parser.parse_args()
+
+    failures = []
+    for name in discover(args.filters):
+        module = importlib.import_module(f"benchmarks.{name}")
+        started = time.perf_counter()
+        try:
+            module.run(quick=args.quick)
+        except Exception as e:
+            failures.append(name)
+            print(f"\n❌ {name} failed: {e}")
+        print(f"  ({name} took {time.perf_counter() - started:.1f}s)")
+
+    if failures:
+        print(f"\n❌ {len(failures)} benchmark(s) failed: {', '.join(failures)}")
+        return False
+    print("\n🎉 All benchmarks completed!")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+Standalone background job worker for LifeOS
+
+Runs next to the API (which can then use JOB_WORKERS=0) against the same
+database; any number of these can share the queue.
+"""
+import os
+import signal
+import threading
+from app.database import SessionLocal, init_database
+from app.services.jobs import JobWorkerPool
+
+if __name__ == "__main__":
+    init_database()
+    pool = JobWorkerPool(SessionLocal, workers=int(os.getenv("JOB_WORKERS", "4")) or 1)
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopping.set())
+    pool.start()
+    print(f"⚙️  Job worker {pool.worker_id} running with {pool.workers} threads (Ctrl+C to stop)")
+    try:
+        stopping.wait()
+    except KeyboardInterrupt:
+        pass
+    print("Stopping, waiting for running jobs...")
+    pool.stop()
@@ -13,4 +13,369 @@ CREATE TABLE IF NOT EXISTS users (
 
 -- Create indexes for better query performance
 CREATE INDEX IF NOT EXISTS idx_users_username ON users(username);
-CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
+
+-- Refresh token sessions, one per device; only SHA-256 hashes of the tokens are stored
+CREATE TABLE IF NOT EXISTS refresh_tokens (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    token_hash VARCHAR(64) NOT NULL,
+    device_id VARCHAR(100) NOT NULL DEFAULT 'default',
+    device_name VARCHAR(100),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP NOT NULL,
+    revoked_at TIMESTAMP,
+    replaced_by_id INTEGER
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_refresh_tokens_hash ON refresh_tokens(token_hash);
+CREATE INDEX IF NOT EXISTS idx_refresh_tokens_user_device ON refresh_tokens(user_id, device_id);
+CREATE INDEX IF NOT EXISTS idx_refresh_tokens_expires ON refresh_tokens(expires_at);
+
+-- Per-user change sequence for delta sync
+CREATE TABLE IF NOT EXISTS sync_counters (
+    user_id INTEGER PRIMARY KEY REFERENCES users(id),
+    last_seq INTEGER NOT NULL DEFAULT 0
+);
+
+-- Tasks table (soft-deleted rows are kept as sync tombstones)
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    title VARCHAR(200) NOT NULL,
+    description TEXT,
+    category VARCHAR(20) NOT NULL DEFAULT 'life',
+    status VARCHAR(20) NOT NULL DEFAULT 'todo',
+    priority INTEGER NOT NULL DEFAULT 2,
+    due_date TIMESTAMP,
+    estimate_minutes INTEGER,
+    completed_at TIMESTAMP,
+    kind VARCHAR(20) NOT NULL DEFAULT 'task',
+    parent_id INTEGER REFERENCES tasks(id),
+    path VARCHAR(512) NOT NULL DEFAULT '',
+    depth INTEGER NOT NULL DEFAULT 0,
+    subtree_total INTEGER NOT NULL DEFAULT 0,
+    subtree_done INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    seq INTEGER NOT NULL DEFAULT 0,
+    deleted_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_tasks_user_id ON tasks(user_id);
+CREATE INDEX IF NOT EXISTS idx_tasks_user_seq ON tasks(user_id, seq);
+CREATE INDEX IF NOT EXISTS idx_tasks_user_path ON tasks(user_id, path);
+
+-- Daily analytics rollups, maintained incrementally on every task write
+CREATE TABLE IF NOT EXISTS daily_rollups (
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    day DATE NOT NULL,
+    category VARCHAR(20) NOT NULL,
+    tasks_created INTEGER NOT NULL DEFAULT 0,
+    tasks_completed INTEGER NOT NULL DEFAULT 0,
+    habit_checkins INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, day, category)
+);
+
+-- Habits with incrementally maintained streaks
+CREATE TABLE IF NOT EXISTS habits (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    name VARCHAR(100) NOT NULL,
+    category VARCHAR(20) NOT NULL DEFAULT 'life',
+    current_streak INTEGER NOT NULL DEFAULT 0,
+    longest_streak INTEGER NOT NULL DEFAULT 0,
+    total_checkins INTEGER NOT NULL DEFAULT 0,
+    last_checkin DATE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    seq INTEGER NOT NULL DEFAULT 0,
+    deleted_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_habits_user_id ON habits(user_id);
+CREATE INDEX IF NOT EXISTS idx_habits_user_seq ON habits(user_id, seq);
+
+-- Habit check-ins as one 46-byte bitset per habit and year (bit n = day n of the year)
+CREATE TABLE IF NOT EXISTS habit_years (
+    habit_id INTEGER NOT NULL REFERENCES habits(id),
+    year INTEGER NOT NULL,
+    bits BLOB NOT NULL,
+    PRIMARY KEY (habit_id, year)
+);
+
+-- Wellness metrics: raw samples for the recent window
+CREATE TABLE IF NOT EXISTS metric_points (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    metric VARCHAR(30) NOT NULL,
+    ts TIMESTAMP NOT NULL,
+    value FLOAT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_metric_points_user_metric_ts ON metric_points(user_id, metric, ts);
+
+-- Older raw samples packed into one row per day (int32 offsets then float64 values)
+CREATE TABLE IF NOT EXISTS metric_blocks (
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    metric VARCHAR(30) NOT NULL,
+    day DATE NOT NULL,
+    count INTEGER NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (user_id, metric, day)
+);
+
+-- Hourly, daily and weekly min/max/sum/count tiers
+CREATE TABLE IF NOT EXISTS metric_rollups (
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    metric VARCHAR(30) NOT NULL,
+    tier VARCHAR(10) NOT NULL,
+    bucket TIMESTAMP NOT NULL,
+    count INTEGER NOT NULL,
+    sum FLOAT NOT NULL,
+    min FLOAT NOT NULL,
+    max FLOAT NOT NULL,
+    PRIMARY KEY (user_id, metric, tier, bucket)
+);
+
+-- Shared food catalogue (macros per 100 g); autocomplete uses a separate on-disk prefix index
+CREATE TABLE IF NOT EXISTS foods (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(200) NOT NULL,
+    calories FLOAT NOT NULL DEFAULT 0,
+    protein FLOAT NOT NULL DEFAULT 0,
+    carbs FLOAT NOT NULL DEFAULT 0,
+    fat FLOAT NOT NULL DEFAULT 0
+);
+
+-- Workout sets
+CREATE TABLE IF NOT EXISTS workout_sets (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    exercise VARCHAR(100) NOT NULL,
+    muscle_group VARCHAR(30) NOT NULL DEFAULT 'other',
+    reps INTEGER NOT NULL DEFAULT 0,
+    weight FLOAT NOT NULL DEFAULT 0,
+    duration_seconds INTEGER,
+    performed_at TIMESTAMP NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    seq INTEGER NOT NULL DEFAULT 0,
+    deleted_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_workout_sets_user_seq ON workout_sets(user_id, seq);
+CREATE INDEX IF NOT EXISTS idx_workout_sets_user_exercise ON workout_sets(user_id, exercise);
+
+-- Incrementally maintained workout progress summaries
+CREATE TABLE IF NOT EXISTS exercise_summaries (
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    exercise VARCHAR(100) NOT NULL,
+    total_sets INTEGER NOT NULL DEFAULT 0,
+    total_reps INTEGER NOT NULL DEFAULT 0,
+    total_volume FLOAT NOT NULL DEFAULT 0,
+    best_weight FLOAT NOT NULL DEFAULT 0,
+    best_e1rm FLOAT NOT NULL DEFAULT 0,
+    last_performed TIMESTAMP,
+    PRIMARY KEY (user_id, exercise)
+);
+
+CREATE TABLE IF NOT EXISTS exercise_days (
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    exercise VARCHAR(100) NOT NULL,
+    day DATE NOT NULL,
+    sets INTEGER NOT NULL DEFAULT 0,
+    volume FLOAT NOT NULL DEFAULT 0,
+    best_e1rm FLOAT NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, exercise, day)
+);
+
+CREATE TABLE IF NOT EXISTS muscle_group_weeks (
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    week DATE NOT NULL,
+    muscle_group VARCHAR(30) NOT NULL,
+    sets INTEGER NOT NULL DEFAULT 0,
+    volume FLOAT NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, week, muscle_group)
+);
+
+-- Bank and card transactions (signed integer cents)
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    account VARCHAR(50) NOT NULL,
+    posted_on DATE NOT NULL,
+    amount_cents INTEGER NOT NULL,
+    payee VARCHAR(200) NOT NULL,
+    category VARCHAR(50),
+    dedup_hash VARCHAR(32) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    seq INTEGER NOT NULL DEFAULT 0,
+    deleted_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_transactions_user_seq ON transactions(user_id, seq);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_transactions_user_dedup ON transactions(user_id, dedup_hash);
+CREATE INDEX IF NOT EXISTS idx_transactions_user_posted ON transactions(user_id, posted_on);
+
+-- Payee categorization rules, tried in priority order
+CREATE TABLE IF NOT EXISTS category_rules (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    pattern VARCHAR(100) NOT NULL,
+    category VARCHAR(50) NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 100,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_category_rules_user ON category_rules(user_id);
+
+-- Monthly budget limits and incrementally maintained spending aggregates
+CREATE TABLE IF NOT EXISTS budgets (
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    category VARCHAR(50) NOT NULL,
+    limit_cents INTEGER NOT NULL,
+    PRIMARY KEY (user_id, category)
+);
+
+CREATE TABLE IF NOT EXISTS budget_aggregates (
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    month DATE NOT NULL,
+    category VARCHAR(50) NOT NULL,
+    spent_cents INTEGER NOT NULL DEFAULT 0,
+    income_cents INTEGER NOT NULL DEFAULT 0,
+    transaction_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, month, category)
+);
+
+-- Focus and Pomodoro session events (append-only, group-committed)
+CREATE TABLE IF NOT EXISTS focus_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    session_id VARCHAR(64),
+    kind VARCHAR(20) NOT NULL,
+    ts TIMESTAMP NOT NULL,
+    value INTEGER,
+    note VARCHAR(200),
+    received_at TIMESTAMP NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_focus_events_user_ts ON focus_events(user_id, ts);
+
+-- Scheduling: busy calendar time, task dependencies and the stored time-blocked plan
+CREATE TABLE IF NOT EXISTS busy_blocks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    title VARCHAR(200),
+    start TIMESTAMP NOT NULL,
+    "end" TIMESTAMP NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_busy_blocks_user_start ON busy_blocks(user_id, start);
+
+CREATE TABLE IF NOT EXISTS task_dependencies (
+    task_id INTEGER NOT NULL REFERENCES tasks(id),
+    depends_on_id INTEGER NOT NULL REFERENCES tasks(id),
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    PRIMARY KEY (task_id, depends_on_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_task_dependencies_user ON task_dependencies(user_id);
+
+CREATE TABLE IF NOT EXISTS schedule_plans (
+    user_id INTEGER PRIMARY KEY REFERENCES users(id),
+    horizon_start TIMESTAMP NOT NULL,
+    horizon_end TIMESTAMP NOT NULL,
+    settings TEXT NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS schedule_blocks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    task_id INTEGER NOT NULL REFERENCES tasks(id),
+    start TIMESTAMP NOT NULL,
+    "end" TIMESTAMP NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_schedule_blocks_user_start ON schedule_blocks(user_id, start);
+
+-- Journal notes, reflections and check-in answers (similarity index lives in VECTOR_INDEX_DIR)
+CREATE TABLE IF NOT EXISTS journal_entries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    kind VARCHAR(20) NOT NULL DEFAULT 'journal',
+    entry_date DATE NOT NULL,
+    body TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    seq INTEGER NOT NULL DEFAULT 0,
+    deleted_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_journal_entries_user_seq ON journal_entries(user_id, seq);
+CREATE INDEX IF NOT EXISTS idx_journal_entries_user_date ON journal_entries(user_id, entry_date);
+
+-- Durable background job queue; workers claim rows atomically under a renewable lease
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER REFERENCES users(id),
+    kind VARCHAR(50) NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued',
+    payload TEXT NOT NULL DEFAULT '{}',
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 5,
+    run_after TIMESTAMP NOT NULL,
+    locked_by VARCHAR(64),
+    lease_expires_at TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_jobs_status_run_after ON jobs(status, run_after);
+CREATE INDEX IF NOT EXISTS idx_jobs_user_created ON jobs(user_id, created_at);
+
+-- Reminders and recurring maintenance; the scheduler loads upcoming rows by next_fire_at in windows
+CREATE TABLE IF NOT EXISTS triggers (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER REFERENCES users(id),
+    key VARCHAR(100) UNIQUE,
+    kind VARCHAR(50) NOT NULL DEFAULT 'reminder',
+    title VARCHAR(200),
+    payload TEXT NOT NULL DEFAULT '{}',
+    next_fire_at TIMESTAMP,
+    repeat_seconds INTEGER,
+    status VARCHAR(20) NOT NULL DEFAULT 'active',
+    version INTEGER NOT NULL DEFAULT 0,
+    fire_count INTEGER NOT NULL DEFAULT 0,
+    last_fired_at TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    seq INTEGER NOT NULL DEFAULT 0,
+    deleted_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_triggers_status_next_fire ON triggers(status, next_fire_at);
+CREATE INDEX IF NOT EXISTS idx_triggers_user_seq ON triggers(user_id, seq);
+
+-- Responses stored by Idempotency-Key so retried POST/PATCH requests are replayed, not re-run
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    scope VARCHAR(64) NOT NULL,
+    key VARCHAR(255) NOT NULL,
+    fingerprint VARCHAR(64) NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    locked_until TIMESTAMP,
+    response_status INTEGER,
+    response_headers TEXT,
+    response_body BLOB,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP NOT NULL
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_idempotency_keys_scope_key ON idempotency_keys(scope, key);
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_expires ON idempotency_keys(expires_at);
@@ -0,0 +1,97 @@
+"""
+Tests for incrementally maintained daily rollups and the analytics endpoints
+"""
+import uuid
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from app.database import SessionLocal, init_database
+from app.models.user import User
+from app.models.sync import SyncCounter
+from app.models.task import Task
+from app.models.rollup import DailyRollup
+from app.services.rollups import RollupService
+from main import app
+
+
+def _register(client):
+    suffix = uuid.uuid4().hex[:8]
+    response = client.post("/api/auth/register", json={
+        "username": f"stats_{suffix}",
+        "email": f"stats_{suffix}@test.com",
+        "password": "testpassword123"
+    })
+    assert response.status_code == 201
+    data = response.json()
+    return data["user_id"], {"Authorization": f"Bearer {data['token']}"}
+
+
+def _cleanup(user_id):
+    db = SessionLocal()
+    for model in (Task, DailyRollup, SyncCounter):
+        db.query(model).filter(model.user_id == user_id).delete()
+    db.query(User).filter(User.id == user_id).delete()
+    db.commit()
+    db.close()
+
+
+def _rollup_snapshot(user_id):
+    db = SessionLocal()
+    rows = db.query(DailyRollup).filter(DailyRollup.user_id == user_id).all()
+    snapshot = {
+        (r.day, r.category): (r.tasks_created, r.tasks_completed)
+        for r in rows if r.tasks_created or r.tasks_completed
+    }
+    db.close()
+    return snapshot
+
+
+def test_rollups_and_analytics():
+    """Test incremental rollups match a rebuild and feed the analytics endpoints"""
+    init_database()
+    client = TestClient(app)
+    user_id, headers = _register(client)
+
+    try:
+        ids = [client.post("/api/tasks", json={"title": f"T{i}", "category": "work" if i % 2 else "life"},
+                           headers=headers).json()["id"] for i in range(6)]
+        client.patch(f"/api/tasks/{ids[0]}", json={"status": "done"}, headers=headers)
+        client.patch(f"/api/tasks/{ids[1]}", json={"status": "done"}, headers=headers)
+        client.patch(f"/api/tasks/{ids[1]}", json={"category": "life"}, headers=headers)
+        client.patch(f"/api/tasks/{ids[2]}", json={"status": "done"}, headers=headers)
+        client.patch(f"/api/tasks/{ids[2]}", json={"status": "todo"}, headers=headers)
+        client.delete(f"/api/tasks/{ids[3]}", headers=headers)
+
+        print("\n1. Incremental rollups match a full rebuild...")
+        incremental = _rollup_snapshot(user_id)
+        db = SessionLocal()
+        RollupService.rebuild(db, user_id)
+        db.close()
+        assert _rollup_snapshot(user_id) == incremental
+        today = datetime.utcnow().date()
+        assert incremental == {(today, "life"): (4, 2), (today, "work"): (1, 0)}
+        print("✅ Rebuild consistency passed")
+
+        print("\n2. Summary endpoint...")
+        response = client.get(f"/api/analytics/summary?start={today - timedelta(days=6)}&end={today}&period=week",
+                              headers=headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["totals"] == {"tasks_created": 5, "tasks_completed": 2, "habit_checkins": 0, "completion_rate": 0.4}
+        assert data["buckets"][-1]["by_category"]["life"]["tasks_completed"] == 2
+        print("✅ Summary passed")
+
+        print("\n3. Streak endpoint...")
+        assert client.get("/api/analytics/streak", headers=headers).json() == {"current": 1, "longest": 1}
+        print("✅ Streak passed")
+
+        print("\n4. Invalid range...")
+        response = client.get(f"/api/analytics/summary?start={today}&end={today - timedelta(days=1)}", headers=headers)
+        assert response.status_code == 400
+        print("✅ Invalid range rejected")
+    finally:
+        _cleanup(user_id)
+
+
+if __name__ == "__main__":
+    test_rollups_and_analytics()
+    print("\n🎉 All analytics tests passed!")
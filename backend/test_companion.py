@@ -0,0 +1,124 @@
+"""
+Tests for the AI companion pipeline: micro-batching, response cache, per-user limits and SSE streaming
+"""
+import asyncio
+import uuid
+import pytest
+from fastapi.testclient import TestClient
+from app.database import SessionLocal
+from app.models.user import User
+from app.services.companion import (
+    CompanionBusyError, CompanionModel, CompanionPipeline, ResponseCache, StubModel, build_prompt, cache_key
+)
+from main import app
+
+
+async def _collect(stream):
+    return "".join([token async for token in stream])
+
+
+def test_cache_key_ignores_case_whitespace_and_context_order():
+    key = cache_key("stub", "chat", "How  was my WEEK?", {"a": 1, "b": [1, 2]})
+    assert key == cache_key("stub", "chat", " how was my week? ", {"b": [1, 2], "a": 1})
+    assert key != cache_key("stub", "insight", "How was my week?", {"a": 1, "b": [1, 2]})
+    assert key != cache_key("stub", "chat", "How was my week?", {"a": 2, "b": [1, 2]})
+
+
+def test_compatible_prompts_share_one_model_call():
+    async def scenario():
+        model = StubModel(latency=0.01, token_delay=0)
+        pipeline = CompanionPipeline(model, max_batch=8, batch_wait=0.05, user_concurrency=10)
+        streams = [pipeline.open(user_id, "chat", f"question {user_id}") for user_id in range(5)]
+        streams.append(pipeline.open(99, "checkin", "morning"))
+        answers = await asyncio.gather(*(_collect(stream) for stream in streams))
+        assert model.calls == 2 and model.prompts == 6
+        assert answers[0] == "".join(model.answer(build_prompt("chat", "question 0", None)))
+        assert pipeline.stats()["mean_batch_size"] == 3.0
+
+    asyncio.run(scenario())
+
+
+def test_cached_and_in_flight_duplicates_skip_the_model():
+    async def scenario():
+        model = StubModel(latency=0.02, token_delay=0.001)
+        pipeline = CompanionPipeline(model, batch_wait=0.001, user_concurrency=10)
+        first = pipeline.open(1, "insight", "Summarize my habits", {"streak": 4})
+        shared = pipeline.open(2, "insight", "summarize my  habits", {"streak": 4})
+        assert (first.source, shared.source) == ("model", "shared")
+        answers = await asyncio.gather(_collect(first), _collect(shared))
+        assert answers[0] == answers[1]
+        cached = pipeline.open(3, "insight", "Summarize my habits", {"streak": 4})
+        assert cached.source == "cache"
+        assert await _collect(cached) == answers[0]
+        stats = pipeline.stats()
+        assert model.calls == 1
+        assert (stats["requests"], stats["cache_hits"], stats["shared"]) == (3, 1, 1)
+        assert stats["open_streams"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_cache_expires_and_evicts():
+    cache = ResponseCache(ttl=60, capacity=2)
+    cache.put("a", ["x"])
+    cache.put("b", ["y"])
+    cache.get("a")
+    cache.put("c", ["z"])
+    assert cache.get("b") is None and cache.get("a") == ["x"]
+    expired = ResponseCache(ttl=-1)
+    expired.put("a", ["x"])
+    assert expired.get("a") is None
+
+
+def test_per_user_concurrency_limit_and_model_errors():
+    class FailingModel(CompanionModel):
+        name = "failing"
+
+        async def generate(self, prompts):
+            raise RuntimeError("provider unavailable")
+
+    async def scenario():
+        pipeline = CompanionPipeline(FailingModel(), batch_wait=0.001, user_concurrency=1)
+        stream = pipeline.open(1, "chat", "hello")
+        with pytest.raises(CompanionBusyError):
+            pipeline.open(1, "chat", "another")
+        pipeline.open(2, "chat", "other user").close()
+        with pytest.raises(RuntimeError):
+            await _collect(stream)
+        # The slot is released and the failed answer was not cached
+        retry = pipeline.open(1, "chat", "hello")
+        assert retry.source == "model"
+        retry.close()
+        assert pipeline.stats()["errors"] == 2  # both prompts of the failed batch
+
+    asyncio.run(scenario())
+
+
+def test_ask_streams_tokens_as_server_sent_events():
+    with TestClient(app) as client:
+        suffix = uuid.uuid4().hex[:8]
+        response = client.post("/api/auth/register", json={
+            "username": f"companion_{suffix}",
+            "email": f"companion_{suffix}@test.com",
+            "password": "testpassword123"
+        })
+        data = response.json()
+        headers = {"Authorization": f"Bearer {data['token']}"}
+        try:
+            prompt = {"kind": "checkin", "prompt": f"How am I doing {suffix}?", "context": {"mood": 4}}
+            for expected_source in ("model", "cache"):
+                with client.stream("POST", "/api/companion/ask", json=prompt, headers=headers) as response:
+                    assert response.status_code == 200
+                    assert response.headers["content-type"].startswith("text/event-stream")
+                    body = "".join(response.iter_text())
+                assert body.count("event: token") == 24
+                assert body.endswith(f'event: done\ndata: {{"source": "{expected_source}"}}\n\n')
+
+            stats = client.get("/api/companion/stats", headers=headers).json()
+            assert stats["cache_hits"] >= 1 and stats["provider"] == "stub"
+            assert client.post("/api/companion/ask", json={"prompt": ""}, headers=headers).status_code == 422
+        finally:
+            db = SessionLocal()
+            db.query(User).filter(User.id == data["user_id"]).delete()
+            db.commit()
+            db.close()
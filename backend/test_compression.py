@@ -0,0 +1,147 @@
+"""
+Tests for the response compression middleware
+"""
+import gzip
+import json
+import os
+import anyio
+from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+from fastapi.testclient import TestClient
+from app import compression
+from app.compression import CompressionMiddleware, choose_encoding
+
+
+ROWS = [{"id": n, "title": f"Task {n}", "status": "todo", "priority": n % 4 + 1} for n in range(2000)]
+
+
+def _app(**options):
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, **options)
+
+    @app.get("/small")
+    async def small():
+        return {"token": "abc"}
+
+    @app.get("/large")
+    async def large():
+        return ROWS
+
+    @app.get("/image")
+    async def image():
+        return Response(b"\x89PNG" + b"\x00" * 5000, media_type="image/png")
+
+    @app.get("/random")
+    async def random_bytes():
+        return Response(os.urandom(5000), media_type="text/plain")
+
+    @app.get("/stream")
+    async def stream():
+        return StreamingResponse((json.dumps(row) + "\n" for row in ROWS), media_type="application/x-ndjson")
+
+    @app.get("/events")
+    async def events():
+        return StreamingResponse(iter(["data: 1\n\n", "data: 2\n\n"]), media_type="text/event-stream")
+
+    return app
+
+
+def test_choose_encoding(monkeypatch):
+    preferred = next(iter(compression.ENCODERS))
+    assert choose_encoding("gzip, deflate, br, zstd") == preferred
+    assert choose_encoding("gzip;q=1.0, br;q=0.5, zstd;q=0.5") == "gzip"
+    assert choose_encoding("*") == preferred
+    if len(compression.ENCODERS) > 1:
+        # The wildcard still covers the optional encodings when gzip is refused
+        assert choose_encoding("*, gzip;q=0") == preferred
+    assert choose_encoding("identity") is None
+    assert choose_encoding("gzip;q=0") is None
+    assert choose_encoding(None) is None
+
+    # Without the optional libraries only gzip is ever chosen
+    monkeypatch.setattr(compression, "ENCODERS", {"gzip": compression.ENCODERS["gzip"]})
+    assert choose_encoding("br, zstd") is None
+    assert choose_encoding("br, zstd, gzip;q=0.1") == "gzip"
+    assert choose_encoding("*, gzip;q=0") is None
+
+
+def test_compresses_large_bodies_in_every_available_encoding():
+    client = TestClient(_app())
+    for encoding in compression.ENCODERS:
+        response = client.get("/large", headers={"Accept-Encoding": encoding})
+        assert response.headers["content-encoding"] == encoding
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert int(response.headers["content-length"]) < len(json.dumps(ROWS)) / 4
+        assert response.json() == ROWS
+
+    with client.stream("GET", "/large", headers={"Accept-Encoding": "gzip"}) as response:
+        assert json.loads(gzip.decompress(b"".join(response.iter_raw()))) == ROWS
+
+
+def test_skips_small_incompressible_and_event_stream_bodies():
+    client = TestClient(_app())
+    headers = {"Accept-Encoding": "gzip, br, zstd"}
+    for path in ("/small", "/image", "/random", "/events"):
+        response = client.get(path, headers=headers)
+        assert "content-encoding" not in response.headers, path
+    assert client.get("/large", headers={"Accept-Encoding": "identity"}).headers.get("content-encoding") is None
+
+
+def _asgi_get(app, path, headers):
+    # Drive the app directly: the test client joins a streamed body into one piece
+    messages = []
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+        "client": ("test", 1), "server": ("test", 80),
+    }
+
+    requested = []
+
+    async def receive():
+        if requested:
+            await anyio.sleep_forever()
+        requested.append(True)
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    anyio.run(app, scope, receive, send)
+    start = messages[0]
+    return {k.decode(): v.decode() for k, v in start["headers"]}, [m.get("body", b"") for m in messages[1:]]
+
+
+def test_streams_are_compressed_chunk_by_chunk():
+    app = _app(stream_flush_size=16 * 1024)
+    plain = b"".join(json.dumps(row).encode() + b"\n" for row in ROWS)
+    for encoding in compression.ENCODERS:
+        headers, chunks = _asgi_get(app, "/stream", {"Accept-Encoding": encoding})
+        assert headers["content-encoding"] == encoding
+        assert "content-length" not in headers
+        # Several compressed pieces went out while the stream was running, not one buffered body
+        assert len([chunk for chunk in chunks if chunk]) > 1
+        body = b"".join(chunks)
+        assert len(body) < len(plain) / 4
+        if encoding == "gzip":
+            assert gzip.decompress(body) == plain
+
+
+def test_large_bodies_are_compressed_off_the_event_loop(monkeypatch):
+    offloaded = []
+    original = compression.to_thread.run_sync
+
+    async def _recording_run_sync(func, *args, **kwargs):
+        if getattr(func, "__module__", None) == compression.__name__:
+            offloaded.append(func)
+        return await original(func, *args, **kwargs)
+
+    monkeypatch.setattr(compression.to_thread, "run_sync", _recording_run_sync)
+    client = TestClient(_app(thread_size=50_000))
+    assert client.get("/large", headers={"Accept-Encoding": "gzip"}).json() == ROWS
+    assert offloaded == [compression.compress]
+    offloaded.clear()
+    client.get("/small", headers={"Accept-Encoding": "gzip"})
+    client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert offloaded == []
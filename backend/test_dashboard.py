@@ -0,0 +1,90 @@
+"""
+Integration test for the single-call dashboard endpoint
+"""
+import uuid
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from app.database import SessionLocal, init_database
+from app.models.user import User
+from app.models.sync import SyncCounter
+from app.models.task import Task
+from app.models.rollup import DailyRollup
+from main import app
+
+
+def _register(client):
+    suffix = uuid.uuid4().hex[:8]
+    response = client.post("/api/auth/register", json={
+        "username": f"dash_{suffix}",
+        "email": f"dash_{suffix}@test.com",
+        "password": "testpassword123"
+    })
+    assert response.status_code == 201
+    data = response.json()
+    return data["user_id"], {"Authorization": f"Bearer {data['token']}"}
+
+
+def _cleanup(user_id):
+    db = SessionLocal()
+    db.query(Task).filter(Task.user_id == user_id).delete()
+    db.query(DailyRollup).filter(DailyRollup.user_id == user_id).delete()
+    db.query(SyncCounter).filter(SyncCounter.user_id == user_id).delete()
+    db.query(User).filter(User.id == user_id).delete()
+    db.commit()
+    db.close()
+
+
+def test_dashboard():
+    """Test dashboard payload, caching and write-driven invalidation"""
+    init_database()
+    client = TestClient(app)
+    user_id, headers = _register(client)
+
+    try:
+        yesterday = (datetime.utcnow() - timedelta(days=1)).isoformat()
+        client.post("/api/tasks", json={"title": "Overdue", "due_date": yesterday, "priority": 1}, headers=headers)
+        client.post("/api/tasks", json={"title": "Later", "category": "work"}, headers=headers)
+
+        print("\n1. First call builds the payload...")
+        response = client.get("/api/dashboard", headers=headers)
+        assert response.status_code == 200
+        assert response.headers["x-cache"] == "MISS"
+        assert "dashboard;dur=" in response.headers["server-timing"]
+        data = response.json()
+        assert [t["title"] for t in data["today"]] == ["Overdue"]
+        assert data["today"][0]["overdue"] is True
+        assert data["metrics"]["total"] == 2
+        assert data["metrics"]["by_category"] == {"work": 1, "life": 1}
+        assert len(data["progress"]) == 7
+        print("✅ Dashboard payload passed")
+
+        print("\n2. Second call is served from cache...")
+        response = client.get("/api/dashboard", headers=headers)
+        assert response.headers["x-cache"] == "HIT"
+        assert response.json() == data
+        print("✅ Cache hit passed")
+
+        print("\n3. A write invalidates the cache...")
+        task_id = data["today"][0]["id"]
+        client.patch(f"/api/tasks/{task_id}", json={"status": "done"}, headers=headers)
+        response = client.get("/api/dashboard", headers=headers)
+        assert response.headers["x-cache"] == "MISS"
+        data = response.json()
+        assert data["today"] == []
+        assert data["metrics"]["completed"] == 1
+        assert data["metrics"]["completed_today"] == 1
+        assert data["progress"][-1]["completed"] == 1
+        print("✅ Invalidation passed")
+
+        print("\n4. Stats report the hit ratio...")
+        stats = client.get("/api/dashboard/stats", headers=headers).json()
+        assert stats["hits"] >= 1 and stats["misses"] >= 2
+        assert 0 < stats["hit_ratio"] < 1
+        print("✅ Stats passed")
+    finally:
+        _cleanup(user_id)
+
+
+if __name__ == "__main__":
+    test_dashboard()
+    print("\n🎉 All dashboard tests passed!")
@@ -0,0 +1,195 @@
+"""
+Tests for the streaming NDJSON export
+"""
+import gzip
+import json
+import os
+import tracemalloc
+import uuid
+from datetime import datetime
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+import app.database_init  # noqa: F401  (registers every model)
+from app.database import Base, SessionLocal, init_database
+from app.models.user import User
+from app.models.sync import SyncCounter
+from app.models.task import Task
+from app.models.habit import Habit, HabitYear
+from app.models.metric import MetricPoint, MetricRollup
+from app.models.schedule import BusyBlock
+from app.models.rollup import DailyRollup
+from app.services.export import EXPORT_EXCLUDED, EXPORT_TABLES, ExportService
+from main import app
+
+
+# Scale of the memory test; set EXPORT_TEST_ROWS=5000000 for the full-size run
+EXPORT_TEST_ROWS = int(os.getenv("EXPORT_TEST_ROWS", "20000"))
+# Budget for Python allocations during the export, independent of row count
+EXPORT_MEMORY_BUDGET = 8 * 1024 * 1024
+
+
+def _register(client):
+    suffix = uuid.uuid4().hex[:8]
+    response = client.post("/api/auth/register", json={
+        "username": f"export_{suffix}",
+        "email": f"export_{suffix}@test.com",
+        "password": "testpassword123"
+    })
+    assert response.status_code == 201
+    data = response.json()
+    return data["user_id"], {"Authorization": f"Bearer {data['token']}"}
+
+
+def _bulk_insert_tasks(user_id, count, batch=10000):
+    db = SessionLocal()
+    now = datetime.utcnow()
+    for start in range(0, count, batch):
+        db.execute(insert(Task), [
+            {"user_id": user_id, "title": f"Task {i}", "category": "work", "status": "todo",
+             "priority": 2, "seq": i + 1, "created_at": now, "updated_at": now}
+            for i in range(start, min(start + batch, count))
+        ])
+    db.commit()
+    db.close()
+
+
+def _cleanup(user_id):
+    db = SessionLocal()
+    habit_ids = [habit.id for habit in db.query(Habit.id).filter(Habit.user_id == user_id)]
+    db.query(HabitYear).filter(HabitYear.habit_id.in_(habit_ids)).delete()
+    for model in (Task, Habit, MetricPoint, MetricRollup, BusyBlock, DailyRollup):
+        db.query(model).filter(model.user_id == user_id).delete()
+    db.query(SyncCounter).filter(SyncCounter.user_id == user_id).delete()
+    db.query(User).filter(User.id == user_id).delete()
+    db.commit()
+    db.close()
+
+
+def _export_peak(user_id):
+    """Drain the export stream and return (records, peak traced bytes)"""
+    tracemalloc.start()
+    records = 0
+    for chunk in ExportService.iter_chunks(ExportService.iter_lines(user_id), compress=True):
+        records += 1
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return records, peak
+
+
+def test_export_stream_and_resume():
+    """Test NDJSON output, gzip and resuming from a cursor"""
+    init_database()
+    client = TestClient(app)
+    user_id, headers = _register(client)
+
+    try:
+        for i in range(5):
+            client.post("/api/tasks", json={"title": f"Export {i}"}, headers=headers)
+
+        print("\n1. Plain NDJSON export...")
+        response = client.get("/api/export", headers=headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert lines[0]["table"] == "users"
+        tasks = [line["data"]["title"] for line in lines[1:-1] if line["table"] == "tasks"]
+        assert tasks == [f"Export {i}" for i in range(5)]
+        assert lines[-1] == {"done": True}
+        print("✅ NDJSON export passed")
+
+        print("\n2. Gzip export...")
+        response = client.get("/api/export?gzip=true", headers=headers)
+        unzipped = gzip.decompress(response.content).decode("utf-8").splitlines()
+        assert [json.loads(line) for line in unzipped] == lines
+        print("✅ Gzip export passed")
+
+        print("\n3. Resume from cursor...")
+        cursor = lines[2]["cursor"]
+        response = client.get(f"/api/export?cursor={cursor}", headers=headers)
+        resumed = [json.loads(line) for line in response.text.splitlines()]
+        assert resumed == lines[3:]
+        print("✅ Resume passed")
+
+        print("\n4. Invalid cursor...")
+        response = client.get("/api/export?cursor=bogus:1", headers=headers)
+        assert response.status_code == 400
+        print("✅ Invalid cursor rejected")
+    finally:
+        _cleanup(user_id)
+
+
+def test_every_user_table_is_exported():
+    """A table holding user data (directly or through a parent row) must be exported or explicitly excluded"""
+    user_tables = set()
+    for table in Base.metadata.sorted_tables:  # parents come before the tables referencing them
+        if "user_id" in table.c or any(fk.column.table.name in user_tables for fk in table.foreign_keys):
+            user_tables.add(table.name)
+    missing = user_tables - set(EXPORT_TABLES) - set(EXPORT_EXCLUDED)
+    assert not missing, f"Add to EXPORT_TABLES or EXPORT_EXCLUDED: {sorted(missing)}"
+    assert not set(EXPORT_TABLES) & set(EXPORT_EXCLUDED)
+
+
+def test_export_includes_tables_outside_the_change_feed():
+    init_database()
+    client = TestClient(app)
+    user_id, headers = _register(client)
+    try:
+        habit = client.post("/api/habits", json={"name": "Stretch"}, headers=headers).json()
+        assert client.post(f"/api/habits/{habit['id']}/checkins", json={"day": "2030-03-01"},
+                           headers=headers).status_code == 200
+        client.post("/api/metrics", json={"points": [
+            {"metric": "sleep_hours", "ts": "2030-03-01T07:00:00", "value": 7.5}
+        ]}, headers=headers)
+        client.post("/api/schedule/busy", json={
+            "title": "Dentist", "start": "2030-03-04T10:00:00", "end": "2030-03-04T11:00:00"
+        }, headers=headers)
+
+        lines = [json.loads(line) for line in client.get("/api/export", headers=headers).text.splitlines()]
+        by_table = {}
+        for line in lines[1:-1]:
+            by_table.setdefault(line["table"], []).append(line["data"])
+        assert by_table["habit_years"] == [{"habit_id": habit["id"], "year": 2030, "days": ["2030-03-01"]}]
+        assert by_table["metric_points"][0]["value"] == 7.5
+        assert by_table["busy_blocks"][0]["title"] == "Dentist"
+        assert "user_id" not in by_table["metric_points"][0]
+
+        # Cursors resume inside tables without an id column too
+        rollup = next(line for line in lines if line.get("table") == "metric_rollups")
+        resumed = [json.loads(line) for line in
+                   client.get(f"/api/export?cursor={rollup['cursor']}", headers=headers).text.splitlines()]
+        assert resumed == lines[lines.index(rollup) + 1:]
+    finally:
+        _cleanup(user_id)
+
+
+def test_export_memory_is_flat():
+    """Test that peak memory does not grow with the number of exported rows"""
+    init_database()
+    client = TestClient(app)
+    small_user, _ = _register(client)
+    large_user, _ = _register(client)
+
+    try:
+        _bulk_insert_tasks(small_user, EXPORT_TEST_ROWS // 10)
+        _bulk_insert_tasks(large_user, EXPORT_TEST_ROWS)
+
+        _, small_peak = _export_peak(small_user)
+        _, large_peak = _export_peak(large_user)
+        print(f"\nPeak traced memory: {small_peak / 1024:.0f} KiB for {EXPORT_TEST_ROWS // 10} rows, "
+              f"{large_peak / 1024:.0f} KiB for {EXPORT_TEST_ROWS} rows")
+
+        assert large_peak < EXPORT_MEMORY_BUDGET
+        # Ten times the rows must not mean meaningfully more memory
+        assert large_peak < small_peak * 1.5 + 512 * 1024
+        print("✅ Flat memory passed")
+    finally:
+        _cleanup(small_user)
+        _cleanup(large_user)
+
+
+if __name__ == "__main__":
+    test_export_stream_and_resume()
+    test_every_user_table_is_exported()
+    test_export_includes_tables_outside_the_change_feed()
+    test_export_memory_is_flat()
+    print("\n🎉 All export tests passed!")
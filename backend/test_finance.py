@@ -0,0 +1,267 @@
+"""
+Tests for streaming bank-statement import, deduplication and categorization rules
+"""
+import io
+import uuid
+from datetime import date
+from fastapi.testclient import TestClient
+from app.database import SessionLocal
+from app.models.user import User
+from app.models.sync import SyncCounter
+from app.models.finance import Transaction, CategoryRule, Budget, BudgetAggregate
+from app.services.budgets import BudgetService
+from app.services.finance import (
+    compile_rules, iter_ofx, normalize_payee, parse_amount_cents, FinanceService
+)
+from main import app
+
+
+CSV_STATEMENT = """Date,Description,Amount
+2024-03-01,STARBUCKS #1234 SEATTLE,-4.50
+2024-03-01,STARBUCKS #1234 SEATTLE,-4.50
+03/02/2024,"Whole Foods Market","-1,234.56"
+2024-03-03,ACME PAYROLL 000123456,2500.00
+not a date,broken,-1
+"""
+
+OFX_STATEMENT = """OFXHEADER:100
+DATA:OFXSGML
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKACCTFROM><ACCTID>CHK-42</BANKACCTFROM>
+<BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20240305120000<TRNAMT>-12.30<NAME>Netflix.com</STMTTRN>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20240306<TRNAMT>-60.00<NAME>Shell Oil 5732</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+
+def _register(client):
+    suffix = uuid.uuid4().hex[:8]
+    response = client.post("/api/auth/register", json={
+        "username": f"fin_{suffix}",
+        "email": f"fin_{suffix}@test.com",
+        "password": "testpassword123"
+    })
+    assert response.status_code == 201
+    data = response.json()
+    return data["user_id"], {"Authorization": f"Bearer {data['token']}"}
+
+
+def _cleanup(user_id):
+    db = SessionLocal()
+    for model in (Transaction, CategoryRule, Budget, BudgetAggregate, SyncCounter):
+        db.query(model).filter(model.user_id == user_id).delete()
+    db.query(User).filter(User.id == user_id).delete()
+    db.commit()
+    db.close()
+
+
+def _upload(client, headers, content, filename="statement.csv", account="checking", encoding="utf-8"):
+    return client.post(
+        "/api/finance/import",
+        files={"file": (filename, content.encode(encoding), "application/octet-stream")},
+        data={"account": account},
+        headers=headers
+    )
+
+
+def test_parsing_helpers():
+    assert parse_amount_cents("-1,234.56") == -123456
+    assert parse_amount_cents("(45.00)") == -4500
+    assert parse_amount_cents("12,30") == 1230
+    assert parse_amount_cents("$7") == 700
+    assert normalize_payee("STARBUCKS #1234 Seattle") == "starbucks seattle"
+
+
+def test_compiled_rules_respect_priority():
+    rules = [
+        CategoryRule(id=1, pattern="market", category="groceries", priority=100),
+        CategoryRule(id=2, pattern="whole foods", category="organic", priority=10),
+        CategoryRule(id=3, pattern="shell", category="fuel", priority=100),
+    ]
+    categorize = compile_rules(rules)
+    assert categorize("whole foods market") == "organic"
+    assert categorize("corner market") == "groceries"
+    assert categorize("shell oil") == "fuel"
+    assert categorize("netflix com") is None
+    assert compile_rules([])("anything") is None
+
+
+def test_ofx_tokens_split_across_chunks(monkeypatch):
+    from app.services import finance
+    monkeypatch.setattr(finance, "READ_CHUNK_SIZE", 7)
+    errors = [0]
+    rows = list(iter_ofx(io.BytesIO(OFX_STATEMENT.encode()), errors))
+    assert rows == [
+        ("CHK-42", date(2024, 3, 5), -1230, "Netflix.com"),
+        ("CHK-42", date(2024, 3, 6), -6000, "Shell Oil 5732"),
+    ]
+    assert errors == [0]
+
+
+def test_csv_import_dedup_and_rules():
+    with TestClient(app) as client:
+        user_id, headers = _register(client)
+        try:
+            assert client.post("/api/finance/rules", json={"pattern": "Starbucks", "category": "coffee"},
+                               headers=headers).status_code == 201
+            assert client.post("/api/finance/rules", json={"pattern": "payroll", "category": "income"},
+                               headers=headers).status_code == 201
+
+            report = _upload(client, headers, CSV_STATEMENT).json()
+            assert report["format"] == "csv"
+            assert (report["rows"], report["inserted"], report["duplicates"], report["errors"]) == (4, 4, 0, 1)
+            assert report["rows_per_second"] > 0
+
+            # The two identical coffees are distinct lines; re-importing adds nothing
+            again = _upload(client, headers, CSV_STATEMENT).json()
+            assert (again["inserted"], again["duplicates"]) == (0, 4)
+
+            # An overlapping statement only adds the new line
+            overlap = CSV_STATEMENT.splitlines()[0] + "\n2024-03-03,ACME PAYROLL 000123456,2500.00\n2024-03-04,Bakery,-3.20\n"
+            assert _upload(client, headers, overlap).json()["inserted"] == 1
+
+            transactions = client.get("/api/finance/transactions", headers=headers).json()
+            assert len(transactions) == 5
+            by_payee = {}
+            for t in transactions:
+                by_payee.setdefault(t["payee"], []).append(t)
+            assert [t["category"] for t in by_payee["STARBUCKS #1234 SEATTLE"]] == ["coffee", "coffee"]
+            assert by_payee["ACME PAYROLL 000123456"][0]["category"] == "income"
+            assert by_payee["Whole Foods Market"][0]["amount_cents"] == -123456
+            assert by_payee["Bakery"][0]["category"] is None
+
+            # Imported rows flow through the sync feed with distinct seqs
+            feed = client.get("/api/sync", params={"since": 0}, headers=headers).json()
+            upserts = feed["changes"]["transactions"]["upserts"]
+            assert len({row["seq"] for row in upserts}) == 5
+
+            bakery = by_payee["Bakery"][0]
+            edited = client.patch(f"/api/finance/transactions/{bakery['id']}", json={"category": "food"},
+                                  headers=headers).json()
+            assert edited["category"] == "food" and edited["seq"] > max(row["seq"] for row in upserts)
+        finally:
+            _cleanup(user_id)
+
+
+def test_cp1252_statement_is_imported():
+    with TestClient(app) as client:
+        user_id, headers = _register(client)
+        try:
+            statement = "Date,Description,Amount\n2024-03-01,Caf\u00e9 M\u00fcller,-4.50\n2024-03-02,Boulangerie \u20ac,-2.10\n"
+            response = _upload(client, headers, statement, encoding="cp1252")
+            assert response.status_code == 200, response.text
+            assert response.json()["inserted"] == 2
+            payees = {t["payee"] for t in client.get("/api/finance/transactions", headers=headers).json()}
+            assert payees == {"Caf\u00e9 M\u00fcller", "Boulangerie \u20ac"}
+        finally:
+            _cleanup(user_id)
+
+
+def test_ofx_import_uses_statement_account():
+    with TestClient(app) as client:
+        user_id, headers = _register(client)
+        try:
+            report = _upload(client, headers, OFX_STATEMENT, filename="march.ofx").json()
+            assert (report["format"], report["inserted"]) == ("ofx", 2)
+            db = SessionLocal()
+            accounts = {t.account for t in db.query(Transaction).filter(Transaction.user_id == user_id)}
+            db.close()
+            assert accounts == {"CHK-42"}
+
+            bad = _upload(client, headers, "foo,bar\n1,2\n")
+            assert bad.status_code == 400
+            assert bad.json()["detail"]["error"] == "invalid_statement"
+        finally:
+            _cleanup(user_id)
+
+
+def test_large_import_is_batched():
+    db = SessionLocal()
+    user = User(username=f"bulk_{uuid.uuid4().hex[:8]}", email=f"bulk_{uuid.uuid4().hex[:8]}@test.com",
+                password_hash="x")
+    db.add(user)
+    db.commit()
+    try:
+        lines = ["date,amount,payee"] + [
+            f"2024-{1 + i % 12:02d}-{1 + i % 28:02d},-{i % 5000}.{i % 100:02d},Shop {i % 700}" for i in range(12000)
+        ]
+        stream = io.BytesIO("\n".join(lines).encode())
+        report = FinanceService.import_statement(db, user.id, stream, "bulk.csv")
+        assert report["rows"] == report["inserted"] == 12000
+        assert db.get(SyncCounter, user.id).last_seq >= 12000
+    finally:
+        db.close()
+        _cleanup(user.id)
+
+
+def _aggregates(user_id):
+    db = SessionLocal()
+    rows = {
+        (a.month.isoformat(), a.category): (a.spent_cents, a.income_cents, a.transaction_count)
+        for a in db.query(BudgetAggregate).filter(BudgetAggregate.user_id == user_id)
+        if a.transaction_count
+    }
+    db.close()
+    return rows
+
+
+def test_budget_aggregates_follow_imports_and_edits():
+    with TestClient(app) as client:
+        user_id, headers = _register(client)
+        try:
+            client.post("/api/finance/rules", json={"pattern": "Starbucks", "category": "coffee"}, headers=headers)
+            _upload(client, headers, CSV_STATEMENT)
+            _upload(client, headers, CSV_STATEMENT)
+            expected = {
+                ("2024-03-01", "coffee"): (900, 0, 2),
+                ("2024-03-01", "uncategorized"): (123456, 250000, 2),
+            }
+            assert _aggregates(user_id) == expected
+
+            assert client.put("/api/finance/budgets/coffee", json={"limit_cents": 1000},
+                              headers=headers).status_code == 200
+            month = client.get("/api/finance/budgets", params={"month": "2024-03"}, headers=headers).json()
+            coffee = next(line for line in month["categories"] if line["category"] == "coffee")
+            assert (coffee["spent_cents"], coffee["limit_cents"], coffee["remaining_cents"]) == (900, 1000, 100)
+
+            transactions = client.get("/api/finance/transactions", headers=headers).json()
+            groceries = next(t for t in transactions if t["payee"] == "Whole Foods Market")
+            client.patch(f"/api/finance/transactions/{groceries['id']}",
+                         json={"category": "groceries", "posted_on": "2024-04-02"}, headers=headers)
+            coffee_id = next(t["id"] for t in transactions if t["category"] == "coffee")
+            client.delete(f"/api/finance/transactions/{coffee_id}", headers=headers)
+            assert _aggregates(user_id) == {
+                ("2024-03-01", "coffee"): (450, 0, 1),
+                ("2024-03-01", "uncategorized"): (0, 250000, 1),
+                ("2024-04-01", "groceries"): (123456, 0, 1),
+            }
+
+            # Incremental maintenance leaves nothing for reconciliation to fix
+            db = SessionLocal()
+            assert BudgetService.reconcile(db, user_id) == 0
+            db.close()
+        finally:
+            _cleanup(user_id)
+
+
+def test_reconcile_repairs_drift():
+    with TestClient(app) as client:
+        user_id, headers = _register(client)
+        try:
+            _upload(client, headers, CSV_STATEMENT)
+            before = _aggregates(user_id)
+            db = SessionLocal()
+            aggregate = db.query(BudgetAggregate).filter(BudgetAggregate.user_id == user_id).first()
+            aggregate.spent_cents += 999
+            db.add(BudgetAggregate(user_id=user_id, month=date(2020, 1, 1), category="ghost",
+                                   spent_cents=1, income_cents=0, transaction_count=1))
+            db.query(Transaction).filter(Transaction.user_id == user_id, Transaction.amount_cents > 0).delete()
+            db.commit()
+
+            assert BudgetService.reconcile(db, user_id) == 2
+            db.close()
+            before[("2024-03-01", "uncategorized")] = (123456 + 900, 0, 3)
+            assert _aggregates(user_id) == before
+            assert BudgetService.reconcile(SessionLocal(), user_id) == 0
+        finally:
+            _cleanup(user_id)
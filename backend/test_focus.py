@@ -0,0 +1,168 @@
+"""
+Tests for buffered focus event ingestion and its group-commit flusher
+"""
+import time
+import uuid
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+import app.database_init  # noqa: F401  (registers every model)
+from app.database import Base, SessionLocal
+from app.models.user import User
+from app.models.focus import FocusEvent
+from app.services.focus import BufferFullError, FocusEventBuffer, focus_buffer
+from main import app
+
+
+def _register(client):
+    suffix = uuid.uuid4().hex[:8]
+    response = client.post("/api/auth/register", json={
+        "username": f"focus_{suffix}",
+        "email": f"focus_{suffix}@test.com",
+        "password": "testpassword123"
+    })
+    assert response.status_code == 201
+    data = response.json()
+    return data["user_id"], {"Authorization": f"Bearer {data['token']}"}
+
+
+def _cleanup(user_id):
+    db = SessionLocal()
+    db.query(FocusEvent).filter(FocusEvent.user_id == user_id).delete()
+    db.query(User).filter(User.id == user_id).delete()
+    db.commit()
+    db.close()
+
+
+def _count(user_id):
+    db = SessionLocal()
+    count = db.query(FocusEvent).filter(FocusEvent.user_id == user_id).count()
+    db.close()
+    return count
+
+
+def _event(kind="tick", seconds=0, session="s1"):
+    ts = datetime(2024, 5, 1, 9, 0) + timedelta(seconds=seconds)
+    return {"kind": kind, "ts": ts.isoformat(), "session_id": session, "value": seconds}
+
+
+def test_ingest_accepts_single_array_and_wrapped_batches():
+    with TestClient(app) as client:
+        user_id, headers = _register(client)
+        try:
+            single = client.post("/api/focus/events", json=_event("start"), headers=headers)
+            assert single.status_code == 202
+            assert single.json()["accepted"] == 1
+
+            array = client.post("/api/focus/events", json=[_event("tick", i) for i in range(1, 6)], headers=headers)
+            assert array.json()["accepted"] == 5
+            wrapped = client.post("/api/focus/events", json={"events": [_event("distraction", 7), _event("stop", 9)]},
+                                  headers=headers)
+            assert wrapped.json()["accepted"] == 2
+
+            bad = client.post("/api/focus/events", json=_event("explode"), headers=headers)
+            assert bad.status_code == 422
+
+            focus_buffer.flush()
+            events = client.get("/api/focus/events", params={"start": "2024-05-01T00:00:00", "end": "2024-05-02T00:00:00"},
+                                headers=headers).json()
+            assert [e["kind"] for e in events] == ["start"] + ["tick"] * 5 + ["distraction", "stop"]
+
+            # 10:30+02:00 to 11:30+02:00 is 08:30 to 09:30 UTC; events are stored in UTC
+            events = client.get("/api/focus/events", params={"start": "2024-05-01T10:30:00+02:00",
+                                                             "end": "2024-05-01T11:30:00+02:00"},
+                                headers=headers).json()
+            assert len(events) == 8
+
+            stats = client.get("/api/focus/ingest/stats", headers=headers).json()
+            assert stats["flushed"] >= 8 and stats["pending"] == 0
+        finally:
+            _cleanup(user_id)
+
+
+def test_shutdown_flushes_pending_events():
+    with TestClient(app) as client:
+        user_id, headers = _register(client)
+        client.post("/api/focus/events", json=[_event("tick", i) for i in range(20)], headers=headers)
+    try:
+        assert _count(user_id) == 20
+    finally:
+        _cleanup(user_id)
+
+
+def test_flusher_group_commits_by_size_and_time():
+    db = SessionLocal()
+    user = User(username=f"buf_{uuid.uuid4().hex[:8]}", email=f"buf_{uuid.uuid4().hex[:8]}@test.com", password_hash="x")
+    db.add(user)
+    db.commit()
+    user_id = user.id
+    db.close()
+    row = {"user_id": user_id, "session_id": None, "kind": "tick", "ts": datetime(2024, 5, 1),
+           "value": None, "note": None, "received_at": datetime(2024, 5, 1)}
+    buffer = FocusEventBuffer(SessionLocal, max_batch=100, interval=30, capacity=250)
+    buffer.start()
+    try:
+        buffer.append([row] * 99)
+        time.sleep(0.2)
+        assert buffer.flushed == 0  # below the size trigger, interval far away
+
+        buffer.append([row] * 150)
+        for _ in range(100):
+            if buffer.flushed:
+                break
+            time.sleep(0.02)
+        assert buffer.flushed == 249 and buffer.batches == 1
+
+        try:
+            buffer.append([row] * 251)
+            assert False, "expected the capacity bound to reject the append"
+        except BufferFullError:
+            assert buffer.rejected == 251
+
+        timed = FocusEventBuffer(SessionLocal, max_batch=10_000, interval=0.05)
+        timed.start()
+        timed.append([row] * 3)
+        time.sleep(0.3)
+        assert timed.flushed == 3
+        timed.stop()
+    finally:
+        buffer.stop()
+        _cleanup(user_id)
+
+
+def test_bad_rows_are_dead_lettered_and_requeues_respect_capacity(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'focus.db'}")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    row = {"user_id": 1, "session_id": None, "kind": "tick", "ts": datetime(2024, 5, 1),
+           "value": None, "note": None, "received_at": datetime(2024, 5, 1)}
+
+    # One poison row no longer holds the rest of its batch (and every later one) back
+    buffer = FocusEventBuffer(session_factory, capacity=10)
+    buffer.append([row] * 3 + [{**row, "kind": None}] + [row] * 2)
+    assert buffer.flush() == 5
+    assert len(buffer) == 0 and buffer.dead_lettered == 1
+    buffer.append([row] * 4)
+    assert buffer.flush() == 4
+
+    # An unavailable database requeues, but never past the capacity
+    def _locked(*args, **kwargs):
+        raise OperationalError("INSERT INTO focus_events", {}, Exception("database is locked"))
+
+    def _unavailable():
+        buffer.append([row] * 7)  # events acknowledged while the flush runs
+        db = session_factory()
+        db.execute = _locked
+        return db
+
+    buffer.session_factory = _unavailable
+    buffer.append([row] * 6)
+    assert buffer.flush() == 0
+    assert len(buffer) == 10 and buffer.dropped == 3 and buffer.failed_flushes == 1
+    buffer.session_factory = session_factory
+    assert buffer.flush() == 10
+    db = session_factory()
+    assert db.query(FocusEvent).count() == 19
+    db.close()
@@ -0,0 +1,90 @@
+"""
+Tests for the food catalogue importer and prefix index
+"""
+import io
+import os
+import tempfile
+import uuid
+from fastapi.testclient import TestClient
+from app.database import SessionLocal, init_database
+from app.models.user import User
+from app.models.food import Food
+from app.services import foods as food_service
+from app.services.foods import FoodIndex, FoodService, normalize
+from main import app
+
+
+CATALOGUE = """name,calories,protein,carbs,fat
+Chicken Breast,165,31,0,3.6
+Chicken Thigh,209,26,0,10.9
+Chickpeas,364,19,61,6
+Crème Fraîche,292,2.4,2.9,30
+Apple,52,0.3,14,0.2
+Apple Pie,237,1.9,34,11
+Green Apple,58,0.4,14,0.2
+,1,1,1,1
+"""
+
+
+def test_normalize():
+    """Test query and name normalization"""
+    assert normalize("  Crème   Fraîche! ") == "creme fraiche"
+    assert normalize("Ben & Jerry's") == "ben jerry s"
+
+
+def test_import_and_suggest():
+    """Test CSV import, index build and type-ahead through the endpoint"""
+    init_database()
+    client = TestClient(app)
+    suffix = uuid.uuid4().hex[:8]
+    data = client.post("/api/auth/register", json={
+        "username": f"food_{suffix}", "email": f"food_{suffix}@test.com", "password": "testpassword123"
+    }).json()
+    headers = {"Authorization": f"Bearer {data['token']}"}
+
+    db = SessionLocal()
+    original_path = food_service.FOOD_INDEX_PATH
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            first_id = (db.query(Food.id).order_by(Food.id.desc()).first() or (0,))[0]
+            assert FoodService.import_csv(db, io.StringIO(CATALOGUE)) == 7
+            catalogue = [row for row in FoodService.iter_catalogue(db) if row[0] > first_id]
+            food_service.FOOD_INDEX_PATH = os.path.join(tmp, "food_index.bin")
+            FoodIndex.build(catalogue, food_service.FOOD_INDEX_PATH)
+
+            print("\n1. Prefix matches on the full name...")
+            names = [f["name"] for f in client.get("/api/foods/suggest?q=chick", headers=headers).json()]
+            assert names == ["Chicken Breast", "Chicken Thigh", "Chickpeas"]
+            print("✅ Prefix match passed")
+
+            print("\n2. Word starts, accents and limits...")
+            names = [f["name"] for f in client.get("/api/foods/suggest?q=APPLE", headers=headers).json()]
+            assert names == ["Apple", "Green Apple", "Apple Pie"]
+            names = [f["name"] for f in client.get("/api/foods/suggest?q=apple&limit=1", headers=headers).json()]
+            assert names == ["Apple"]
+            result = client.get("/api/foods/suggest?q=creme fr", headers=headers).json()
+            assert result[0]["name"] == "Crème Fraîche" and result[0]["fat"] == 30
+            assert client.get("/api/foods/suggest?q=zzz", headers=headers).json() == []
+            print("✅ Word start match passed")
+
+            print("\n3. Rebuilding the index is picked up by running workers...")
+            FoodIndex.build(catalogue[:1], food_service.FOOD_INDEX_PATH)
+            os.utime(food_service.FOOD_INDEX_PATH, (0, 12345))
+            names = [f["name"] for f in client.get("/api/foods/suggest?q=chick", headers=headers).json()]
+            assert names == ["Chicken Breast"]
+            print("✅ Index reload passed")
+        finally:
+            food_service.FOOD_INDEX_PATH = original_path
+            if food_service._index is not None:
+                food_service._index.close()
+                food_service._index = None
+            db.query(Food).filter(Food.id > first_id).delete()
+            db.query(User).filter(User.id == data["user_id"]).delete()
+            db.commit()
+            db.close()
+
+
+if __name__ == "__main__":
+    test_normalize()
+    test_import_and_suggest()
+    print("\n🎉 All food tests passed!")
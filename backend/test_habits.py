@@ -0,0 +1,159 @@
+"""
+Tests for bitset-encoded habit check-ins and incremental streaks
+"""
+import uuid
+from datetime import date, datetime, timedelta
+from fastapi.testclient import TestClient
+from app.database import SessionLocal, init_database
+from app.models.user import User
+from app.models.sync import SyncCounter
+from app.models.habit import Habit, HabitYear
+from app.models.rollup import DailyRollup
+from app.services.rollups import RollupService
+from main import app
+
+
+def _register(client):
+    suffix = uuid.uuid4().hex[:8]
+    response = client.post("/api/auth/register", json={
+        "username": f"habit_{suffix}",
+        "email": f"habit_{suffix}@test.com",
+        "password": "testpassword123"
+    })
+    assert response.status_code == 201
+    data = response.json()
+    return data["user_id"], {"Authorization": f"Bearer {data['token']}"}
+
+
+def _cleanup(user_id):
+    db = SessionLocal()
+    habit_ids = [h.id for h in db.query(Habit.id).filter(Habit.user_id == user_id)]
+    db.query(HabitYear).filter(HabitYear.habit_id.in_(habit_ids)).delete()
+    for model in (Habit, DailyRollup, SyncCounter):
+        db.query(model).filter(model.user_id == user_id).delete()
+    db.query(User).filter(User.id == user_id).delete()
+    db.commit()
+    db.close()
+
+
+def _streaks(habit):
+    return habit["current_streak"], habit["longest_streak"], habit["total_checkins"]
+
+
+def test_habit_streaks():
+    """Test streak maintenance for forward, backfilled and undone check-ins"""
+    init_database()
+    client = TestClient(app)
+    user_id, headers = _register(client)
+
+    try:
+        habit_id = client.post("/api/habits", json={"name": "Read"}, headers=headers).json()["id"]
+        today = datetime.utcnow().date()
+        days = [today - timedelta(days=n) for n in range(10, -1, -1)]
+
+        def check(day):
+            response = client.post(f"/api/habits/{habit_id}/checkins", json={"day": day.isoformat()}, headers=headers)
+            assert response.status_code == 200
+            return response.json()
+
+        def undo(day):
+            return client.delete(f"/api/habits/{habit_id}/checkins/{day.isoformat()}", headers=headers).json()
+
+        print("\n1. Consecutive check-ins extend the streak...")
+        for day in days[:3]:
+            habit = check(day)
+        assert _streaks(habit) == (0, 3, 3)  # run ended 8 days ago, so not current
+        assert _streaks(check(days[2])) == (0, 3, 3)  # duplicate check-in is a no-op
+        print("✅ Forward streak passed")
+
+        print("\n2. A gap starts a new current streak...")
+        for day in days[5:]:
+            habit = check(day)
+        assert _streaks(habit) == (6, 6, 9)
+        print("✅ New streak passed")
+
+        print("\n3. Backfilling the gap joins both runs...")
+        check(days[3])
+        habit = check(days[4])
+        assert _streaks(habit) == (11, 11, 11)
+        print("✅ Backfill passed")
+
+        print("\n4. Undo in the middle and at the end...")
+        assert _streaks(undo(days[5])) == (5, 5, 10)
+        assert _streaks(undo(today)) == (4, 5, 9)
+        print("✅ Undo passed")
+
+        print("\n5. Heatmap decodes the bitset...")
+        heatmap = client.get(f"/api/habits/{habit_id}/heatmap?year={today.year}", headers=headers).json()
+        checked = {date(today.year, 1, 1) + timedelta(days=i) for i, bit in enumerate(heatmap["days"]) if bit}
+        expected = {d for d in days if d.year == today.year} - {days[5], today}
+        assert checked == expected
+        assert len(heatmap["days"]) in (365, 366)
+        print("✅ Heatmap passed")
+
+        print("\n6. Rollups match a rebuild and habits appear in sync and dashboard...")
+        db = SessionLocal()
+        incremental = {(r.day, r.category): r.habit_checkins for r in
+                       db.query(DailyRollup).filter(DailyRollup.user_id == user_id) if r.habit_checkins}
+        RollupService.rebuild(db, user_id)
+        rebuilt = {(r.day, r.category): r.habit_checkins for r in
+                   db.query(DailyRollup).filter(DailyRollup.user_id == user_id) if r.habit_checkins}
+        db.close()
+        assert incremental == rebuilt and sum(rebuilt.values()) == 9
+        sync = client.get("/api/sync", headers=headers).json()
+        assert sync["changes"]["habits"]["upserts"][0]["id"] == habit_id
+        dashboard = client.get("/api/dashboard", headers=headers).json()
+        assert dashboard["habits"][0]["checked_today"] is False
+        print("✅ Integration passed")
+    finally:
+        _cleanup(user_id)
+
+
+def test_streak_across_year_boundary():
+    """Test that streaks continue across the end of a year"""
+    init_database()
+    client = TestClient(app)
+    user_id, headers = _register(client)
+
+    try:
+        habit_id = client.post("/api/habits", json={"name": "Walk"}, headers=headers).json()["id"]
+        for day in ("2023-12-30", "2024-01-01", "2023-12-31"):
+            habit = client.post(f"/api/habits/{habit_id}/checkins", json={"day": day}, headers=headers).json()
+        assert habit["longest_streak"] == 3
+        assert habit["last_checkin"] == "2024-01-01"
+        habit = client.delete(f"/api/habits/{habit_id}/checkins/2024-01-01", headers=headers).json()
+        assert habit["longest_streak"] == 2
+        assert habit["last_checkin"] == "2023-12-31"
+    finally:
+        _cleanup(user_id)
+
+
+def test_update_rejects_nulls_and_moves_rollups():
+    """Name and category cannot be cleared; a new category moves the habit's check-ins in the rollups"""
+    init_database()
+    client = TestClient(app)
+    user_id, headers = _register(client)
+
+    try:
+        habit_id = client.post("/api/habits", json={"name": "Stretch"}, headers=headers).json()["id"]
+        client.post(f"/api/habits/{habit_id}/checkins", json={"day": "2024-03-01"}, headers=headers)
+        for field in ("name", "category"):
+            response = client.patch(f"/api/habits/{habit_id}", json={field: None}, headers=headers)
+            assert response.status_code == 422, field
+
+        habit = client.patch(f"/api/habits/{habit_id}", json={"category": "work"}, headers=headers).json()
+        assert (habit["name"], habit["category"]) == ("Stretch", "work")
+        db = SessionLocal()
+        rows = {r.category: r.habit_checkins for r in
+                db.query(DailyRollup).filter(DailyRollup.user_id == user_id, DailyRollup.day == date(2024, 3, 1))}
+        db.close()
+        assert rows.get("work") == 1 and not rows.get("life")
+    finally:
+        _cleanup(user_id)
+
+
+if __name__ == "__main__":
+    test_habit_streaks()
+    test_streak_across_year_boundary()
+    test_update_rejects_nulls_and_moves_rollups()
+    print("\n🎉 All habit tests passed!")
@@ -0,0 +1,228 @@
+"""
+Tests for Idempotency-Key handling: concurrent duplicates, replays, key reuse, lock takeover and auth paths
+"""
+import asyncio
+import json
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.database import Base, SessionLocal, init_database
+from app.idempotency import IdempotencyMiddleware
+from app.models.idempotency import IdempotencyKey
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+from app.services.auth import AuthService
+from app.services.idempotency import CLAIMED, COMPLETED, MISMATCH, PENDING, IdempotencyService
+from main import app
+
+
+def _sessions(path):
+    import app.database_init  # noqa: F401  (registers every model)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+
+def _concurrently(count, func):
+    results = [None] * count
+    barrier = threading.Barrier(count)
+
+    def _call(n):
+        barrier.wait()
+        results[n] = func()
+
+    threads = [threading.Thread(target=_call, args=(n,)) for n in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def _delete_user(username):
+    db = SessionLocal()
+    user = db.query(User).filter(User.username == username).first()
+    if user is not None:
+        db.query(RefreshToken).filter(RefreshToken.user_id == user.id).delete()
+        db.delete(user)
+    db.commit()
+    db.close()
+
+
+def test_concurrent_duplicate_registrations_run_once(monkeypatch):
+    """Duplicates of a registration wait for it and replay it with fresh tokens, without bcrypt or an insert"""
+    init_database()
+    created = []
+    create_user = AuthService.create_user
+
+    def _slow_create_user(db, user_data):
+        created.append(user_data.username)
+        time.sleep(0.3)  # keep the first request in flight while the duplicates arrive
+        return create_user(db, user_data)
+
+    monkeypatch.setattr(AuthService, "create_user", staticmethod(_slow_create_user))
+    suffix = uuid.uuid4().hex[:8]
+    payload = {"username": f"idem_{suffix}", "email": f"idem_{suffix}@test.com", "password": "testpassword123",
+               "device_id": "phone"}
+    key = f"register-{suffix}"
+    try:
+        with TestClient(app) as client:
+            responses = _concurrently(5, lambda: client.post("/api/auth/register", json=payload,
+                                                             headers={"Idempotency-Key": key}))
+            assert created == [payload["username"]]
+            assert [response.status_code for response in responses] == [201] * 5
+            assert len({response.json()["user_id"] for response in responses}) == 1
+            assert sum(response.headers.get("idempotent-replayed") == "true" for response in responses) == 4
+            assert all(response.json()["token"] and response.json()["refresh_token"] for response in responses)
+
+            # The stored response holds no credentials
+            db = SessionLocal()
+            stored = db.query(IdempotencyKey).filter(IdempotencyKey.key == key).one()
+            assert stored.status == "completed"
+            assert json.loads(stored.response_body)["token"] is None
+            assert json.loads(stored.response_body)["refresh_token"] is None
+            db.close()
+
+            # A later retry skips bcrypt and the lookups; its refresh token replaces the device's session
+            def _untouchable(*args, **kwargs):
+                raise AssertionError("registration ran again on a replay")
+
+            for name in ("create_user", "hash_password", "get_user_by_email", "get_user_by_username"):
+                monkeypatch.setattr(AuthService, name, staticmethod(_untouchable))
+            replay = client.post("/api/auth/register", json=payload, headers={"Idempotency-Key": key})
+            assert replay.status_code == 201
+            assert replay.headers["idempotent-replayed"] == "true"
+            assert int(replay.headers["content-length"]) == len(replay.content)
+            assert replay.json()["user_id"] == responses[0].json()["user_id"]
+            verified = client.get("/api/auth/verify", headers={"Authorization": f"Bearer {replay.json()['token']}"})
+            assert verified.json()["username"] == payload["username"]
+            refreshed = client.post("/api/auth/refresh", json={"refresh_token": replay.json()["refresh_token"]})
+            assert refreshed.status_code == 200
+
+            reused = client.post("/api/auth/register", json={**payload, "username": "someone_else"},
+                                 headers={"Idempotency-Key": key})
+            assert reused.status_code == 422
+            assert reused.json()["detail"]["error"] == "idempotency_key_reused"
+    finally:
+        db = SessionLocal()
+        db.query(IdempotencyKey).filter(IdempotencyKey.key == key).delete()
+        db.commit()
+        db.close()
+        _delete_user(payload["username"])
+
+
+def test_login_and_refresh_ignore_the_key():
+    """Login and refresh check credentials every time: the key is ignored there and nothing is stored"""
+    init_database()
+    suffix = uuid.uuid4().hex[:8]
+    payload = {"username": f"idem_{suffix}", "email": f"idem_{suffix}@test.com", "password": "testpassword123"}
+    key = f"login-{suffix}"
+    client = TestClient(app)
+    try:
+        assert client.post("/api/auth/register", json=payload).status_code == 201
+        login = {"email": payload["email"], "password": payload["password"]}
+        logged_in = client.post("/api/auth/login", json=login, headers={"Idempotency-Key": key})
+        assert logged_in.status_code == 200
+        assert "idempotent-replayed" not in client.post("/api/auth/login", json=login,
+                                                        headers={"Idempotency-Key": key}).headers
+
+        refresh = {"refresh_token": client.post("/api/auth/login", json=login).json()["refresh_token"]}
+        assert client.post("/api/auth/refresh", json=refresh, headers={"Idempotency-Key": key}).status_code == 200
+
+        # A retried refresh goes through rotation again instead of replaying the successor token
+        retried = client.post("/api/auth/refresh", json=refresh, headers={"Idempotency-Key": key})
+        assert retried.status_code == 401
+        assert "idempotent-replayed" not in retried.headers
+        db = SessionLocal()
+        assert db.query(IdempotencyKey).filter(IdempotencyKey.key == key).count() == 0
+        db.close()
+    finally:
+        _delete_user(payload["username"])
+
+
+def test_in_process_duplicates_wait_and_server_errors_are_not_stored(tmp_path):
+    calls = {"create": 0, "flaky": 0, "limited": 0, "invalid": 0}
+    api = FastAPI()
+    api.add_middleware(IdempotencyMiddleware, session_factory=_sessions(tmp_path / "idem.db"))
+
+    @api.post("/items")
+    async def create_item(item: dict):
+        calls["create"] += 1
+        await asyncio.sleep(0.2)
+        return {"n": calls["create"], **item}
+
+    @api.post("/flaky")
+    async def flaky():
+        calls["flaky"] += 1
+        if calls["flaky"] == 1:
+            raise HTTPException(status_code=503, detail="try again")
+        return {"attempt": calls["flaky"]}
+
+    @api.post("/limited")
+    async def limited():
+        calls["limited"] += 1
+        if calls["limited"] == 1:
+            raise HTTPException(status_code=429, detail="slow down", headers={"Retry-After": "1"})
+        return {"attempt": calls["limited"]}
+
+    @api.post("/invalid")
+    async def invalid():
+        calls["invalid"] += 1
+        raise HTTPException(status_code=400, detail="bad request")
+
+    # One client, one event loop: duplicates wait on the running request, not the database
+    with TestClient(api) as client:
+        responses = _concurrently(6, lambda: client.post("/items", json={"name": "a"},
+                                                         headers={"Idempotency-Key": "k1"}))
+        assert calls["create"] == 1
+        assert all(response.json() == {"n": 1, "name": "a"} for response in responses)
+
+        # Another credential is another scope
+        other = client.post("/items", json={"name": "a"},
+                            headers={"Idempotency-Key": "k1", "Authorization": "Bearer other"})
+        assert other.json() == {"n": 2, "name": "a"}
+        assert client.post("/items", json={"name": "b"}).json()["n"] == 3
+
+        assert client.post("/flaky", headers={"Idempotency-Key": "k2"}).status_code == 503
+        retried = client.post("/flaky", headers={"Idempotency-Key": "k2"})
+        assert retried.json() == {"attempt": 2}
+        assert "idempotent-replayed" not in retried.headers
+        assert client.post("/flaky", headers={"Idempotency-Key": "k2"}).headers["idempotent-replayed"] == "true"
+
+        # A rate limit is retried for real; a deterministic client error is replayed
+        assert client.post("/limited", headers={"Idempotency-Key": "k3"}).status_code == 429
+        assert client.post("/limited", headers={"Idempotency-Key": "k3"}).json() == {"attempt": 2}
+        assert client.post("/invalid", headers={"Idempotency-Key": "k4"}).status_code == 400
+        assert client.post("/invalid", headers={"Idempotency-Key": "k4"}).headers["idempotent-replayed"] == "true"
+        assert calls["invalid"] == 1
+
+        assert client.post("/items", json={}, headers={"Idempotency-Key": ""}).status_code == 400
+        assert client.post("/items", json={}, headers={"Idempotency-Key": "x" * 256}).status_code == 400
+
+
+def test_claim_takeover_and_purge(tmp_path):
+    session_factory = _sessions(tmp_path / "claims.db")
+    db = session_factory()
+    assert IdempotencyService.claim(db, "s", "k", "f1", lock_seconds=60)[0] == CLAIMED
+    assert IdempotencyService.claim(db, "s", "k", "f1")[0] == PENDING
+    assert IdempotencyService.claim(db, "s", "k", "f2")[0] == MISMATCH
+
+    # An owner that died leaves its lock to run out; the next duplicate takes over
+    assert IdempotencyService.claim(db, "s", "dead", "f", lock_seconds=0)[0] == CLAIMED
+    assert IdempotencyService.claim(db, "s", "dead", "f")[0] == CLAIMED
+
+    IdempotencyService.complete(db, "s", "k", 201, [["content-type", "application/json"]], b'{"ok":true}')
+    assert IdempotencyService.claim(db, "s", "k", "f1") == (
+        COMPLETED, (201, [["content-type", "application/json"]], b'{"ok":true}')
+    )
+
+    # Expired keys are purged and can be claimed afresh
+    assert IdempotencyService.purge(db, datetime.utcnow() + timedelta(days=2)) == 2
+    assert IdempotencyService.claim(db, "s", "k", "f2", ttl_seconds=0)[0] == CLAIMED
+    assert IdempotencyService.claim(db, "s", "k", "f3")[0] == CLAIMED
+    db.close()
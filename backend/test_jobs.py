@@ -0,0 +1,229 @@
+"""
+Tests for the background job queue: atomic claims, retries, crash recovery and the jobs API
+"""
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from app.database import Base, SessionLocal
+from app.models.user import User
+from app.models.job import Job
+from app.services.jobs import JobService, JobWorkerPool, PermanentJobError, job_handler, retry_delay
+from main import app
+
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Runs in a separate process so the test can kill it with SIGKILL mid-job
+WORKER_SCRIPT = """
+import sys, time
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.services.jobs import JobWorkerPool, job_handler
+
+@job_handler("test.slow")
+def slow(db, user_id, payload):
+    time.sleep(payload["seconds"])
+    return payload
+
+engine = create_engine("sqlite:///" + sys.argv[1], connect_args={"check_same_thread": False})
+JobWorkerPool(sessionmaker(bind=engine), workers=2, lease_seconds=1, poll_seconds=0.05).start()
+time.sleep(600)
+"""
+
+executions = []
+executions_lock = threading.Lock()
+flaky_attempts = {}
+
+
+@job_handler("test.record")
+def _record(db, user_id, payload):
+    with executions_lock:
+        executions.append(payload["n"])
+    return {"n": payload["n"]}
+
+
+@job_handler("test.flaky")
+def _flaky(db, user_id, payload):
+    if payload.get("permanent"):
+        raise PermanentJobError("bad payload")
+    key = payload["key"]
+    flaky_attempts[key] = flaky_attempts.get(key, 0) + 1
+    if flaky_attempts[key] <= payload["failures"]:
+        raise ValueError(f"failure {flaky_attempts[key]}")
+    return {"attempts": flaky_attempts[key]}
+
+
+@job_handler("test.slow")
+def _slow(db, user_id, payload):
+    time.sleep(payload["seconds"])
+    return payload
+
+
+def _sessions(path):
+    import app.database_init  # noqa: F401  (registers every model)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def _pragmas(dbapi_connection, connection_record):
+        dbapi_connection.execute("PRAGMA journal_mode=WAL")
+
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+
+def _wait_for(condition, timeout=20.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def _statuses(session_factory):
+    db = session_factory()
+    try:
+        return JobService.status_counts(db)
+    finally:
+        db.close()
+
+
+def test_retry_delay_grows_and_is_capped():
+    for attempts, delay in ((1, 5), (2, 10), (4, 40), (20, 900)):
+        for _ in range(20):
+            assert delay / 2 <= retry_delay(attempts, base=5, cap=900) <= delay
+
+
+def test_concurrent_workers_run_each_job_exactly_once(tmp_path):
+    session_factory = _sessions(tmp_path / "jobs.db")
+    db = session_factory()
+    for n in range(300):
+        JobService.enqueue(db, "test.record", {"n": n})
+    db.close()
+    executions.clear()
+    pool = JobWorkerPool(session_factory, workers=8, poll_seconds=0.01)
+    pool.start()
+    try:
+        assert _wait_for(lambda: _statuses(session_factory).get("succeeded") == 300)
+    finally:
+        pool.stop()
+    assert sorted(executions) == list(range(300))
+    stats = pool.stats()
+    assert stats["claimed"] == stats["succeeded"] == 300 and stats["reclaimed"] == 0
+    assert stats["jobs_per_second_1m"] > 0 and stats["queue_wait_p95_ms"] is not None
+
+
+def test_failures_retry_with_backoff_until_max_attempts(tmp_path):
+    session_factory = _sessions(tmp_path / "jobs.db")
+    db = session_factory()
+    recovers = JobService.enqueue(db, "test.flaky", {"key": "recovers", "failures": 2}).id
+    exhausts = JobService.enqueue(db, "test.flaky", {"key": "exhausts", "failures": 99}, max_attempts=3).id
+    permanent = JobService.enqueue(db, "test.flaky", {"permanent": True}).id
+    pool = JobWorkerPool(session_factory, workers=2, poll_seconds=0.01, retry_base=0.05, retry_max=0.2)
+    for _ in range(200):
+        pool.run_next(db)
+        db.expire_all()
+        if all(db.get(Job, job_id).status in ("succeeded", "failed") for job_id in (recovers, exhausts, permanent)):
+            break
+        time.sleep(0.02)
+
+    job = db.get(Job, recovers)
+    assert (job.status, job.attempts, job.to_dict()["result"]) == ("succeeded", 3, {"attempts": 3})
+    assert job.error is None
+    job = db.get(Job, exhausts)
+    assert (job.status, job.attempts) == ("failed", 3) and "failure 3" in job.error
+    job = db.get(Job, permanent)
+    assert (job.status, job.attempts) == ("failed", 1) and "bad payload" in job.error
+    assert pool.counters["retried"] == 4
+    db.close()
+
+
+def test_jobs_of_a_killed_worker_are_not_lost(tmp_path):
+    path = tmp_path / "jobs.db"
+    session_factory = _sessions(path)
+    db = session_factory()
+    ids = [JobService.enqueue(db, "test.slow", {"seconds": 0.4, "n": n}).id for n in range(10)]
+    db.close()
+
+    worker = subprocess.Popen([sys.executable, "-c", WORKER_SCRIPT, str(path)], cwd=BACKEND_DIR)
+    try:
+        assert _wait_for(lambda: _statuses(session_factory).get("succeeded", 0) >= 2
+                         and _statuses(session_factory).get("running", 0) == 2)
+    finally:
+        os.kill(worker.pid, signal.SIGKILL)
+        worker.wait()
+
+    db = session_factory()
+    interrupted = [job.id for job in db.query(Job).filter(Job.status == "running")]
+    assert len(interrupted) == 2
+    db.close()
+
+    pool = JobWorkerPool(session_factory, workers=2, lease_seconds=1, poll_seconds=0.05)
+    pool.start()
+    try:
+        assert _wait_for(lambda: _statuses(session_factory) == {"succeeded": 10})
+    finally:
+        pool.stop()
+    db = session_factory()
+    jobs = {job.id: job for job in db.query(Job)}
+    assert set(jobs) == set(ids)
+    for job_id in interrupted:
+        assert jobs[job_id].attempts == 2
+    assert [jobs[job_id].to_dict()["result"]["n"] for job_id in ids] == list(range(10))
+    assert pool.counters["reclaimed"] == 2
+    db.close()
+
+
+def test_jobs_api_runs_reports_in_the_background():
+    with TestClient(app) as client:
+        suffix = uuid.uuid4().hex[:8]
+        data = client.post("/api/auth/register", json={
+            "username": f"jobs_{suffix}",
+            "email": f"jobs_{suffix}@test.com",
+            "password": "testpassword123"
+        }).json()
+        headers = {"Authorization": f"Bearer {data['token']}"}
+        try:
+            response = client.post("/api/jobs", json={
+                "kind": "analytics.summary",
+                "payload": {"start": "2030-01-01", "end": "2030-01-31", "period": "week"}
+            }, headers=headers)
+            assert response.status_code == 202
+            summary_id = response.json()["id"]
+            bad_id = client.post("/api/jobs", json={
+                "kind": "analytics.summary", "payload": {"start": "yesterday"}
+            }, headers=headers).json()["id"]
+            later_id = client.post("/api/jobs", json={
+                "kind": "rollups.rebuild", "delay_seconds": 3600
+            }, headers=headers).json()["id"]
+            assert client.post("/api/jobs", json={"kind": "test.record"}, headers=headers).status_code == 422
+
+            assert _wait_for(lambda: client.get(f"/api/jobs/{summary_id}", headers=headers).json()["status"]
+                             == "succeeded", timeout=10)
+            job = client.get(f"/api/jobs/{summary_id}", headers=headers).json()
+            assert job["result"]["period"] == "week" and job["result"]["totals"]["tasks_created"] == 0
+            assert _wait_for(lambda: client.get(f"/api/jobs/{bad_id}", headers=headers).json()["status"]
+                             == "failed", timeout=10)
+            assert "ISO date" in client.get(f"/api/jobs/{bad_id}", headers=headers).json()["error"]
+
+            queued = client.get("/api/jobs", params={"status": "queued"}, headers=headers).json()
+            assert [job["id"] for job in queued] == [later_id]
+            assert client.post(f"/api/jobs/{later_id}/cancel", headers=headers).json()["status"] == "cancelled"
+            assert client.post(f"/api/jobs/{summary_id}/cancel", headers=headers).status_code == 409
+            assert client.get("/api/jobs/999999999", headers=headers).status_code == 404
+
+            stats = client.get("/api/jobs/stats", headers=headers).json()
+            assert stats["workers"]["succeeded"] >= 1 and stats["queue"]["succeeded"] >= 1
+        finally:
+            db = SessionLocal()
+            db.query(Job).filter(Job.user_id == data["user_id"]).delete()
+            db.query(User).filter(User.id == data["user_id"]).delete()
+            db.commit()
+            db.close()
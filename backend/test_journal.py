@@ -0,0 +1,127 @@
+"""
+Tests for journal entries, the hashing embedder and the memory-mapped vector index
+"""
+import uuid
+import numpy as np
+from fastapi.testclient import TestClient
+from app.database import SessionLocal
+from app.models.user import User
+from app.models.sync import SyncCounter
+from app.models.journal import JournalEntry
+from app.services.embeddings import HashingEmbedder
+from app.services.vector_index import VectorIndex, vector_store
+from main import app
+
+
+def _unit_vectors(count, dim, seed):
+    vectors = np.random.default_rng(seed).standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_hashing_embedder_is_deterministic_and_normalized():
+    embedder = HashingEmbedder(dim=128)
+    vectors = embedder.embed(["Long run by the river", "long RUN by the river!", "Budget review", "  "])
+    assert vectors.shape == (4, 128) and vectors.dtype == np.float32
+    assert np.allclose(vectors[0], vectors[1])
+    assert np.isclose(np.linalg.norm(vectors[2]), 1.0)
+    assert not vectors[3].any()
+    assert vectors[0] @ vectors[1] > vectors[0] @ vectors[2]
+    assert np.array_equal(embedder.embed(["Budget review"])[0], HashingEmbedder(dim=128).embed(["Budget review"])[0])
+
+
+def test_index_upsert_remove_and_reload(tmp_path):
+    path = str(tmp_path / "user")
+    vectors = _unit_vectors(3000, 32, seed=1)
+    index = VectorIndex(path, 32, "test")
+    index.upsert(list(range(1, 3001)), vectors)
+    assert index.search(vectors[41], k=1)[0][0] == 42
+    index.upsert([42], vectors[7:8])
+    assert [entry_id for entry_id, _ in index.search(vectors[7], k=2)] in ([8, 42], [42, 8])
+    assert index.remove([8, 9999]) == 1
+    assert index.search(vectors[7], k=1)[0][0] == 42
+    index.close()
+
+    reopened = VectorIndex(path, 32, "test")
+    assert len(reopened) == 2999
+    assert reopened.search(vectors[100], k=1)[0][0] == 101
+    assert reopened.search(vectors[7], k=1)[0][0] == 42
+    reopened.compact()
+    assert reopened.count == 2999 and reopened.search(vectors[2999], k=1)[0][0] == 3000
+
+    # Another embedder invalidates the stored vectors
+    assert VectorIndex(path, 32, "other").needs_rebuild
+    assert len(VectorIndex(path, 32, "other")) == 0
+
+
+def test_ivf_index_matches_brute_force(tmp_path):
+    rng = np.random.default_rng(5)
+    centers = _unit_vectors(40, 48, seed=2)
+    vectors = centers[rng.integers(0, 40, 6000)] + 0.3 * _unit_vectors(6000, 48, seed=3)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    index = VectorIndex(str(tmp_path / "ivf"), 48, "test", ivf_threshold=4000, nprobe=8)
+    index.upsert(list(range(4000)), vectors[:4000])
+    assert index.nlist > 0 and index.trained_on == 4000
+    index.upsert(list(range(4000, 6000)), vectors[4000:])
+
+    hits = 0
+    for query in vectors[rng.integers(0, 6000, 50)]:
+        exact = {entry_id for entry_id, _ in index.search(query, k=10, exact=True)}
+        approximate = {entry_id for entry_id, _ in index.search(query, k=10)}
+        hits += len(exact & approximate)
+    assert hits / 500 > 0.9
+
+
+def test_journal_api_similar_entries(tmp_path, monkeypatch):
+    monkeypatch.setattr(vector_store, "root", str(tmp_path))
+    with TestClient(app) as client:
+        suffix = uuid.uuid4().hex[:8]
+        data = client.post("/api/auth/register", json={
+            "username": f"journal_{suffix}",
+            "email": f"journal_{suffix}@test.com",
+            "password": "testpassword123"
+        }).json()
+        headers = {"Authorization": f"Bearer {data['token']}"}
+        try:
+            bodies = [
+                ("journal", "Went for a long run by the river, legs tired but happy"),
+                ("reflection", "Felt anxious about the budget review meeting at work"),
+                ("journal", "Another long run by the river this morning, faster pace"),
+                ("checkin", "Slept badly, low energy all afternoon"),
+            ]
+            ids = []
+            for kind, body in bodies:
+                response = client.post("/api/journal/entries", json={
+                    "kind": kind, "entry_date": "2030-03-01", "body": body
+                }, headers=headers)
+                assert response.status_code == 201
+                ids.append(response.json()["id"])
+
+            results = client.get("/api/journal/similar", params={"q": "long run river", "k": 2}, headers=headers).json()
+            assert [r["entry"]["id"] for r in results["results"]] in ([ids[0], ids[2]], [ids[2], ids[0]])
+
+            results = client.get(f"/api/journal/entries/{ids[0]}/similar", params={"k": 1}, headers=headers).json()
+            assert results["results"][0]["entry"]["id"] == ids[2]
+
+            results = client.get("/api/journal/similar", params={"q": "river run", "kind": "reflection"},
+                                 headers=headers).json()
+            assert {r["entry"]["kind"] for r in results["results"]} <= {"reflection"}
+
+            client.patch(f"/api/journal/entries/{ids[2]}", json={"body": "Budget spreadsheet cleanup"}, headers=headers)
+            client.delete(f"/api/journal/entries/{ids[0]}", headers=headers)
+            results = client.get("/api/journal/similar", params={"q": "long run river"}, headers=headers).json()
+            assert ids[0] not in [r["entry"]["id"] for r in results["results"]]
+            results = client.get("/api/journal/similar", params={"q": "budget spreadsheet", "k": 1},
+                                 headers=headers).json()
+            assert results["results"][0]["entry"]["id"] == ids[2]
+
+            assert client.post("/api/journal/reindex", headers=headers).json() == {"indexed": 3}
+            sync = client.get("/api/sync", params={"since": 0}, headers=headers).json()
+            assert len(sync["changes"]["journal_entries"]["upserts"]) == 3
+        finally:
+            vector_store.drop(data["user_id"])
+            db = SessionLocal()
+            for model in (JournalEntry, SyncCounter):
+                db.query(model).filter(model.user_id == data["user_id"]).delete()
+            db.query(User).filter(User.id == data["user_id"]).delete()
+            db.commit()
+            db.close()
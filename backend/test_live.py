@@ -0,0 +1,148 @@
+"""
+Tests for live change notifications: broker coalescing, commit hooks, SSE and WebSocket
+"""
+import asyncio
+import threading
+import uuid
+from datetime import datetime, timedelta
+import pytest
+from fastapi.testclient import TestClient
+from app.database import SessionLocal
+from app.models.user import User
+from app.models.sync import SyncCounter
+from app.models.task import Task
+from app.routers.live import event_stream
+from app.services.auth import AuthService
+from app.services.live import LiveBroker, live_broker
+from app.services.sync import SyncService
+from main import app
+
+
+def _register(client):
+    suffix = uuid.uuid4().hex[:8]
+    response = client.post("/api/auth/register", json={
+        "username": f"live_{suffix}",
+        "email": f"live_{suffix}@test.com",
+        "password": "testpassword123"
+    })
+    assert response.status_code == 201
+    data = response.json()
+    return data["user_id"], data["token"]
+
+
+def _cleanup(user_id):
+    db = SessionLocal()
+    for model in (Task, SyncCounter):
+        db.query(model).filter(model.user_id == user_id).delete()
+    db.query(User).filter(User.id == user_id).delete()
+    db.commit()
+    db.close()
+
+
+def test_slow_subscriber_gets_coalesced_cursor():
+    async def scenario():
+        broker = LiveBroker()
+        subscriber = broker.subscribe(7, 0)
+        other_user = broker.subscribe(8, 0)
+        publisher = threading.Thread(target=lambda: [broker.publish(7, seq) for seq in range(1, 1001)])
+        publisher.start()
+        publisher.join()
+        assert await subscriber.next_cursor(1.0) == 1000
+        assert await subscriber.next_cursor(0.05) is None
+        assert await other_user.next_cursor(0.05) is None
+        assert broker.stats()["connections"] == 2
+        broker.unsubscribe(subscriber)
+        broker.unsubscribe(other_user)
+        assert broker.stats() == {"users": 0, "connections": 0, "published": 1000}
+
+    asyncio.run(scenario())
+
+
+def test_changes_are_published_on_commit_only():
+    async def scenario():
+        subscriber = live_broker.subscribe(-1, 0)
+        try:
+            db = SessionLocal()
+            SyncService.next_seq(db, -1)
+            db.rollback()
+            assert await subscriber.next_cursor(0.05) is None
+
+            first = SyncService.next_seq(db, -1)
+            second = SyncService.next_seq(db, -1)
+            assert await subscriber.next_cursor(0.05) is None  # not committed yet
+            db.commit()
+            assert second == first + 1
+            assert await subscriber.next_cursor(1.0) == second
+            db.query(SyncCounter).filter(SyncCounter.user_id == -1).delete()
+            db.commit()
+            db.close()
+        finally:
+            live_broker.unsubscribe(subscriber)
+
+    asyncio.run(scenario())
+
+
+def test_sse_stream_emits_cursor_events():
+    async def scenario():
+        stream = event_stream(-2, 0, 3)
+        assert await stream.__anext__() == "retry: 5000\n\n"
+        assert await stream.__anext__() == 'id: 3\nevent: changes\ndata: {"cursor": 3}\n\n'
+        live_broker.publish(-2, 4)
+        live_broker.publish(-2, 9)
+        assert await stream.__anext__() == 'id: 9\nevent: changes\ndata: {"cursor": 9}\n\n'
+        await stream.aclose()
+        assert -2 not in live_broker._subscribers
+
+    asyncio.run(scenario())
+
+
+def test_sse_stream_ends_when_the_token_expires():
+    async def scenario():
+        stream = event_stream(-3, 0, 0, datetime.utcnow() - timedelta(seconds=1))
+        assert await stream.__anext__() == "retry: 5000\n\n"
+        assert await stream.__anext__() == "event: expired\ndata: {}\n\n"
+        with pytest.raises(StopAsyncIteration):
+            await stream.__anext__()
+        assert -3 not in live_broker._subscribers
+
+    asyncio.run(scenario())
+
+
+def test_sse_requires_ticket_or_token():
+    with TestClient(app) as client:
+        assert client.get("/api/live/events", params={"ticket": "bogus"}).status_code == 401
+        assert client.get("/api/live/events").status_code == 401
+        assert client.post("/api/live/ticket").status_code in (401, 403)
+
+
+def test_stream_ticket_is_not_an_access_token():
+    with TestClient(app) as client:
+        user_id, token = _register(client)
+        try:
+            response = client.post("/api/live/ticket", headers={"Authorization": f"Bearer {token}"})
+            assert response.status_code == 200
+            ticket = response.json()["ticket"]
+            token_data, expires_at = AuthService.verify_stream_ticket(ticket)
+            assert token_data.user_id == user_id
+            assert expires_at == AuthService.token_expires_at(token).replace(microsecond=0)
+            assert AuthService.verify_token(ticket) is None
+            assert client.get("/api/auth/verify", headers={"Authorization": f"Bearer {ticket}"}).status_code == 401
+            assert AuthService.verify_stream_ticket(token) is None
+        finally:
+            _cleanup(user_id)
+
+
+def test_websocket_receives_task_changes():
+    with TestClient(app) as client:
+        user_id, token = _register(client)
+        try:
+            headers = {"Authorization": f"Bearer {token}"}
+            ticket = client.post("/api/live/ticket", headers=headers).json()["ticket"]
+            with client.websocket_connect(f"/api/live/ws?ticket={ticket}&since=0") as ws:
+                created = client.post("/api/tasks", json={"title": "Push me"}, headers=headers).json()
+                message = ws.receive_json()
+                assert message == {"type": "changes", "cursor": created["seq"]}
+                stats = client.get("/api/live/stats", headers=headers).json()
+                assert stats["connections"] >= 1
+        finally:
+            _cleanup(user_id)
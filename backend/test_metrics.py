@@ -0,0 +1,110 @@
+"""
+Tests for the tiered wellness metric store
+"""
+import uuid
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from app.database import SessionLocal, init_database
+from app.models.user import User
+from app.models.metric import MetricPoint, MetricBlock, MetricRollup
+from app.services.metrics import MetricService
+from main import app
+
+
+def _register(client):
+    suffix = uuid.uuid4().hex[:8]
+    response = client.post("/api/auth/register", json={
+        "username": f"metric_{suffix}",
+        "email": f"metric_{suffix}@test.com",
+        "password": "testpassword123"
+    })
+    assert response.status_code == 201
+    data = response.json()
+    return data["user_id"], {"Authorization": f"Bearer {data['token']}"}
+
+
+def _cleanup(user_id):
+    db = SessionLocal()
+    for model in (MetricPoint, MetricBlock, MetricRollup):
+        db.query(model).filter(model.user_id == user_id).delete()
+    db.query(User).filter(User.id == user_id).delete()
+    db.commit()
+    db.close()
+
+
+def test_metric_tiers_and_compaction():
+    """Test rollup tiers, tier selection and raw compaction"""
+    init_database()
+    client = TestClient(app)
+    user_id, headers = _register(client)
+
+    try:
+        print("\n1. Record two years of hourly mood samples...")
+        start = datetime(2022, 1, 3)  # a Monday
+        hours = 2 * 365 * 24
+        db = SessionLocal()
+        MetricService.record_points(db, user_id, (
+            ("mood", start + timedelta(hours=h), float(h % 10)) for h in range(hours)
+        ))
+        db.close()
+        print("✅ Bulk record passed")
+
+        print("\n2. A multi-year chart reads hundreds of rollup rows...")
+        end = start + timedelta(hours=hours)
+        params = {"start": start.isoformat(), "end": end.isoformat()}
+        data = client.get("/api/metrics/mood/series", params=params, headers=headers).json()
+        assert data["tier"] == "day"
+        assert 700 <= data["rows_read"] <= 800
+        assert data["points"][0] == {"ts": "2022-01-03T00:00:00", "avg": 4.0, "min": 0.0, "max": 9.0, "count": 24}
+        data = client.get("/api/metrics/mood/series", params={**params, "max_points": 100}, headers=headers).json()
+        assert data["tier"] == "week" and data["rows_read"] < 110
+        print("✅ Tier selection passed")
+
+        print("\n3. Short ranges read raw samples, before and after compaction...")
+        window = {"start": start.isoformat(), "end": (start + timedelta(hours=5)).isoformat()}
+        before = client.get("/api/metrics/mood/series", params=window, headers=headers).json()
+        assert before["tier"] == "raw" and len(before["points"]) == 6
+
+        db = SessionLocal()
+        compacted = MetricService.compact(db, before=start + timedelta(days=10), user_id=user_id)
+        assert compacted == 10 * 24
+        assert db.query(MetricBlock).filter(MetricBlock.user_id == user_id).count() == 10
+        db.close()
+
+        after = client.get("/api/metrics/mood/series", params=window, headers=headers).json()
+        assert after["points"] == before["points"]
+        assert after["rows_read"] == 1
+        print("✅ Compaction passed")
+
+        print("\n4. Incremental writes merge into existing buckets...")
+        response = client.post("/api/metrics", json={"points": [
+            {"metric": "mood", "ts": "2022-01-03T00:30:00+00:00", "value": -1.0}
+        ]}, headers=headers)
+        assert response.status_code == 201
+        data = client.get("/api/metrics/mood/series", params={**window, "resolution": 3600}, headers=headers).json()
+        assert data["tier"] == "hour"
+        assert data["points"][0]["count"] == 2 and data["points"][0]["min"] == -1.0
+        print("✅ Incremental rollups passed")
+
+        print("\n5. Ranges with a UTC offset are converted to UTC...")
+        shifted = {"start": "2022-01-03T02:00:00+02:00", "end": "2022-01-03T07:00:00+02:00"}
+        response = client.get("/api/metrics/mood/series", params=shifted, headers=headers)
+        assert response.status_code == 200
+        assert response.json()["points"] == client.get("/api/metrics/mood/series", params=window,
+                                                       headers=headers).json()["points"]
+        response = client.get("/api/metrics/mood/series", params={"start": "2022-01-03T00:00:00Z"}, headers=headers)
+        assert response.status_code == 200
+        print("✅ Offset ranges passed")
+
+        print("\n6. Invalid metric names are rejected...")
+        response = client.post("/api/metrics", json={"points": [{"metric": "Bad Name", "ts": "2022-01-01T00:00:00", "value": 1}]},
+                               headers=headers)
+        assert response.status_code == 422
+        print("✅ Validation passed")
+    finally:
+        _cleanup(user_id)
+
+
+if __name__ == "__main__":
+    test_metric_tiers_and_compaction()
+    print("\n🎉 All metric tests passed!")
@@ -0,0 +1,82 @@
+"""
+Tests for MessagePack content negotiation and columnar packing
+"""
+import uuid
+import msgpack
+from fastapi.testclient import TestClient
+from app.database import SessionLocal
+from app.models.user import User
+from app.models.sync import SyncCounter
+from app.models.task import Task
+from app.models.habit import Habit
+from app.models.rollup import DailyRollup
+from app.services.packing import pack_columns, prefers_msgpack, unpack_columns
+from main import app
+
+
+MSGPACK = {"Accept": "application/msgpack"}
+
+
+def test_accept_negotiation():
+    assert prefers_msgpack("application/msgpack")
+    assert prefers_msgpack("application/x-msgpack, */*;q=0.8")
+    assert prefers_msgpack("application/msgpack;q=0.9, application/json;q=0.5")
+    assert not prefers_msgpack(None)
+    assert not prefers_msgpack("*/*")
+    assert not prefers_msgpack("application/json, application/msgpack")
+    assert not prefers_msgpack("application/msgpack;q=0")
+    assert not prefers_msgpack("application/msgpack;q=0.5, */*")
+
+
+def test_pack_columns_round_trip():
+    rows = [{"id": 1, "title": "Run", "due": None}, {"id": 2, "title": "Read", "extra": [1, 2]}]
+    packed = pack_columns(rows)
+    assert packed == {
+        "fields": ["id", "title", "due", "extra"],
+        "columns": [[1, 2], ["Run", "Read"], [None, None], [None, [1, 2]]],
+        "count": 2
+    }
+    assert unpack_columns(packed) == [dict(rows[0], extra=None), dict(rows[1], due=None)]
+    assert unpack_columns(pack_columns([])) == []
+
+
+def test_list_and_sync_endpoints_pack_the_json_payload():
+    with TestClient(app) as client:
+        suffix = uuid.uuid4().hex[:8]
+        data = client.post("/api/auth/register", json={
+            "username": f"pack_{suffix}",
+            "email": f"pack_{suffix}@test.com",
+            "password": "testpassword123"
+        }).json()
+        headers = {"Authorization": f"Bearer {data['token']}"}
+        try:
+            for n in range(5):
+                client.post("/api/tasks", json={"title": f"Task {n}", "priority": 1 + n % 4,
+                                                "due_date": "2030-01-0%dT09:00:00" % (n + 1)}, headers=headers)
+            client.post("/api/habits", json={"name": "Meditate"}, headers=headers)
+            deleted = client.post("/api/tasks", json={"title": "Gone"}, headers=headers).json()["id"]
+            client.delete(f"/api/tasks/{deleted}", headers=headers)
+
+            for path in ("/api/tasks", "/api/habits"):
+                plain = client.get(path, headers=headers)
+                packed = client.get(path, headers={**headers, **MSGPACK})
+                assert plain.headers["content-type"] == "application/json"
+                assert packed.headers["content-type"] == "application/msgpack"
+                for response in (plain, packed):
+                    assert "Accept" in [value.strip() for value in response.headers["vary"].split(",")]
+                assert unpack_columns(msgpack.unpackb(packed.content)) == plain.json()
+                assert len(packed.content) < len(plain.content)
+
+            plain = client.get("/api/sync", headers=headers).json()
+            packed = msgpack.unpackb(client.get("/api/sync", headers={**headers, **MSGPACK}).content)
+            assert (packed["cursor"], packed["has_more"]) == (plain["cursor"], plain["has_more"])
+            assert packed["changes"]["tasks"]["deletes"] == [deleted]
+            for table, changes in plain["changes"].items():
+                assert unpack_columns(packed["changes"][table]["upserts"]) == changes["upserts"]
+        finally:
+            db = SessionLocal()
+            for model in (Task, Habit, SyncCounter, DailyRollup):
+                db.query(model).filter(model.user_id == data["user_id"]).delete()
+            db.query(User).filter(User.id == data["user_id"]).delete()
+            db.commit()
+            db.close()
@@ -0,0 +1,116 @@
+"""
+Tests for refresh tokens: rotation, reuse detection, per-device revocation and the auth endpoints
+"""
+import uuid
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from app.database import SessionLocal, init_database
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+from app.services import auth as auth_service
+from app.services.auth import AuthService, hash_refresh_token
+from main import app
+
+
+def _cleanup(user_id):
+    db = SessionLocal()
+    db.query(RefreshToken).filter(RefreshToken.user_id == user_id).delete()
+    db.query(User).filter(User.id == user_id).delete()
+    db.commit()
+    db.close()
+
+
+def test_refresh_rotates_and_revokes_per_device(monkeypatch):
+    init_database()
+    client = TestClient(app)
+    suffix = uuid.uuid4().hex[:8]
+    credentials = {"email": f"refresh_{suffix}@test.com", "password": "testpassword123"}
+    response = client.post("/api/auth/register", json={
+        "username": f"refresh_{suffix}", **credentials, "device_id": "phone", "device_name": "Pixel"
+    })
+    assert response.status_code == 201
+    registered = response.json()
+    user_id = registered["user_id"]
+
+    try:
+        assert registered["expires_in"] == auth_service.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        phone_token = registered["refresh_token"]
+
+        # Refreshing never checks the password
+        def _no_bcrypt(*args, **kwargs):
+            raise AssertionError("bcrypt used on refresh")
+
+        monkeypatch.setattr(AuthService, "verify_password", staticmethod(_no_bcrypt))
+        monkeypatch.setattr(AuthService, "hash_password", staticmethod(_no_bcrypt))
+        refreshed = client.post("/api/auth/refresh", json={"refresh_token": phone_token})
+        assert refreshed.status_code == 200
+        body = refreshed.json()
+        assert body["user_id"] == user_id and body["username"] == f"refresh_{suffix}"
+        assert client.get("/api/auth/verify", headers={"Authorization": f"Bearer {body['token']}"}).status_code == 200
+        assert body["refresh_token"] != phone_token
+        monkeypatch.undo()
+
+        # The used token is gone; only its hash was ever stored
+        assert client.post("/api/auth/refresh", json={"refresh_token": phone_token}).status_code == 401
+        db = SessionLocal()
+        hashes = {row.token_hash for row in db.query(RefreshToken).filter(RefreshToken.user_id == user_id)}
+        db.close()
+        assert hash_refresh_token(phone_token) in hashes and phone_token not in hashes
+        phone_token = body["refresh_token"]
+
+        laptop = client.post("/api/auth/login", json={**credentials, "device_id": "laptop"}).json()
+        headers = {"Authorization": f"Bearer {laptop['token']}"}
+        sessions = client.get("/api/auth/sessions", headers=headers).json()
+        assert sorted(session["device_id"] for session in sessions) == ["laptop", "phone"]
+        assert next(s for s in sessions if s["device_id"] == "phone")["device_name"] == "Pixel"
+
+        # Signing the phone out leaves the laptop working
+        assert client.delete("/api/auth/sessions/phone", headers=headers).status_code == 204
+        assert client.delete("/api/auth/sessions/phone", headers=headers).status_code == 404
+        assert client.post("/api/auth/refresh", json={"refresh_token": phone_token}).status_code == 401
+        laptop_token = client.post("/api/auth/refresh", json={"refresh_token": laptop["refresh_token"]}).json()
+        assert laptop_token["refresh_token"]
+
+        assert client.post("/api/auth/logout", json={"refresh_token": laptop_token["refresh_token"]}).status_code == 204
+        assert client.post("/api/auth/refresh",
+                           json={"refresh_token": laptop_token["refresh_token"]}).status_code == 401
+        assert client.get("/api/auth/sessions", headers=headers).json() == []
+    finally:
+        _cleanup(user_id)
+
+
+def test_reused_refresh_token_ends_the_device_session():
+    init_database()
+    db = SessionLocal()
+    user = User(username=f"reuse_{uuid.uuid4().hex[:8]}", email=f"reuse_{uuid.uuid4().hex[:8]}@test.com",
+                password_hash="x")
+    db.add(user)
+    db.commit()
+    user_id = user.id
+    try:
+        first = AuthService.create_refresh_token(db, user_id, "tablet")
+        _, _, second = AuthService.rotate_refresh_token(db, first)
+
+        # A retry racing its own refresh is refused but harmless
+        assert AuthService.rotate_refresh_token(db, first) is None
+        _, _, third = AuthService.rotate_refresh_token(db, second)
+
+        # Long after rotation the old token shows up again: someone copied it
+        db.execute(update(RefreshToken).where(RefreshToken.token_hash == hash_refresh_token(first))
+                   .values(revoked_at=datetime.utcnow() - timedelta(hours=1)))
+        db.commit()
+        assert AuthService.rotate_refresh_token(db, first) is None
+        assert AuthService.rotate_refresh_token(db, third) is None
+        assert AuthService.list_sessions(db, user_id) == []
+
+        # Expired tokens are refused, and purged along with revoked ones
+        expired = AuthService.create_refresh_token(db, user_id, "tablet")
+        db.execute(update(RefreshToken).where(RefreshToken.token_hash == hash_refresh_token(expired))
+                   .values(expires_at=datetime.utcnow() - timedelta(seconds=1)))
+        db.commit()
+        assert AuthService.rotate_refresh_token(db, expired) is None
+        assert AuthService.purge_refresh_tokens(db, datetime.utcnow() + timedelta(seconds=1)) == 4
+    finally:
+        db.close()
+        _cleanup(user_id)
@@ -0,0 +1,245 @@
+"""
+Tests for the time-block scheduler: free-time bookkeeping, placement, repair and incremental re-planning
+"""
+import random
+import uuid
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from app.database import SessionLocal
+from app.models.user import User
+from app.models.sync import SyncCounter
+from app.models.task import Task
+from app.models.rollup import DailyRollup
+from app.models.schedule import BusyBlock, TaskDependency, SchedulePlan, ScheduleBlock
+from app.services.scheduler import FreeTime, PlanTask, plan, replan, subtract
+from main import app
+
+
+def _register(client):
+    suffix = uuid.uuid4().hex[:8]
+    response = client.post("/api/auth/register", json={
+        "username": f"sched_{suffix}",
+        "email": f"sched_{suffix}@test.com",
+        "password": "testpassword123"
+    })
+    assert response.status_code == 201
+    data = response.json()
+    return data["user_id"], {"Authorization": f"Bearer {data['token']}"}
+
+
+def _cleanup(user_id):
+    db = SessionLocal()
+    for model in (ScheduleBlock, SchedulePlan, TaskDependency, BusyBlock, Task, DailyRollup, SyncCounter):
+        db.query(model).filter(model.user_id == user_id).delete()
+    db.query(User).filter(User.id == user_id).delete()
+    db.commit()
+    db.close()
+
+
+def _check_plan(tasks, windows, result):
+    """Blocks lie in free time, never overlap, have the right length and respect dependencies"""
+    by_id = {task.id: task for task in tasks}
+    placed = sorted(chunk for blocks in result.blocks.values() for chunk in blocks)
+    for (_, end), (start, _) in zip(placed, placed[1:]):
+        assert end <= start
+    free = FreeTime(windows)
+    for start, end in placed:
+        free.occupy([(start, end)])
+    for task_id, blocks in result.blocks.items():
+        assert sum(end - start for start, end in blocks) == by_id[task_id].minutes
+        for dep in by_id[task_id].depends_on:
+            assert result.blocks[dep][-1][1] <= blocks[0][0]
+
+
+def test_free_time_occupy_and_release():
+    free = FreeTime([(0, 100), (200, 300)])
+    assert free.find(50, 80, 10) == [(50, 100), (200, 230)]
+    assert free.find(50, 80, 60) == [(200, 280)]
+    free.occupy([(20, 40), (200, 300)])
+    assert free.intervals() == [(0, 20), (40, 100)]
+    free.release([(20, 40), (200, 300)])
+    assert free.intervals() == [(0, 100), (200, 300)]
+    assert subtract([(0, 100), (200, 300)], [(90, 210), (250, 260)]) == [(0, 90), (210, 250), (260, 300)]
+
+
+def test_plan_orders_by_rank_and_dependencies():
+    windows = [(0, 480), (1440, 1920)]
+    tasks = [
+        PlanTask(1, 120, priority=2),
+        PlanTask(2, 60, priority=1),
+        PlanTask(3, 90, priority=1, depends_on=[7]),
+        PlanTask(4, 800),
+        PlanTask(5, 30, depends_on=[6]),
+        PlanTask(6, 30, depends_on=[5]),
+        PlanTask(7, 30, priority=4),
+    ]
+    result = plan(tasks, FreeTime(windows), min_chunk=30)
+    _check_plan(tasks, windows, result)
+    # Task 7 inherits priority 1 from task 3 and goes before task 1
+    assert result.blocks[2] == [(0, 60)]
+    assert result.blocks[7] == [(60, 90)]
+    assert result.blocks[3] == [(90, 180)]
+    assert result.blocks[1] == [(180, 300)]
+    assert result.unscheduled == {4: "no_capacity", 5: "dependency_cycle", 6: "dependency_cycle"}
+    assert not result.late
+
+
+def test_repair_pulls_deadline_task_forward():
+    windows = [(0, 600)]
+    tasks = [
+        PlanTask(1, 300, priority=1),
+        PlanTask(2, 60, priority=3, deadline=200),
+        PlanTask(3, 120, priority=2, deadline=250),
+    ]
+    result = plan(tasks, FreeTime(windows), min_chunk=30)
+    _check_plan(tasks, windows, result)
+    assert not result.late
+    assert result.repaired == 2
+    assert result.blocks[2] == [(0, 60)]
+    assert result.blocks[3] == [(60, 180)]
+    assert result.blocks[1] == [(180, 480)]
+
+
+def test_repair_rolls_back_when_it_would_make_others_late():
+    windows = [(0, 400)]
+    tasks = [
+        PlanTask(1, 300, priority=1, deadline=320),
+        PlanTask(2, 60, priority=3, deadline=100),
+    ]
+    result = plan(tasks, FreeTime(windows), min_chunk=300)
+    assert result.late == {2}
+    assert result.repaired == 0
+    assert result.blocks == {1: [(0, 300)], 2: [(300, 360)]}
+
+
+def test_replan_keeps_head_and_places_every_task():
+    rng = random.Random(7)
+    windows = subtract([(day * 1440 + 540, day * 1440 + 1020) for day in range(20)], [(600, 660), (3500, 3600)])
+    tasks = [
+        PlanTask(n, rng.choice([30, 60, 90, 120]), rng.randint(1, 4),
+                 rng.choice([None, rng.randint(500, 28000)]),
+                 [rng.randint(1, n - 1)] if n > 1 and rng.random() < 0.2 else ())
+        for n in range(1, 101)
+    ]
+    full = plan(tasks, FreeTime(windows), 25)
+    changed = next(task for task in tasks if task.priority == 3 and task.id > 50)
+    changed.minutes += 45
+    result, freeze = replan(tasks, FreeTime(windows), full.blocks, {changed.id}, 25)
+    _check_plan(tasks, windows, result)
+    assert 0 < freeze < 1 << 40
+    kept = [task_id for task_id, blocks in full.blocks.items() if blocks[-1][1] <= freeze and task_id != changed.id]
+    assert kept
+    for task_id in kept:
+        assert result.blocks[task_id] == full.blocks[task_id]
+    assert set(result.blocks) | set(result.unscheduled) == {task.id for task in tasks}
+
+
+def test_replan_moves_kept_blocks_that_are_no_longer_free():
+    tasks = [PlanTask(n, 60) for n in range(1, 6)]
+    full = plan(tasks, FreeTime([(0, 480)]), 25)
+    windows = subtract([(0, 480)], [(10, 40)])
+    result, freeze = replan(tasks, FreeTime(windows), full.blocks, {5}, 25)
+    _check_plan(tasks, windows, result)
+    assert freeze == 0
+    assert set(result.blocks) == {task.id for task in tasks}
+
+
+def test_schedule_api_plan_replan_and_dependencies():
+    client = TestClient(app)
+    user_id, headers = _register(client)
+    try:
+        start = datetime(2030, 1, 7, 8, 0)  # a Monday
+        ids = []
+        for n in range(4):
+            response = client.post("/api/tasks", json={
+                "title": f"work {n}", "estimate_minutes": 60, "priority": 2,
+                "due_date": (start + timedelta(days=3)).isoformat()
+            }, headers=headers)
+            ids.append(response.json()["id"])
+        parent = client.post("/api/tasks", json={"title": "project", "kind": "project"}, headers=headers).json()
+        client.post("/api/tasks", json={"title": "sub", "parent_id": parent["id"], "estimate_minutes": 30}, headers=headers)
+
+        response = client.put(f"/api/schedule/dependencies/{ids[0]}", json={"depends_on": [ids[1]]}, headers=headers)
+        assert response.json() == {"task_id": ids[0], "depends_on": [ids[1]]}
+        response = client.put(f"/api/schedule/dependencies/{ids[0]}", json={"depends_on": [ids[0]]}, headers=headers)
+        assert response.status_code == 400
+
+        busy = client.post("/api/schedule/busy", json={
+            "title": "standup", "start": "2030-01-07T09:00:00", "end": "2030-01-07T10:00:00"
+        }, headers=headers)
+        assert busy.status_code == 201
+
+        response = client.post("/api/schedule/plan", json={"start": start.isoformat(), "days": 7}, headers=headers)
+        assert response.status_code == 200, response.text
+        data = response.json()
+        planned = {block["task_id"] for block in data["blocks"]}
+        assert parent["id"] not in planned and len(planned) == 5
+        assert data["blocks"][0]["start"] == "2030-01-07T10:00:00"
+        first = {block["task_id"]: block["start"] for block in data["blocks"]}
+        assert first[ids[1]] < first[ids[0]]
+
+        # A meeting lands on the first planned block after the plan was made
+        client.post("/api/schedule/busy", json={
+            "title": "review", "start": "2030-01-07T10:00:00", "end": "2030-01-07T10:30:00"
+        }, headers=headers)
+        client.patch(f"/api/tasks/{ids[3]}", json={"status": "done"}, headers=headers)
+        response = client.post("/api/schedule/replan", json={"task_ids": [ids[3]]}, headers=headers)
+        assert response.status_code == 200
+        assert ids[3] not in {block["task_id"] for block in response.json()["blocks"]}
+        assert min(block["start"] for block in response.json()["blocks"]) >= "2030-01-07T10:30:00"
+
+        stored = client.get("/api/schedule", headers=headers).json()
+        assert {b["task_id"] for b in stored["blocks"]} == {b["task_id"] for b in response.json()["blocks"]}
+    finally:
+        _cleanup(user_id)
+
+
+def test_schedule_api_converts_offset_timestamps_to_utc():
+    client = TestClient(app)
+    user_id, headers = _register(client)
+    try:
+        client.post("/api/tasks", json={"title": "work", "estimate_minutes": 60}, headers=headers)
+        busy = client.post("/api/schedule/busy", json={
+            "title": "standup", "start": "2030-01-07T09:00:00+02:00", "end": "2030-01-07T10:00:00+02:00"
+        }, headers=headers)
+        assert busy.status_code == 201
+        assert busy.json()["start"] == "2030-01-07T07:00:00"
+        assert busy.json()["end"] == "2030-01-07T08:00:00"
+
+        listed = client.get("/api/schedule/busy", params={
+            "start": "2030-01-07T08:30:00+02:00", "end": "2030-01-07T09:30:00+02:00"
+        }, headers=headers)
+        assert listed.status_code == 200
+        assert [block["start"] for block in listed.json()] == ["2030-01-07T07:00:00"]
+
+        # The plan starts at 07:30 UTC, inside the busy hour, so work begins when it ends
+        response = client.post("/api/schedule/plan", json={
+            "start": "2030-01-07T09:30:00+02:00", "days": 1, "tz_offset_minutes": 120
+        }, headers=headers)
+        assert response.status_code == 200, response.text
+        assert response.json()["blocks"][0]["start"] == "2030-01-07T08:00:00"
+    finally:
+        _cleanup(user_id)
+
+
+def test_schedule_api_validates_hours_weekdays_and_ranges():
+    client = TestClient(app)
+    user_id, headers = _register(client)
+    try:
+        for body in ({"weekdays": []}, {"weekdays": [1, 7]}, {"day_start": "9:00"}, {"day_end": "25:00"}):
+            response = client.post("/api/schedule/plan", json=body, headers=headers)
+            assert response.status_code == 422, body
+        response = client.post("/api/schedule/plan", json={"day_start": "9:00"}, headers=headers)
+        assert response.json()["detail"][0]["msg"] == "Value error, Time must be HH:MM"
+        response = client.post("/api/schedule/plan", json={"day_start": "12:00", "day_end": "12:00"}, headers=headers)
+        assert response.status_code == 400
+        assert response.json()["detail"]["details"] == {"field": "day_end", "code": "invalid_range"}
+
+        # Compared in UTC: 10:30+02:00 is before 09:00Z
+        response = client.post("/api/schedule/busy", json={
+            "start": "2030-01-07T09:00:00Z", "end": "2030-01-07T10:30:00+02:00"
+        }, headers=headers)
+        assert response.status_code == 400
+        assert response.json()["detail"]["details"] == {"field": "end", "code": "invalid_range"}
+    finally:
+        _cleanup(user_id)
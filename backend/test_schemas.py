@@ -0,0 +1,86 @@
+"""
+Tests for the shared schema types and the schema validation benchmark's coverage
+"""
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+from app.schemas.auth import RefreshRequest, UserCreate, UserLogin, UserResponse
+from app.schemas.finance import TransactionUpdate
+from app.schemas.journal import JournalEntryUpdate
+from app.schemas.task import TaskUpdate
+from app.schemas.trigger import ReminderUpdate
+from app.schemas.workout import WorkoutSetUpdate
+from app.schemas.types import EMAIL_PATTERN
+from benchmarks import bench_schemas
+from main import app
+
+
+def test_auth_schemas_validate_with_the_shared_types():
+    user = UserCreate(username="ada", email="ada@example.com", password="secret", device_id="phone")
+    assert (user.username, user.email, user.device_id, user.device_name) == ("ada", "ada@example.com", "phone", None)
+    assert UserLogin(email="ada@example.com", password="x").device_id is None
+
+    for bad in (
+        {"username": "ab", "email": "ada@example.com", "password": "secret"},
+        {"username": "ada", "email": "not-an-email", "password": "secret"},
+        {"username": "ada", "email": "ada@example", "password": "secret"},
+        {"username": "ada", "email": "ada@example.com", "password": "short"},
+        {"username": "ada", "email": "ada@example.com", "password": "secret", "device_id": ""},
+    ):
+        with pytest.raises(ValidationError):
+            UserCreate(**bad)
+    with pytest.raises(ValidationError):
+        UserLogin(email="ada@example.com\n", password="x")
+    with pytest.raises(ValidationError):
+        RefreshRequest(refresh_token="")
+
+    # The pattern is compiled into the model's core schema, not checked by a Python validator
+    assert not UserLogin.__pydantic_decorators__.field_validators
+    assert UserResponse.model_config["from_attributes"]
+
+
+def test_invalid_email_message_does_not_expose_the_pattern():
+    client = TestClient(app)
+    for path, payload in (
+        ("/api/auth/register", {"username": "ada", "email": "not-an-email", "password": "secret"}),
+        ("/api/auth/login", {"email": "not-an-email", "password": "secret"}),
+    ):
+        response = client.post(path, json=payload)
+        assert response.status_code == 422
+        assert response.json()["detail"] == [{
+            "type": "value_error", "loc": ["body", "email"], "msg": "Value error, Invalid email format",
+            "input": "not-an-email"
+        }]
+        assert EMAIL_PATTERN not in response.text
+
+    # Other validation errors keep FastAPI's default form
+    response = client.post("/api/auth/register", json={"username": "ab", "email": "ada@example.com",
+                                                       "password": "secret"})
+    assert response.json()["detail"][0]["type"] == "string_too_short"
+    assert response.json()["detail"][0]["ctx"] == {"min_length": 3}
+
+
+@pytest.mark.parametrize("model, required, clearable", [
+    (TaskUpdate, ("title", "category", "status", "priority", "kind"),
+     ("description", "due_date", "estimate_minutes", "parent_id")),
+    (WorkoutSetUpdate, ("exercise", "muscle_group", "reps", "weight", "performed_at"), ("duration_seconds",)),
+    (TransactionUpdate, ("amount_cents", "posted_on", "payee"), ("category",)),
+    (JournalEntryUpdate, ("kind", "entry_date", "body"), ()),
+    (ReminderUpdate, ("title", "fire_at", "payload"), ("repeat_seconds",)),
+])
+def test_update_schemas_reject_nulls_only_for_fields_that_cannot_be_cleared(model, required, clearable):
+    assert model.model_validate({}).model_dump(exclude_unset=True) == {}
+    for field in required:
+        with pytest.raises(ValidationError):
+            model.model_validate({field: None})
+    for field in clearable:
+        assert model.model_validate({field: None}).model_dump(exclude_unset=True) == {field: None}
+    # Checked by the field types in compiled code, not by a Python validator
+    assert not model.__pydantic_decorators__.model_validators
+
+
+def test_every_request_schema_has_a_benchmark_case():
+    # A new request schema gets a sample payload in bench_schemas and so meets the same budget
+    assert bench_schemas._uncovered() == []
+    for model, payload in bench_schemas.SCHEMA_CASES.items():
+        model.model_validate(payload)
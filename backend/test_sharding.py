@@ -0,0 +1,147 @@
+"""
+Tests for optional user sharding: shard placement, the engine cache and request routing
+"""
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, inspect
+from app import database
+from app.database import SessionLocal, ShardRouter, engine
+from app.models.user import User
+from app.models.sync import SyncCounter
+from app.models.task import Task
+from app.models.focus import FocusEvent
+from app.models.trigger import Trigger
+from app.models.metric import MetricBlock, MetricPoint
+from app.models.finance import BudgetAggregate
+from app.models.rollup import DailyRollup
+from app import rebuild_rollups
+from app.services.focus import focus_buffer
+from app.services.jobs import JOB_HANDLERS
+from app.services.triggers import SYSTEM_TRIGGERS
+from main import app
+
+
+def _register(client):
+    suffix = uuid.uuid4().hex[:8]
+    data = client.post("/api/auth/register", json={
+        "username": f"shard_{suffix}",
+        "email": f"shard_{suffix}@test.com",
+        "password": "testpassword123"
+    }).json()
+    return data["user_id"], {"Authorization": f"Bearer {data['token']}"}
+
+
+def test_shard_placement_and_engine_eviction(tmp_path):
+    import app.database_init  # noqa: F401  (registers every model)
+    hashed = ShardRouter("hash", engine, count=4, directory=str(tmp_path / "hash"))
+    keys = [hashed.shard_key(user_id) for user_id in range(1, 401)]
+    assert keys == [hashed.shard_key(user_id) for user_id in range(1, 401)]
+    assert sorted(set(keys)) == ["shard_000", "shard_001", "shard_002", "shard_003"]
+    assert min(keys.count(key) for key in set(keys)) > 60
+
+    per_user = ShardRouter("user", engine, directory=str(tmp_path / "user"), capacity=2)
+    for user_id in (1, 2, 1, 3, 1, 2):
+        db = per_user.session(user_id)
+        db.close()
+    # 1 stays hot; 2 is evicted by 3 and opened again
+    assert per_user.stats()["opened"] == 4 and per_user.stats()["evicted"] == 2
+    files = sorted(name for name in os.listdir(tmp_path / "user") if name.endswith(".db"))
+    assert files == ["user_1.db", "user_2.db", "user_3.db"]
+
+    tables = set(inspect(create_engine(f"sqlite:///{tmp_path / 'user' / 'user_1.db'}")).get_table_names())
+    assert {"tasks", "sync_counters", "focus_events"} <= tables
+    assert not tables & set(database.CENTRAL_TABLES)
+
+
+def test_requests_route_user_data_to_shards(tmp_path, monkeypatch):
+    router = ShardRouter("hash", engine, count=2, directory=str(tmp_path))
+    with TestClient(app) as client:
+        users = [_register(client) for _ in range(2)]
+        monkeypatch.setattr(database, "shard_router", router)
+        try:
+            for user_id, headers in users:
+                for n in range(3):
+                    assert client.post("/api/tasks", json={"title": f"Task {n}"}, headers=headers).status_code == 201
+                reminder = client.post("/api/reminders", json={
+                    "title": "Stretch", "fire_at": (datetime.utcnow() + timedelta(seconds=1)).isoformat() + "Z"
+                }, headers=headers)
+                assert reminder.status_code == 201
+                client.post("/api/focus/events", json={"kind": "start", "ts": "2024-05-01T09:00:00",
+                                                       "session_id": "s1"}, headers=headers)
+                assert len(client.get("/api/tasks", headers=headers).json()) == 3
+            focus_buffer.flush()
+
+            for user_id, headers in users:
+                shard = router.session(user_id)
+                assert shard.query(Task).filter(Task.user_id == user_id).count() == 3
+                assert shard.query(FocusEvent).filter(FocusEvent.user_id == user_id).count() == 1
+                # Central tables are reached through the same session
+                assert shard.query(User).filter(User.id == user_id).one().id == user_id
+                shard.close()
+
+                central = SessionLocal()
+                assert central.query(Task).filter(Task.user_id == user_id).count() == 0
+                assert central.query(SyncCounter).filter(SyncCounter.user_id == user_id).count() == 0
+                central.close()
+
+            # The scheduler fires the central reminder and stamps it from the shard's counter
+            user_id, headers = users[0]
+            deadline = time.monotonic() + 10
+            while time.monotonic() < deadline:
+                changes = client.get("/api/sync", params={"since": 0}, headers=headers).json()["changes"]
+                if changes["triggers"]["upserts"][0]["fire_count"] == 1:
+                    break
+                time.sleep(0.2)
+            assert len(changes["tasks"]["upserts"]) == 3
+            assert [row["seq"] for row in changes["triggers"]["upserts"]] == [5]
+        finally:
+            monkeypatch.undo()
+            db = SessionLocal()
+            for user_id, _ in users:
+                db.query(Trigger).filter(Trigger.user_id == user_id).delete()
+                db.query(User).filter(User.id == user_id).delete()
+            db.commit()
+            db.close()
+            router.dispose()
+
+
+def test_maintenance_jobs_cover_every_shard(tmp_path, monkeypatch, capsys):
+    import app.database_init  # noqa: F401  (registers every model)
+    router = ShardRouter("user", engine, directory=str(tmp_path))
+    monkeypatch.setattr(database, "shard_router", router)
+    old = datetime.utcnow() - timedelta(days=400)
+    try:
+        for user_id in (1, 2, 3):
+            shard = router.session(user_id)
+            shard.add_all([MetricPoint(user_id=user_id, metric="weight", ts=old + timedelta(minutes=n), value=70.0)
+                           for n in range(user_id)])
+            # An aggregate left behind with no transactions behind it
+            shard.add(BudgetAggregate(user_id=user_id, month=old.date().replace(day=1), category="groceries",
+                                      spent_cents=100, income_cents=0, transaction_count=1))
+            shard.add(Task(user_id=user_id, title="old", created_at=old))
+            shard.commit()
+            shard.close()
+
+        assert SYSTEM_TRIGGERS["system.metrics.compact"][0] == "metrics.compact"
+        assert SYSTEM_TRIGGERS["system.budgets.reconcile"][0] == "budgets.reconcile"
+        central = SessionLocal()
+        assert JOB_HANDLERS["metrics.compact"](central, None, {}) == {"compacted": 6}
+        assert JOB_HANDLERS["budgets.reconcile"](central, None, {}) == {"repaired": 3}
+        assert JOB_HANDLERS["rollups.rebuild"](central, None, {}) == {"rows": 3}
+        central.close()
+        monkeypatch.setattr("sys.argv", ["rebuild_rollups"])
+        rebuild_rollups.main()
+        assert "Rebuilt 3 rollup rows for all users" in capsys.readouterr().out
+        for user_id in (1, 2, 3):
+            shard = router.session(user_id)
+            assert shard.query(MetricPoint).count() == 0
+            assert shard.query(MetricBlock).one().count == user_id
+            assert shard.query(BudgetAggregate).count() == 0
+            assert shard.query(DailyRollup).one().tasks_created == 1
+            shard.close()
+    finally:
+        monkeypatch.undo()
+        router.dispose()
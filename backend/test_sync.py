@@ -0,0 +1,120 @@
+"""
+Integration test for the delta-sync change feed
+"""
+import uuid
+from fastapi.testclient import TestClient
+from app.database import SessionLocal, init_database
+from app.models.user import User
+from app.models.sync import SyncCounter
+from app.models.task import Task
+from main import app
+
+
+def _register(client):
+    """Register a throwaway user and return (user_id, auth headers)"""
+    suffix = uuid.uuid4().hex[:8]
+    response = client.post("/api/auth/register", json={
+        "username": f"sync_{suffix}",
+        "email": f"sync_{suffix}@test.com",
+        "password": "testpassword123"
+    })
+    assert response.status_code == 201
+    data = response.json()
+    return data["user_id"], {"Authorization": f"Bearer {data['token']}"}
+
+
+def _cleanup(user_id):
+    db = SessionLocal()
+    db.query(Task).filter(Task.user_id == user_id).delete()
+    db.query(SyncCounter).filter(SyncCounter.user_id == user_id).delete()
+    db.query(User).filter(User.id == user_id).delete()
+    db.commit()
+    db.close()
+
+
+def test_sync_feed():
+    """Test that the change feed returns only rows changed after the cursor"""
+    init_database()
+    client = TestClient(app)
+    user_id, headers = _register(client)
+
+    try:
+        print("\n1. Empty feed for a new user...")
+        response = client.get("/api/sync", headers=headers)
+        assert response.status_code == 200
+        assert response.json() == {"cursor": 0, "has_more": False, "changes": {}}
+        print("✅ Empty feed passed")
+
+        print("\n2. Full sync after creating tasks...")
+        ids = []
+        for i in range(3):
+            response = client.post("/api/tasks", json={"title": f"Task {i}"}, headers=headers)
+            assert response.status_code == 201
+            ids.append(response.json()["id"])
+        response = client.get("/api/sync", headers=headers)
+        data = response.json()
+        assert [t["id"] for t in data["changes"]["tasks"]["upserts"]] == ids
+        assert data["has_more"] is False
+        cursor = data["cursor"]
+        print("✅ Full sync passed")
+
+        print("\n3. Nothing changed since cursor...")
+        response = client.get(f"/api/sync?since={cursor}", headers=headers)
+        assert response.json() == {"cursor": cursor, "has_more": False, "changes": {}}
+        print("✅ No-op sync passed")
+
+        print("\n4. Update and delete produce delta and tombstone...")
+        client.patch(f"/api/tasks/{ids[0]}", json={"status": "done"}, headers=headers)
+        response = client.delete(f"/api/tasks/{ids[1]}", headers=headers)
+        assert response.status_code == 204
+        data = client.get(f"/api/sync?since={cursor}", headers=headers).json()
+        tasks = data["changes"]["tasks"]
+        assert [t["id"] for t in tasks["upserts"]] == [ids[0]]
+        assert tasks["upserts"][0]["completed_at"] is not None
+        assert tasks["deletes"] == [ids[1]]
+        assert data["cursor"] > cursor
+        print("✅ Delta sync passed")
+
+        print("\n5. Paging with a small limit...")
+        seen = []
+        cursor = 0
+        while True:
+            data = client.get(f"/api/sync?since={cursor}&limit=1", headers=headers).json()
+            for bucket in data["changes"].values():
+                seen.extend(t["id"] for t in bucket["upserts"])
+                seen.extend(bucket["deletes"])
+            cursor = data["cursor"]
+            if not data["has_more"]:
+                break
+        assert sorted(seen) == sorted(ids)
+        print("✅ Paging passed")
+
+        print("\n6. Deleted tasks are hidden from the list endpoint...")
+        listed = [t["id"] for t in client.get("/api/tasks", headers=headers).json()]
+        assert listed == [ids[0], ids[2]]
+        print("✅ Tombstones hidden passed")
+
+        print("\n7. Nulls are rejected for fields that cannot be cleared...")
+        for field in ("title", "category", "status", "priority", "kind"):
+            response = client.patch(f"/api/tasks/{ids[2]}", json={field: None}, headers=headers)
+            assert response.status_code == 422, field
+        response = client.patch(f"/api/tasks/{ids[2]}", json={"description": None, "parent_id": None}, headers=headers)
+        assert response.status_code == 200
+        assert response.json()["status"] == "todo"
+        print("✅ Null validation passed")
+
+        print("\n8. Due dates with an offset are stored in UTC...")
+        created = client.post("/api/tasks", json={"title": "Deadline", "due_date": "2030-01-07T17:00:00+02:00"},
+                              headers=headers).json()
+        assert created["due_date"] == "2030-01-07T15:00:00"
+        updated = client.patch(f"/api/tasks/{created['id']}", json={"due_date": "2030-01-08T09:00:00-05:00"},
+                               headers=headers).json()
+        assert updated["due_date"] == "2030-01-08T14:00:00"
+        print("✅ Due date conversion passed")
+    finally:
+        _cleanup(user_id)
+
+
+if __name__ == "__main__":
+    test_sync_feed()
+    print("\n🎉 All sync tests passed!")
@@ -0,0 +1,181 @@
+"""
+Tests for task hierarchies: materialized paths, subtree fetches and propagated progress counters
+"""
+import random
+import uuid
+from datetime import datetime
+from sqlalchemy import insert
+from fastapi.testclient import TestClient
+from app.database import SessionLocal
+from app.models.user import User
+from app.models.sync import SyncCounter
+from app.models.task import Task
+from app.models.rollup import DailyRollup
+from app.services.task_tree import TaskTreeService
+from main import app
+
+
+def _register(client):
+    suffix = uuid.uuid4().hex[:8]
+    response = client.post("/api/auth/register", json={
+        "username": f"tree_{suffix}",
+        "email": f"tree_{suffix}@test.com",
+        "password": "testpassword123"
+    })
+    assert response.status_code == 201
+    data = response.json()
+    return data["user_id"], {"Authorization": f"Bearer {data['token']}"}
+
+
+def _cleanup(user_id):
+    db = SessionLocal()
+    for model in (Task, DailyRollup, SyncCounter):
+        db.query(model).filter(model.user_id == user_id).delete()
+    db.query(User).filter(User.id == user_id).delete()
+    db.commit()
+    db.close()
+
+
+def _create(client, headers, title, parent_id=None, **fields):
+    response = client.post("/api/tasks", json={"title": title, "parent_id": parent_id, **fields}, headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def _progress(client, headers, task_id):
+    data = client.get(f"/api/tasks/{task_id}/progress", headers=headers).json()
+    return data["done"], data["total"]
+
+
+def _brute_force(user_id):
+    """Counters recomputed by walking parent links, independent of paths"""
+    db = SessionLocal()
+    tasks = {t.id: t for t in db.query(Task).filter(Task.user_id == user_id, Task.deleted_at.is_(None))}
+    expected = {task_id: [0, 0] for task_id in tasks}
+    for task in tasks.values():
+        node = task
+        while node is not None:
+            expected[node.id][0] += task.status == "done"
+            expected[node.id][1] += 1
+            node = tasks.get(node.parent_id)
+    actual = {task_id: [t.subtree_done, t.subtree_total] for task_id, t in tasks.items()}
+    db.close()
+    return expected, actual
+
+
+def test_progress_propagates_through_deep_chains():
+    with TestClient(app) as client:
+        user_id, headers = _register(client)
+        try:
+            goal = _create(client, headers, "Run a marathon", kind="goal")
+            project = _create(client, headers, "Training plan", goal["id"], kind="project")
+            chain = [project]
+            for level in range(12):
+                chain.append(_create(client, headers, f"Step {level}", chain[-1]["id"]))
+            sibling = _create(client, headers, "Buy shoes", project["id"], status="done")
+            assert chain[-1]["depth"] == 13 and sibling["depth"] == 2
+
+            assert _progress(client, headers, goal["id"]) == (1, 15)
+            assert _progress(client, headers, chain[6]["id"]) == (0, 7)
+
+            client.patch(f"/api/tasks/{chain[-1]['id']}", json={"status": "done"}, headers=headers)
+            assert _progress(client, headers, goal["id"]) == (2, 15)
+            assert _progress(client, headers, chain[6]["id"]) == (1, 7)
+            client.patch(f"/api/tasks/{chain[-1]['id']}", json={"status": "in_progress"}, headers=headers)
+            assert _progress(client, headers, chain[6]["id"]) == (0, 7)
+
+            progress = client.get(f"/api/tasks/{project['id']}/progress", headers=headers).json()
+            assert progress["percent"] == round(1 / 14 * 100, 1)
+
+            subtree = client.get(f"/api/tasks/{project['id']}/subtree", headers=headers).json()
+            assert len(subtree) == 14
+            assert subtree[0]["id"] == project["id"]
+            seen = set()
+            for task in subtree[1:]:
+                assert task["parent_id"] in seen | {project["id"]}
+                seen.add(task["id"])
+            shallow = client.get(f"/api/tasks/{project['id']}/subtree", params={"max_depth": 1}, headers=headers).json()
+            assert {t["title"] for t in shallow} == {"Training plan", "Step 0", "Buy shoes"}
+        finally:
+            _cleanup(user_id)
+
+
+def test_move_and_delete_keep_counters_consistent():
+    with TestClient(app) as client:
+        user_id, headers = _register(client)
+        try:
+            rng = random.Random(39)
+            nodes = [_create(client, headers, "root", kind="goal")]
+            for n in range(60):
+                parent = rng.choice(nodes)
+                nodes.append(_create(client, headers, f"node {n}", parent["id"],
+                                     status=rng.choice(["todo", "done", "in_progress"])))
+            for _ in range(40):
+                node = rng.choice(nodes[1:])
+                action = rng.random()
+                if action < 0.5:
+                    client.patch(f"/api/tasks/{node['id']}", json={"status": rng.choice(["todo", "done"])},
+                                 headers=headers)
+                else:
+                    target = rng.choice(nodes + [None])
+                    response = client.patch(f"/api/tasks/{node['id']}",
+                                            json={"parent_id": target["id"] if target else None}, headers=headers)
+                    assert response.status_code in (200, 400, 404)
+            expected, actual = _brute_force(user_id)
+            assert actual == expected
+
+            victim = next(n for n in nodes[1:] if client.get(f"/api/tasks/{n['id']}/progress",
+                                                             headers=headers).json()["total"] > 2)
+            removed = client.get(f"/api/tasks/{victim['id']}/subtree", headers=headers).json()
+            assert client.delete(f"/api/tasks/{victim['id']}", headers=headers).status_code == 204
+            for task in removed:
+                assert client.get(f"/api/tasks/{task['id']}", headers=headers).status_code == 404
+            expected, actual = _brute_force(user_id)
+            assert actual == expected
+
+            db = SessionLocal()
+            assert TaskTreeService.rebuild_counters(db, user_id) == 0
+            db.close()
+        finally:
+            _cleanup(user_id)
+
+
+def test_invalid_parents_are_rejected():
+    with TestClient(app) as client:
+        user_id, headers = _register(client)
+        try:
+            parent = _create(client, headers, "parent")
+            child = _create(client, headers, "child", parent["id"])
+            missing = client.post("/api/tasks", json={"title": "orphan", "parent_id": 10 ** 9}, headers=headers)
+            assert missing.status_code == 400
+            assert missing.json()["detail"]["details"]["code"] == "invalid_parent"
+            cycle = client.patch(f"/api/tasks/{parent['id']}", json={"parent_id": child["id"]}, headers=headers)
+            assert cycle.status_code == 400
+            assert _progress(client, headers, parent["id"]) == (0, 2)
+        finally:
+            _cleanup(user_id)
+
+
+def test_tasks_without_paths_are_backfilled_before_use():
+    """Rows bulk-inserted with the column defaults (path="") must not act as the whole task list"""
+    with TestClient(app) as client:
+        user_id, headers = _register(client)
+        try:
+            db = SessionLocal()
+            now = datetime.utcnow()
+            rows = [{"user_id": user_id, "title": title, "status": status, "created_at": now, "updated_at": now}
+                    for title, status in (("goal", "todo"), ("step", "done"), ("unrelated", "todo"))]
+            goal_id, step_id, unrelated_id = (db.execute(insert(Task).values(row)).inserted_primary_key[0]
+                                              for row in rows)
+            db.execute(Task.__table__.update().where(Task.id == step_id).values(parent_id=goal_id))
+            db.commit()
+            db.close()
+
+            assert _progress(client, headers, goal_id) == (1, 2)
+            assert client.delete(f"/api/tasks/{goal_id}", headers=headers).status_code == 204
+            assert client.get(f"/api/tasks/{step_id}", headers=headers).status_code == 404
+            assert client.get(f"/api/tasks/{unrelated_id}", headers=headers).status_code == 200
+            expected, actual = _brute_force(user_id)
+            assert actual == expected
+        finally:
+            _cleanup(user_id)
@@ -0,0 +1,205 @@
+"""
+Tests for the timer wheel and the trigger scheduler: exactly-once firing, misfire recovery and reminders
+"""
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from app.database import Base, SessionLocal
+from app.models.user import User
+from app.models.sync import SyncCounter
+from app.models.job import Job
+from app.models.trigger import Trigger
+from app.services.timer_wheel import TimerWheel
+from app.services.triggers import TriggerScheduler, next_occurrence
+from main import app
+
+
+BASE = datetime(2030, 6, 1, 9, 0, 0)
+
+
+def _sessions(path):
+    import app.database_init  # noqa: F401  (registers every model)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def _pragmas(dbapi_connection, connection_record):
+        dbapi_connection.execute("PRAGMA journal_mode=WAL")
+
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+
+def _add(session_factory, triggers):
+    db = session_factory()
+    db.add_all(triggers)
+    db.commit()
+    ids = [trigger.id for trigger in triggers]
+    db.close()
+    return ids
+
+
+def test_timer_wheel_fires_every_timer_once_at_its_tick():
+    rng = random.Random(44)
+    start = 1_000_000
+    wheel = TimerWheel(start, slots=8, levels=3)
+    due = {n: start + rng.randrange(1, 3000) for n in range(3000)}
+    for n, tick in due.items():
+        wheel.add(tick, n)
+    fired = {}
+    now = start
+    while now < start + 3100:
+        previous, now = now, now + rng.choice((1, 1, 2, 37))
+        for n in wheel.advance(now):
+            assert n not in fired
+            fired[n] = (previous, now)
+    assert len(wheel) == 0 and len(fired) == len(due)
+    assert all(previous < due[n] <= now for n, (previous, now) in fired.items())
+
+    # Already-due timers come out of the next advance
+    wheel.add(now - 5, "late")
+    assert wheel.advance(now) == ["late"]
+
+
+def test_next_occurrence_skips_missed_repeats():
+    assert next_occurrence(BASE, None, BASE) is None
+    assert next_occurrence(BASE, 60, BASE) == BASE + timedelta(seconds=60)
+    assert next_occurrence(BASE, 3600, BASE + timedelta(hours=5, minutes=1)) == BASE + timedelta(hours=6)
+
+
+def test_two_schedulers_fire_each_occurrence_exactly_once(tmp_path):
+    session_factory = _sessions(tmp_path / "triggers.db")
+    one_off = [
+        Trigger(kind="reminder" if n % 2 else "jobs.purge", user_id=1 if n % 10 == 1 else None,
+                next_fire_at=BASE + timedelta(seconds=n * 0.7), payload="{}")
+        for n in range(200)
+    ]
+    repeating = [Trigger(kind="jobs.purge", next_fire_at=BASE + timedelta(seconds=5 + n), repeat_seconds=30,
+                         payload="{}") for n in range(20)]
+    one_off_ids = _add(session_factory, one_off)
+    repeating_ids = _add(session_factory, repeating)
+
+    schedulers = [TriggerScheduler(session_factory, window_seconds=60, misfire_grace_seconds=10) for _ in range(2)]
+    now = BASE - timedelta(seconds=1)
+    while now < BASE + timedelta(seconds=150):
+        now += timedelta(seconds=0.5)
+        for scheduler in random.Random(now.second).sample(schedulers, 2):
+            scheduler.tick(now)
+
+    db = session_factory()
+    triggers = {trigger.id: trigger for trigger in db.query(Trigger)}
+    for trigger_id in one_off_ids:
+        assert (triggers[trigger_id].status, triggers[trigger_id].fire_count) == ("done", 1)
+    for n, trigger_id in enumerate(repeating_ids):
+        # First at BASE + 5 + n, then every 30 s up to BASE + 150
+        assert triggers[trigger_id].fire_count == len(range(5 + n, 150, 30))
+        assert triggers[trigger_id].next_fire_at > now - timedelta(seconds=1)
+    fires = sum(trigger.fire_count for trigger in triggers.values())
+    assert sum(scheduler.counters["fired"] for scheduler in schedulers) == fires
+    assert all(scheduler.counters["fired"] > 0 for scheduler in schedulers)
+    jobs = db.query(Job).count()
+    assert jobs == sum(t.fire_count for t in triggers.values() if t.kind == "jobs.purge")
+    assert db.query(SyncCounter).filter(SyncCounter.user_id == 1).one().last_seq == 20
+    db.close()
+
+
+def test_misfires_are_recovered_after_restart(tmp_path):
+    session_factory = _sessions(tmp_path / "triggers.db")
+    missed_once, missed_daily, future = _add(session_factory, [
+        Trigger(kind="jobs.purge", next_fire_at=BASE - timedelta(hours=3), payload="{}"),
+        Trigger(kind="jobs.purge", next_fire_at=BASE - timedelta(days=3, hours=1), repeat_seconds=86400,
+                payload="{}"),
+        Trigger(kind="jobs.purge", next_fire_at=BASE + timedelta(hours=2), payload="{}"),
+    ])
+    scheduler = TriggerScheduler(session_factory, window_seconds=600, misfire_grace_seconds=30)
+    assert scheduler.tick(BASE) == 2
+    assert scheduler.tick(BASE + timedelta(seconds=1)) == 0
+    assert scheduler.counters["misfired"] == 2
+
+    db = session_factory()
+    assert db.get(Trigger, missed_once).status == "done"
+    daily = db.get(Trigger, missed_daily)
+    assert (daily.fire_count, daily.next_fire_at) == (1, BASE + timedelta(hours=23))
+    assert db.get(Trigger, future).fire_count == 0
+    late = [job.to_dict()["payload"]["late_seconds"] for job in db.query(Job).order_by(Job.id)]
+    assert sorted(late) == [3 * 3600, 3 * 86400 + 3600]
+    db.close()
+
+
+def test_edited_trigger_does_not_fire_its_old_occurrence(tmp_path):
+    session_factory = _sessions(tmp_path / "triggers.db")
+    (trigger_id,) = _add(session_factory, [Trigger(kind="reminder", next_fire_at=BASE + timedelta(seconds=10),
+                                                   payload="{}")])
+    scheduler = TriggerScheduler(session_factory, window_seconds=600, misfire_grace_seconds=30)
+    scheduler.tick(BASE)
+
+    # Another process moves the reminder 20 s later and bumps its version
+    db = session_factory()
+    trigger = db.get(Trigger, trigger_id)
+    trigger.next_fire_at = BASE + timedelta(seconds=30)
+    trigger.version += 1
+    db.commit()
+    assert scheduler.tick(BASE + timedelta(seconds=10)) == 0
+    assert scheduler.counters["lost_races"] == 1
+
+    # The new time was not loaded by this scheduler: it fires once the misfire scan sees it
+    assert scheduler.tick(BASE + timedelta(seconds=35)) == 0
+    assert scheduler.tick(BASE + timedelta(seconds=66)) == 1
+    db.refresh(trigger)
+    assert (trigger.status, trigger.fire_count) == ("done", 1)
+    db.close()
+
+
+def test_reminder_api_fires_and_syncs():
+    with TestClient(app) as client:
+        suffix = uuid.uuid4().hex[:8]
+        data = client.post("/api/auth/register", json={
+            "username": f"remind_{suffix}",
+            "email": f"remind_{suffix}@test.com",
+            "password": "testpassword123"
+        }).json()
+        headers = {"Authorization": f"Bearer {data['token']}"}
+        try:
+            soon = client.post("/api/reminders", json={
+                "title": "Stretch", "fire_at": (datetime.utcnow() + timedelta(seconds=1)).isoformat() + "Z"
+            }, headers=headers)
+            assert soon.status_code == 201
+            later = client.post("/api/reminders", json={
+                "title": "Water the plants", "fire_at": "2099-01-01T08:00:00", "repeat_seconds": 86400,
+                "payload": {"habit_id": 3}
+            }, headers=headers).json()
+            assert client.post("/api/reminders", json={
+                "title": "Too often", "fire_at": "2099-01-01T08:00:00", "repeat_seconds": 5
+            }, headers=headers).status_code == 422
+
+            deadline = time.monotonic() + 10
+            while time.monotonic() < deadline:
+                reminders = client.get("/api/reminders", params={"include_finished": True}, headers=headers).json()
+                fired = [r for r in reminders if r["id"] == soon.json()["id"] and r["status"] == "done"]
+                if fired:
+                    break
+                time.sleep(0.2)
+            assert fired and fired[0]["fire_count"] == 1 and fired[0]["last_fired_at"]
+            assert [r["id"] for r in client.get("/api/reminders", headers=headers).json()] == [later["id"]]
+
+            changes = client.get("/api/sync", params={"since": 0}, headers=headers).json()["changes"]["triggers"]
+            assert {row["id"]: row["fire_count"] for row in changes["upserts"]} == {
+                soon.json()["id"]: 1, later["id"]: 0
+            }
+
+            moved = client.patch(f"/api/reminders/{later['id']}", json={"fire_at": "2099-02-01T08:00:00"},
+                                 headers=headers).json()
+            assert moved["next_fire_at"] == "2099-02-01T08:00:00" and moved["payload"] == {"habit_id": 3}
+            assert client.delete(f"/api/reminders/{later['id']}", headers=headers).status_code == 204
+            assert client.get("/api/reminders", headers=headers).json() == []
+            assert client.get("/api/reminders/scheduler/stats", headers=headers).json()["fired"] >= 1
+        finally:
+            db = SessionLocal()
+            for model in (Trigger, SyncCounter):
+                db.query(model).filter(model.user_id == data["user_id"]).delete()
+            db.query(User).filter(User.id == data["user_id"]).delete()
+            db.commit()
+            db.close()
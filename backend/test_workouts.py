@@ -0,0 +1,151 @@
+"""
+Tests for incrementally maintained workout progress summaries
+"""
+import random
+import uuid
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from app.database import SessionLocal, init_database
+from app.models.user import User
+from app.models.sync import SyncCounter
+from app.models.workout import WorkoutSet, ExerciseSummary, ExerciseDay, MuscleGroupWeek
+from app.services.workouts import WorkoutService
+from main import app
+
+
+EXERCISES = {"Bench Press": "chest", "Squat": "legs", "Deadlift": "back", "Curl": "arms"}
+
+
+def _register(client):
+    suffix = uuid.uuid4().hex[:8]
+    response = client.post("/api/auth/register", json={
+        "username": f"lift_{suffix}",
+        "email": f"lift_{suffix}@test.com",
+        "password": "testpassword123"
+    })
+    assert response.status_code == 201
+    data = response.json()
+    return data["user_id"], {"Authorization": f"Bearer {data['token']}"}
+
+
+def _cleanup(user_id):
+    db = SessionLocal()
+    for model in (WorkoutSet, ExerciseSummary, ExerciseDay, MuscleGroupWeek, SyncCounter):
+        db.query(model).filter(model.user_id == user_id).delete()
+    db.query(User).filter(User.id == user_id).delete()
+    db.commit()
+    db.close()
+
+
+def _snapshot(user_id):
+    """All summary rows of a user, rounded to absorb float summation order"""
+    db = SessionLocal()
+    snapshot = {
+        "summaries": sorted(
+            (s.exercise, s.total_sets, s.total_reps, round(s.total_volume, 6), s.best_weight,
+             round(s.best_e1rm, 6), s.last_performed)
+            for s in db.query(ExerciseSummary).filter(ExerciseSummary.user_id == user_id)
+        ),
+        "days": sorted(
+            (d.exercise, d.day, d.sets, round(d.volume, 6), round(d.best_e1rm, 6))
+            for d in db.query(ExerciseDay).filter(ExerciseDay.user_id == user_id)
+        ),
+        "weeks": sorted(
+            (w.week, w.muscle_group, w.sets, round(w.volume, 6))
+            for w in db.query(MuscleGroupWeek).filter(MuscleGroupWeek.user_id == user_id)
+        )
+    }
+    db.close()
+    return snapshot
+
+
+def test_summaries_match_recomputation():
+    """Test random logs, edits and deletes against a from-scratch recomputation"""
+    init_database()
+    client = TestClient(app)
+    user_id, headers = _register(client)
+    rng = random.Random(1234)
+    base = datetime(2024, 3, 1, 18, 0)
+
+    try:
+        live = []
+        for step in range(150):
+            action = rng.random()
+            if action < 0.6 or not live:
+                exercise = rng.choice(list(EXERCISES))
+                response = client.post("/api/workouts/sets", json={
+                    "exercise": exercise,
+                    "muscle_group": EXERCISES[exercise],
+                    "reps": rng.randint(1, 12),
+                    "weight": rng.choice([20, 40, 60, 62.5, 80, 100]),
+                    "performed_at": (base + timedelta(days=rng.randint(0, 30), minutes=step)).isoformat()
+                }, headers=headers)
+                assert response.status_code == 201
+                live.append(response.json()["id"])
+            elif action < 0.8:
+                set_id = rng.choice(live)
+                changes = rng.choice([
+                    {"reps": rng.randint(1, 12)},
+                    {"weight": rng.choice([10, 60, 140])},
+                    {"exercise": "Squat", "muscle_group": "legs"},
+                    {"performed_at": (base + timedelta(days=rng.randint(0, 30))).isoformat()},
+                ])
+                assert client.patch(f"/api/workouts/sets/{set_id}", json=changes, headers=headers).status_code == 200
+            else:
+                set_id = live.pop(rng.randrange(len(live)))
+                assert client.delete(f"/api/workouts/sets/{set_id}", headers=headers).status_code == 204
+
+        print("\n1. Incremental summaries equal a full recomputation...")
+        incremental = _snapshot(user_id)
+        db = SessionLocal()
+        WorkoutService.rebuild(db, user_id)
+        db.close()
+        assert _snapshot(user_id) == incremental
+        print("✅ Recomputation consistency passed")
+
+        print("\n2. Progress endpoints read the summaries...")
+        records = client.get("/api/workouts/records", headers=headers).json()
+        assert {r["exercise"] for r in records} == {s[0] for s in incremental["summaries"]}
+        trend = client.get("/api/workouts/progress/e1rm?exercise=Squat&days=3660", headers=headers).json()
+        assert len(trend) == len([d for d in incremental["days"] if d[0] == "Squat"])
+        volume = client.get("/api/workouts/progress/volume?weeks=520", headers=headers).json()
+        assert sum(v["sets"] for v in volume) == len(live)
+        print("✅ Progress endpoints passed")
+    finally:
+        _cleanup(user_id)
+
+
+def test_offset_timestamps_land_on_their_utc_day_and_week():
+    """01:00+05:00 on Monday 4 March is 20:00 UTC on Sunday 3 March"""
+    init_database()
+    client = TestClient(app)
+    user_id, headers = _register(client)
+
+    try:
+        response = client.post("/api/workouts/sets", json={
+            "exercise": "Squat", "muscle_group": "legs", "reps": 5, "weight": 100,
+            "performed_at": "2024-03-04T01:00:00+05:00"
+        }, headers=headers)
+        assert response.status_code == 201
+        assert response.json()["performed_at"] == "2024-03-03T20:00:00"
+        snapshot = _snapshot(user_id)
+        assert snapshot["summaries"][0][-1] == datetime(2024, 3, 3, 20, 0)
+        assert [d[1].isoformat() for d in snapshot["days"]] == ["2024-03-03"]
+        assert [w[0].isoformat() for w in snapshot["weeks"]] == ["2024-02-26"]
+
+        # 23:30-05:00 on Sunday 10 March is 04:30 UTC on Monday 11 March
+        response = client.patch(f"/api/workouts/sets/{response.json()['id']}",
+                                json={"performed_at": "2024-03-10T23:30:00-05:00"}, headers=headers)
+        assert response.status_code == 200
+        snapshot = _snapshot(user_id)
+        assert snapshot["summaries"][0][-1] == datetime(2024, 3, 11, 4, 30)
+        assert [d[1].isoformat() for d in snapshot["days"]] == ["2024-03-11"]
+        assert [w[0].isoformat() for w in snapshot["weeks"]] == ["2024-03-11"]
+    finally:
+        _cleanup(user_id)
+
+
+if __name__ == "__main__":
+    test_summaries_match_recomputation()
+    test_offset_timestamps_land_on_their_utc_day_and_week()
+    print("\n🎉 All workout tests passed!")
@@ -1,5 +1,5 @@
 import axios from 'axios';
-import type { LoginRequest, RegisterRequest, AuthResponse, ApiError } from '../types';
+import type { LoginRequest, RegisterRequest, AuthResponse, ApiError, SyncResponse } from '../types';
 
 class ApiService {
     private api: ReturnType<typeof axios.create>;
@@ -66,6 +66,52 @@ class ApiService {
         }
     }
 
+    // Delta-sync endpoint: pass the cursor from the previous call, keep paging while has_more
+    async sync(since: number = 0): Promise<SyncResponse> {
+        try {
+            const response = await this.api.get<SyncResponse>('/sync', { params: { since } });
+            return response.data;
+        } catch (error: unknown) {
+            throw this.handleError(error);
+        }
+    }
+
+    // Live change notifications: onChange receives the newest sync cursor, then call sync(since)
+    // Opens the stream with a short-lived ticket so the access token stays out of URLs;
+    // when the server ends the stream at token expiry, reconnects with a fresh ticket
+    subscribeChanges(since: number, onChange: (cursor: number) => void): () => void {
+        let cursor = since;
+        let source: EventSource | null = null;
+        let closed = false;
+
+        const connect = async () => {
+            try {
+                const response = await this.api.post<{ ticket: string; expires_in: number }>('/live/ticket');
+                if (closed) return;
+                const params = new URLSearchParams({ since: String(cursor), ticket: response.data.ticket });
+                source = new EventSource(`${this.api.defaults.baseURL}/live/events?${params}`);
+                source.addEventListener('changes', (event) => {
+                    cursor = JSON.parse((event as MessageEvent).data).cursor;
+                    onChange(cursor);
+                });
+                const reconnect = () => {
+                    source?.close();
+                    if (!closed) setTimeout(connect, 5000);
+                };
+                source.addEventListener('expired', reconnect);
+                source.onerror = reconnect;
+            } catch {
+                if (!closed) setTimeout(connect, 5000);
+            }
+        };
+
+        connect();
+        return () => {
+            closed = true;
+            source?.close();
+        };
+    }
+
     // Health check endpoint
     async healthCheck(): Promise<{ status: string; database: string }> {
         try {
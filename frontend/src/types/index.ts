@@ -34,6 +34,18 @@ export interface ApiError {
   };
 }
 
+// Delta-sync interfaces
+export interface TableChanges {
+  upserts: Record<string, unknown>[];
+  deletes: number[];
+}
+
+export interface SyncResponse {
+  cursor: number;
+  has_more: boolean;
+  changes: Record<string, TableChanges>;
+}
+
 // Form validation interfaces
 export interface FormErrors {
   [key: string]: string;